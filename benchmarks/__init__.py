@@ -0,0 +1,16 @@
+"""
+Raystack benchmark suite. Run it from the repository root:
+
+    python -m benchmarks                 # run and compare with baseline.json
+    python -m benchmarks -k orm          # only benchmarks matching "orm"
+    python -m benchmarks --save-baseline # record a new baseline
+"""
+import os
+import sys
+
+# Like raystack.py, work from a checkout without installing the package.
+_src = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+if _src not in sys.path:
+    sys.path.insert(0, _src)
+
+os.environ.setdefault("RAYSTACK_SETTINGS_MODULE", "benchmarks.settings")
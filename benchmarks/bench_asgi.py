@@ -0,0 +1,59 @@
+"""
+End-to-end requests against a Raystack application, in process.
+"""
+import httpx
+from starlette.responses import PlainTextResponse
+
+from raystack.applications import Raystack
+
+
+def hello_app():
+    app = Raystack()
+
+    @app.get("/hello")
+    async def hello():
+        return PlainTextResponse("Hello, world!")
+
+    @app.get("/items/{item_id}")
+    async def item(item_id: int):
+        return {"id": item_id, "name": "item-%d" % item_id}
+
+    return app
+
+
+async def _receive():
+    return {"type": "http.request", "body": b"", "more_body": False}
+
+
+async def _send(message):
+    pass
+
+
+class HelloWorld:
+    def setup(self):
+        self.app = hello_app()
+        self.client = httpx.AsyncClient(app=self.app, base_url="http://testserver")
+        self.scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": "GET",
+            "scheme": "http",
+            "path": "/hello",
+            "raw_path": b"/hello",
+            "root_path": "",
+            "query_string": b"",
+            "headers": [(b"host", b"testserver")],
+            "client": ("127.0.0.1", 50000),
+            "server": ("testserver", 80),
+        }
+
+    async def time_asgi_call(self):
+        # The application alone, without a client in the way.
+        await self.app(dict(self.scope), _receive, _send)
+
+    async def time_client_plain_text(self):
+        await self.client.get("/hello")
+
+    async def time_client_json(self):
+        await self.client.get("/items/42")
@@ -0,0 +1,109 @@
+"""
+QuerySet, Model and ForeignKeyField hot paths against SQLite.
+
+Every scenario runs twice: through the synchronous sqlite driver and through
+aiosqlite, which is what projects configured with an async URL get.
+"""
+from benchmarks.common import BenchAuthor, BenchBook, BenchEntry, use_database
+from raystack.core.database import transaction
+
+
+class QuerySetSync:
+    def setup(self):
+        use_database(async_mode=False)
+
+    def time_filter_first(self):
+        BenchAuthor.objects.filter(name="author-42").first()
+
+    def time_get(self):
+        BenchAuthor.objects.get(id=42)
+
+    def time_count(self):
+        BenchAuthor.objects.count()
+
+    def time_execute_all(self):
+        BenchAuthor.objects.all().execute_all()
+
+    def time_filter_execute_all(self):
+        BenchBook.objects.filter(author=7).execute_all()
+
+    def time_order_by_slice(self):
+        BenchAuthor.objects.all().order_by("-age")[:20]
+
+    def time_values_execute_all(self):
+        BenchAuthor.objects.all().values("id", "name").execute_all()
+
+
+class QuerySetAsync:
+    def setup(self):
+        use_database(async_mode=True)
+
+    async def time_filter_first(self):
+        await BenchAuthor.objects.filter(name="author-42").first()
+
+    async def time_get(self):
+        await BenchAuthor.objects.get(id=42)
+
+    async def time_count(self):
+        await BenchAuthor.objects.count()
+
+    async def time_execute_all(self):
+        await BenchAuthor.objects.all().execute_all()
+
+    async def time_filter_execute_all(self):
+        await BenchBook.objects.filter(author=7).execute_all()
+
+    async def time_order_by_slice(self):
+        await BenchAuthor.objects.all().order_by("-age")[:20]
+
+
+class ModelWriteSync:
+    def setup(self):
+        use_database(async_mode=False)
+        self.entry = BenchEntry(id=1, title="entry", hits=0)
+
+    def time_save_update(self):
+        self.entry.hits += 1
+        self.entry.save()
+
+    def time_create(self):
+        BenchEntry.create(title="created", hits=1)
+
+    def time_save_update_x10_atomic(self):
+        with transaction.atomic():
+            for _ in range(10):
+                self.entry.hits += 1
+                self.entry.save()
+
+
+class ModelWriteAsync:
+    def setup(self):
+        use_database(async_mode=True)
+        self.entry = BenchEntry(id=1, title="entry", hits=0)
+
+    async def time_save_update(self):
+        self.entry.hits += 1
+        await self.entry.save()
+
+    async def time_create(self):
+        await BenchEntry.create(title="created", hits=1)
+
+    async def time_save_update_x10_atomic(self):
+        async with transaction.atomic():
+            for _ in range(10):
+                self.entry.hits += 1
+                await self.entry.save()
+
+
+class ForeignKeySync:
+    def setup(self):
+        use_database(async_mode=False)
+        self.cached = BenchBook(id=1, title="book-1-0", author=1)
+        self.cached.author
+
+    def time_fk_load(self):
+        # A fresh instance has no cached related object, so this queries.
+        BenchBook(id=1, title="book-1-0", author=1).author
+
+    def time_fk_cached(self):
+        self.cached.author
@@ -0,0 +1,85 @@
+"""
+Jinja2 rendering of the admin templates through the template backend.
+"""
+import os
+from types import SimpleNamespace
+
+import raystack
+from raystack.conf import settings
+from raystack.template.backends.jinja2 import Jinja2
+
+TEMPLATE_DIR = os.path.join(os.path.dirname(raystack.__file__), "contrib", "templates")
+
+
+def url_for(endpoint, **kwargs):
+    if endpoint == "admin_static":
+        return "/admin_static/" + kwargs["filename"]
+    return "/" + "/".join([endpoint] + [str(value) for value in kwargs.values()])
+
+
+def make_users(count):
+    group = SimpleNamespace(id=1, name="staff")
+    return [
+        SimpleNamespace(
+            id=i,
+            name="user-%d" % i,
+            email="user-%d@example.com" % i,
+            age=30,
+            group=group,
+            organization="Raystack",
+            is_active="1",
+            is_superuser="0",
+        )
+        for i in range(1, count + 1)
+    ]
+
+
+class AdminTemplates:
+    def setup(self):
+        engine = Jinja2(
+            {
+                "NAME": "benchmarks",
+                "DIRS": [TEMPLATE_DIR],
+                "APP_DIRS": False,
+                "OPTIONS": {},
+            }
+        )
+        self.users_template = engine.get_template("admin/users.html")
+        self.dashboard_template = engine.get_template("admin/dashboard.html")
+        self.login_template = engine.get_template("accounts/login.html")
+        self.base_context = {
+            "url_for": url_for,
+            "parent": "Admin",
+            "config": settings,
+        }
+        users = make_users(50)
+        self.users_context = dict(self.base_context, segment="Users", users=users)
+        self.dashboard_context = dict(
+            self.base_context,
+            segment="Dashboard",
+            stats={
+                "total_users": 50,
+                "new_users_today": 5,
+                "total_groups": 1,
+                "active_groups": 1,
+                "online_users": 12,
+                "system_status": "Online",
+            },
+            recent_users=users[:5],
+            recent_activities=[],
+            system_info={
+                "version": raystack.__version__,
+                "uptime": "1 day",
+                "memory_usage": 45,
+                "cpu_usage": 23,
+            },
+        )
+
+    def time_render_users(self):
+        self.users_template.render(dict(self.users_context))
+
+    def time_render_dashboard(self):
+        self.dashboard_template.render(dict(self.dashboard_context))
+
+    def time_render_login(self):
+        self.login_template.render(dict(self.base_context, segment="Login"))
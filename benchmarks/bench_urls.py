@@ -0,0 +1,80 @@
+"""
+URL resolution through URLResolver.
+
+The patterns are built from RoutePattern/RegexPattern directly, which is what
+path()/re_path() produce.
+"""
+from raystack.urls.resolvers import (
+    RegexPattern,
+    RoutePattern,
+    URLPattern,
+    URLResolver,
+)
+
+
+def view(*args, **kwargs):
+    pass
+
+
+def route(pattern, name=None):
+    return URLPattern(RoutePattern(pattern, name=name, is_endpoint=True), view, None, name)
+
+
+def include(pattern, patterns):
+    return URLResolver(RoutePattern(pattern, is_endpoint=False), patterns)
+
+
+def build_urlpatterns(static_routes=200):
+    api = [
+        route("", "api-index"),
+        route("<int:pk>/", "api-detail"),
+        route("<slug:slug>/edit/", "api-edit"),
+    ]
+    urlpatterns = [route("page%d/" % i, "page%d" % i) for i in range(static_routes)]
+    urlpatterns += [
+        route("users/<int:user_id>/", "user-detail"),
+        route("users/<int:user_id>/edit/", "user-edit"),
+        route("articles/<int:year>/<slug:slug>/", "article"),
+        include("api/", api),
+        include("api/v2/", api),
+        URLPattern(
+            RegexPattern(r"^archive/(?P<year>[0-9]{4})/$", name="archive", is_endpoint=True),
+            view,
+            None,
+            "archive",
+        ),
+    ]
+    return urlpatterns
+
+
+class Resolve:
+    paths = [
+        "/page0/",
+        "/page199/",
+        "/users/7/",
+        "/users/7/edit/",
+        "/articles/2024/hello-world/",
+        "/api/",
+        "/api/42/",
+        "/api/v2/some-slug/edit/",
+        "/archive/2020/",
+    ]
+
+    def setup(self):
+        self.resolver = URLResolver(RegexPattern(r"^/"), build_urlpatterns())
+        for path in self.paths:
+            self.resolver.resolve(path)
+
+    def time_resolve_static(self):
+        self.resolver.resolve("/page199/")
+
+    def time_resolve_mixed(self):
+        resolve = self.resolver.resolve
+        for path in self.paths:
+            resolve(path)
+
+    def time_resolve_linear(self):
+        # The uncompiled walk used under DEBUG, kept as a reference point.
+        resolve = self.resolver._resolve_linear
+        for path in self.paths:
+            resolve(path)
@@ -0,0 +1,102 @@
+"""
+Models and fixtures shared by the ORM benchmarks.
+"""
+import sqlite3
+
+from raystack.conf import settings
+from raystack.core.database import db
+from raystack.core.database.fields import AutoField, CharField, IntegerField
+from raystack.core.database.fields.related import ForeignKeyField
+from raystack.core.database.models import Model
+
+AUTHORS = 100
+BOOKS_PER_AUTHOR = 3
+
+
+class BenchAuthor(Model):
+    table = "bench_author"
+
+    id = AutoField()
+    name = CharField(max_length=50)
+    email = CharField(max_length=100)
+    age = IntegerField()
+
+
+class BenchBook(Model):
+    table = "bench_book"
+
+    id = AutoField()
+    title = CharField(max_length=100)
+    author = ForeignKeyField(to="BenchAuthor")
+
+
+class BenchEntry(Model):
+    """Write target, kept apart so inserts don't skew the read benchmarks."""
+
+    table = "bench_entry"
+
+    id = AutoField()
+    title = CharField(max_length=100)
+    hits = IntegerField()
+
+
+_prepared = False
+
+
+def database_path():
+    return str(settings.BASE_DIR / "bench.sqlite3")
+
+
+def prepare_database():
+    """Create and seed the benchmark tables once per run."""
+    global _prepared
+    if _prepared:
+        return
+    conn = sqlite3.connect(database_path())
+    with conn:
+        conn.executescript(
+            """
+            DROP TABLE IF EXISTS bench_author;
+            DROP TABLE IF EXISTS bench_book;
+            DROP TABLE IF EXISTS bench_entry;
+            CREATE TABLE bench_author (
+                id INTEGER PRIMARY KEY, name VARCHAR(50), email VARCHAR(100),
+                age INTEGER
+            );
+            CREATE TABLE bench_book (
+                id INTEGER PRIMARY KEY, title VARCHAR(100),
+                author INTEGER REFERENCES bench_author (id)
+            );
+            CREATE TABLE bench_entry (
+                id INTEGER PRIMARY KEY, title VARCHAR(100), hits INTEGER
+            );
+            """
+        )
+        conn.executemany(
+            "INSERT INTO bench_author (id, name, email, age) VALUES (?, ?, ?, ?)",
+            [
+                (i, "author-%d" % i, "author-%d@example.com" % i, 20 + i % 50)
+                for i in range(1, AUTHORS + 1)
+            ],
+        )
+        conn.executemany(
+            "INSERT INTO bench_book (title, author) VALUES (?, ?)",
+            [
+                ("book-%d-%d" % (i, j), i)
+                for i in range(1, AUTHORS + 1)
+                for j in range(BOOKS_PER_AUTHOR)
+            ],
+        )
+        conn.execute("INSERT INTO bench_entry (id, title, hits) VALUES (1, 'entry', 0)")
+    conn.close()
+    _prepared = True
+
+
+def use_database(async_mode=False):
+    """
+    Point the default backend at the benchmark database, in sync (sqlite) or
+    async (aiosqlite) mode. The ORM picks the mode from the URL on each call.
+    """
+    prepare_database()
+    scheme = "sqlite+aiosqlite" if async_mode else "sqlite"
+    db.database_url = "%s:///%s" % (scheme, database_path())
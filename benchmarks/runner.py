@@ -0,0 +1,307 @@
+"""
+A small asv-style benchmark runner.
+
+Benchmarks live in ``benchmarks/bench_*.py`` as classes whose ``time_*``
+methods (plain or ``async def``) are timed. An optional ``setup()`` and
+``teardown()`` run around each class. Results are written as JSON and compared
+against a stored baseline; anything slower than the threshold is reported as a
+regression and makes the run exit with status 1.
+"""
+import argparse
+import asyncio
+import contextlib
+import datetime
+import fnmatch
+import importlib
+import inspect
+import json
+import os
+import pkgutil
+import platform
+import statistics
+import subprocess
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BENCH_DIR)
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, "baseline.json")
+DEFAULT_OUTPUT = os.path.join(BENCH_DIR, "results", "latest.json")
+
+RESULTS_VERSION = 1
+
+
+def discover(patterns=None):
+    """
+    Yield (name, cls, method_name) for every benchmark, in file order. Names
+    look like ``orm.QuerySetSync.time_count``.
+    """
+    import benchmarks
+
+    for module_info in sorted(pkgutil.iter_modules(benchmarks.__path__), key=lambda m: m.name):
+        if not module_info.name.startswith("bench_"):
+            continue
+        module = importlib.import_module("benchmarks.%s" % module_info.name)
+        prefix = module_info.name[len("bench_"):]
+        classes = [
+            obj
+            for obj in vars(module).values()
+            if inspect.isclass(obj) and obj.__module__ == module.__name__
+        ]
+        classes.sort(key=lambda cls: inspect.getsourcelines(cls)[1])
+        for cls in classes:
+            for attr in vars(cls):
+                if not attr.startswith("time_"):
+                    continue
+                name = "%s.%s.%s" % (prefix, cls.__name__, attr)
+                if patterns and not any(fnmatch.fnmatch(name, "*%s*" % p) for p in patterns):
+                    continue
+                yield name, cls, attr
+
+
+class Timer:
+    """Time a benchmark callable, running coroutines on one shared loop."""
+
+    def __init__(self, loop, min_time, repeat):
+        self.loop = loop
+        self.min_time = min_time
+        self.repeat = repeat
+
+    def call(self, func):
+        result = func()
+        if inspect.isawaitable(result):
+            result = self.loop.run_until_complete(result)
+        return result
+
+    def _run(self, func, number):
+        if asyncio.iscoroutinefunction(func):
+
+            async def timed():
+                start = time.perf_counter()
+                for _ in range(number):
+                    await func()
+                return time.perf_counter() - start
+
+            return self.loop.run_until_complete(timed())
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        return time.perf_counter() - start
+
+    def calibrate(self, func):
+        """Return the number of calls that takes at least min_time."""
+        number = 1
+        while True:
+            for multiplier in (1, 2, 5):
+                count = number * multiplier
+                if self._run(func, count) >= self.min_time:
+                    return count
+            number *= 10
+
+    def measure(self, func):
+        self._run(func, 1)
+        number = self.calibrate(func)
+        samples = [self._run(func, number) / number for _ in range(self.repeat)]
+        return {
+            "min": min(samples),
+            "median": statistics.median(samples),
+            "mean": statistics.mean(samples),
+            "stdev": statistics.stdev(samples) if len(samples) > 1 else 0.0,
+            "number": number,
+            "repeat": self.repeat,
+        }
+
+
+def machine_info():
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=ROOT_DIR,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(patterns=None, min_time=0.1, repeat=5, verbose=True):
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    timer = Timer(loop, min_time, repeat)
+    results = {}
+    instances = {}
+    devnull = open(os.devnull, "w")
+    try:
+        for name, cls, attr in discover(patterns):
+            if cls not in instances:
+                # Tear down the previous class before setting up the next one.
+                for instance in instances.values():
+                    if hasattr(instance, "teardown"):
+                        timer.call(instance.teardown)
+                instances = {cls: cls()}
+                if hasattr(instances[cls], "setup"):
+                    with contextlib.redirect_stdout(devnull):
+                        timer.call(instances[cls].setup)
+            func = getattr(instances[cls], attr)
+            # Some hot paths still print; keep that out of the report.
+            with contextlib.redirect_stdout(devnull):
+                results[name] = timer.measure(func)
+            if verbose:
+                print("%-55s %12s" % (name, format_time(results[name]["min"])))
+        for instance in instances.values():
+            if hasattr(instance, "teardown"):
+                timer.call(instance.teardown)
+    finally:
+        devnull.close()
+        loop.close()
+    return {
+        "version": RESULTS_VERSION,
+        "created": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "revision": git_revision(),
+        "machine": machine_info(),
+        "benchmarks": results,
+    }
+
+
+def compare(baseline, current, threshold):
+    """
+    Return (rows, regressions) comparing the fastest sample of each benchmark,
+    which is the least affected by noise from the rest of the system. A
+    benchmark regresses when it is more than ``threshold`` (a fraction) slower
+    than the baseline.
+    """
+    rows = []
+    regressions = []
+    for name, result in current["benchmarks"].items():
+        base = baseline["benchmarks"].get(name)
+        if base is None:
+            rows.append((name, None, result["min"], None))
+            continue
+        ratio = result["min"] / base["min"] if base["min"] else None
+        rows.append((name, base["min"], result["min"], ratio))
+        if ratio is not None and ratio > 1 + threshold:
+            regressions.append(name)
+    return rows, regressions
+
+
+def format_time(seconds):
+    if seconds is None:
+        return "-"
+    for unit, scale in (("s", 1), ("ms", 1e3), ("us", 1e6)):
+        if seconds * scale >= 1:
+            return "%.2f%s" % (seconds * scale, unit)
+    return "%.0fns" % (seconds * 1e9)
+
+
+def load(path):
+    with open(path) as fh:
+        return json.load(fh)
+
+
+def save(data, path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as fh:
+        json.dump(data, fh, indent=2, sort_keys=True)
+        fh.write("\n")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks",
+        description="Run the Raystack benchmarks and compare them with a baseline.",
+    )
+    parser.add_argument(
+        "-k",
+        dest="patterns",
+        action="append",
+        help="Only run benchmarks whose name contains this pattern (repeatable).",
+    )
+    parser.add_argument("--repeat", type=int, default=5, help="Samples per benchmark.")
+    parser.add_argument(
+        "--min-time",
+        type=float,
+        default=0.1,
+        help="Minimum duration of a sample in seconds.",
+    )
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="Where to write the results.")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline to compare against.")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.25,
+        help="Allowed slowdown before a benchmark counts as a regression (0.25 = 25%%).",
+    )
+    parser.add_argument(
+        "--save-baseline",
+        action="store_true",
+        help="Store the results as the new baseline instead of comparing.",
+    )
+    parser.add_argument(
+        "--compare-only",
+        metavar="RESULTS",
+        help="Compare an existing results file with the baseline without running.",
+    )
+    options = parser.parse_args(argv)
+
+    if options.compare_only:
+        current = load(options.compare_only)
+    else:
+        current = run(options.patterns, options.min_time, options.repeat)
+        save(current, options.output)
+        print("\nResults written to %s" % os.path.relpath(options.output))
+
+    if options.save_baseline:
+        if options.patterns and os.path.exists(options.baseline):
+            # Refresh only what was run.
+            baseline = load(options.baseline)
+            baseline["benchmarks"].update(current["benchmarks"])
+            baseline.update({k: v for k, v in current.items() if k != "benchmarks"})
+            current = baseline
+        save(current, options.baseline)
+        print("Baseline saved to %s" % os.path.relpath(options.baseline))
+        return 0
+
+    if not os.path.exists(options.baseline):
+        print("No baseline at %s; run with --save-baseline to create one." % options.baseline)
+        return 0
+
+    baseline = load(options.baseline)
+    if baseline.get("machine") != current.get("machine"):
+        print(
+            "\nWarning: the baseline was recorded on a different machine or "
+            "Python; ratios are only indicative."
+        )
+    rows, regressions = compare(baseline, current, options.threshold)
+    print("\n%-55s %12s %12s %8s" % ("benchmark", "baseline", "current", "ratio"))
+    for name, base, value, ratio in rows:
+        flag = " !" if name in regressions else ""
+        print(
+            "%-55s %12s %12s %8s%s"
+            % (
+                name,
+                format_time(base),
+                format_time(value),
+                "-" if ratio is None else "%.2f" % ratio,
+                flag,
+            )
+        )
+    if regressions:
+        print(
+            "\n%d benchmark(s) regressed by more than %d%%:"
+            % (len(regressions), options.threshold * 100)
+        )
+        for name in regressions:
+            print("  %s" % name)
+        return 1
+    print("\nNo regressions above %d%%." % (options.threshold * 100))
+    return 0
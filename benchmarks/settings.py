@@ -0,0 +1,46 @@
+"""
+Settings used while running the benchmark suite.
+
+Everything lives in a throwaway directory (or RAYSTACK_BENCH_DIR when set) so
+runs never touch a project database.
+"""
+import os
+import pathlib
+import tempfile
+
+BASE_DIR = pathlib.Path(
+    os.environ.get("RAYSTACK_BENCH_DIR") or tempfile.mkdtemp(prefix="raystack-bench-")
+)
+
+DEBUG = False
+
+USE_I18N = False
+
+SECRET_KEY = "raystack-benchmarks"
+
+ALLOWED_HOSTS = ["*"]
+
+INSTALLED_APPS = []
+
+MIDDLEWARE = []
+
+DATABASES = {
+    "default": {
+        "ENGINE": "raystack.core.database.sqlalchemy",
+        "URL": "sqlite:///" + str(BASE_DIR / "bench.sqlite3"),
+    }
+}
+
+TEMPLATES = [
+    {
+        "BACKEND": "raystack.template.backends.jinja2.Jinja2",
+        "DIRS": [],
+        "APP_DIRS": False,
+    },
+]
+
+STATIC_URL = "static/"
+
+STATIC_ROOT = str(BASE_DIR / "staticfiles")
+
+STATICFILES_DIRS = []
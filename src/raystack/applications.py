@@ -0,0 +1,204 @@
+import os
+import logging
+import importlib
+
+from fastapi import FastAPI
+
+from raystack.conf import get_snapshot, settings
+from raystack import shortcuts
+
+
+logger = logging.getLogger("uvicorn")
+
+
+class Raystack(FastAPI):
+
+    def __init__(self):
+        super().__init__()
+
+        self.settings = settings
+        # Validate the settings now rather than on the first request.
+        self.settings_snapshot = get_snapshot()
+        self.shortcuts = shortcuts
+
+        # Get absolute path to current directory
+        self.raystack_directory = os.path.dirname(os.path.abspath(__file__))
+        
+        # Include routers
+        self.include_routers()
+        self.include_templates()
+        self.include_static()
+        self.include_profiling()
+        self.include_middleware()
+        self.include_metrics()
+        self.include_tracing()
+        self.include_log_store()
+        self.include_translations()
+
+    def include_routers(self):
+        self._routers_loaded = False
+        if getattr(self.settings, "LAZY_ROUTERS", False):
+            logger.info("Deferring apps and routers to the first request")
+            return
+        self.load_routers()
+
+    def load_routers(self):
+        # Check and import installed applications
+        self._routers_loaded = True
+        logger.info(f"Loading apps and routers:")
+        for app_path in self.settings.INSTALLED_APPS:
+            # Dynamically import module
+            module = importlib.import_module(app_path)
+            logger.info(f"✅'{app_path}'")
+
+            # If module contains routers, include them
+            if hasattr(module, "router"):
+                self.include_router(module.router)
+                logger.info(f"✅'{app_path}.router'")
+            else:
+                logger.warning(f"⚠️ '{app_path}.router'")
+
+    async def __call__(self, scope, receive, send):
+        if not self._routers_loaded and scope["type"] != "lifespan":
+            self.load_routers()
+        await super().__call__(scope, receive, send)
+
+    def include_templates(self):
+        # Connect internal Raystack templates (e.g., admin templates)
+        internal_template_dirs = [
+            os.path.join(self.raystack_directory, "contrib", "templates")
+        ]
+        for template in self.settings.TEMPLATES:
+            # Add internal templates to user template directories
+            template_dirs = template.get("DIRS", [])
+            # Convert relative paths to absolute
+            template_dirs = [os.path.join(self.settings.BASE_DIR, path) for path in template_dirs]
+            # Add internal templates if not already present
+            for internal_dir in internal_template_dirs:
+                if internal_dir not in template_dirs:
+                    template_dirs.append(internal_dir)
+            template["DIRS"] = template_dirs
+
+    def include_static(self):
+        from raystack.contrib.staticfiles.finders import RAYSTACK_STATIC_PREFIX
+        from raystack.contrib.staticfiles.handlers import StaticFilesHandler
+        from raystack.contrib.staticfiles.storage import staticfiles_storage
+
+        # Serve the output of collectstatic when it's there: hashed names are
+        # cached forever and precompressed variants are used.
+        manifest = getattr(staticfiles_storage, "hashed_files", None)
+        if manifest:
+            static_root = staticfiles_storage.location
+            admin_prefix = RAYSTACK_STATIC_PREFIX + "/"
+            admin_names = [
+                name[len(admin_prefix):]
+                for name in manifest.values()
+                if name.startswith(admin_prefix)
+            ]
+            self.mount(
+                "/admin_static",
+                StaticFilesHandler(
+                    os.path.join(static_root, RAYSTACK_STATIC_PREFIX),
+                    immutable_names=admin_names,
+                    cache_lookups=True,
+                ),
+                name="admin_static",
+            )
+            if "://" not in self.settings.STATIC_URL:
+                self.mount(
+                    "/" + self.settings.STATIC_URL.strip("/"),
+                    StaticFilesHandler(
+                        static_root,
+                        immutable_names=manifest.values(),
+                        cache_lookups=True,
+                    ),
+                    name="static",
+                )
+            return
+
+        # Include framework static files
+        internal_static_dir = os.path.join(self.raystack_directory, "contrib", "static")
+        self.mount("/admin_static", StaticFilesHandler(internal_static_dir), name="admin_static")
+
+        # Include static files from STATICFILES_DIRS
+        if hasattr(self.settings, 'STATICFILES_DIRS') and self.settings.STATICFILES_DIRS:
+            for static_dir in self.settings.STATICFILES_DIRS:
+                if os.path.exists(static_dir):
+                    self.mount("/static", StaticFilesHandler(static_dir), name="static")
+                    break  # Mount only the first existing directory
+        # Fallback to default static directory
+        elif self.settings.STATIC_URL:
+            static_dir = os.path.join(self.settings.BASE_DIR, self.settings.STATIC_URL)
+            if os.path.exists(static_dir):
+                self.mount("/static", StaticFilesHandler(static_dir), name="static")
+
+    def include_middleware(self):
+        # Include middleware from settings
+        if hasattr(self.settings, 'MIDDLEWARE') and self.settings.MIDDLEWARE:
+            logger.info(f"Loading middleware:")
+            for middleware_path in self.settings.MIDDLEWARE:
+                try:
+                    # Import middleware class
+                    module_path, class_name = middleware_path.rsplit('.', 1)
+                    module = importlib.import_module(module_path)
+                    middleware_class = getattr(module, class_name)
+                    
+                    # Add middleware
+                    self.add_middleware(middleware_class)
+                    logger.info(f"✅'{middleware_path}'")
+                except Exception as e:
+                    logger.warning(f"⚠️ Failed to load middleware '{middleware_path}': {e}")
+
+    def include_profiling(self):
+        if not getattr(self.settings, "PROFILING_ENABLED", False):
+            return
+        from raystack.middlewares import ProfilingMiddleware
+
+        # Added before MIDDLEWARE, so it's the innermost middleware.
+        self.add_middleware(ProfilingMiddleware)
+        logger.info(f"✅ Profiling {self.settings.PROFILING_SAMPLE_RATE:.1%} of requests")
+
+    def include_metrics(self):
+        if not getattr(self.settings, "METRICS_ENABLED", False):
+            return
+        from raystack.core.metrics import MetricsApp, instruments
+        from raystack.middlewares import MetricsMiddleware
+
+        instruments.install()
+        self.add_route(
+            self.settings.METRICS_URL,
+            MetricsApp(),
+            methods=["GET", "HEAD"],
+            name="metrics",
+            include_in_schema=False,
+        )
+        # Added after MIDDLEWARE, so it wraps all of it.
+        self.add_middleware(MetricsMiddleware)
+        logger.info(f"✅ Metrics at '{self.settings.METRICS_URL}'")
+
+    def include_tracing(self):
+        if not getattr(self.settings, "TRACING_ENABLED", False):
+            return
+        from raystack.core import tracing
+        from raystack.middlewares import TracingMiddleware
+
+        tracing.get_tracer()
+        # Added last, so the request span covers every other middleware.
+        self.add_middleware(TracingMiddleware)
+        logger.info(f"✅ Tracing to '{self.settings.TRACING_EXPORTER}'")
+
+    def include_log_store(self):
+        if not getattr(self.settings, "LOG_STORE_ENABLED", False):
+            return
+        from raystack.core import logstore
+
+        logstore.install()
+        logger.info(f"✅ Logging to '{self.settings.LOG_STORE_PATH}'")
+
+    def include_translations(self):
+        if not (self.settings.USE_I18N and getattr(self.settings, "LOCALE_WARM_UP", False)):
+            return
+        from raystack.utils.translation import trans_real
+
+        trans_real.warm_up()
+        logger.info(f"✅ Translations loaded for {len(self.settings.LANGUAGES)} languages")
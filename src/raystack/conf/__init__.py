@@ -8,6 +8,7 @@ for a list of all possible variables.
 
 import importlib
 import os
+import threading
 import time
 import traceback
 import warnings
@@ -263,8 +264,110 @@ class UserSettingsHolder:
         }
 
 
+class SettingsSnapshot:
+    """
+    A frozen copy of every setting, taken by get_snapshot(). Its settings are
+    plain attributes (slots), so reading one costs what reading any
+    attribute does, without going through the LazySettings proxy: framework
+    code reading settings on every request reads them here.
+
+    Changing ``settings`` doesn't change the snapshot; reload_settings()
+    takes a new one.
+    """
+
+    __slots__ = ()
+
+    def __setattr__(self, name, value):
+        raise AttributeError(
+            "Settings snapshots are read-only; change settings and call "
+            "reload_settings()."
+        )
+
+    __delattr__ = __setattr__
+
+    def __repr__(self):
+        return "<SettingsSnapshot>"
+
+    def as_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+def _validate(values):
+    for name in ("ALLOWED_HOSTS", "INSTALLED_APPS", "LOCALE_PATHS", "SECRET_KEY_FALLBACKS"):
+        if name in values and not isinstance(values[name], (list, tuple)):
+            raise ImproperlyConfigured("The %s setting must be a list or a tuple." % name)
+    databases = values.get("DATABASES", {})
+    if not isinstance(databases, dict) or not all(isinstance(db, dict) for db in databases.values()):
+        raise ImproperlyConfigured("The DATABASES setting must map aliases to dicts.")
+
+
+def _take_snapshot():
+    values = {name: getattr(settings, name) for name in dir(settings._wrapped) if name.isupper()}
+    _validate(values)
+    cls = type("SettingsSnapshot", (SettingsSnapshot,), {"__slots__": tuple(values)})
+    snapshot = cls.__new__(cls)
+    for name, value in values.items():
+        object.__setattr__(snapshot, name, value)
+    return snapshot
+
+
 settings = LazySettings()
 
+_snapshot = None
+_snapshot_lock = threading.Lock()
+
+
+def get_snapshot():
+    """The settings as they were at start-up or the last reload_settings()."""
+    snapshot = _snapshot
+    if snapshot is None:
+        with _snapshot_lock:
+            snapshot = _snapshot
+            if snapshot is None:
+                if settings._wrapped is empty:
+                    settings._setup()
+                snapshot = _set_snapshot(_take_snapshot())
+    return snapshot
+
+
+def _set_snapshot(snapshot):
+    global _snapshot
+    _snapshot = snapshot
+    return snapshot
+
+
+def reload_settings(reimport=False):
+    """
+    Take a new snapshot of the settings, after re-importing the settings
+    module if ``reimport`` is True, and send setting_changed for each setting
+    whose value changed. Return the names of those settings.
+    """
+    from raystack.core.signals import setting_changed
+
+    with _snapshot_lock:
+        if reimport and isinstance(settings._wrapped, Settings):
+            module = importlib.import_module(settings._wrapped.SETTINGS_MODULE)
+            importlib.reload(module)
+            settings._wrapped = Settings(module.__name__)
+        elif settings._wrapped is empty:
+            settings._setup()
+        old = _snapshot
+        new = _take_snapshot()
+        old_values = old.as_dict() if old is not None else {}
+        new_values = new.as_dict()
+        changed = [
+            name
+            for name in sorted(old_values.keys() | new_values.keys())
+            if name not in old_values
+            or name not in new_values
+            or old_values[name] is not new_values[name] and old_values[name] != new_values[name]
+        ] if old is not None else []
+        _set_snapshot(new)
+    for name in changed:
+        setting_changed.send(settings, setting=name, value=new_values.get(name), snapshot=new)
+    return changed
+
+
 def get_settings():
     """Returns the currently configured settings object."""
     return settings
@@ -159,6 +159,13 @@ LANGUAGES_BIDI = ["he", "ar", "ar-dz", "ckb", "fa", "ug", "ur"]
 # to load the internationalization machinery.
 USE_I18N = True
 LOCALE_PATHS = []
+# Where compiletranslations writes the merged catalog of each language, read
+# at start-up instead of the catalogs of every locale directory. None reads
+# the catalogs.
+LOCALE_CACHE_DIR = None
+# Load the translations of LANGUAGES when the application starts rather than
+# on the first request in each language.
+LOCALE_WARM_UP = True
 
 # Settings for language cookie
 LANGUAGE_COOKIE_NAME = "raystack_language"
@@ -186,6 +193,27 @@ DATABASES = {}
 # Classes used to implement DB routing behavior.
 DATABASE_ROUTERS = []
 
+# Seconds a read replica that failed to connect is skipped for.
+DATABASE_REPLICA_RETRY_AFTER = 30
+
+# Page sizes of paginated API lists (?limit=), see raystack.core.pagination.
+PAGINATION_DEFAULT_LIMIT = 50
+PAGINATION_MAX_LIMIT = 500
+
+# Admin list pages: rows per page, the row count past which counts are
+# shown as "N+" (or estimated), and seconds counts are cached for.
+ADMIN_LIST_PER_PAGE = 100
+ADMIN_COUNT_LIMIT = 10000
+ADMIN_COUNT_CACHE_TIMEOUT = 30
+
+# Seconds each process caches the user and group counters of the admin
+# dashboard (raystack.contrib.auth.stats) for.
+STATS_CACHE_TIMEOUT = 5
+
+# Threads running sync ORM calls made from the event loop (sync database URL
+# under an ASGI server). Keep 1 for SQLite.
+DATABASE_THREAD_POOL_SIZE = 1
+
 # The email backend to use. For possible shortcuts see raystack.core.mail.
 # The default is to use the SMTP backend.
 # Third-party backends can be specified by providing a Python path
@@ -213,6 +241,12 @@ EMAIL_TIMEOUT = None
 # List of strings representing installed apps.
 INSTALLED_APPS = []
 
+# Import INSTALLED_APPS and register their routers on the first request
+# instead of when the application is created. Shortens process start-up at
+# the cost of a slower first request; startup events declared by app routers
+# won't run.
+LAZY_ROUTERS = False
+
 TEMPLATES = [
     {
         "BACKEND": "raystack.template.backends.jinja2.Jinja2",
@@ -286,7 +320,7 @@ STORAGES = {
         "BACKEND": "raystack.core.files.storage.FileSystemStorage",
     },
     "staticfiles": {
-        "BACKEND": "raystack.contrib.staticfiles.storage.StaticFilesStorage",
+        "BACKEND": "raystack.contrib.staticfiles.storage.ManifestStaticFilesStorage",
     },
 }
 
@@ -505,8 +539,12 @@ SESSION_COOKIE_SAMESITE = "Lax"
 SESSION_SAVE_EVERY_REQUEST = False
 # Whether a user's session cookie expires when the web browser is closed.
 SESSION_EXPIRE_AT_BROWSER_CLOSE = False
-# The module to store session data
-SESSION_ENGINE = "raystack.contrib.sessions.backends.db"
+# The module to store session data: signed_cookies, sqlite or locmem, of
+# raystack.contrib.sessions.backends. It was the never shipped
+# raystack.contrib.sessions.backends.db before.
+SESSION_ENGINE = "raystack.contrib.sessions.backends.signed_cookies"
+# The SQLite file of the sqlite session backend.
+SESSION_SQLITE_PATH = "sessions.sqlite3"
 # Directory to store session files if using the file session module. If None,
 # the backend will use a sensible default.
 SESSION_FILE_PATH = None
@@ -527,6 +565,80 @@ CACHE_MIDDLEWARE_KEY_PREFIX = ""
 CACHE_MIDDLEWARE_SECONDS = 600
 CACHE_MIDDLEWARE_ALIAS = "default"
 
+############################
+# DATABASE INSTRUMENTATION #
+############################
+
+# Used by raystack.middlewares.QueryInstrumentationMiddleware.
+# How often one query shape may repeat within a request before it's reported
+# as a likely N+1. 0 disables the check.
+QUERY_N_PLUS_ONE_THRESHOLD = 5
+# Append the list of queries to HTML responses when DEBUG is on.
+QUERY_DEBUG_PANEL = True
+
+###########
+# METRICS #
+###########
+
+# Record request, database, template and password hashing metrics and serve
+# them in the Prometheus text format at METRICS_URL.
+METRICS_ENABLED = False
+METRICS_URL = "/metrics"
+# A directory shared by all worker processes (emptied before they start) to
+# aggregate metrics across workers. Defaults to $RAYSTACK_METRICS_DIR.
+METRICS_MULTIPROCESS_DIR = None
+
+#############
+# PROFILING #
+#############
+
+# Sample the stacks of some requests and aggregate them per route, viewable
+# as flame graphs at /admin/profiling. Requests are profiled when their path
+# matches one of PROFILING_ROUTES (regular expressions), when they carry the
+# PROFILING_HEADER header, or at random at PROFILING_SAMPLE_RATE (0 to 1).
+PROFILING_ENABLED = False
+PROFILING_SAMPLE_RATE = 0.01
+PROFILING_HEADER = "X-Raystack-Profile"
+PROFILING_ROUTES = []
+# Seconds between stack samples.
+PROFILING_INTERVAL = 0.005
+
+###########
+# TRACING #
+###########
+
+# Record spans for requests, queries, template rendering and authentication,
+# continuing traces from incoming W3C traceparent headers.
+TRACING_ENABLED = False
+# "memory", "file", "console", "opentelemetry" (hand spans to an installed
+# OpenTelemetry SDK) or the dotted path of an exporter class.
+TRACING_EXPORTER = "memory"
+# Where the "file" exporter appends spans, as JSON lines.
+TRACING_FILE = "traces.jsonl"
+# Fraction of new traces to record. Traces continued from another service
+# follow that service's sampling decision.
+TRACING_SAMPLE_RATE = 1.0
+TRACING_SERVICE_NAME = "raystack"
+
+#############
+# LOG STORE #
+#############
+
+# Write the records of LOG_STORE_LOGGERS at LOG_STORE_LEVEL and up to a
+# SQLite file, from a background thread, for the admin's logs page.
+LOG_STORE_ENABLED = False
+LOG_STORE_PATH = "logs.sqlite3"
+LOG_STORE_LEVEL = "INFO"
+LOG_STORE_LOGGERS = ["raystack", "uvicorn"]
+# Older rows are dropped past this many.
+LOG_STORE_MAX_ROWS = 100000
+# Records waiting to be written; more are dropped rather than block logging.
+LOG_STORE_QUEUE_SIZE = 10000
+# Records written per transaction.
+LOG_STORE_BATCH_SIZE = 500
+# Seconds between the checks for new rows of the logs page's live tail.
+LOG_STORE_TAIL_INTERVAL = 1.0
+
 ##################
 # AUTHENTICATION #
 ##################
@@ -0,0 +1,214 @@
+"""
+Admin list pages, searched, sorted, paged and counted by the database:
+
+    changelist = ChangeList(
+        request,
+        UserModel.objects.all(),
+        list_display=("id", "name", "email"),
+        search_fields=("^name", "^email"),
+        sortable_by=("id", "name", "email"),
+    )
+    users = await changelist.get_results()
+
+The request's ?q= is the search, ?o= the column to sort by ("-name" for
+descending) and ?p= the page, from 1. Only that page's rows are read, and
+only their ``list_display`` columns.
+
+Search fields take Django's prefixes: "^name" matches the start of the
+value, which an index on the column can serve; "=email" the whole value;
+a bare "name" any part of it, which scans the table.
+
+Counting every row of a big table costs as much as reading it, so counts
+stop at ADMIN_COUNT_LIMIT rows ("10000+"), unfiltered lists of bigger
+tables take the database's own estimate, and counts are cached for
+ADMIN_COUNT_CACHE_TIMEOUT seconds, until invalidate() is called for the
+model.
+"""
+import hashlib
+
+from raystack.conf import settings
+from raystack.core.api import python_type
+from raystack.core.cache import cache
+from raystack.core.database.query import run_sync
+from raystack.core.database.utils import connections
+
+# Bumped by invalidate(); part of the key of every cached count of a model.
+VERSION_KEY = "raystack.admin.version.%s"
+
+
+def _version(model):
+    return cache.get_or_set(VERSION_KEY % model.get_table_name(), 1, None)
+
+
+def cache_key(model, *parts):
+    """A cache key for ``parts``, dropped when ``model`` is invalidated."""
+    digest = hashlib.md5(repr(parts).encode(), usedforsecurity=False).hexdigest()
+    return "raystack.admin.%s.%s.%s" % (model.get_table_name(), _version(model), digest)
+
+
+def invalidate(model):
+    """Forget the cached counts (and choices) of ``model`` after writing to it."""
+    try:
+        cache.incr(VERSION_KEY % model.get_table_name())
+    except ValueError:
+        pass
+
+
+async def estimate_count(queryset):
+    """
+    The number of rows of the queryset's table according to the database's
+    statistics, or None if it hasn't any: PostgreSQL keeps them up to date,
+    SQLite only after ANALYZE.
+    """
+    backend = connections[queryset.db]
+    table = queryset.model_class.get_table_name()
+    if backend.database_url.startswith("postgresql"):
+        query = "SELECT CAST(reltuples AS BIGINT) FROM pg_class WHERE oid = to_regclass(:table)"
+    elif backend.database_url.startswith("sqlite"):
+        query = "SELECT stat FROM sqlite_stat1 WHERE tbl = :table LIMIT 1"
+    else:
+        return None
+    params = {"table": table}
+    try:
+        # The mode of the database the queryset reads from, which needn't
+        # be the default one's.
+        if backend.is_async:
+            rows = await backend.execute_async(query, params, fetch=True)
+        else:
+            rows = await run_sync(backend.execute, query, params, fetch=True)
+    except Exception:
+        # No statistics table yet.
+        return None
+    if not rows or rows[0][0] is None:
+        return None
+    # sqlite_stat1.stat is "<rows> <rows per index key>..."
+    estimate = int(str(rows[0][0]).split()[0])
+    return estimate if estimate >= 0 else None
+
+
+class ChangeList:
+    def __init__(self, request, queryset, list_display, search_fields=(), sortable_by=None, per_page=None):
+        self.request = request
+        self.model = queryset.model_class
+        self.list_display = tuple(list_display)
+        self.search_fields = tuple(search_fields)
+        self.sortable_by = tuple(self.list_display if sortable_by is None else sortable_by)
+        self.per_page = per_page or getattr(settings, "ADMIN_LIST_PER_PAGE", 100)
+        params = request.query_params
+        self.query = params.get("q", "").strip()
+        self.ordering = self._ordering(params.get("o", ""))
+        self.page_num = self._page_num(params.get("p"))
+        self.queryset = self._search(queryset)
+        self.results = []
+        self.has_next = False
+        self.count = None
+        # Whether ``count`` is a lower bound or an estimate.
+        self.approximate = False
+
+    def _ordering(self, value):
+        # "field" or "-field", with a single dash.
+        name = value[1:] if value.startswith("-") else value
+        if name in self.sortable_by:
+            return value
+        return "id"
+
+    @staticmethod
+    def _page_num(value):
+        try:
+            return max(1, int(value))
+        except (TypeError, ValueError):
+            return 1
+
+    def _search(self, queryset):
+        if not self.query or not self.search_fields:
+            return queryset
+        lookups = {}
+        for field in self.search_fields:
+            name = field.lstrip("^=")
+            if field.startswith("^"):
+                lookups[name + "__startswith"] = self.query
+            elif field.startswith("="):
+                if python_type(self.model._fields[name]) is int:
+                    # Not a number: it can't match, and the database may
+                    # refuse the comparison.
+                    if not self.query.isdigit():
+                        continue
+                    lookups[name] = int(self.query)
+                else:
+                    lookups[name] = self.query
+            else:
+                lookups[name + "__contains"] = self.query
+        if not lookups:
+            return queryset.filter(id__in=[])
+        return queryset.filter_any(**lookups)
+
+    async def get_results(self):
+        """Fetch and count the rows of the page; return the rows, as dicts."""
+        # The id keeps rows with equal values in a stable order across pages.
+        order = (self.ordering,) if self.ordering.lstrip("-") == "id" else (self.ordering, "id")
+        offset = (self.page_num - 1) * self.per_page
+        queryset = self.queryset.values(*self.list_display).order_by(*order)
+        # One row more than the page, to know whether there's a next one.
+        rows = list(await queryset.get_item(slice(offset, offset + self.per_page + 1)))
+        self.has_next = len(rows) > self.per_page
+        self.results = rows[:self.per_page]
+        self.count, self.approximate = await self.get_count()
+        return self.results
+
+    async def get_count(self):
+        """Return (count, approximate)."""
+        key = cache_key(self.model, "count", self.queryset.query, sorted((self.queryset.params or {}).items()))
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+        limit = getattr(settings, "ADMIN_COUNT_LIMIT", 10000)
+        result = None
+        if "WHERE" not in self.queryset.query:
+            estimate = await estimate_count(self.queryset)
+            if estimate is not None and estimate > limit:
+                result = (estimate, True)
+        if result is None:
+            count = await self.queryset.acount(limit=limit + 1)
+            result = (limit, True) if count > limit else (count, False)
+        cache.set(key, result, getattr(settings, "ADMIN_COUNT_CACHE_TIMEOUT", 30))
+        return result
+
+    # Template helpers
+
+    @property
+    def num_pages(self):
+        if self.count is None:
+            return None
+        return max(1, -(-self.count // self.per_page))
+
+    @property
+    def pages(self):
+        """Page numbers around the current one, None marking gaps."""
+        last = self.num_pages or self.page_num
+        if self.has_next:
+            last = max(last, self.page_num + 1)
+        numbers = sorted({1, last} | set(range(max(1, self.page_num - 2), min(last, self.page_num + 2) + 1)))
+        pages = []
+        for number in numbers:
+            if pages and number - pages[-1] > 1:
+                pages.append(None)
+            pages.append(number)
+        return pages
+
+    def url(self, **params):
+        """The URL of this list with ``params`` changed."""
+        return str(self.request.url.include_query_params(**params))
+
+    def page_url(self, number):
+        return self.url(p=number)
+
+    def sort_url(self, field):
+        """The URL sorting by ``field``, descending if it's sorted ascending already."""
+        return self.url(o="-" + field if self.ordering == field else field, p=1)
+
+    def sort_icon(self, field):
+        if self.ordering == field:
+            return "fa-sort-up"
+        if self.ordering == "-" + field:
+            return "fa-sort-down"
+        return "fa-sort"
@@ -0,0 +1,55 @@
+"""
+Forms of the admin's create and edit pages.
+"""
+from raystack import forms
+
+
+class GroupForm(forms.Form):
+    name = forms.CharField(
+        label="Group Name",
+        max_length=100,
+        help_text="Unique name for the group",
+        widget=forms.TextInput(attrs={"class": "form-control"}),
+    )
+    description = forms.CharField(
+        required=False,
+        max_length=100,
+        widget=forms.Textarea(attrs={
+            "class": "form-control",
+            "rows": "3",
+            "placeholder": "Describe the purpose of this group",
+        }),
+    )
+
+    @classmethod
+    def for_group(cls, group):
+        return cls(initial={"name": group.name, "description": group.description})
+
+
+class UserForm(forms.Form):
+    name = forms.CharField(max_length=50, widget=forms.TextInput(attrs={"class": "form-control"}))
+    age = forms.IntegerField(min_value=0, widget=forms.NumberInput(attrs={"class": "form-control"}))
+    email = forms.EmailField(
+        label="Email Address",
+        max_length=100,
+        help_text="This will be used for login",
+        widget=forms.EmailInput(attrs={"class": "form-control"}),
+    )
+    organization = forms.CharField(
+        required=False,
+        max_length=100,
+        widget=forms.TextInput(attrs={"class": "form-control"}),
+    )
+    # Drawn by the templates from the cached group choices.
+    group_id = forms.IntegerField(label="Group")
+
+    @classmethod
+    def for_user(cls, user):
+        return cls(initial={
+            "name": user.name,
+            "age": user.age,
+            "email": user.email,
+            "organization": user.organization,
+            # The id stored on the row, without loading the group.
+            "group_id": getattr(user.__dict__.get("group"), "id", user.__dict__.get("group")),
+        })
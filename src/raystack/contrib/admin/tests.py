@@ -1,3 +1,173 @@
-from raystack.test import TestCase
+"""
+Tests of ChangeList: the admin list pages' search, sorting, paging and counts.
+"""
+import asyncio
+import os
+import sqlite3
+import unittest
+from urllib.parse import urlencode
 
-# Create your tests here.
+from raystack.core.database.tests import Account, DatabaseTestCase
+
+from starlette.requests import Request
+
+from raystack.conf import settings
+from raystack.contrib.admin import changelist as changelists
+from raystack.contrib.admin.changelist import ChangeList
+from raystack.core.cache import cache
+from raystack.core.database.sqlalchemy import SQLAlchemyBackend
+from raystack.core.database.utils import connections
+
+NAMES = ["ann", "anna", "bob", "100%", "carl", "dora", "anne"]
+
+
+def request(**params):
+    return Request({
+        "type": "http",
+        "method": "GET",
+        "scheme": "http",
+        "server": ("testserver", 80),
+        "path": "/admin/accounts",
+        "root_path": "",
+        "query_string": urlencode(params).encode(),
+        "headers": [],
+    })
+
+
+class ChangeListTests(DatabaseTestCase):
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.addCleanup(cache.clear)
+        Account.objects.all().bulk_create(
+            [{"name": name, "balance": len(NAMES) - i} for i, name in enumerate(NAMES)]
+        )
+
+    def changelist(self, per_page=None, **params):
+        changelist = ChangeList(
+            request(**params),
+            Account.objects.all(),
+            list_display=("id", "name"),
+            search_fields=("=id", "^name"),
+            sortable_by=("id", "name", "balance"),
+            per_page=per_page,
+        )
+        asyncio.run(changelist.get_results())
+        return changelist
+
+    def names(self, changelist):
+        return [row["name"] for row in changelist.results]
+
+    def override(self, name, value):
+        old = getattr(settings, name, None)
+        setattr(settings, name, value)
+        self.addCleanup(setattr, settings, name, old)
+
+    def test_search(self):
+        self.assertEqual(self.names(self.changelist(q="ann")), ["ann", "anna", "anne"])
+        self.assertEqual(self.names(self.changelist(q="3")), ["bob"])
+        self.assertEqual(self.names(self.changelist(q="10")), ["100%"])
+        self.assertEqual(self.names(self.changelist(q="%")), [])
+        self.assertEqual(self.changelist(q="ann").count, 3)
+
+    def test_search_exact_number_field_ignores_text(self):
+        changelist = ChangeList(
+            request(q="ann"), Account.objects.all(), list_display=("id", "name"), search_fields=("=id",)
+        )
+        asyncio.run(changelist.get_results())
+        self.assertEqual(changelist.results, [])
+
+    def test_sort(self):
+        self.assertEqual(self.names(self.changelist(o="name"))[:3], ["100%", "ann", "anna"])
+        self.assertEqual(self.names(self.changelist(o="-balance"))[:2], ["ann", "anna"])
+        self.assertEqual(self.names(self.changelist(o="balance"))[:2], ["anne", "dora"])
+        # Not sortable, or malformed: by id.
+        for value in ("email", "--name", "-"):
+            with self.subTest(o=value):
+                self.assertEqual(self.changelist(o=value).ordering, "id")
+
+    def test_sort_url_toggles(self):
+        changelist = self.changelist(o="name")
+        self.assertIn("o=-name", changelist.sort_url("name"))
+        self.assertIn("o=balance", changelist.sort_url("balance"))
+        self.assertEqual(changelist.sort_icon("name"), "fa-sort-up")
+
+    def test_paging(self):
+        first = self.changelist(per_page=3)
+        self.assertEqual(self.names(first), NAMES[:3])
+        self.assertTrue(first.has_next)
+        self.assertEqual((first.count, first.num_pages), (7, 3))
+        last = self.changelist(per_page=3, p=3)
+        self.assertEqual(self.names(last), NAMES[6:])
+        self.assertFalse(last.has_next)
+        self.assertEqual(self.changelist(per_page=3, p=9).results, [])
+        for value in ("0", "x", "-2"):
+            with self.subTest(p=value):
+                self.assertEqual(self.changelist(per_page=3, p=value).page_num, 1)
+
+    def test_pages(self):
+        changelist = self.changelist(per_page=1, p=4)
+        self.assertEqual(changelist.pages, [1, 2, 3, 4, 5, 6, 7])
+        changelist = self.changelist(per_page=1, p=1)
+        self.assertEqual(changelist.pages, [1, 2, 3, None, 7])
+
+    def test_count_stops_at_the_limit(self):
+        self.override("ADMIN_COUNT_LIMIT", 5)
+        changelist = self.changelist()
+        self.assertEqual((changelist.count, changelist.approximate), (5, True))
+        changelist = self.changelist(q="ann")
+        self.assertEqual((changelist.count, changelist.approximate), (3, False))
+
+    def test_count_cached_until_invalidated(self):
+        self.assertEqual(self.changelist().count, 7)
+        Account.objects.create(name="eve", balance=0)
+        self.assertEqual(self.changelist().count, 7)
+        changelists.invalidate(Account)
+        self.assertEqual(self.changelist().count, 8)
+
+    def analyze(self):
+        connection = sqlite3.connect(os.path.join(self.directory, "db.sqlite3"))
+        with connection:
+            connection.execute("ANALYZE")
+        connection.close()
+
+    def test_unfiltered_count_uses_the_estimate(self):
+        self.override("ADMIN_COUNT_LIMIT", 5)
+        self.analyze()
+        self.assertEqual(asyncio.run(changelists.estimate_count(Account.objects.all())), 7)
+        changelist = self.changelist()
+        self.assertEqual((changelist.count, changelist.approximate), (7, True))
+
+    def test_estimate_without_statistics(self):
+        self.assertIsNone(asyncio.run(changelists.estimate_count(Account.objects.all())))
+
+    def test_estimate_in_the_mode_of_the_queryset_database(self):
+        # Another database, with a URL in the other mode than the default's.
+        self.analyze()
+        scheme = "sqlite" if self.scheme == "sqlite+aiosqlite" else "sqlite+aiosqlite"
+        backend = SQLAlchemyBackend(
+            "%s:///%s" % (scheme, os.path.join(self.directory, "db.sqlite3")), alias="other"
+        )
+        backend._options = {}
+        connections._connections.other = backend
+        self.addCleanup(delattr, connections._connections, "other")
+
+        def wrong_mode(*args, **kwargs):
+            raise AssertionError("estimate_count() used the default database's mode")
+
+        if backend.is_async:
+            backend.execute = wrong_mode
+        else:
+            backend.execute_async = wrong_mode
+        queryset = Account.objects.all().using("other")
+        self.assertEqual(asyncio.run(changelists.estimate_count(queryset)), 7)
+
+
+class AsyncURLChangeListTests(ChangeListTests):
+    """The same with an async default database."""
+
+    scheme = "sqlite+aiosqlite"
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,13 @@
+import asyncio
+import json
 import os
+from datetime import datetime
+from typing import Optional
+from urllib.parse import urlencode
 
 from fastapi import APIRouter, Request
+from fastapi.responses import PlainTextResponse, RedirectResponse, Response, StreamingResponse
+from starlette.concurrency import run_in_threadpool
 
 from raystack.conf import settings
 from raystack.shortcuts import render_template
@@ -12,10 +19,16 @@ from jwt import PyJWTError as JWTError
 from fastapi.security import OAuth2PasswordBearer
 
 from raystack.contrib.auth.accounts.decorators import login_required
+from raystack.contrib.staticfiles.storage import admin_static_url
 
 from raystack.contrib.auth.users.models import UserModel
 from raystack.contrib.auth.groups.models import GroupModel
-from raystack.contrib.auth.groups.forms import GroupCreateForm
+from raystack.contrib.admin.forms import GroupForm, UserForm
+from raystack.contrib.auth.stats import counters
+from raystack.contrib.admin import changelist as changelists
+from raystack.contrib.admin.changelist import ChangeList
+from raystack.core import logstore
+from raystack.core.cache import cache
 
 
 router = APIRouter()
@@ -26,6 +39,9 @@ def url_for(endpoint, **kwargs):
     Function for generating URL based on endpoint and additional parameters.
     In this case, endpoint is ignored as we only use filename.
     """
+    if endpoint == "admin_static" and "filename" in kwargs:
+        return admin_static_url(kwargs["filename"])
+
     path = f"/{endpoint}"
 
     if not kwargs:
@@ -37,10 +53,45 @@ def url_for(endpoint, **kwargs):
     return path
 
 
+USER_LIST_DISPLAY = ("id", "name", "email", "group", "organization", "is_active")
+USER_SEARCH_FIELDS = ("=id", "^name", "^email")
+USER_SORTABLE_BY = ("id", "name", "email")
+GROUP_LIST_DISPLAY = ("id", "name", "description")
+
+
+async def attach_groups(users):
+    """Replace the group ids of ``users`` (dicts) with their groups, in one query."""
+    group_ids = sorted({user["group"] for user in users if user["group"] is not None})
+    groups = {}
+    if group_ids:
+        rows = await GroupModel.objects.filter(id__in=group_ids).values(*GROUP_LIST_DISPLAY).aexecute()
+        groups = {row["id"]: row for row in rows}
+    for user in users:
+        user["group"] = groups.get(user["group"])
+    return users
+
+
+async def group_choices():
+    """The groups offered by user forms, cached until a group changes."""
+    key = changelists.cache_key(GroupModel, "choices")
+    choices = cache.get(key)
+    if choices is None:
+        choices = await GroupModel.objects.all().values("id", "name").order_by("name").aexecute()
+        cache.set(key, choices, getattr(settings, "ADMIN_COUNT_CACHE_TIMEOUT", 30))
+    return choices
+
+
 @router.get("/users", response_model=None)
 @login_required(["user_auth"])
 async def users_view(request: Request):
-    users = await UserModel.objects.all().execute_all()  # type: ignore
+    changelist = ChangeList(
+        request,
+        UserModel.objects.all(),
+        list_display=USER_LIST_DISPLAY,
+        search_fields=USER_SEARCH_FIELDS,
+        sortable_by=USER_SORTABLE_BY,
+    )
+    users = await attach_groups(await changelist.get_results())
 
     return render_template(request=request, template_name="admin/users.html", context={
         "url_for": url_for,
@@ -48,13 +99,21 @@ async def users_view(request: Request):
         "segment": "Users",
         "config": request.app.settings,
         "users": users,
+        "changelist": changelist,
     })
 
 
 @router.get("/groups", response_model=None)
 @login_required(["user_auth"])
 async def groups_view(request: Request):
-    groups = await GroupModel.objects.all().execute()  # type: ignore
+    changelist = ChangeList(
+        request,
+        GroupModel.objects.all(),
+        list_display=GROUP_LIST_DISPLAY,
+        search_fields=("=id", "^name"),
+        sortable_by=("id", "name"),
+    )
+    groups = await changelist.get_results()
 
     return render_template(request=request, template_name="admin/groups.html", context={
         "url_for": url_for,
@@ -62,6 +121,7 @@ async def groups_view(request: Request):
         "segment": "Groups",
         "config": request.app.settings,
         "groups": groups,
+        "changelist": changelist,
     })
 
 
@@ -69,24 +129,15 @@ async def groups_view(request: Request):
 @login_required(["user_auth"])
 async def dashboard_view(request: Request):
     """Dashboard view with statistics"""
-    # Get statistics
-    total_users = await UserModel.objects.count()
-    total_groups = await GroupModel.objects.count()
-    
-    # Mock statistics for now - in real app these would come from actual data
-    stats = {
-        "total_users": total_users,
-        "new_users_today": 5,  # Mock data
-        "total_groups": total_groups,
-        "active_groups": total_groups,  # Mock data
+    # Counters kept up to date on every write: no table is counted here
+    stats = await counters.aget()
+    stats.update({
         "online_users": 12,  # Mock data
         "system_status": "Online"  # Mock data
-    }
-    
-    # Get recent users for activity feed
-    recent_users = await UserModel.objects.all().execute()
-    # Limit to 5 users for display
-    recent_users = recent_users[:5] if recent_users else []
+    })
+
+    # The five newest users
+    recent_users = await UserModel.objects.all().values(*USER_LIST_DISPLAY).order_by("-id").get_item(slice(0, 5))
     
     # Mock recent activities data
     recent_activities = [
@@ -132,73 +183,58 @@ async def dashboard_view(request: Request):
         "system_info": system_info,
     })
 
+def log_filters(request):
+    """The filters of the logs page: ?level=, ?module= (a logger and its children), ?since=, ?until=."""
+    params = request.query_params
+    level = params.get("level", "").upper()
+    return {
+        "level": level if level in logstore.LEVELS else None,
+        "logger": params.get("module", "").strip() or None,
+        "since": _parse_datetime(params.get("since")),
+        "until": _parse_datetime(params.get("until")),
+    }
+
+
+def _parse_datetime(value):
+    try:
+        return datetime.fromisoformat(value) if value else None
+    except ValueError:
+        return None
+
+
+def _log_event(entry):
+    data = {key: value for key, value in entry.items() if key != "timestamp"}
+    data["time"] = entry["timestamp"].strftime("%Y-%m-%d %H:%M:%S")
+    data["ms"] = entry["timestamp"].strftime("%f")[:-3]
+    return "id: %d\ndata: %s\n\n" % (entry["id"], json.dumps(data))
+
+
 @router.get("/logs", response_model=None)
 @login_required(["user_auth"])
 async def logs_view(request: Request):
     """System logs view"""
-    # Mock logs data - in real app this would come from actual log files
-    from datetime import datetime
-    logs = [
-        {
-            "timestamp": datetime(2024, 1, 15, 10, 30, 15),
-            "level": "INFO", 
-            "message": "User login successful", 
-            "user": {"name": "admin"},
-            "module": "auth",
-            "function": "login",
-            "details": "User authenticated successfully",
-            "ip_address": "192.168.1.100"
-        },
-        {
-            "timestamp": datetime(2024, 1, 15, 10, 25, 42),
-            "level": "WARNING", 
-            "message": "Failed login attempt", 
-            "user": {"name": "unknown"},
-            "module": "auth",
-            "function": "login",
-            "details": "Invalid credentials provided",
-            "ip_address": "192.168.1.101"
-        },
-        {
-            "timestamp": datetime(2024, 1, 15, 10, 20, 18),
-            "level": "INFO", 
-            "message": "Database backup completed", 
-            "user": {"name": "system"},
-            "module": "backup",
-            "function": "create_backup",
-            "details": "Backup file created successfully",
-            "ip_address": "127.0.0.1"
-        },
-        {
-            "timestamp": datetime(2024, 1, 15, 10, 15, 33),
-            "level": "ERROR", 
-            "message": "Connection timeout", 
-            "user": {"name": "system"},
-            "module": "database",
-            "function": "connect",
-            "details": "Database connection failed after 30 seconds",
-            "ip_address": "127.0.0.1"
-        },
-        {
-            "timestamp": datetime(2024, 1, 15, 10, 10, 55),
-            "level": "INFO", 
-            "message": "New user registered", 
-            "user": {"name": "john_doe"},
-            "module": "registration",
-            "function": "register_user",
-            "details": "User account created successfully",
-            "ip_address": "192.168.1.102"
-        },
-    ]
-    
-    # Calculate log statistics
-    stats = {
-        "info_count": len([log for log in logs if log["level"] == "INFO"]),
-        "warning_count": len([log for log in logs if log["level"] == "WARNING"]),
-        "error_count": len([log for log in logs if log["level"] == "ERROR"]),
-        "total_count": len(logs)
-    }
-    
+    store = logstore.get_store()
+    filters = log_filters(request)
+    try:
+        before = int(request.query_params["before"])
+    except (KeyError, ValueError):
+        before = None
+    per_page = getattr(settings, "ADMIN_LIST_PER_PAGE", 100)
+    # One row more than the page, to know whether there are older ones.
+    logs = await run_in_threadpool(store.search, before=before, limit=per_page + 1, **filters)
+    has_next = len(logs) > per_page
+    logs = logs[:per_page]
+    counts = await run_in_threadpool(store.counts)
+    stats = {"%s_count" % level.lower(): count for level, count in counts.items()}
+    stats["total_count"] = sum(counts.values())
+
+    # New rows are tailed into the first page, unless it ends in the past.
+    tail_params = None
+    if before is None and filters["until"] is None:
+        tail_after = logs[0]["id"] if logs else await run_in_threadpool(store.last_id)
+        tail_params = {"after": tail_after}
+        tail_params.update((name, value) for name, value in request.query_params.items() if name in ("level", "module"))
+
     return render_template(request=request, template_name="admin/logs.html", context={
         "url_for": url_for,
         "parent": "Admin",
@@ -206,9 +242,66 @@ async def logs_view(request: Request):
         "config": request.app.settings,
         "logs": logs,
         "stats": stats,
+        "levels": logstore.LEVELS,
+        "filters": {name: request.query_params.get(name, "") for name in ("level", "module", "since", "until")},
+        "older_url": str(request.url.include_query_params(before=logs[-1]["id"])) if has_next else None,
+        "newest_url": str(request.url.remove_query_params("before")) if before is not None else None,
+        "tail_url": "%s/stream?%s" % (request.url.path.rstrip("/"), urlencode(tail_params)) if tail_params else None,
     })
 
 
+@router.get("/logs/stream", response_model=None)
+@login_required(["user_auth"])
+async def logs_stream_view(request: Request):
+    """
+    The rows written after ?after= (or the Last-Event-ID of a reconnecting
+    EventSource) matching the level and module filters, as server-sent events.
+    """
+    store = logstore.get_store()
+    filters = log_filters(request)
+    try:
+        after = int(request.headers.get("last-event-id") or request.query_params["after"])
+    except (KeyError, ValueError):
+        after = await run_in_threadpool(store.last_id)
+    interval = getattr(settings, "LOG_STORE_TAIL_INTERVAL", 1.0)
+    batch = getattr(settings, "ADMIN_LIST_PER_PAGE", 100)
+
+    async def events():
+        nonlocal after
+        idle = 0.0
+        while not await request.is_disconnected():
+            # Only the rows after the last one sent: an index lookup, however
+            # big the store is.
+            entries = await run_in_threadpool(
+                store.tail, after, level=filters["level"], logger=filters["logger"], limit=batch
+            )
+            for entry in entries:
+                yield _log_event(entry)
+                after = entry["id"]
+            if len(entries) == batch:
+                continue
+            idle += interval
+            if idle >= 15:
+                # Keeps proxies from closing the idle connection.
+                yield ": keep-alive\n\n"
+                idle = 0.0
+            await asyncio.sleep(interval)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.post("/logs/clear", response_model=None)
+@login_required(["user_auth"])
+async def logs_clear_view(request: Request):
+    """Delete every row of the log store"""
+    await run_in_threadpool(logstore.get_store().clear)
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+
 @router.get("/settings", response_model=None)
 @login_required(["user_auth"])
 async def settings_view(request: Request):
@@ -233,13 +326,59 @@ async def settings_view(request: Request):
         "settings": settings_data,
     })
 
+@router.get("/profiling", response_model=None)
+@login_required(["user_auth"])
+async def profiling_view(request: Request):
+    """Routes profiled by ProfilingMiddleware in this worker"""
+    from raystack.core import profiling
+
+    return render_template(request=request, template_name="admin/profiling.html", context={
+        "url_for": url_for,
+        "parent": "Admin",
+        "segment": "Profiling",
+        "config": request.app.settings,
+        "enabled": getattr(settings, "PROFILING_ENABLED", False),
+        "routes": profiling.store.routes(),
+        "pid": os.getpid(),
+    })
+
+@router.get("/profiling/flamegraph", response_model=None)
+@login_required(["user_auth"])
+async def profiling_flamegraph(request: Request, route: Optional[str] = None):
+    from raystack.core import profiling
+
+    svg = profiling.flamegraph(
+        profiling.store.stacks(route),
+        title=route or "All routes (pid %d)" % os.getpid(),
+    )
+    return Response(svg, media_type="image/svg+xml", headers={"Cache-Control": "no-store"})
+
+@router.get("/profiling/collapsed", response_model=None)
+@login_required(["user_auth"])
+async def profiling_collapsed(request: Request, route: Optional[str] = None):
+    from raystack.core import profiling
+
+    return PlainTextResponse(
+        profiling.collapse(profiling.store.stacks(route)),
+        headers={"Cache-Control": "no-store"},
+    )
+
+@router.post("/profiling/reset", response_model=None)
+@login_required(["user_auth"])
+async def profiling_reset(request: Request):
+    from raystack.core import profiling
+
+    profiling.store.reset()
+    return RedirectResponse(url="/admin/profiling", status_code=303)
+
 @router.get("/users/edit/{user_id}", response_model=None)
 @login_required(["user_auth"])
 async def user_edit_view(request: Request, user_id: int):
     user = await UserModel.objects.filter(id=user_id).first()
-    groups = await GroupModel.objects.all().execute()
+    groups = await group_choices()
     return render_template(request=request, template_name="admin/user_edit.html", context={
         "user": user,
+        "form": UserForm.for_user(user) if user else UserForm(),
         "groups": groups,
         "url_for": url_for,
         "parent": "Admin",
@@ -250,24 +389,28 @@ async def user_edit_view(request: Request, user_id: int):
 @router.post("/users/edit/{user_id}", response_model=None)
 @login_required(["user_auth"])
 async def user_edit_post(request: Request, user_id: int):
-    form = await request.form()
+    form = UserForm(await request.form())
     user = await UserModel.objects.filter(id=user_id).first()
-    if user:
-        user.name = form.get("name")
-        user.age = int(form.get("age"))
-        user.email = form.get("email")
-        user.organization = form.get("organization")
-        group_id = int(form.get("group_id"))
-        user.group = group_id
+    valid = form.is_valid()
+    if user and valid:
+        data = form.cleaned_data
+        user.name = data["name"]
+        user.age = data["age"]
+        user.email = data["email"]
+        user.organization = data["organization"]
+        user.group = data["group_id"]
         await user.save()
+        changelists.invalidate(UserModel)
     return render_template(request=request, template_name="admin/user_edit.html", context={
         "user": user,
-        "groups": await GroupModel.objects.all().execute(),
+        "form": form,
+        "groups": await group_choices(),
         "url_for": url_for,
         "parent": "Admin",
         "segment": "Edit User",
         "config": request.app.settings,
-        "success": True
+        "success": valid,
+        "errors": None if valid else "Please fix the errors in the form.",
     })
 
 @router.get("/groups/edit/{group_id}", response_model=None)
@@ -276,6 +419,7 @@ async def group_edit_view(request: Request, group_id: int):
     group = await GroupModel.objects.filter(id=group_id).first()
     return render_template(request=request, template_name="admin/group_edit.html", context={
         "group": group,
+        "form": GroupForm.for_group(group) if group else GroupForm(),
         "url_for": url_for,
         "parent": "Admin",
         "segment": "Edit Group",
@@ -285,27 +429,32 @@ async def group_edit_view(request: Request, group_id: int):
 @router.post("/groups/edit/{group_id}", response_model=None)
 @login_required(["user_auth"])
 async def group_edit_post(request: Request, group_id: int):
-    form = await request.form()
+    form = GroupForm(await request.form())
     group = await GroupModel.objects.filter(id=group_id).first()
-    if group:
-        group.name = form.get("name")
-        group.description = form.get("description")
+    valid = form.is_valid()
+    if group and valid:
+        group.name = form.cleaned_data["name"]
+        group.description = form.cleaned_data["description"]
         await group.save()
+        changelists.invalidate(GroupModel)
     return render_template(request=request, template_name="admin/group_edit.html", context={
         "group": group,
+        "form": form,
         "url_for": url_for,
         "parent": "Admin",
         "segment": "Edit Group",
         "config": request.app.settings,
-        "success": True
+        "success": valid,
+        "errors": None if valid else "Please fix the errors in the form.",
     })
 
 # --- User Create ---
 @router.get("/users/create", response_model=None)
 @login_required(["user_auth"])
 async def user_create_view(request: Request):
-    groups = await GroupModel.objects.all().execute()
+    groups = await group_choices()
     return render_template(request=request, template_name="admin/user_create.html", context={
+        "form": UserForm(),
         "groups": groups,
         "url_for": url_for,
         "parent": "Admin",
@@ -316,23 +465,36 @@ async def user_create_view(request: Request):
 @router.post("/users/create", response_model=None)
 @login_required(["user_auth"])
 async def user_create_post(request: Request):
-    form = await request.form()
-    user = UserModel(
-        name=form.get("name"),
-        age=int(form.get("age")),
-        email=form.get("email"),
-        password_hash="",  # Set password later or generate
-        group=int(form.get("group_id")),
-        organization=form.get("organization")
-    )
-    await user.save()
+    form = UserForm(await request.form())
+    if form.is_valid():
+        data = form.cleaned_data
+        user = UserModel(
+            name=data["name"],
+            age=data["age"],
+            email=data["email"],
+            password_hash="",  # Set password later or generate
+            group=data["group_id"],
+            organization=data["organization"]
+        )
+        await user.save()
+        changelists.invalidate(UserModel)
+        return render_template(request=request, template_name="admin/user_create.html", context={
+            "form": UserForm(),
+            "groups": await group_choices(),
+            "url_for": url_for,
+            "parent": "Admin",
+            "segment": "Create User",
+            "config": request.app.settings,
+            "success": True
+        })
     return render_template(request=request, template_name="admin/user_create.html", context={
-        "groups": await GroupModel.objects.all().execute(),
+        "form": form,
+        "groups": await group_choices(),
         "url_for": url_for,
         "parent": "Admin",
         "segment": "Create User",
         "config": request.app.settings,
-        "success": True
+        "errors": "Please fix the errors in the form."
     })
 
 # --- User Delete ---
@@ -354,6 +516,7 @@ async def user_delete_post(request: Request, user_id: int):
     user = await UserModel.objects.filter(id=user_id).first()
     if user:
         await user.delete()
+        changelists.invalidate(UserModel)
     # Redirect to users list after deletion
     return render_template(request=request, template_name="admin/user_delete.html", context={
         "deleted": True,
@@ -367,7 +530,7 @@ async def user_delete_post(request: Request, user_id: int):
 @router.get("/groups/create", response_model=None)
 @login_required(["user_auth"])
 async def group_create_view(request: Request):
-    form = GroupCreateForm()
+    form = GroupForm()
     return render_template(request=request, template_name="admin/group_create.html", context={
         "form": form,
         "url_for": url_for,
@@ -379,16 +542,16 @@ async def group_create_view(request: Request):
 @router.post("/groups/create", response_model=None)
 @login_required(["user_auth"])
 async def group_create_post(request: Request):
-    data = await request.form()
-    form = GroupCreateForm(data)
+    form = GroupForm(await request.form())
     if form.is_valid():
         group = GroupModel(
             name=form.cleaned_data["name"],
             description=form.cleaned_data["description"]
         )
         await group.save()
+        changelists.invalidate(GroupModel)
         return render_template(request=request, template_name="admin/group_create.html", context={
-            "form": GroupCreateForm(),
+            "form": GroupForm(),
             "url_for": url_for,
             "parent": "Admin",
             "segment": "Create Group",
@@ -423,6 +586,7 @@ async def group_delete_post(request: Request, group_id: int):
     group = await GroupModel.objects.filter(id=group_id).first()
     if group:
         await group.delete()
+        changelists.invalidate(GroupModel)
     return render_template(request=request, template_name="admin/group_delete.html", context={
         "deleted": True,
         "url_for": url_for,
@@ -451,11 +615,19 @@ async def user_view(request: Request, user_id: int):
 @login_required(["user_auth"])
 async def group_view(request: Request, group_id: int):
     group = await GroupModel.objects.filter(id=group_id).first()
-    # Get users in this group
-    users_in_group = await UserModel.objects.filter(group=group_id).execute()
+    # A page of the users in this group
+    changelist = ChangeList(
+        request,
+        UserModel.objects.filter(group=group_id),
+        list_display=USER_LIST_DISPLAY,
+        search_fields=USER_SEARCH_FIELDS,
+        sortable_by=USER_SORTABLE_BY,
+    )
+    users_in_group = await changelist.get_results()
     return render_template(request=request, template_name="admin/group_view.html", context={
         "group": group,
         "users_in_group": users_in_group,
+        "changelist": changelist,
         "url_for": url_for,
         "parent": "Admin",
         "segment": "View Group",
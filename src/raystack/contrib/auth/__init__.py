@@ -33,3 +33,6 @@ if hasattr(accounts_urls, 'router'):
 # Connect account routes (login/logout)
 if hasattr(accounts_api, 'router'):
     router.include_router(accounts_api.router, prefix="/accounts", tags=["accounts"])
+
+# Keep the dashboard counters up to date as users and groups change
+from raystack.contrib.auth import stats  # NOQA isort:skip
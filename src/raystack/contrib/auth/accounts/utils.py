@@ -4,18 +4,12 @@ from typing import Optional
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from starlette.authentication import requires
+from raystack.conf import get_snapshot
 from raystack.contrib.auth.users.models import UserModel
-import bcrypt
 
 
 # JWT settings
-try:
-    from config.settings import SECRET_KEY, ALGORITHM
-    ACCESS_TOKEN_EXPIRE_MINUTES = 30
-except ImportError:
-    SECRET_KEY = "your-secret-key-here"
-    ALGORITHM = "HS256"
-    ACCESS_TOKEN_EXPIRE_MINUTES = 30
+ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
@@ -27,13 +21,15 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     else:
         expire = datetime.utcnow() + timedelta(minutes=15)
     to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+    snapshot = get_snapshot()
+    encoded_jwt = jwt.encode(to_encode, snapshot.SECRET_KEY, algorithm=snapshot.ALGORITHM)
     return encoded_jwt
 
 
 def verify_token(token: str):
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        snapshot = get_snapshot()
+        payload = jwt.decode(token, snapshot.SECRET_KEY, algorithms=[snapshot.ALGORITHM])
         email: str = payload.get("sub")
         if email is None:
             return None
@@ -70,16 +66,9 @@ async def get_current_active_superuser(current_user: UserModel = Depends(get_cur
     return current_user
 
 
-# Password handling functions (stubs)
-async def hash_password(password: str) -> str:
-    # Hash password using bcrypt
-    hashed_password = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt())
-    return hashed_password.decode('utf-8')
-
-
-async def check_password(plain_password: str, hashed_password: str) -> bool:
-    # Verify password using bcrypt
-    return bcrypt.checkpw(plain_password.encode('utf-8'), hashed_password.encode('utf-8'))
+# Password handling functions: bcrypt runs in the executor rather than on the
+# event loop.
+from raystack.contrib.auth.users.utils import hash_password, check_password
 
 
 def generate_jwt(user_id: int) -> str:
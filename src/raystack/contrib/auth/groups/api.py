@@ -1,11 +1,11 @@
-from typing import Union
+from typing import Union, List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
 from pydantic import BaseModel
 import jwt
 from jwt import PyJWTError as JWTError
 from datetime import timedelta
-from .models import GroupModel
+from .models import Group, GroupModel
 # from .utils import hash_password, generate_jwt, check_password
 
 from starlette.responses import JSONResponse, \
@@ -19,9 +19,23 @@ from starlette.responses import JSONResponse, \
 from fastapi.security import OAuth2PasswordBearer
 from datetime import datetime
 
+from raystack.core.pagination import next_link, paginate
+
 
 router = APIRouter()
 
+GROUP_FIELDS = ("id", "name", "description")
+
+
+# Get groups, a page at a time (GET ?after=<id>&limit=<n>)
+@router.get("/", response_model=List[Group])
+async def get_groups(request: Request, after: Optional[int] = None, limit: Optional[int] = Query(None, ge=1)):
+    page = await paginate(GroupModel.objects.all().values(*GROUP_FIELDS), after, limit)
+    response = JSONResponse(page.items)
+    if page.next_cursor is not None:
+        response.headers["Link"] = next_link(request.url, page)
+    return response
+
 # Creating table on application startup
 # @router.on_event("startup")
 # async def create_tables():
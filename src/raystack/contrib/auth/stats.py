@@ -0,0 +1,269 @@
+"""
+Counters of users and groups for the admin dashboard, kept up to date as
+users and groups are saved and deleted rather than counted on each view.
+
+    from raystack.contrib.auth import stats
+
+    await stats.counters.aget()
+    # {"total_users": ..., "new_users_today": ..., "total_groups": ...,
+    #  "active_groups": ...}
+
+They're rows of the raystack_stats table (created on first use) in the
+database users are written to, changed by the model signals once the
+transaction of the write commits (and not if it rolls back). Each process caches them for
+STATS_CACHE_TIMEOUT seconds; its own writes update the cache once they
+commit.
+
+The first read recounts them from the tables, and so does the first read
+after QuerySet.update(), delete() or bulk_create() on users or groups,
+which don't tell which rows they changed. "New today" only counts the
+users created since the counters exist: UserModel has no creation date to
+recount it from.
+"""
+import threading
+import time
+from datetime import date
+
+from sqlalchemy.exc import IntegrityError
+
+from raystack.conf import settings
+from raystack.core.database import signals, transaction
+from raystack.core.database.query import run_sync
+from raystack.core.database.utils import connections, router
+from raystack.contrib.auth.groups.models import GroupModel
+from raystack.contrib.auth.users.models import UserModel
+
+TABLE = "raystack_stats"
+TOTAL_USERS = "users.total"
+NEW_USERS = "users.new.%s"
+TOTAL_GROUPS = "groups.total"
+ACTIVE_GROUPS = "groups.active"
+# Members of each group; a group is active while it has some.
+MEMBERS = "groups.members.%s"
+# Set when the counters must be recounted.
+STALE = "stale"
+
+CREATE_TABLE = f'CREATE TABLE IF NOT EXISTS "{TABLE}" ("name" VARCHAR(100) PRIMARY KEY, "value" BIGINT NOT NULL)'
+INCREMENT = f'UPDATE "{TABLE}" SET "value" = "value" + :delta WHERE "name" = :name'
+SET = f'UPDATE "{TABLE}" SET "value" = :delta WHERE "name" = :name'
+INSERT = f'INSERT INTO "{TABLE}" ("name", "value") VALUES (:name, :delta)'
+SELECT = f'SELECT "value" FROM "{TABLE}" WHERE "name" = :name'
+
+
+class Counters:
+    def __init__(self):
+        self._lock = threading.Lock()
+        # {name: value} of the dashboard counters, read at _cached_at.
+        self._cache = {}
+        self._cached_at = None
+        self._tables = set()
+
+    def _alias(self):
+        return router.db_for_write(UserModel)
+
+    def _ensure_table(self, using):
+        if using not in self._tables:
+            connections[using].execute(CREATE_TABLE)
+            self._tables.add(using)
+
+    def _write(self, using, update, name, delta):
+        """Run ``update`` (INCREMENT or SET) on a counter, inserting its row if there's none."""
+        backend = connections[using]
+        params = {"name": name, "delta": delta}
+        if not backend.execute(update, params).rowcount:
+            try:
+                # In a savepoint: another process inserting the row first
+                # only fails this statement.
+                with transaction.atomic(using=using):
+                    backend.execute(INSERT, params)
+            except IntegrityError:
+                backend.execute(update, params)
+
+    def _add(self, using, name, delta, fetch=False):
+        self._write(using, INCREMENT, name, delta)
+        # The cached value changes with the row: once the write commits.
+        transaction.on_commit(lambda: self._cache_add(name, delta), using)
+        if fetch:
+            return connections[using].execute(SELECT, {"name": name}, fetch=True)[0][0]
+
+    def _cache_add(self, name, delta):
+        with self._lock:
+            if name in self._cache:
+                self._cache[name] += delta
+
+    def add(self, deltas, using=None):
+        """Add ``deltas`` ({counter name: delta}) to the counters."""
+        using = using or self._alias()
+        self._ensure_table(using)
+        with transaction.atomic(using=using):
+            for name, delta in deltas.items():
+                if delta:
+                    self._add(using, name, delta)
+
+    def move_member(self, old_group, new_group, using=None):
+        """Count a user out of ``old_group`` and into ``new_group`` (either may be None)."""
+        if old_group == new_group:
+            return
+        using = using or self._alias()
+        self._ensure_table(using)
+        with transaction.atomic(using=using):
+            if old_group is not None and self._add(using, MEMBERS % old_group, -1, fetch=True) == 0:
+                self._add(using, ACTIVE_GROUPS, -1)
+            if new_group is not None and self._add(using, MEMBERS % new_group, 1, fetch=True) == 1:
+                self._add(using, ACTIVE_GROUPS, 1)
+
+    def forget_group(self, group, using=None):
+        """Drop the member count of a deleted group."""
+        using = using or self._alias()
+        self._ensure_table(using)
+        backend = connections[using]
+        with transaction.atomic(using=using):
+            rows = backend.execute(SELECT, {"name": MEMBERS % group}, fetch=True)
+            if rows and rows[0][0] > 0:
+                self._add(using, ACTIVE_GROUPS, -1)
+            backend.execute(f'DELETE FROM "{TABLE}" WHERE "name" = :name', {"name": MEMBERS % group})
+
+    def rebuild(self, using=None):
+        """Recount the counters (but "new today") from the tables."""
+        using = using or self._alias()
+        self._ensure_table(using)
+        backend = connections[using]
+        users = UserModel.get_table_name()
+        groups = GroupModel.get_table_name()
+        with transaction.atomic(using=using):
+            total_users = backend.execute(f'SELECT COUNT(*) FROM "{users}"', fetch=True)[0][0]
+            total_groups = backend.execute(f'SELECT COUNT(*) FROM "{groups}"', fetch=True)[0][0]
+            members = backend.execute(
+                f'SELECT u."group", COUNT(*) FROM "{users}" u '
+                f'JOIN "{groups}" g ON g."id" = u."group" GROUP BY u."group"',
+                fetch=True,
+            )
+            backend.execute(
+                f'DELETE FROM "{TABLE}" WHERE "name" NOT LIKE :new_users',
+                {"new_users": NEW_USERS % "%"},
+            )
+            values = {TOTAL_USERS: total_users, TOTAL_GROUPS: total_groups, ACTIVE_GROUPS: len(members)}
+            values.update((MEMBERS % group, count) for group, count in members)
+            # Another process may be rebuilding them too.
+            for name, value in values.items():
+                self._write(using, SET, name, value)
+        with self._lock:
+            self._cached_at = None
+
+    def get(self, using=None):
+        """The dashboard counters, from the cache when it's fresh enough."""
+        names = (TOTAL_USERS, NEW_USERS % date.today().isoformat(), TOTAL_GROUPS, ACTIVE_GROUPS)
+        timeout = getattr(settings, "STATS_CACHE_TIMEOUT", 5)
+        with self._lock:
+            fresh = self._cached_at is not None and time.monotonic() - self._cached_at < timeout
+            if fresh and all(name in self._cache for name in names):
+                return self._result(names, self._cache)
+        using = using or self._alias()
+        self._ensure_table(using)
+        values = self._read(using, names + (STALE,))
+        if TOTAL_USERS not in values or values.get(STALE):
+            self.rebuild(using)
+            values = self._read(using, names)
+        for name in names:
+            values.setdefault(name, 0)
+        with self._lock:
+            self._cache = values
+            self._cached_at = time.monotonic()
+        return self._result(names, values)
+
+    async def aget(self, using=None):
+        """get() for async code: the queries run in the database thread pool."""
+        return await run_sync(self.get, using)
+
+    def _read(self, using, names):
+        params = {f"n{i}": name for i, name in enumerate(names)}
+        placeholders = ", ".join(f":{key}" for key in params)
+        rows = connections[using].execute(
+            f'SELECT "name", "value" FROM "{TABLE}" WHERE "name" IN ({placeholders})', params, fetch=True
+        )
+        return dict(rows)
+
+    @staticmethod
+    def _result(names, values):
+        total_users, new_users, total_groups, active_groups = (values[name] for name in names)
+        return {
+            "total_users": total_users,
+            "new_users_today": new_users,
+            "total_groups": total_groups,
+            "active_groups": active_groups,
+        }
+
+
+counters = Counters()
+
+
+def _group_of(instance):
+    value = instance.get("group") if isinstance(instance, dict) else instance.__dict__.get("group")
+    return getattr(value, "id", value)
+
+
+def _id_of(instance):
+    return instance.get("id") if isinstance(instance, dict) else instance.__dict__.get("id")
+
+
+@signals.receiver(signals.pre_save, sender=UserModel)
+def user_saving(sender, instance, using, **kwargs):
+    user_id = _id_of(instance)
+    if user_id not in (None, 0, ""):
+        # The group the row has now, to move the user out of it.
+        rows = connections[using].execute(
+            f'SELECT "group" FROM "{sender.get_table_name()}" WHERE "id" = :id', {"id": user_id}, fetch=True
+        )
+        instance._stats_group = rows[0][0] if rows else None
+
+
+# The counters change once the write commits: receivers of writes made
+# from async code run in the database thread pool, which can't use the
+# connection of an async atomic() block, and counters changed outside it
+# would stay changed if it rolled back.
+
+@signals.receiver(signals.post_save, sender=UserModel)
+def user_saved(sender, instance, created, using, **kwargs):
+    group = _group_of(instance)
+    if created:
+        def count():
+            counters.add({TOTAL_USERS: 1, NEW_USERS % date.today().isoformat(): 1}, using)
+            counters.move_member(None, group, using)
+    else:
+        old_group = instance.__dict__.pop("_stats_group", group)
+
+        def count():
+            counters.move_member(old_group, group, using)
+    transaction.on_commit(count, using)
+
+
+@signals.receiver(signals.post_delete, sender=UserModel)
+def user_deleted(sender, instance, using, **kwargs):
+    group = _group_of(instance)
+
+    def count():
+        counters.add({TOTAL_USERS: -1}, using)
+        counters.move_member(group, None, using)
+    transaction.on_commit(count, using)
+
+
+@signals.receiver(signals.post_save, sender=GroupModel)
+def group_saved(sender, instance, created, using, **kwargs):
+    if created:
+        transaction.on_commit(lambda: counters.add({TOTAL_GROUPS: 1}, using), using)
+
+
+@signals.receiver(signals.post_delete, sender=GroupModel)
+def group_deleted(sender, instance, using, **kwargs):
+    group = _id_of(instance)
+
+    def count():
+        counters.add({TOTAL_GROUPS: -1}, using)
+        counters.forget_group(group, using)
+    transaction.on_commit(count, using)
+
+
+@signals.receiver(signals.rows_changed, sender=UserModel)
+@signals.receiver(signals.rows_changed, sender=GroupModel)
+def rows_changed_in_bulk(sender, using, **kwargs):
+    transaction.on_commit(lambda: counters.add({STALE: 1}, using), using)
@@ -0,0 +1,138 @@
+"""
+Tests of the dashboard counters kept by raystack.contrib.auth.stats.
+"""
+import unittest
+
+from raystack.core.database.tests import DatabaseTestCase
+
+from raystack.contrib.auth import stats
+from raystack.contrib.auth.groups.models import GroupModel
+from raystack.contrib.auth.users.models import UserModel
+from raystack.core.database import transaction
+
+SCHEMA = """
+    CREATE TABLE groups_groupmodel (
+        id INTEGER PRIMARY KEY, name VARCHAR(100) UNIQUE, description VARCHAR(100)
+    );
+    CREATE TABLE users_usermodel (
+        id INTEGER PRIMARY KEY, name VARCHAR(50), age INTEGER, email VARCHAR(100),
+        password_hash VARCHAR(255), "group" INTEGER, organization VARCHAR(100),
+        is_active VARCHAR(1), is_superuser VARCHAR(1)
+    );
+"""
+
+
+class CountersTests(DatabaseTestCase):
+    schema = SCHEMA
+
+    def setUp(self):
+        super().setUp()
+        # The receivers use the module's counters: a new one has no cache
+        # and no table of another test's database.
+        counters = stats.counters
+        stats.counters = stats.Counters()
+        self.addCleanup(setattr, stats, "counters", counters)
+
+    def counts(self):
+        """The counters as stored, read around the process cache."""
+        return stats.Counters().get()
+
+    def create_group(self, name):
+        return GroupModel.objects.create(name=name, description="")
+
+    def create_user(self, name, group=None):
+        return UserModel.objects.create(
+            name=name, age=30, email="%s@example.com" % name, password_hash="",
+            group=group, organization="",
+        )
+
+    def assertCounts(self, total_users, total_groups, active_groups, new_users_today=None):
+        counts = self.counts()
+        self.assertEqual(
+            (counts["total_users"], counts["total_groups"], counts["active_groups"]),
+            (total_users, total_groups, active_groups),
+        )
+        if new_users_today is not None:
+            self.assertEqual(counts["new_users_today"], new_users_today)
+
+    def test_create_and_delete(self):
+        self.assertCounts(0, 0, 0)
+        admins = self.create_group("admins")
+        self.create_group("staff")
+        ann = self.create_user("ann", admins.id)
+        self.create_user("bob")
+        self.assertCounts(2, 2, 1, new_users_today=2)
+        ann.delete()
+        self.assertCounts(1, 2, 0)
+        admins.delete()
+        self.assertCounts(1, 1, 0)
+
+    def test_group_move(self):
+        admins = self.create_group("admins")
+        staff = self.create_group("staff")
+        ann = self.create_user("ann", admins.id)
+        self.create_user("bob", admins.id)
+        self.assertCounts(2, 2, 1)
+        ann.group = staff.id
+        ann.save()
+        self.assertCounts(2, 2, 2)
+        ann.group = None
+        ann.save()
+        self.assertCounts(2, 2, 1)
+
+    def test_deleting_a_group_with_members(self):
+        admins = self.create_group("admins")
+        self.create_user("ann", admins.id)
+        self.assertCounts(1, 1, 1)
+        admins.delete()
+        self.assertCounts(1, 0, 0)
+
+    def test_rollback_leaves_counters_unchanged(self):
+        admins = self.create_group("admins")
+        self.create_user("ann", admins.id)
+        before = stats.counters.get()
+        with self.assertRaises(ValueError):
+            with transaction.atomic():
+                self.create_user("bob", admins.id)
+                self.create_group("staff").delete()
+                raise ValueError
+        self.assertEqual(stats.counters.get(), before)
+        self.assertCounts(1, 1, 1)
+
+    def test_rolled_back_counter_write_leaves_cache_unchanged(self):
+        before = stats.counters.get()
+        with self.assertRaises(ValueError):
+            with transaction.atomic():
+                stats.counters.add({stats.TOTAL_GROUPS: 1})
+                raise ValueError
+        self.assertEqual(stats.counters.get(), before)
+        self.assertCounts(0, 0, 0)
+
+    def test_recounted_after_update(self):
+        admins = self.create_group("admins")
+        staff = self.create_group("staff")
+        self.create_user("ann", admins.id)
+        self.create_user("bob", admins.id)
+        self.assertCounts(2, 2, 1)
+        UserModel.objects.filter(name="bob").update(group=staff.id)
+        self.assertCounts(2, 2, 2)
+        UserModel.objects.filter(group=admins.id).delete()
+        self.assertCounts(1, 2, 1)
+
+    def test_recounted_after_bulk_create(self):
+        self.assertCounts(0, 0, 0)
+        GroupModel.objects.all().bulk_create(
+            [{"name": "admins", "description": ""}, {"name": "staff", "description": ""}]
+        )
+        self.assertCounts(0, 2, 0)
+
+    def test_rebuild_over_existing_rows(self):
+        admins = self.create_group("admins")
+        self.create_user("ann", admins.id)
+        stats.counters.rebuild()
+        stats.counters.rebuild()
+        self.assertCounts(1, 1, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,6 @@
-from typing import Union, List
+from typing import Union, List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
 from pydantic import BaseModel
 import jwt
 from jwt import PyJWTError as JWTError
@@ -15,7 +15,8 @@ from starlette.responses import JSONResponse, \
     FileResponse, \
     HTMLResponse
 
-from raystack.core.database.sqlalchemy import db
+from raystack.core.database import db
+from raystack.core.pagination import next_link, paginate
 from raystack.contrib.auth.groups.models import GroupModel
 
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
@@ -43,8 +44,11 @@ ACCESS_TOKEN_EXPIRE_MINUTES = 30
 @router.route("/login", methods=["POST"])
 async def login_user(request):
     # Redirect to previous path after login
-    if 'history' in request.session and len(request.session['history']):
-        previous = request.session['history'].pop()
+    history = request.session.get('history')
+    if history:
+        previous = history.pop()
+        # Stored again, as the session only saves values that are set.
+        request.session['history'] = history
     else:
         previous = '/admin'
 
@@ -111,8 +115,27 @@ async def create_user(user: UserCreate):
     )
 
 
-# Get all users (GET)
+# Columns the User response is built from; password_hash is never read.
+USER_FIELDS = ("id", "name", "age", "email", "group", "organization")
+GROUP_FIELDS = ("id", "name", "description")
+
+
+# Get users, a page at a time (GET ?after=<id>&limit=<n>)
 @router.get("/", response_model=List[User])
-async def get_users():
-    users = await UserModel.objects.all().execute()  # type: ignore
-    return [User(name=user.name, age=user.age, email=user.email) for user in users] 
\ No newline at end of file
+async def get_users(request: Request, after: Optional[int] = None, limit: Optional[int] = Query(None, ge=1)):
+    page = await paginate(UserModel.objects.all().values(*USER_FIELDS), after, limit)
+
+    # The page's groups in one query
+    group_ids = sorted({row["group"] for row in page.items if row["group"] is not None})
+    groups = {}
+    if group_ids:
+        rows = await GroupModel.objects.filter(id__in=group_ids).values(*GROUP_FIELDS).aexecute()
+        groups = {row["id"]: row for row in rows}
+    for row in page.items:
+        row["group"] = groups.get(row["group"])
+
+    # Rows go out as they are: they already have the User shape
+    response = JSONResponse(page.items)
+    if page.next_cursor is not None:
+        response.headers["Link"] = next_link(request.url, page)
+    return response 
\ No newline at end of file
@@ -3,30 +3,59 @@ from typing import Union
 from datetime import datetime, timedelta
 import jwt
 
-try:
-    from raystack.conf import settings
-except ImportError:
-    from config.settings import SECRET_KEY, ALGORITHM
-    # Create a mock settings object
-    class MockSettings:
-        SECRET_KEY = SECRET_KEY
-        ALGORITHM = ALGORITHM
-    settings = MockSettings()
+from raystack.conf import get_snapshot
 
 
 import asyncio
+import functools
+
+from raystack.core import tracing
+from raystack.core.metrics import metrics_enabled
+
 
 def asyncify(func):
-    """Convert synchronous function to asynchronous."""
+    """
+    Convert synchronous function to asynchronous, running it in the default
+    executor. With metrics enabled the calls waiting for and holding an
+    executor thread are reported (these are the password hashing functions),
+    and with tracing enabled each call runs in a span named after ``func``.
+    """
+    @functools.wraps(func)
     async def inner(*args, **kwargs):
+        with tracing.span("auth." + func.__name__):
+            return await _run(*args, **kwargs)
+
+    async def _run(*args, **kwargs):
         try:
             # Python 3.7+
             loop = asyncio.get_running_loop()
         except AttributeError:
             # Python 3.6
             loop = asyncio.get_event_loop()
-        func_out = await loop.run_in_executor(None, func, *args, **kwargs)
-        return func_out
+        call = functools.partial(func, *args, **kwargs)
+        if not metrics_enabled():
+            return await loop.run_in_executor(None, call)
+
+        from raystack.core.metrics.instruments import (
+            PASSWORD_HASH_IN_PROGRESS,
+            PASSWORD_HASH_QUEUED,
+        )
+
+        started = []
+
+        def run():
+            started.append(True)
+            PASSWORD_HASH_QUEUED.dec()
+            with PASSWORD_HASH_IN_PROGRESS.track_inprogress():
+                return call()
+
+        PASSWORD_HASH_QUEUED.inc()
+        try:
+            return await loop.run_in_executor(None, run)
+        finally:
+            if not started:
+                # Cancelled before a thread picked it up.
+                PASSWORD_HASH_QUEUED.dec()
     return inner
 
 @asyncify
@@ -48,17 +77,10 @@ def generate_jwt(user_id: int):
     
     payload = {'sub': user_id, 'exp': datetime.utcnow() + timedelta(days=1)}
 
-    # Get settings directly from config
-    try:
-        from config.settings import SECRET_KEY, ALGORITHM
-        secret_key = SECRET_KEY
-        algorithm = ALGORITHM
-    except ImportError:
-        secret_key = 'default-secret-key'
-        algorithm = 'HS256'
-
-    # Use secret_key as is (keep bytes format for consistency)
-    key = secret_key
+    # The key JWTAuthentication checks tokens with.
+    snapshot = get_snapshot()
+    key = snapshot.SECRET_KEY
+    algorithm = snapshot.ALGORITHM
 
     try:
         token = jwt.encode(payload, key, algorithm=algorithm)
@@ -21,7 +21,7 @@ from starlette.responses import JSONResponse, \
     FileResponse, \
     HTMLResponse
 
-from raystack.core.database.sqlalchemy import db
+from raystack.core.database import db
 
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
@@ -48,8 +48,11 @@ ACCESS_TOKEN_EXPIRE_MINUTES = 30
 @router.route("/login", methods=["POST"])
 async def login_user(request):
     # Redirect to previous path after login
-    if 'history' in request.session and len(request.session['history']):
-        previous = request.session['history'].pop()
+    history = request.session.get('history')
+    if history:
+        previous = history.pop()
+        # Stored again, as the session only saves values that are set.
+        request.session['history'] = history
     else:
         previous = '/admin'
 
@@ -0,0 +1,24 @@
+"""
+Raystack sessions: ``request.session`` kept in a signed cookie or in a
+server-side store.
+
+Add the middleware, and pick the store with SESSION_ENGINE:
+
+    from raystack.contrib.sessions.middleware import SessionMiddleware
+
+    app.add_middleware(SessionMiddleware)
+
+- ``raystack.contrib.sessions.backends.signed_cookies`` (the default): the
+  data is the cookie, compressed and signed with SECRET_KEY. Nothing is
+  kept on the server.
+- ``raystack.contrib.sessions.backends.sqlite``: the cookie holds a random
+  key; the data is in the SQLite file SESSION_SQLITE_PATH, which several
+  worker processes may share.
+- ``raystack.contrib.sessions.backends.locmem``: the data is in the memory
+  of the process, for development and single-process servers.
+
+A session is loaded the first time the request uses it, and saved only when
+it was changed, so requests that don't touch it cost no more than reading
+the cookie header. The sqlite store is read and written in the threadpool
+instead, its session read before the request is handled.
+"""
@@ -0,0 +1,264 @@
+import string
+
+from starlette.concurrency import run_in_threadpool
+
+from raystack.conf import settings
+from raystack.utils.crypto import get_random_string
+from raystack.utils.module_loading import import_string
+
+# Characters of the session keys of the server-side stores.
+VALID_KEY_CHARS = string.ascii_lowercase + string.digits
+
+
+class CreateError(Exception):
+    """
+    Used internally as a consistent exception type to catch from save (see the
+    docstring for SessionBase.save() for details).
+    """
+
+    pass
+
+
+class SessionBase:
+    """
+    Base class for all Session classes.
+
+    The data is read from the store the first time it's used, not when the
+    session is created; ``accessed`` and ``modified`` tell the middleware
+    whether the request used or changed it.
+    """
+
+    __not_given = object()
+    # Whether load(), save() and delete() wait on a file or a database, so
+    # the async methods run them in the threadpool.
+    io_bound = False
+
+    def __init__(self, session_key=None):
+        self._session_key = session_key
+        self.accessed = False
+        self.modified = False
+
+    def __contains__(self, key):
+        return key in self._session
+
+    def __getitem__(self, key):
+        return self._session[key]
+
+    def __setitem__(self, key, value):
+        self._session[key] = value
+        self.modified = True
+
+    def __delitem__(self, key):
+        del self._session[key]
+        self.modified = True
+
+    def __iter__(self):
+        return iter(self._session)
+
+    def __len__(self):
+        return len(self._session)
+
+    def get(self, key, default=None):
+        return self._session.get(key, default)
+
+    def pop(self, key, default=__not_given):
+        self.modified = self.modified or key in self._session
+        args = () if default is self.__not_given else (default,)
+        return self._session.pop(key, *args)
+
+    def setdefault(self, key, value):
+        if key in self._session:
+            return self._session[key]
+        self[key] = value
+        return value
+
+    def update(self, dict_):
+        self._session.update(dict_)
+        self.modified = True
+
+    def keys(self):
+        return self._session.keys()
+
+    def values(self):
+        return self._session.values()
+
+    def items(self):
+        return self._session.items()
+
+    def clear(self):
+        # To avoid unnecessary persistent storage accesses, we set up the
+        # internals directly (loading data wastes time, since we are going to
+        # set it to an empty dict anyway).
+        self._session_cache = {}
+        self.accessed = True
+        self.modified = True
+
+    def is_empty(self):
+        """Return True when there is no session_key and the session is empty."""
+        try:
+            return not self._session_key and not self._session_cache
+        except AttributeError:
+            return True
+
+    @property
+    def serializer(self):
+        # Looked up when the data is read or written, not for every request.
+        return import_string(settings.SESSION_SERIALIZER)
+
+    def encode(self, session_dict):
+        """Return the given session dictionary serialized as bytes."""
+        return self.serializer().dumps(session_dict)
+
+    def decode(self, session_data):
+        try:
+            return self.serializer().loads(session_data)
+        except Exception:
+            # Data that can't be read is an empty session.
+            return {}
+
+    def _get_new_session_key(self):
+        """Return session key that isn't being used."""
+        while True:
+            session_key = get_random_string(32, VALID_KEY_CHARS)
+            if not self.exists(session_key):
+                return session_key
+
+    def _validate_session_key(self, key):
+        """
+        Key must be truthy and at least 8 characters long. 8 characters is an
+        arbitrary lower bound for some minimal key security.
+        """
+        return key and len(key) >= 8
+
+    def _get_session_key(self):
+        return self.__session_key
+
+    def _set_session_key(self, value):
+        """Validate session key on assignment. Invalid values will set to None."""
+        if self._validate_session_key(value):
+            self.__session_key = value
+        else:
+            self.__session_key = None
+
+    session_key = property(_get_session_key)
+    _session_key = property(_get_session_key, _set_session_key)
+
+    def _get_session(self, no_load=False):
+        """
+        The session's data, loaded from the store on first use. A session
+        with no key is empty; no store is asked for it.
+        """
+        self.accessed = True
+        try:
+            return self._session_cache
+        except AttributeError:
+            if self.session_key is None or no_load:
+                self._session_cache = {}
+            else:
+                self._session_cache = self.load()
+        return self._session_cache
+
+    _session = property(_get_session)
+
+    async def _call(self, method, *args):
+        if self.io_bound:
+            return await run_in_threadpool(method, *args)
+        return method(*args)
+
+    async def aload(self):
+        """
+        Load the data now, off the event loop, unless it's loaded already.
+        Doesn't count as the request using the session.
+        """
+        if not hasattr(self, "_session_cache") and self.session_key is not None:
+            self._session_cache = await self._call(self.load)
+
+    async def asave(self, must_create=False):
+        """save() for async code: off the event loop for io_bound stores."""
+        await self._call(self.save, must_create)
+
+    async def adelete(self, session_key=None):
+        """delete() for async code: off the event loop for io_bound stores."""
+        await self._call(self.delete, session_key)
+
+    def get_expiry_age(self):
+        """Seconds the session lasts after it's saved."""
+        return settings.SESSION_COOKIE_AGE
+
+    def flush(self):
+        """
+        Remove the current session data from the database and regenerate the
+        key.
+        """
+        self.clear()
+        self.delete()
+        self._session_key = None
+
+    def cycle_key(self):
+        """
+        Create a new session key, while retaining the current session data.
+        """
+        data = self._session
+        key = self.session_key
+        self.create()
+        self._session_cache = data
+        if key:
+            self.delete(key)
+
+    # Methods that child classes must implement.
+
+    def exists(self, session_key):
+        """
+        Return True if the given session_key already exists.
+        """
+        raise NotImplementedError(
+            "subclasses of SessionBase must provide an exists() method"
+        )
+
+    def create(self):
+        """
+        Create a new session instance. Guaranteed to create a new object with
+        a unique key and will have saved the result once (with empty data)
+        before the method returns.
+        """
+        raise NotImplementedError(
+            "subclasses of SessionBase must provide a create() method"
+        )
+
+    def save(self, must_create=False):
+        """
+        Save the session data. If 'must_create' is True, create a new session
+        object (or raise CreateError). Otherwise, only update an existing
+        object, creating it if it's gone.
+        """
+        raise NotImplementedError(
+            "subclasses of SessionBase must provide a save() method"
+        )
+
+    def delete(self, session_key=None):
+        """
+        Delete the session data under this key. If the key is None, use the
+        current session key value.
+        """
+        raise NotImplementedError(
+            "subclasses of SessionBase must provide a delete() method"
+        )
+
+    def load(self):
+        """
+        Load the session data and return a dictionary.
+        """
+        raise NotImplementedError(
+            "subclasses of SessionBase must provide a load() method"
+        )
+
+    @classmethod
+    def clear_expired(cls):
+        """
+        Remove expired sessions from the session store.
+
+        If this operation isn't possible on a given backend, it should raise
+        NotImplementedError. If it isn't necessary, because the backend has
+        a built-in expiration mechanism, it should be a no-op.
+        """
+        raise NotImplementedError("This backend does not support clear_expired().")
@@ -0,0 +1,68 @@
+import threading
+import time
+
+from raystack.contrib.sessions.backends.base import CreateError, SessionBase
+
+# {session key: (expiry time, encoded data)}, shared by the requests of the
+# process. The data is kept encoded so that no two requests share a dict.
+_sessions = {}
+_lock = threading.Lock()
+# Expired sessions are dropped every this many new sessions.
+CULL_FREQUENCY = 1000
+_created = 0
+
+
+class SessionStore(SessionBase):
+    """
+    Sessions kept in the memory of the process. They're lost on restart and
+    not seen by other worker processes; use the sqlite store for those.
+    """
+
+    def load(self):
+        entry = _sessions.get(self.session_key)
+        if entry is None or entry[0] <= time.time():
+            self._session_key = None
+            return {}
+        return self.decode(entry[1])
+
+    def exists(self, session_key):
+        return session_key in _sessions
+
+    def create(self):
+        global _created
+        _created += 1
+        if _created % CULL_FREQUENCY == 0:
+            self.clear_expired()
+        while True:
+            self._session_key = self._get_new_session_key()
+            try:
+                self.save(must_create=True)
+            except CreateError:
+                continue
+            self.modified = True
+            return
+
+    def save(self, must_create=False):
+        if self.session_key is None:
+            return self.create()
+        data = self.encode(self._get_session(no_load=must_create))
+        entry = (time.time() + self.get_expiry_age(), data)
+        with _lock:
+            if must_create and self.session_key in _sessions:
+                raise CreateError
+            _sessions[self.session_key] = entry
+
+    def delete(self, session_key=None):
+        if session_key is None:
+            if self.session_key is None:
+                return
+            session_key = self.session_key
+        with _lock:
+            _sessions.pop(session_key, None)
+
+    @classmethod
+    def clear_expired(cls):
+        now = time.time()
+        with _lock:
+            for session_key in [key for key, (expires, _) in _sessions.items() if expires <= now]:
+                del _sessions[session_key]
@@ -0,0 +1,89 @@
+from raystack.contrib.sessions.backends.base import SessionBase
+from raystack.core import signing
+
+
+class SessionStore(SessionBase):
+    """
+    The session data is the cookie: JSON, compressed when that makes it
+    shorter, signed with a timestamp (TimestampSigner.sign_object). Loading
+    it checks the signature and the age; nothing is stored on the server.
+    """
+
+    salt = "raystack.contrib.sessions.backends.signed_cookies"
+
+    def load(self):
+        """
+        Load the data from the key itself instead of fetching from some
+        external data store. Opposite of _get_session_key(); a cookie with a
+        bad signature, or older than the expiry age, is an empty session.
+        """
+        try:
+            return signing.loads(
+                self.session_key,
+                serializer=self.serializer,
+                max_age=self.get_expiry_age(),
+                salt=self.salt,
+            )
+        except Exception:
+            # BadSignature, SignatureExpired or data that can't be
+            # decoded: start over with an empty session, and have the
+            # middleware delete the cookie unless the request sets data.
+            self._session_key = None
+        return {}
+
+    def create(self):
+        """
+        To create a new key, set the modified flag so that the cookie is set
+        on the client for the current request.
+        """
+        self.modified = True
+
+    def save(self, must_create=False):
+        """
+        To save, get the session key as a securely signed string and then set
+        the modified flag so that the cookie is set on the client for the
+        current request.
+        """
+        self._session_key = self._get_session_key()
+        self.modified = True
+
+    def exists(self, session_key=None):
+        """
+        This method makes sense when you're talking to a shared resource, but
+        it doesn't matter when you're storing the information in the client's
+        cookie.
+        """
+        return False
+
+    def delete(self, session_key=None):
+        """
+        To delete, clear the session key and the underlying data structure
+        and set the modified flag so that the cookie is set on the client for
+        the current request.
+        """
+        self._session_key = ""
+        self._session_cache = {}
+        self.modified = True
+
+    def cycle_key(self):
+        """
+        Keep the same data but with a new key. Call save() and it will
+        automatically save a cookie with a new key at the end of the request.
+        """
+        self.save()
+
+    def _get_session_key(self):
+        """
+        Instead of generating a random string, generate a secure url-safe
+        base64-encoded string of data as our session key.
+        """
+        return signing.dumps(
+            self._session,
+            compress=True,
+            salt=self.salt,
+            serializer=self.serializer,
+        )
+
+    @classmethod
+    def clear_expired(cls):
+        pass
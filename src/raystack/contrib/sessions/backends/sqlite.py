@@ -0,0 +1,152 @@
+import sqlite3
+import threading
+import time
+
+from raystack.conf import settings
+from raystack.contrib.sessions.backends.base import CreateError, SessionBase
+
+SCHEMA = (
+    'CREATE TABLE IF NOT EXISTS "sessions" ('
+    '"session_key" TEXT PRIMARY KEY, "session_data" BLOB NOT NULL, "expire_date" REAL NOT NULL)',
+    'CREATE INDEX IF NOT EXISTS "sessions_expire_date" ON "sessions" ("expire_date")',
+)
+
+
+class SessionDatabase:
+    """
+    The SQLite file of the sessions, with a connection per thread. Several
+    worker processes may share the file.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        self._created = False
+        self._lock = threading.Lock()
+
+    def connection(self):
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            # Readers don't wait for a writer.
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        if not self._created:
+            with self._lock:
+                if not self._created:
+                    for statement in SCHEMA:
+                        connection.execute(statement)
+                    self._created = True
+        return connection
+
+
+_databases = {}
+_databases_lock = threading.Lock()
+# Expired sessions are deleted every this many new sessions.
+CULL_FREQUENCY = 1000
+_created = 0
+
+
+def get_database(path=None):
+    """The SessionDatabase of ``path`` (SESSION_SQLITE_PATH by default)."""
+    path = path or settings.SESSION_SQLITE_PATH
+    try:
+        return _databases[path]
+    except KeyError:
+        with _databases_lock:
+            return _databases.setdefault(path, SessionDatabase(path))
+
+
+class SessionStore(SessionBase):
+    """
+    Sessions kept in the SQLite file SESSION_SQLITE_PATH, under a random key
+    sent as the cookie. A session is read with one lookup by key, in the
+    threadpool before the request is handled when it comes with a cookie,
+    and written there too.
+    """
+
+    io_bound = True
+
+    def __init__(self, session_key=None):
+        super().__init__(session_key)
+        self.database = get_database()
+
+    def load(self):
+        row = self.database.connection().execute(
+            'SELECT "session_data" FROM "sessions" WHERE "session_key" = ? AND "expire_date" > ?',
+            (self.session_key, time.time()),
+        ).fetchone()
+        if row is None:
+            self._session_key = None
+            return {}
+        return self.decode(row[0])
+
+    def exists(self, session_key):
+        return (
+            self.database.connection().execute(
+                'SELECT 1 FROM "sessions" WHERE "session_key" = ?', (session_key,)
+            ).fetchone()
+            is not None
+        )
+
+    def create(self):
+        global _created
+        _created += 1
+        if _created % CULL_FREQUENCY == 0:
+            self.clear_expired()
+        while True:
+            self._session_key = self._get_new_session_key()
+            try:
+                # Save immediately to ensure we have a unique entry in the
+                # database.
+                self.save(must_create=True)
+            except CreateError:
+                # Key wasn't unique. Try again.
+                continue
+            self.modified = True
+            return
+
+    def save(self, must_create=False):
+        """
+        Save the current session data to the database. If 'must_create' is
+        True, raise CreateError if a session with the same key exists.
+        """
+        if self.session_key is None:
+            return self.create()
+        params = (
+            self.session_key,
+            self.encode(self._get_session(no_load=must_create)),
+            time.time() + self.get_expiry_age(),
+        )
+        connection = self.database.connection()
+        if must_create:
+            try:
+                connection.execute(
+                    'INSERT INTO "sessions" ("session_key", "session_data", "expire_date") VALUES (?, ?, ?)',
+                    params,
+                )
+            except sqlite3.IntegrityError:
+                raise CreateError
+        else:
+            connection.execute(
+                'INSERT INTO "sessions" ("session_key", "session_data", "expire_date") VALUES (?, ?, ?) '
+                'ON CONFLICT ("session_key") DO UPDATE SET '
+                '"session_data" = excluded."session_data", "expire_date" = excluded."expire_date"',
+                params,
+            )
+
+    def delete(self, session_key=None):
+        if session_key is None:
+            if self.session_key is None:
+                return
+            session_key = self.session_key
+        self.database.connection().execute(
+            'DELETE FROM "sessions" WHERE "session_key" = ?', (session_key,)
+        )
+
+    @classmethod
+    def clear_expired(cls):
+        get_database().connection().execute(
+            'DELETE FROM "sessions" WHERE "expire_date" <= ?', (time.time(),)
+        )
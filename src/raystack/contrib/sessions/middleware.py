@@ -0,0 +1,105 @@
+import functools
+import time
+from email.utils import formatdate
+from http.cookies import SimpleCookie
+from importlib import import_module
+
+from starlette.datastructures import MutableHeaders
+from starlette.requests import cookie_parser
+
+from raystack.conf import get_snapshot
+
+
+@functools.lru_cache
+def get_session_store(engine):
+    """The SessionStore class of the SESSION_ENGINE module ``engine``."""
+    return import_module(engine).SessionStore
+
+
+class SessionMiddleware:
+    """
+    Put a session in ``request.session``, of the SESSION_ENGINE store, keyed
+    by the SESSION_COOKIE_NAME cookie.
+
+    The session only reads its store when the request first uses it, and
+    the response only sets the cookie when the session was changed (or on
+    every request with SESSION_SAVE_EVERY_REQUEST). A session emptied by
+    the request, with clear() or flush(), is deleted along with its cookie.
+
+    Stores that read a file or a database (``io_bound``) are read in the
+    threadpool before the request is handled, when it comes with a cookie,
+    and written there before the response starts, so the event loop never
+    waits on them.
+
+    Values changed in place, such as a list in the session that's appended
+    to, aren't seen; set ``request.session.modified = True`` to save them.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] not in ("http", "websocket"):
+            await self.app(scope, receive, send)
+            return
+
+        conf = get_snapshot()
+        session_key = None
+        for name, value in scope["headers"]:
+            if name == b"cookie":
+                session_key = cookie_parser(value.decode("latin-1")).get(conf.SESSION_COOKIE_NAME)
+                break
+        session = get_session_store(conf.SESSION_ENGINE)(session_key)
+        if session.io_bound and session_key is not None:
+            await session.aload()
+        scope["session"] = session
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start" and (
+                session.accessed or conf.SESSION_SAVE_EVERY_REQUEST
+            ):
+                await self.process_response(conf, session, session_key, message)
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+    async def process_response(self, conf, session, session_key, message):
+        """Save the session if needed and set or delete its cookie."""
+        headers = MutableHeaders(scope=message)
+        if session.accessed:
+            headers.add_vary_header("Cookie")
+        if session_key is not None and (
+            session.is_empty() or (session.modified and not session.keys())
+        ):
+            # The request emptied the session (or its cookie was no good).
+            if session.session_key is not None:
+                await session.adelete()
+            headers.append("set-cookie", self.cookie(conf, "", max_age=0))
+            return
+        if not (session.modified or conf.SESSION_SAVE_EVERY_REQUEST) or session.is_empty():
+            return
+        if message["status"] >= 500:
+            return
+        await session.asave()
+        max_age = None if conf.SESSION_EXPIRE_AT_BROWSER_CLOSE else session.get_expiry_age()
+        headers.append("set-cookie", self.cookie(conf, session.session_key, max_age))
+
+    def cookie(self, conf, value, max_age=None):
+        """The Set-Cookie header value of the session cookie."""
+        name = conf.SESSION_COOKIE_NAME
+        cookie = SimpleCookie()
+        cookie[name] = value
+        morsel = cookie[name]
+        if max_age is not None:
+            morsel["max-age"] = max_age
+            morsel["expires"] = formatdate(time.time() + max_age, usegmt=True)
+        morsel["path"] = conf.SESSION_COOKIE_PATH
+        if conf.SESSION_COOKIE_DOMAIN:
+            morsel["domain"] = conf.SESSION_COOKIE_DOMAIN
+        if conf.SESSION_COOKIE_SECURE:
+            morsel["secure"] = True
+        if conf.SESSION_COOKIE_HTTPONLY:
+            morsel["httponly"] = True
+        if conf.SESSION_COOKIE_SAMESITE:
+            morsel["samesite"] = conf.SESSION_COOKIE_SAMESITE
+        return morsel.OutputString()
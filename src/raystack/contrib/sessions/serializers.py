@@ -0,0 +1,5 @@
+from raystack.core.signing import JSONSerializer as BaseJSONSerializer
+
+
+class JSONSerializer(BaseJSONSerializer):
+    """Session data as compact JSON, the SESSION_SERIALIZER by default."""
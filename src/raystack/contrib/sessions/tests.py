@@ -0,0 +1,127 @@
+"""
+Tests of SessionMiddleware with each store.
+"""
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+
+from raystack.conf import settings
+
+if not settings.configured:
+    settings.configure(SECRET_KEY="raystack-tests" * 4, USE_I18N=False)
+
+from starlette.applications import Starlette  # noqa: E402
+from starlette.responses import JSONResponse  # noqa: E402
+from starlette.routing import Route  # noqa: E402
+from starlette.testclient import TestClient  # noqa: E402
+
+from raystack.conf import get_snapshot  # noqa: E402
+from raystack.contrib.sessions.backends import sqlite  # noqa: E402
+from raystack.contrib.sessions.middleware import SessionMiddleware  # noqa: E402
+
+
+# The threads the event loop ran the views in.
+loop_threads = set()
+
+
+async def count(request):
+    loop_threads.add(threading.current_thread())
+    request.session["count"] = request.session.get("count", 0) + 1
+    return JSONResponse(request.session["count"])
+
+
+async def clear(request):
+    request.session.clear()
+    return JSONResponse(None)
+
+
+async def untouched(request):
+    return JSONResponse(None)
+
+
+app = Starlette(
+    routes=[Route("/count", count), Route("/clear", clear), Route("/untouched", untouched)]
+)
+app.add_middleware(SessionMiddleware)
+
+
+class SessionMiddlewareTests(unittest.TestCase):
+    engine = "raystack.contrib.sessions.backends.signed_cookies"
+
+    def setUp(self):
+        conf = get_snapshot()
+        engine = conf.SESSION_ENGINE
+        object.__setattr__(conf, "SESSION_ENGINE", self.engine)
+        self.addCleanup(object.__setattr__, conf, "SESSION_ENGINE", engine)
+        self.client = TestClient(app)
+        self.cookie = conf.SESSION_COOKIE_NAME
+
+    def test_saved_across_requests(self):
+        self.assertEqual(self.client.get("/count").json(), 1)
+        self.assertEqual(self.client.get("/count").json(), 2)
+
+    def test_untouched_session_sets_no_cookie(self):
+        self.client.get("/count")
+        response = self.client.get("/untouched")
+        self.assertNotIn("set-cookie", response.headers)
+        self.assertNotIn("vary", response.headers)
+
+    def test_cleared_session_deletes_cookie(self):
+        self.client.get("/count")
+        response = self.client.get("/clear")
+        self.assertIn('%s=""' % self.cookie, response.headers["set-cookie"])
+        self.assertIn("Max-Age=0", response.headers["set-cookie"])
+        self.assertIsNone(self.client.cookies.get(self.cookie))
+        self.assertEqual(self.client.get("/count").json(), 1)
+
+
+class LocMemSessionMiddlewareTests(SessionMiddlewareTests):
+    engine = "raystack.contrib.sessions.backends.locmem"
+
+
+class SQLiteSessionMiddlewareTests(SessionMiddlewareTests):
+    engine = "raystack.contrib.sessions.backends.sqlite"
+
+    def setUp(self):
+        super().setUp()
+        directory = tempfile.mkdtemp(prefix="raystack-tests-")
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        database = sqlite.SessionDatabase(os.path.join(directory, "sessions.sqlite3"))
+        get_database = sqlite.get_database
+        sqlite.get_database = lambda path=None: database
+        self.addCleanup(setattr, sqlite, "get_database", get_database)
+
+    def test_store_used_off_the_event_loop(self):
+        threads = set()
+        for name in ("load", "save", "delete"):
+            method = getattr(sqlite.SessionStore, name)
+
+            def spy(self, *args, method=method, **kwargs):
+                threads.add(threading.current_thread())
+                return method(self, *args, **kwargs)
+
+            setattr(sqlite.SessionStore, name, spy)
+            self.addCleanup(setattr, sqlite.SessionStore, name, method)
+        self.client.get("/count")
+        self.client.get("/count")
+        self.client.get("/clear")
+        self.assertTrue(threads)
+        self.assertTrue(loop_threads)
+        self.assertFalse(threads & loop_threads)
+
+    def test_cleared_session_is_deleted(self):
+        self.client.get("/count")
+        key = self.client.cookies.get(self.cookie)
+        self.assertTrue(sqlite.get_database().connection().execute(
+            'SELECT 1 FROM "sessions" WHERE "session_key" = ?', (key,)
+        ).fetchone())
+        self.client.get("/clear")
+        self.assertIsNone(sqlite.get_database().connection().execute(
+            'SELECT 1 FROM "sessions" WHERE "session_key" = ?', (key,)
+        ).fetchone())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,117 @@
+import importlib
+import os
+
+from raystack.conf import settings
+from raystack.core.exceptions import ImproperlyConfigured
+from raystack.utils.module_loading import import_string
+
+# Assets shipped with the framework (admin theme, favicon, ...). They are
+# collected under this prefix and served at /admin_static.
+RAYSTACK_STATIC_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "static"
+)
+RAYSTACK_STATIC_PREFIX = "admin"
+
+
+def _walk(root):
+    """Yield paths of the files below root, relative to it and "/"-separated."""
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        for filename in sorted(filenames):
+            if filename.startswith("."):
+                continue
+            full_path = os.path.join(dirpath, filename)
+            yield os.path.relpath(full_path, root).replace(os.sep, "/"), full_path
+
+
+class BaseFinder:
+    """
+    A base file finder to be used for custom staticfiles finder classes.
+    """
+
+    def list(self):
+        """
+        Yield (path, absolute_path) pairs for all files this finder knows of.
+        """
+        raise NotImplementedError(
+            "subclasses of BaseFinder must provide a list() method"
+        )
+
+
+class FileSystemFinder(BaseFinder):
+    """
+    Find the framework's own static files and those in STATICFILES_DIRS.
+
+    Entries of STATICFILES_DIRS may be paths or (prefix, path) tuples.
+    """
+
+    def __init__(self):
+        self.locations = [(RAYSTACK_STATIC_PREFIX, RAYSTACK_STATIC_DIR)]
+        if not isinstance(settings.STATICFILES_DIRS, (list, tuple)):
+            raise ImproperlyConfigured(
+                "Your STATICFILES_DIRS setting is not a tuple or list; "
+                "perhaps you forgot a trailing comma?"
+            )
+        base_dir = getattr(settings, "BASE_DIR", os.getcwd())
+        for root in settings.STATICFILES_DIRS:
+            if isinstance(root, (list, tuple)):
+                prefix, root = root
+            else:
+                prefix = ""
+            root = os.path.join(base_dir, str(root))
+            if os.path.realpath(root) == os.path.realpath(RAYSTACK_STATIC_DIR):
+                continue
+            if (prefix, root) not in self.locations:
+                self.locations.append((prefix, root))
+
+    def list(self):
+        for prefix, root in self.locations:
+            if not os.path.isdir(root):
+                continue
+            for path, full_path in _walk(root):
+                if prefix:
+                    path = "%s/%s" % (prefix, path)
+                yield path, full_path
+
+
+class AppDirectoriesFinder(BaseFinder):
+    """
+    Find static files in the "static" directory of each installed app.
+    """
+
+    source_dir = "static"
+
+    def __init__(self):
+        self.locations = []
+        for app_path in settings.INSTALLED_APPS:
+            try:
+                module = importlib.import_module(app_path)
+            except ImportError:
+                continue
+            if getattr(module, "__file__", None) is None:
+                continue
+            root = os.path.join(os.path.dirname(module.__file__), self.source_dir)
+            if os.path.isdir(root):
+                self.locations.append(root)
+
+    def list(self):
+        for root in self.locations:
+            yield from _walk(root)
+
+
+def get_finders():
+    for finder_path in settings.STATICFILES_FINDERS:
+        yield get_finder(finder_path)
+
+
+def get_finder(import_path):
+    """
+    Import the staticfiles finder class described by import_path, where
+    import_path is the full Python path to the class.
+    """
+    Finder = import_string(import_path)
+    if not issubclass(Finder, BaseFinder):
+        raise ImproperlyConfigured(
+            'Finder "%s" is not a subclass of "%s"' % (Finder, BaseFinder)
+        )
+    return Finder()
@@ -0,0 +1,221 @@
+import functools
+import mimetypes
+import os
+import stat
+from email.utils import formatdate
+
+import anyio
+
+from raystack.contrib.staticfiles.utils import ENCODINGS
+
+CHUNK_SIZE = 64 * 1024
+
+# Hashed names never change content.
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+# Anything else may change on the next deploy, make clients revalidate.
+DEFAULT_CACHE_CONTROL = "no-cache"
+
+# Content types of files requested by their compressed name (app.css.gz),
+# for which mimetypes only gives the type of the uncompressed content.
+COMPRESSED_CONTENT_TYPES = {
+    "gzip": "application/gzip",
+    "br": "application/x-brotli",
+    "bzip2": "application/x-bzip2",
+    "xz": "application/x-xz",
+    "compress": "application/x-compress",
+}
+
+
+def _route_path(scope):
+    # Starlette mounts either strip the mount prefix from "path" or keep the
+    # full path and extend "root_path"; handle both.
+    path = scope["path"]
+    root_path = scope.get("root_path", "")
+    if root_path and path.startswith(root_path):
+        if path == root_path:
+            return ""
+        if path[len(root_path)] == "/":
+            return path[len(root_path) :]
+    return path
+
+
+def _accepted_encodings(scope):
+    for name, value in scope["headers"]:
+        if name == b"accept-encoding":
+            return {
+                part.split(";", 1)[0].strip()
+                for part in value.decode("latin-1").lower().split(",")
+            }
+    return set()
+
+
+def _header(scope, wanted):
+    for name, value in scope["headers"]:
+        if name == wanted:
+            return value.decode("latin-1")
+    return None
+
+
+class StaticFile:
+    """Everything needed to answer a request for one file, resolved once."""
+
+    __slots__ = ("variants", "content_type", "cache_control", "vary")
+
+    def __init__(self, variants, content_type, cache_control):
+        # {encoding or None: (path, size, etag, last_modified)}
+        self.variants = variants
+        self.content_type = content_type
+        self.cache_control = cache_control
+        self.vary = len(variants) > 1
+
+
+class StaticFilesHandler:
+    """
+    ASGI app serving the files below a directory.
+
+    - Precompressed siblings (file.css.br, file.css.gz, as written by
+      collectstatic) are served to clients accepting those encodings.
+    - Names listed in immutable_names (the hashed names from the
+      collectstatic manifest) get a one-year immutable Cache-Control; other
+      files are revalidated with ETag/Last-Modified.
+    - File bodies are handed to the server through the ASGI zero-copy send
+      (sendfile) or path send extensions when the server offers them.
+
+    With cache_lookups, the result of resolving a path (stat calls, variants,
+    headers) is memoized. Only enable it for directories that don't change
+    while the process runs, such as STATIC_ROOT.
+    """
+
+    def __init__(self, directory, *, immutable_names=(), cache_lookups=False):
+        self.directory = os.path.realpath(directory)
+        self.immutable_names = frozenset(immutable_names)
+        if cache_lookups:
+            self.lookup = functools.lru_cache(maxsize=4096)(self.lookup)
+
+    def lookup(self, path):
+        """Return the StaticFile for a request path, or None."""
+        name = path.lstrip("/")
+        full_path = os.path.realpath(os.path.join(self.directory, name))
+        if os.path.commonpath([full_path, self.directory]) != self.directory:
+            return None
+        variants = {}
+        for encoding, suffix in (*ENCODINGS.items(), (None, "")):
+            try:
+                stat_result = os.stat(full_path + suffix)
+            except (FileNotFoundError, NotADirectoryError):
+                continue
+            if not stat.S_ISREG(stat_result.st_mode):
+                continue
+            etag = '"%x-%x%s"' % (
+                int(stat_result.st_mtime),
+                stat_result.st_size,
+                suffix.replace(".", "-"),
+            )
+            variants[encoding] = (
+                full_path + suffix,
+                stat_result.st_size,
+                etag,
+                formatdate(stat_result.st_mtime, usegmt=True),
+            )
+        if None not in variants:
+            return None
+        content_type, compression = mimetypes.guess_type(full_path)
+        if compression is not None:
+            # Sent as is, without Content-Encoding: the client gets the
+            # compressed file, not the content it decompresses to.
+            content_type = COMPRESSED_CONTENT_TYPES.get(compression)
+        if name in self.immutable_names:
+            cache_control = IMMUTABLE_CACHE_CONTROL
+        else:
+            cache_control = DEFAULT_CACHE_CONTROL
+        return StaticFile(
+            variants, content_type or "application/octet-stream", cache_control
+        )
+
+    async def __call__(self, scope, receive, send):
+        assert scope["type"] == "http"
+        method = scope["method"]
+        if method not in ("GET", "HEAD"):
+            await self._send_empty(send, 405, [(b"allow", b"GET, HEAD")])
+            return
+
+        static_file = self.lookup(_route_path(scope))
+        if static_file is None:
+            await self._send_empty(send, 404, [], b"Not Found")
+            return
+
+        encoding = None
+        if static_file.vary:
+            accepted = _accepted_encodings(scope)
+            for candidate in ENCODINGS:
+                if candidate in accepted and candidate in static_file.variants:
+                    encoding = candidate
+                    break
+        path, size, etag, last_modified = static_file.variants[encoding]
+
+        headers = [
+            (b"content-type", static_file.content_type.encode("latin-1")),
+            (b"etag", etag.encode("latin-1")),
+            (b"last-modified", last_modified.encode("latin-1")),
+            (b"cache-control", static_file.cache_control.encode("latin-1")),
+        ]
+        if static_file.vary:
+            headers.append((b"vary", b"Accept-Encoding"))
+        if encoding is not None:
+            headers.append((b"content-encoding", encoding.encode("latin-1")))
+
+        if_none_match = _header(scope, b"if-none-match")
+        if if_none_match is not None and (
+            if_none_match.strip() == "*"
+            or etag in [tag.strip() for tag in if_none_match.split(",")]
+        ):
+            await self._send_empty(send, 304, headers)
+            return
+
+        headers.append((b"content-length", str(size).encode("latin-1")))
+        await send({"type": "http.response.start", "status": 200, "headers": headers})
+        if method == "HEAD":
+            await send({"type": "http.response.body", "body": b""})
+            return
+        await self._send_file(scope, send, path, size)
+
+    async def _send_file(self, scope, send, path, size):
+        extensions = scope.get("extensions") or {}
+        if "http.response.zerocopysend" in extensions:
+            with open(path, "rb") as f:
+                await send(
+                    {
+                        "type": "http.response.zerocopysend",
+                        "file": f,
+                        "count": size,
+                    }
+                )
+            return
+        if "http.response.pathsend" in extensions:
+            await send({"type": "http.response.pathsend", "path": path})
+            return
+        async with await anyio.open_file(path, mode="rb") as f:
+            more_body = True
+            while more_body:
+                chunk = await f.read(CHUNK_SIZE)
+                more_body = len(chunk) == CHUNK_SIZE
+                await send(
+                    {
+                        "type": "http.response.body",
+                        "body": chunk,
+                        "more_body": more_body,
+                    }
+                )
+
+    async def _send_empty(self, send, status, headers, body=b""):
+        await send(
+            {
+                "type": "http.response.start",
+                "status": status,
+                "headers": [
+                    *headers,
+                    (b"content-length", str(len(body)).encode("latin-1")),
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,180 @@
+import json
+import os
+import posixpath
+import tempfile
+from hashlib import md5
+from urllib.parse import quote, urljoin
+
+from raystack.conf import settings
+from raystack.core.exceptions import ImproperlyConfigured
+from raystack.utils._os import safe_join
+from raystack.utils.functional import LazyObject
+from raystack.utils.module_loading import import_string
+
+
+class StaticFilesStorage:
+    """
+    Storage for the files collected into STATIC_ROOT and served from
+    STATIC_URL.
+    """
+
+    def __init__(self, location=None, base_url=None):
+        if location is None:
+            location = settings.STATIC_ROOT
+        if base_url is None:
+            base_url = settings.STATIC_URL
+        self.location = os.path.abspath(location) if location else None
+        base_url = base_url or "/"
+        if "://" not in base_url and not base_url.startswith("/"):
+            base_url = "/" + base_url
+        if not base_url.endswith("/"):
+            base_url += "/"
+        self.base_url = base_url
+
+    def path(self, name):
+        if not self.location:
+            raise ImproperlyConfigured(
+                "You're using the staticfiles app "
+                "without having set the STATIC_ROOT "
+                "setting to a filesystem path."
+            )
+        return safe_join(self.location, name)
+
+    def exists(self, name):
+        return os.path.lexists(self.path(name))
+
+    def open(self, name):
+        with open(self.path(name), "rb") as f:
+            return f.read()
+
+    def save(self, name, content):
+        """
+        Write content (bytes) to name, atomically replacing any existing file.
+        """
+        full_path = self.path(name)
+        directory = os.path.dirname(full_path)
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory)
+        try:
+            with open(fd, "wb") as f:
+                f.write(content)
+            os.chmod(tmp_path, 0o644)
+            os.replace(tmp_path, full_path)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+        return name
+
+    def delete(self, name):
+        try:
+            os.remove(self.path(name))
+        except FileNotFoundError:
+            pass
+
+    def stored_name(self, name):
+        return name
+
+    def url(self, name):
+        return urljoin(self.base_url, quote(self.stored_name(name).lstrip("/")))
+
+    def post_process(self, paths, dry_run=False):
+        """
+        Hook run by collectstatic after all files were copied. Yield
+        (original_path, processed_path) tuples.
+        """
+        return iter(())
+
+
+class ManifestStaticFilesStorage(StaticFilesStorage):
+    """
+    Store a copy of each collected file under a name containing a hash of its
+    contents (css/base.css -> css/base.1a2b3c4d5e6f.css) and record the
+    mapping in a JSON manifest in STATIC_ROOT.
+
+    Hashed names never change content, so they can be served with far-future
+    immutable caching headers.
+    """
+
+    manifest_name = "staticfiles.json"
+    manifest_version = "1.0"
+
+    def __init__(self, location=None, base_url=None):
+        super().__init__(location, base_url)
+        self.hashed_files = self.load_manifest() if self.location else {}
+
+    def file_hash(self, content):
+        return md5(content, usedforsecurity=False).hexdigest()[:12]
+
+    def hashed_name(self, name, content):
+        root, ext = posixpath.splitext(name)
+        return "%s.%s%s" % (root, self.file_hash(content), ext)
+
+    def post_process(self, paths, dry_run=False):
+        if dry_run:
+            return
+        hashed_files = {}
+        for name in sorted(paths):
+            content = self.open(name)
+            hashed = self.hashed_name(name, content)
+            if not self.exists(hashed):
+                self.save(hashed, content)
+            hashed_files[name] = hashed
+            yield name, hashed
+        self.hashed_files = hashed_files
+        self.save_manifest()
+
+    def read_manifest(self):
+        try:
+            with open(self.path(self.manifest_name), encoding="utf-8") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def load_manifest(self):
+        content = self.read_manifest()
+        if content is None:
+            return {}
+        try:
+            stored = json.loads(content)
+        except json.JSONDecodeError:
+            pass
+        else:
+            if stored.get("version") == self.manifest_version:
+                return stored.get("paths", {})
+        raise ValueError(
+            "Couldn't load manifest '%s' (version %s)"
+            % (self.manifest_name, self.manifest_version)
+        )
+
+    def save_manifest(self):
+        payload = {"paths": self.hashed_files, "version": self.manifest_version}
+        self.save(
+            self.manifest_name, json.dumps(payload, sort_keys=True).encode("utf-8")
+        )
+
+    def stored_name(self, name):
+        return self.hashed_files.get(name, name)
+
+
+class ConfiguredStorage(LazyObject):
+    def _setup(self):
+        config = settings.STORAGES["staticfiles"]
+        storage_cls = import_string(config["BACKEND"])
+        self._wrapped = storage_cls(**config.get("OPTIONS", {}))
+
+
+staticfiles_storage = ConfiguredStorage()
+
+
+def admin_static_url(filename):
+    """
+    Return the /admin_static URL of one of the framework's own assets, using
+    its hashed name once collectstatic has run.
+    """
+    from raystack.contrib.staticfiles.finders import RAYSTACK_STATIC_PREFIX
+
+    prefix = RAYSTACK_STATIC_PREFIX + "/"
+    name = staticfiles_storage.stored_name(prefix + filename.lstrip("/"))
+    if name.startswith(prefix):
+        name = name[len(prefix) :]
+    return "/admin_static/" + quote(name)
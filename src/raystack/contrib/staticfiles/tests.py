@@ -0,0 +1,97 @@
+"""
+Tests of the default ManifestStaticFilesStorage: without a manifest, names
+and served files stay unhashed.
+"""
+import copy
+import os
+import shutil
+import tempfile
+import unittest
+
+from raystack.conf import settings
+
+if not settings.configured:
+    settings.configure(SECRET_KEY="raystack-tests", USE_I18N=False)
+
+from starlette.testclient import TestClient  # noqa: E402
+
+from raystack.applications import Raystack  # noqa: E402
+from raystack.contrib.staticfiles.handlers import IMMUTABLE_CACHE_CONTROL  # noqa: E402
+from raystack.contrib.staticfiles.storage import (  # noqa: E402
+    ManifestStaticFilesStorage,
+    admin_static_url,
+    staticfiles_storage,
+)
+from raystack.utils.functional import empty  # noqa: E402
+
+CSS = b"body { color: red; }"
+
+
+class ManifestStorageTests(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, True)
+        self.source = os.path.join(directory, "source")
+        self.root = os.path.join(directory, "root")
+        os.makedirs(os.path.join(self.source, "css"))
+        with open(os.path.join(self.source, "css", "site.css"), "wb") as f:
+            f.write(CSS)
+        self.override("STATIC_ROOT", self.root)
+        self.override("STATIC_URL", "static/")
+        self.override("STATICFILES_DIRS", [self.source])
+        # Raystack() adds its own directories to the TEMPLATES it is given.
+        self.override("BASE_DIR", directory)
+        self.override("TEMPLATES", copy.deepcopy(settings.TEMPLATES))
+        self.reset_storage()
+        self.addCleanup(self.reset_storage)
+
+    def override(self, name, value):
+        old = getattr(settings, name, None)
+        setattr(settings, name, value)
+        self.addCleanup(setattr, settings, name, old)
+
+    def reset_storage(self):
+        staticfiles_storage._wrapped = empty
+
+    def collect(self):
+        """What collectstatic does with a site and an admin file."""
+        storage = ManifestStaticFilesStorage()
+        storage.save("css/site.css", CSS)
+        storage.save("admin/logo.svg", b"<svg/>")
+        processed = dict(storage.post_process(["css/site.css", "admin/logo.svg"]))
+        self.reset_storage()
+        return processed
+
+    def test_urls_without_manifest(self):
+        self.assertEqual(staticfiles_storage.hashed_files, {})
+        self.assertEqual(staticfiles_storage.url("css/site.css"), "/static/css/site.css")
+        self.assertEqual(admin_static_url("logo.svg"), "/admin_static/logo.svg")
+
+    def test_urls_without_static_root(self):
+        self.override("STATIC_ROOT", None)
+        self.reset_storage()
+        self.assertEqual(staticfiles_storage.hashed_files, {})
+        self.assertEqual(staticfiles_storage.url("css/site.css"), "/static/css/site.css")
+
+    def test_served_unhashed_without_manifest(self):
+        client = TestClient(Raystack())
+        response = client.get("/static/css/site.css")
+        self.assertEqual((response.status_code, response.content), (200, CSS))
+        self.assertNotEqual(response.headers.get("cache-control"), IMMUTABLE_CACHE_CONTROL)
+        self.assertEqual(client.get("/admin_static/logo.svg").status_code, 200)
+
+    def test_served_hashed_with_manifest(self):
+        processed = self.collect()
+        hashed = processed["css/site.css"]
+        self.assertNotEqual(hashed, "css/site.css")
+        self.assertEqual(staticfiles_storage.url("css/site.css"), "/static/" + hashed)
+        self.assertEqual(admin_static_url("logo.svg"), "/admin_static/" + processed["admin/logo.svg"][6:])
+        client = TestClient(Raystack())
+        response = client.get("/static/" + hashed)
+        self.assertEqual((response.status_code, response.content), (200, CSS))
+        self.assertEqual(response.headers["cache-control"], IMMUTABLE_CACHE_CONTROL)
+        self.assertEqual(client.get(admin_static_url("logo.svg")).status_code, 200)
+
+
+if __name__ == "__main__":
+    unittest.main()
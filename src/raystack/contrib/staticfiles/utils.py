@@ -0,0 +1,63 @@
+import gzip
+import os
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
+
+# Text-like assets worth storing precompressed. Images and fonts in modern
+# formats are compressed already.
+COMPRESSIBLE_EXTENSIONS = {
+    ".css",
+    ".js",
+    ".mjs",
+    ".map",
+    ".json",
+    ".svg",
+    ".html",
+    ".txt",
+    ".xml",
+    ".ico",
+    ".ttf",
+    ".otf",
+    ".eot",
+}
+
+# Don't bother for files smaller than a TCP packet.
+MIN_COMPRESS_SIZE = 512
+
+# Encoding name -> file suffix, in order of preference.
+ENCODINGS = {"br": ".br", "gzip": ".gz"}
+
+
+def compress_file(path):
+    """
+    Write .gz (and .br when the brotli package is installed) siblings of the
+    file at path, keeping only variants smaller than the original. Return the
+    list of paths written.
+    """
+    if os.path.splitext(path)[1].lower() not in COMPRESSIBLE_EXTENSIONS:
+        return []
+    with open(path, "rb") as f:
+        content = f.read()
+    if len(content) < MIN_COMPRESS_SIZE:
+        return []
+
+    written = []
+    variants = {".gz": lambda: gzip.compress(content, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        variants[".br"] = lambda: brotli.compress(content)
+    for suffix, compress in variants.items():
+        target = path + suffix
+        if os.path.exists(target) and os.path.getmtime(target) >= os.path.getmtime(
+            path
+        ):
+            continue
+        compressed = compress()
+        if len(compressed) >= len(content):
+            continue
+        with open(target, "wb") as f:
+            f.write(compressed)
+        written.append(target)
+    return written
@@ -1,10 +1,13 @@
-try:
-    from . import database
-except ImportError as e:
-    # Log the error but don't fail completely
-    import logging
-    logger = logging.getLogger(__name__)
-    logger.warning(f"Failed to import database module: {e}")
+import importlib
 
-from . import security
-from . import dependencies
\ No newline at end of file
+# The subpackages below pull in SQLAlchemy/SQLModel, passlib and friends.
+# They're imported on first attribute access instead of with raystack.core,
+# which every settings access goes through (raystack.conf imports
+# raystack.core.exceptions).
+_LAZY_SUBMODULES = {"database", "security", "dependencies"}
+
+
+def __getattr__(name):
+    if name in _LAZY_SUBMODULES:
+        return importlib.import_module(f"{__name__}.{name}")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
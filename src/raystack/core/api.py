@@ -0,0 +1,285 @@
+"""
+CRUD APIs generated from models.
+
+    from raystack.core.api import ModelAPIRouter
+
+    app.include_router(ModelAPIRouter(GroupModel), prefix="/api/groups")
+
+adds, for the model's fields (``fields`` and ``exclude`` narrow them down):
+
+    GET    /        the rows, a page at a time (?after=<id>&limit=<n>, see
+                    raystack.core.pagination), filtered by ?<field>=<value>
+                    and ?<field>__<lookup>=<value> (gt, gte, lt, lte, and
+                    in with comma-separated values). With ?format=ndjson or
+                    "Accept: application/x-ndjson", every page is streamed
+                    as one JSON object per line instead.
+    POST   /        create a row
+    POST   /bulk    create a list of rows, in multi-row INSERTs of up to
+                    ``batch_size`` rows, once the validators of the fields
+                    (Model.validate_rows()) pass on every one
+    GET    /{id}    one row, with an ETag; If-None-Match gives a 304
+    PATCH  /{id}    update the fields sent, once they pass the validators;
+                    If-Match gives a 412 when the row has changed since,
+                    including while the request was being handled
+    DELETE /{id}    delete a row
+
+Only the fields served are read, and filter values are sent to the database
+as parameters, never spliced into the SQL.
+"""
+import hashlib
+import json
+from typing import List, Optional
+
+from fastapi import APIRouter, Body, HTTPException, Query, Request, Response
+from pydantic import create_model
+from starlette.responses import StreamingResponse
+
+from raystack.core.database.fields.related import ForeignKeyField
+from raystack.core.database.query import LOOKUPS
+from raystack.core.pagination import clamp_limit, next_link, paginate
+
+NDJSON = "application/x-ndjson"
+
+# Column type prefixes and the Python type of their values; anything else,
+# dates included, is sent as a string.
+PYTHON_TYPES = (
+    ("BOOL", bool),
+    ("INT", int),
+    ("BIGINT", int),
+    ("SMALLINT", int),
+    ("REAL", float),
+    ("FLOAT", float),
+    ("DOUBLE", float),
+    ("DECIMAL", float),
+)
+
+
+def python_type(field):
+    if isinstance(field, ForeignKeyField):
+        return int
+    column_type = str(field.column_type).upper()
+    for prefix, type_ in PYTHON_TYPES:
+        if column_type.startswith(prefix):
+            return type_
+    return str
+
+
+def dumps(value):
+    return json.dumps(value, default=str, separators=(",", ":"))
+
+
+def etag(body):
+    return '"%s"' % hashlib.md5(body, usedforsecurity=False).hexdigest()
+
+
+def etag_matches(header, tag):
+    """Whether an If-None-Match or If-Match ``header`` lists ``tag``."""
+    if header is None:
+        return False
+    tags = [value.strip() for value in header.split(",")]
+    # Weak comparison: W/"x" matches "x".
+    return "*" in tags or tag in (value[2:] if value.startswith("W/") else value for value in tags)
+
+
+class ModelAPIRouter(APIRouter):
+    """
+    The list, retrieve, create, bulk create, update and delete routes of
+    ``model_class``. Extra keyword arguments go to APIRouter (tags,
+    dependencies, ...).
+    """
+
+    def __init__(self, model_class, fields=None, exclude=(), batch_size=None, **kwargs):
+        kwargs.setdefault("tags", [model_class.__name__])
+        super().__init__(**kwargs)
+        self.model_class = model_class
+        names = fields or list(model_class._fields)
+        self.fields = tuple(name for name in names if name not in exclude)
+        for name in self.fields:
+            if name not in model_class._fields:
+                raise KeyError(f"Field '{name}' does not exist in model '{model_class.__name__}'")
+        primary_key = model_class._meta.get("primary_key")
+        self.pk = primary_key.name if primary_key is not None else "id"
+        if self.pk not in self.fields:
+            self.fields = (self.pk,) + self.fields
+        self.batch_size = batch_size
+        self.types = {name: python_type(model_class._fields[name]) for name in self.fields}
+        self.create_schema, self.update_schema = self._schemas()
+        self._add_routes()
+
+    def _schemas(self):
+        create_fields = {}
+        update_fields = {}
+        for name in self.fields:
+            if name == self.pk:
+                continue
+            field = self.model_class._fields[name]
+            type_ = self.types[name]
+            if field.null or field.default is not None:
+                create_fields[name] = (Optional[type_], field.default)
+            else:
+                create_fields[name] = (type_, ...)
+            update_fields[name] = (Optional[type_], None)
+        model_name = self.model_class.__name__
+        return (
+            create_model(f"{model_name}Create", **create_fields),
+            create_model(f"{model_name}Update", **update_fields),
+        )
+
+    def _add_routes(self):
+        create_schema = self.create_schema
+        update_schema = self.update_schema
+
+        async def list_rows(
+            request: Request,
+            after: Optional[int] = None,
+            limit: Optional[int] = Query(None, ge=1),
+        ):
+            return await self.list(request, after, limit)
+
+        async def create_row(data: create_schema):
+            return await self.create(data.dict())
+
+        async def bulk_create_rows(rows: List[create_schema] = Body(...)):
+            return await self.bulk_create([row.dict() for row in rows])
+
+        async def retrieve_row(request: Request, pk: int):
+            return await self.retrieve(request, pk)
+
+        async def update_row(request: Request, pk: int, data: update_schema):
+            return await self.update(request, pk, data.dict(exclude_unset=True))
+
+        async def delete_row(pk: int):
+            return await self.delete(pk)
+
+        self.add_api_route("/", list_rows, methods=["GET"], response_class=Response)
+        self.add_api_route("/", create_row, methods=["POST"], status_code=201, response_class=Response)
+        self.add_api_route("/bulk", bulk_create_rows, methods=["POST"], status_code=201, response_class=Response)
+        self.add_api_route("/{pk}", retrieve_row, methods=["GET"], response_class=Response)
+        self.add_api_route("/{pk}", update_row, methods=["PATCH"], response_class=Response)
+        self.add_api_route("/{pk}", delete_row, methods=["DELETE"], status_code=204, response_class=Response)
+
+    # Queries
+
+    def get_queryset(self):
+        """The rows served; override to restrict them (per tenant, ...)."""
+        return self.model_class.objects.all()
+
+    def filter_queryset(self, queryset, query_params):
+        """``queryset`` filtered by the ``<field>[__<lookup>]`` query parameters."""
+        lookups = {}
+        for key, value in query_params.items():
+            if key in ("after", "limit", "format"):
+                continue
+            name, _, operator = key.partition("__")
+            if name not in self.types or (operator and operator not in LOOKUPS):
+                raise HTTPException(400, f"Unknown filter '{key}'.")
+            try:
+                if operator == "in":
+                    lookups[key] = [self._parse(name, item) for item in value.split(",") if item]
+                else:
+                    lookups[key] = self._parse(name, value)
+            except ValueError:
+                raise HTTPException(400, f"Invalid value for '{key}': {value!r}.")
+        return queryset.filter(**lookups) if lookups else queryset
+
+    def _parse(self, name, value):
+        type_ = self.types[name]
+        if type_ is bool:
+            if value.lower() in ("1", "true", "yes"):
+                return True
+            if value.lower() in ("0", "false", "no"):
+                return False
+            raise ValueError(value)
+        return type_(value)
+
+    def _row(self, pk):
+        return self.get_queryset().filter(**{self.pk: pk}).values(*self.fields).afirst()
+
+    async def _get_row(self, pk):
+        row = await self._row(pk)
+        if row is None:
+            raise HTTPException(404, f"{self.model_class.__name__} {pk} not found.")
+        return row
+
+    # Endpoints
+
+    async def list(self, request, after, limit):
+        queryset = self.filter_queryset(self.get_queryset(), request.query_params)
+        queryset = queryset.values(*self.fields)
+        if request.query_params.get("format") == "ndjson" or NDJSON in request.headers.get("accept", ""):
+            return StreamingResponse(self._stream(queryset, after, limit), media_type=NDJSON)
+        page = await paginate(queryset, after, limit, key=self.pk)
+        response = Response(dumps(page.items), media_type="application/json")
+        if page.next_cursor is not None:
+            response.headers["Link"] = next_link(request.url, page)
+        return response
+
+    async def _stream(self, queryset, after, limit):
+        # Every page from ``after`` on, fetched ``limit`` rows at a time, so
+        # neither the server nor the database holds the whole table.
+        limit = clamp_limit(limit)
+        while True:
+            page = await paginate(queryset, after, limit, key=self.pk)
+            if page.items:
+                yield "".join(dumps(row) + "\n" for row in page.items)
+            if page.next_cursor is None:
+                return
+            after = page.next_cursor
+
+    async def retrieve(self, request, pk):
+        body = dumps(await self._get_row(pk)).encode()
+        tag = etag(body)
+        if etag_matches(request.headers.get("if-none-match"), tag):
+            return Response(status_code=304, headers={"ETag": tag})
+        return Response(body, media_type="application/json", headers={"ETag": tag})
+
+    def validate(self, rows, many=True):
+        """
+        Check ``rows`` with the validators of the model's fields; raise a 422
+        listing each invalid value, located like FastAPI's own errors.
+        """
+        errors = self.model_class.validate_rows(rows)
+        if errors:
+            raise HTTPException(422, [
+                {"loc": ["body", index, name] if many else ["body", name], "msg": message, "type": "value_error"}
+                for index, fields in sorted(errors.items())
+                for name, messages in fields.items()
+                for message in messages
+            ])
+
+    async def create(self, data):
+        self.validate([data], many=False)
+        row = await self.get_queryset().values(*self.fields).acreate(**data)
+        return Response(dumps(row), status_code=201, media_type="application/json")
+
+    async def bulk_create(self, rows):
+        self.validate(rows)
+        created = await self.get_queryset().abulk_create(rows, self.batch_size)
+        return Response(dumps({"created": created}), status_code=201, media_type="application/json")
+
+    async def update(self, request, pk, data):
+        self.validate([data], many=False)
+        queryset = self.get_queryset().filter(**{self.pk: pk})
+        if_match = request.headers.get("if-match")
+        if if_match is not None:
+            current = await self._get_row(pk)
+            if not etag_matches(if_match, etag(dumps(current).encode())):
+                raise HTTPException(412, "The row has changed.")
+            # Update the row only as it was when its ETag was checked: if
+            # another request changed it since, the UPDATE matches nothing.
+            queryset = queryset.filter(**{name: value for name, value in current.items() if name != self.pk})
+        if data:
+            updated = await queryset.aupdate(**data)
+            if not updated:
+                if if_match is not None and await self._row(pk) is not None:
+                    raise HTTPException(412, "The row has changed.")
+                raise HTTPException(404, f"{self.model_class.__name__} {pk} not found.")
+        body = dumps(await self._get_row(pk)).encode()
+        return Response(body, media_type="application/json", headers={"ETag": etag(body)})
+
+    async def delete(self, pk):
+        queryset = self.get_queryset().filter(**{self.pk: pk})
+        if not await queryset.aexists():
+            raise HTTPException(404, f"{self.model_class.__name__} {pk} not found.")
+        await queryset.adelete()
+        return Response(status_code=204)
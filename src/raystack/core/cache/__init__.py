@@ -0,0 +1,61 @@
+"""
+Caching framework.
+
+This package defines a set of cache backends that all conform to a simple API.
+In a nutshell, a cache is a set of values -- which can be any object that
+may be pickled -- identified by string keys. For the complete API, see
+the abstract BaseCache class in raystack.core.cache.backends.base.
+
+Client code should use the `cache` variable defined here to access the default
+cache backend and look up non-default cache backends in the `caches` dict-like
+object.
+
+See .docs/cache.md for documentation on the available backends.
+"""
+
+from raystack.core.cache.backends.base import (
+    BaseCache,
+    CacheKeyWarning,
+    InvalidCacheBackendError,
+)
+from raystack.utils.connection import BaseConnectionHandler, ConnectionProxy
+from raystack.utils.module_loading import import_string
+
+__all__ = [
+    "cache",
+    "caches",
+    "DEFAULT_CACHE_ALIAS",
+    "InvalidCacheBackendError",
+    "CacheKeyWarning",
+    "BaseCache",
+]
+
+DEFAULT_CACHE_ALIAS = "default"
+
+
+class CacheHandler(BaseConnectionHandler):
+    settings_name = "CACHES"
+    exception_class = InvalidCacheBackendError
+
+    def create_connection(self, alias):
+        params = self.settings[alias].copy()
+        backend = params.pop("BACKEND")
+        location = params.pop("LOCATION", "")
+        try:
+            backend_cls = import_string(backend)
+        except ImportError as e:
+            raise InvalidCacheBackendError(
+                "Could not find backend '%s': %s" % (backend, e)
+            ) from e
+        return backend_cls(location, params)
+
+
+caches = CacheHandler()
+
+cache = ConnectionProxy(caches, DEFAULT_CACHE_ALIAS)
+
+
+def close_caches(**kwargs):
+    # Some caches need to do a cleanup at the end of a request cycle. If not
+    # implemented in a particular backend cache.close() is a no-op.
+    caches.close_all()
@@ -0,0 +1,166 @@
+"Thread-safe in-memory cache backend."
+
+import pickle
+import time
+from collections import OrderedDict
+from threading import Lock
+
+from raystack.core.cache.backends.base import (
+    DEFAULT_TIMEOUT,
+    BaseCache,
+    NonBlockingCacheMixin,
+)
+
+# Global in-memory store of cache data. Keyed by name, to provide
+# multiple named local memory caches.
+_caches = {}
+_expire_info = {}
+_sizes = {}
+_locks = {}
+
+
+class LocMemCache(NonBlockingCacheMixin, BaseCache):
+    """
+    Per-process LRU cache.
+
+    Entries are evicted in least-recently-used order once either MAX_ENTRIES
+    or the optional OPTIONS["MAX_BYTES"] memory cap (measured as the size of
+    the pickled values) is exceeded.
+    """
+
+    pickle_protocol = pickle.HIGHEST_PROTOCOL
+
+    def __init__(self, name, params):
+        super().__init__(params)
+        options = params.get("OPTIONS", {})
+        try:
+            self._max_bytes = int(options.get("MAX_BYTES") or 0)
+        except (ValueError, TypeError):
+            self._max_bytes = 0
+        self._cache = _caches.setdefault(name, OrderedDict())
+        self._expire_info = _expire_info.setdefault(name, {})
+        self._sizes = _sizes.setdefault(name, {"total": 0, "entries": {}})
+        self._lock = _locks.setdefault(name, Lock())
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        pickled = pickle.dumps(value, self.pickle_protocol)
+        with self._lock:
+            if self._has_expired(key):
+                self._set(key, pickled, timeout)
+                return True
+            return False
+
+    def get(self, key, default=None, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        with self._lock:
+            if self._has_expired(key):
+                self._delete(key)
+                return default
+            pickled = self._cache[key]
+            self._cache.move_to_end(key, last=False)
+        return pickle.loads(pickled)
+
+    def _set(self, key, value, timeout=DEFAULT_TIMEOUT):
+        size = len(value)
+        if self._max_bytes and size > self._max_bytes:
+            # A single value larger than the whole cache can never fit.
+            self._delete(key)
+            return
+        if key not in self._cache:
+            self._cull(size)
+        else:
+            self._account(key, None)
+        self._cache[key] = value
+        self._cache.move_to_end(key, last=False)
+        self._expire_info[key] = self.get_backend_timeout(timeout)
+        self._account(key, size)
+        if self._max_bytes:
+            self._cull(0)
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        pickled = pickle.dumps(value, self.pickle_protocol)
+        with self._lock:
+            self._set(key, pickled, timeout)
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        with self._lock:
+            if self._has_expired(key):
+                return False
+            self._expire_info[key] = self.get_backend_timeout(timeout)
+            return True
+
+    def incr(self, key, delta=1, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        with self._lock:
+            if self._has_expired(key):
+                self._delete(key)
+                raise ValueError("Key '%s' not found" % key)
+            pickled = self._cache[key]
+            value = pickle.loads(pickled)
+            new_value = value + delta
+            pickled = pickle.dumps(new_value, self.pickle_protocol)
+            self._account(key, None)
+            self._cache[key] = pickled
+            self._cache.move_to_end(key, last=False)
+            self._account(key, len(pickled))
+        return new_value
+
+    def has_key(self, key, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        with self._lock:
+            if self._has_expired(key):
+                self._delete(key)
+                return False
+            return True
+
+    def _has_expired(self, key):
+        exp = self._expire_info.get(key, -1)
+        return exp is not None and exp <= time.time()
+
+    def _account(self, key, size):
+        entries = self._sizes["entries"]
+        self._sizes["total"] -= entries.pop(key, 0)
+        if size is not None:
+            entries[key] = size
+            self._sizes["total"] += size
+
+    def _over_limit(self, incoming):
+        if self._max_entries and len(self._cache) + (1 if incoming else 0) > (
+            self._max_entries
+        ):
+            return True
+        return bool(
+            self._max_bytes and self._sizes["total"] + incoming > self._max_bytes
+        )
+
+    def _cull(self, incoming):
+        # Most recently used entries are kept at the front of the ordered
+        # dict, so eviction pops from the end.
+        while self._cache and self._over_limit(incoming):
+            key, _ = self._cache.popitem()
+            self._expire_info.pop(key, None)
+            self._account(key, None)
+
+    def _delete(self, key):
+        try:
+            del self._cache[key]
+            del self._expire_info[key]
+        except KeyError:
+            return False
+        self._account(key, None)
+        return True
+
+    def delete(self, key, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        with self._lock:
+            return self._delete(key)
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+            self._expire_info.clear()
+            self._sizes["entries"].clear()
+            self._sizes["total"] = 0
@@ -0,0 +1,228 @@
+"Shared-memory cache backend, usable across worker processes on one host."
+
+import hashlib
+import mmap
+import os
+import pickle
+import struct
+import tempfile
+import time
+from contextlib import contextmanager
+from threading import Lock
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+from raystack.core.cache.backends.base import (
+    DEFAULT_TIMEOUT,
+    BaseCache,
+    NonBlockingCacheMixin,
+)
+
+# Slot header: 16-byte key digest, expiry timestamp (0.0 means no expiry),
+# payload length.
+_HEADER = struct.Struct("<16sdI")
+_EMPTY_DIGEST = bytes(16)
+
+# Open segments keyed by file path. Cache objects are created per
+# request context, the mapping itself is shared by the whole process.
+_segments = {}
+_segments_lock = Lock()
+
+
+def _segment_dir():
+    if os.path.isdir("/dev/shm"):
+        return "/dev/shm"
+    return tempfile.gettempdir()
+
+
+def _open_segment(path, size):
+    with _segments_lock:
+        segment = _segments.get(path)
+        if segment is None:
+            fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+            if os.fstat(fd).st_size < size:
+                os.ftruncate(fd, size)
+            segment = (fd, mmap.mmap(fd, size), Lock())
+            _segments[path] = segment
+        return segment
+
+
+class SharedMemoryCache(NonBlockingCacheMixin, BaseCache):
+    """
+    Fixed-size cache kept in a memory-mapped file (``/dev/shm`` on Linux), so
+    every worker process on the host sees the same entries.
+
+    The segment is split into OPTIONS["SLOTS"] slots of OPTIONS["SLOT_SIZE"]
+    bytes. A key hashes to a slot and probes a few neighbours; when they are
+    all taken the first candidate is overwritten. Values that don't fit in a
+    slot are not cached.
+    """
+
+    pickle_protocol = pickle.HIGHEST_PROTOCOL
+    probe_length = 4
+
+    def __init__(self, name, params):
+        super().__init__(params)
+        options = params.get("OPTIONS", {})
+        self._slots = int(options.get("SLOTS", 1024))
+        self._slot_size = int(options.get("SLOT_SIZE", 4096))
+        if self._slot_size <= _HEADER.size:
+            raise ValueError("SLOT_SIZE must be larger than %d" % _HEADER.size)
+        path = options.get("PATH") or os.path.join(
+            _segment_dir(), "raystack-cache-%s" % (name or "default")
+        )
+        self._fd, self._mmap, self._lock = _open_segment(
+            path, self._slots * self._slot_size
+        )
+
+    @contextmanager
+    def _locked(self, exclusive=False):
+        with self._lock:
+            if fcntl is None:
+                yield
+                return
+            fcntl.flock(self._fd, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            try:
+                yield
+            finally:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    def _digest(self, key, version):
+        key = self.make_and_validate_key(key, version=version)
+        return hashlib.blake2b(key.encode(), digest_size=16).digest()
+
+    def _candidates(self, digest):
+        start = int.from_bytes(digest[:8], "little") % self._slots
+        for i in range(self.probe_length):
+            yield ((start + i) % self._slots) * self._slot_size
+
+    def _header(self, offset):
+        return _HEADER.unpack_from(self._mmap, offset)
+
+    def _live(self, expiry, now):
+        return expiry == 0.0 or expiry > now
+
+    def _find(self, digest):
+        """Return the offset of the live slot holding digest, or None."""
+        now = time.time()
+        for offset in self._candidates(digest):
+            slot_digest, expiry, _ = self._header(offset)
+            if slot_digest == digest:
+                return offset if self._live(expiry, now) else None
+        return None
+
+    def _free_slot(self, digest):
+        """Return the slot to write digest into, evicting if necessary."""
+        now = time.time()
+        fallback = None
+        for offset in self._candidates(digest):
+            slot_digest, expiry, _ = self._header(offset)
+            if slot_digest == digest:
+                return offset
+            if fallback is None and (
+                slot_digest == _EMPTY_DIGEST or not self._live(expiry, now)
+            ):
+                fallback = offset
+        if fallback is None:
+            fallback = next(self._candidates(digest))
+        return fallback
+
+    def _read(self, offset):
+        _, _, length = self._header(offset)
+        start = offset + _HEADER.size
+        return pickle.loads(self._mmap[start : start + length])
+
+    def _write(self, digest, pickled, timeout):
+        if len(pickled) > self._slot_size - _HEADER.size:
+            return False
+        expiry = self.get_backend_timeout(timeout)
+        if expiry is None:
+            expiry = 0.0
+        elif expiry <= time.time():
+            self._clear_slot(self._find(digest))
+            return True
+        offset = self._free_slot(digest)
+        start = offset + _HEADER.size
+        self._mmap[start : start + len(pickled)] = pickled
+        _HEADER.pack_into(self._mmap, offset, digest, expiry, len(pickled))
+        return True
+
+    def _clear_slot(self, offset):
+        if offset is None:
+            return False
+        _HEADER.pack_into(self._mmap, offset, _EMPTY_DIGEST, 0.0, 0)
+        return True
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        digest = self._digest(key, version)
+        pickled = pickle.dumps(value, self.pickle_protocol)
+        with self._locked(exclusive=True):
+            if self._find(digest) is not None:
+                return False
+            return self._write(digest, pickled, timeout)
+
+    def get(self, key, default=None, version=None):
+        digest = self._digest(key, version)
+        with self._locked():
+            offset = self._find(digest)
+            if offset is None:
+                return default
+            return self._read(offset)
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        digest = self._digest(key, version)
+        pickled = pickle.dumps(value, self.pickle_protocol)
+        with self._locked(exclusive=True):
+            if not self._write(digest, pickled, timeout):
+                # Too large to cache; make sure a stale value isn't served.
+                self._clear_slot(self._find(digest))
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        digest = self._digest(key, version)
+        with self._locked(exclusive=True):
+            offset = self._find(digest)
+            if offset is None:
+                return False
+            _, _, length = self._header(offset)
+            expiry = self.get_backend_timeout(timeout)
+            _HEADER.pack_into(
+                self._mmap, offset, digest, 0.0 if expiry is None else expiry, length
+            )
+            return True
+
+    def incr(self, key, delta=1, version=None):
+        digest = self._digest(key, version)
+        with self._locked(exclusive=True):
+            offset = self._find(digest)
+            if offset is None:
+                raise ValueError("Key '%s' not found" % key)
+            _, expiry, _ = self._header(offset)
+            new_value = self._read(offset) + delta
+            pickled = pickle.dumps(new_value, self.pickle_protocol)
+            if len(pickled) > self._slot_size - _HEADER.size:
+                # Written in place, it would run into the next slot.
+                raise ValueError(
+                    "Incremented value of key '%s' doesn't fit in a %d-byte slot"
+                    % (key, self._slot_size)
+                )
+            start = offset + _HEADER.size
+            self._mmap[start : start + len(pickled)] = pickled
+            _HEADER.pack_into(self._mmap, offset, digest, expiry, len(pickled))
+        return new_value
+
+    def has_key(self, key, version=None):
+        digest = self._digest(key, version)
+        with self._locked():
+            return self._find(digest) is not None
+
+    def delete(self, key, version=None):
+        digest = self._digest(key, version)
+        with self._locked(exclusive=True):
+            return self._clear_slot(self._find(digest))
+
+    def clear(self):
+        with self._locked(exclusive=True):
+            self._mmap[:] = bytes(len(self._mmap))
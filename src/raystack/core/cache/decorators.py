@@ -0,0 +1,125 @@
+import inspect
+from functools import wraps
+
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import Request
+
+from raystack.conf import settings
+from raystack.responses import Response
+from raystack.utils.cache import (
+    get_cache_control,
+    get_cache_key,
+    patch_cache_control,
+    patch_vary_headers,
+    vary_header_names,
+)
+
+# Name of the parameter injected into the endpoint signature when the view
+# doesn't take the request itself, so FastAPI still hands it over.
+_REQUEST_PARAM = "_cache_page_request"
+
+
+def _find_request_param(signature):
+    for param in signature.parameters.values():
+        if param.annotation is Request or (
+            inspect.isclass(param.annotation) and issubclass(param.annotation, Request)
+        ):
+            return param.name
+    if "request" in signature.parameters:
+        return "request"
+    return None
+
+
+def _is_cacheable(response):
+    if not isinstance(response, Response) or response.status_code != 200:
+        return False
+    if not hasattr(response, "body"):
+        # Streaming and file responses are served as is.
+        return False
+    if "set-cookie" in response.headers:
+        return False
+    return not {"private", "no-store", "no-cache"} & get_cache_control(response)
+
+
+def cache_page(timeout, *, cache=None, key_prefix=None, vary_on=()):
+    """
+    Decorator for FastAPI views that caches the rendered response.
+
+    Only GET/HEAD requests answered with a 200 Response that has a body
+    (e.g. the HTMLResponse returned by shortcuts.render_template) are cached;
+    responses setting cookies or marked private/no-store are not. The key is
+    built from the full URL and vary_on, which accepts request header names,
+    "user" for per-user pages and callables taking the request.
+
+    Must be applied below the router decorator:
+
+        @router.get("/")
+        @cache_page(60 * 15, vary_on=("Accept-Language",))
+        async def index(request: Request):
+            ...
+    """
+    vary_on = tuple(vary_on)
+
+    def decorator(view_func):
+        signature = inspect.signature(view_func)
+        request_param = _find_request_param(signature)
+        is_coroutine = inspect.iscoroutinefunction(view_func)
+
+        @wraps(view_func)
+        async def wrapper(*args, **kwargs):
+            if request_param is None:
+                request = kwargs.pop(_REQUEST_PARAM)
+            else:
+                request = kwargs[request_param]
+
+            from raystack.core.cache import caches
+
+            page_cache = caches[cache or settings.CACHE_MIDDLEWARE_ALIAS]
+            prefix = (
+                settings.CACHE_MIDDLEWARE_KEY_PREFIX
+                if key_prefix is None
+                else key_prefix
+            )
+            cache_key = None
+            if request.method in ("GET", "HEAD"):
+                cache_key = get_cache_key(request, prefix, vary_on)
+                cached = await page_cache.aget(cache_key)
+                if cached is not None:
+                    status_code, raw_headers, body = cached
+                    response = Response(body, status_code=status_code)
+                    response.raw_headers = list(raw_headers)
+                    return response
+
+            if is_coroutine:
+                response = await view_func(*args, **kwargs)
+            else:
+                response = await run_in_threadpool(view_func, *args, **kwargs)
+
+            if cache_key is not None and _is_cacheable(response):
+                patch_vary_headers(response, vary_header_names(vary_on))
+                if timeout:
+                    patch_cache_control(response, max_age=int(timeout))
+                await page_cache.aset(
+                    cache_key,
+                    (response.status_code, tuple(response.raw_headers), response.body),
+                    timeout,
+                )
+            return response
+
+        if request_param is None:
+            # FastAPI builds its dependency graph from the signature, so ask
+            # it for the request under a private name.
+            params = list(signature.parameters.values())
+            position = len(params)
+            if params and params[-1].kind is inspect.Parameter.VAR_KEYWORD:
+                position -= 1
+            params.insert(
+                position,
+                inspect.Parameter(
+                    _REQUEST_PARAM, inspect.Parameter.KEYWORD_ONLY, annotation=Request
+                ),
+            )
+            wrapper.__signature__ = signature.replace(parameters=params)
+        return wrapper
+
+    return decorator
@@ -0,0 +1,336 @@
+"""
+Tests of the cache backends and of the cache_page decorator.
+"""
+import os
+import pickle
+import shutil
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+from raystack.conf import settings
+
+if not settings.configured:
+    settings.configure(SECRET_KEY="raystack-tests", USE_I18N=False)
+
+from fastapi import FastAPI  # noqa: E402
+from starlette.requests import Request  # noqa: E402
+from starlette.testclient import TestClient  # noqa: E402
+
+from raystack.core.cache import caches  # noqa: E402
+from raystack.core.cache.backends import sharedmem  # noqa: E402
+from raystack.core.cache.backends.filebased import FileBasedCache  # noqa: E402
+from raystack.core.cache.backends.locmem import LocMemCache  # noqa: E402
+from raystack.core.cache.backends.sharedmem import SharedMemoryCache  # noqa: E402
+from raystack.core.cache.decorators import cache_page  # noqa: E402
+from raystack.responses import HTMLResponse  # noqa: E402
+
+
+def later(seconds):
+    """Move time.time() forward by seconds."""
+    now = time.time()
+    return mock.patch("time.time", return_value=now + seconds)
+
+
+class BackendTestsMixin:
+    """What every backend must do. Subclasses define make_cache(**options)."""
+
+    def setUp(self):
+        super().setUp()
+        self.cache = self.make_cache()
+
+    def test_get_set_delete(self):
+        self.assertIsNone(self.cache.get("key"))
+        self.assertEqual(self.cache.get("key", "default"), "default")
+        self.cache.set("key", {"a": [1, 2]})
+        self.assertEqual(self.cache.get("key"), {"a": [1, 2]})
+        self.assertTrue(self.cache.has_key("key"))
+        self.cache.set("key", "replaced")
+        self.assertEqual(self.cache.get("key"), "replaced")
+        self.assertTrue(self.cache.delete("key"))
+        self.assertFalse(self.cache.delete("key"))
+        self.assertIsNone(self.cache.get("key"))
+
+    def test_add(self):
+        self.assertTrue(self.cache.add("key", 1))
+        self.assertFalse(self.cache.add("key", 2))
+        self.assertEqual(self.cache.get("key"), 1)
+
+    def test_versions_are_separate(self):
+        self.cache.set("key", 1, version=1)
+        self.cache.set("key", 2, version=2)
+        self.assertEqual((self.cache.get("key", version=1), self.cache.get("key", version=2)), (1, 2))
+
+    def test_expiry(self):
+        self.cache.set("short", 1, 10)
+        self.cache.set("forever", 2, None)
+        self.cache.set("gone", 3, 0)
+        self.assertIsNone(self.cache.get("gone"))
+        self.assertEqual(self.cache.get("short"), 1)
+        with later(11):
+            self.assertIsNone(self.cache.get("short"))
+            self.assertFalse(self.cache.has_key("short"))
+            self.assertEqual(self.cache.get("forever"), 2)
+            self.assertTrue(self.cache.add("short", 4))
+            self.assertEqual(self.cache.get("short"), 4)
+
+    def test_touch(self):
+        self.cache.set("key", 1, 10)
+        self.assertTrue(self.cache.touch("key", 100))
+        self.assertFalse(self.cache.touch("missing", 100))
+        with later(11):
+            self.assertEqual(self.cache.get("key"), 1)
+
+    def test_incr_decr(self):
+        self.cache.set("count", 1)
+        self.assertEqual(self.cache.incr("count"), 2)
+        self.assertEqual(self.cache.incr("count", 10), 12)
+        self.assertEqual(self.cache.decr("count", 2), 10)
+        self.assertEqual(self.cache.get("count"), 10)
+        with self.assertRaises(ValueError):
+            self.cache.incr("missing")
+
+    def test_incr_expiry(self):
+        self.cache.set("count", 1, 10)
+        self.cache.incr("count")
+        with later(11):
+            self.assertIsNone(self.cache.get("count"))
+
+    def test_many(self):
+        self.cache.set_many({"a": 1, "b": 2})
+        self.assertEqual(self.cache.get_many(["a", "b", "c"]), {"a": 1, "b": 2})
+        self.cache.delete_many(["a", "b"])
+        self.assertEqual(self.cache.get_many(["a", "b"]), {})
+
+    def test_clear(self):
+        self.cache.set("a", 1)
+        self.cache.set("b", 2)
+        self.cache.clear()
+        self.assertEqual(self.cache.get_many(["a", "b"]), {})
+
+
+class LocMemCacheTests(BackendTestsMixin, unittest.TestCase):
+    def make_cache(self, **options):
+        cache = LocMemCache("tests-%s" % self.id(), {"OPTIONS": options})
+        cache.clear()
+        self.addCleanup(cache.clear)
+        return cache
+
+    def assertSizesAccounted(self, cache):
+        sizes = {key: len(value) for key, value in cache._cache.items()}
+        self.assertEqual(cache._sizes["entries"], sizes)
+        self.assertEqual(cache._sizes["total"], sum(sizes.values()))
+
+    def test_evicts_least_recently_used(self):
+        cache = self.make_cache(MAX_ENTRIES=3)
+        for key in "abc":
+            cache.set(key, key)
+        cache.get("a")
+        cache.set("d", "d")
+        self.assertEqual(cache.get_many("abcd"), {"a": "a", "c": "c", "d": "d"})
+        # Replacing an entry doesn't evict another one.
+        cache.set("a", "A")
+        self.assertEqual(len(cache.get_many("abcd")), 3)
+
+    def test_max_bytes(self):
+        value = "x" * 100
+        size = len(pickle.dumps(value, LocMemCache.pickle_protocol))
+        cache = self.make_cache(MAX_BYTES=size * 3)
+        for key in "abc":
+            cache.set(key, value)
+        cache.get("a")
+        cache.set("d", value)
+        self.assertEqual(sorted(cache.get_many("abcd")), ["a", "c", "d"])
+        self.assertLessEqual(cache._sizes["total"], size * 3)
+        self.assertSizesAccounted(cache)
+
+    def test_max_bytes_growing_value_evicts_others(self):
+        size = len(pickle.dumps("x" * 100, LocMemCache.pickle_protocol))
+        cache = self.make_cache(MAX_BYTES=size * 3)
+        for key in "abc":
+            cache.set(key, "x" * 100)
+        cache.set("a", "x" * (size * 2))
+        self.assertEqual(sorted(cache.get_many("abc")), ["a"])
+        self.assertSizesAccounted(cache)
+
+    def test_value_larger_than_max_bytes_is_not_cached(self):
+        cache = self.make_cache(MAX_BYTES=50)
+        cache.set("key", "small")
+        cache.set("key", "x" * 100)
+        self.assertIsNone(cache.get("key"))
+        self.assertSizesAccounted(cache)
+
+    def test_incr_accounts_the_new_size(self):
+        cache = self.make_cache(MAX_BYTES=1000)
+        cache.set("count", 1)
+        cache.incr("count", 10 ** 40)
+        self.assertSizesAccounted(cache)
+        cache.delete("count")
+        self.assertEqual(cache._sizes["total"], 0)
+
+    def test_same_name_shares_entries(self):
+        self.cache.set("key", 1)
+        self.assertEqual(LocMemCache("tests-%s" % self.id(), {}).get("key"), 1)
+
+
+class FileBasedCacheTests(BackendTestsMixin, unittest.TestCase):
+    def make_cache(self, **options):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, True)
+        return FileBasedCache(os.path.join(directory, "cache"), {"OPTIONS": options})
+
+    def test_expired_file_removed_on_read(self):
+        self.cache.set("key", 1, 10)
+        with later(11):
+            self.assertIsNone(self.cache.get("key"))
+        self.assertEqual(self.cache._list_cache_files(), [])
+
+    def test_incr_expiry(self):
+        # BaseCache.incr() is a get() and a set(): the default timeout
+        # starts again.
+        self.cache.set("count", 1, 10)
+        self.cache.incr("count")
+        with later(11):
+            self.assertEqual(self.cache.get("count"), 2)
+        with later(self.cache.default_timeout + 1):
+            self.assertIsNone(self.cache.get("count"))
+
+    def test_cull(self):
+        cache = self.make_cache(MAX_ENTRIES=9)
+        for i in range(20):
+            cache.set("key%d" % i, i)
+            self.assertLessEqual(len(cache._list_cache_files()), 9)
+        self.assertEqual(cache.get("key19"), 19)
+
+    def test_directory_recreated(self):
+        shutil.rmtree(self.cache._dir)
+        self.cache.set("key", 1)
+        self.assertEqual(self.cache.get("key"), 1)
+
+
+class SharedMemoryCacheTests(BackendTestsMixin, unittest.TestCase):
+    def make_cache(self, **options):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, True)
+        options["PATH"] = self.path = os.path.join(directory, "segment")
+        cache = SharedMemoryCache("tests", {"OPTIONS": options})
+        self.addCleanup(self.close_segment, self.path)
+        return cache
+
+    def close_segment(self, path):
+        fd, segment, _ = sharedmem._segments.pop(path)
+        segment.close()
+        os.close(fd)
+
+    def test_processes_share_the_segment(self):
+        # A second cache on the same file, as another worker would open it.
+        other = SharedMemoryCache("other", {"OPTIONS": {"PATH": self.path}})
+        self.cache.set("key", 1)
+        self.assertEqual(other.get("key"), 1)
+
+    def test_value_larger_than_a_slot_is_not_cached(self):
+        cache = self.make_cache(SLOTS=4, SLOT_SIZE=64)
+        cache.set("key", "small")
+        cache.set("key", "x" * 100)
+        self.assertIsNone(cache.get("key"))
+        self.assertFalse(cache.add("other", "x" * 100))
+
+    def test_full_probe_range_evicts(self):
+        cache = self.make_cache(SLOTS=2, SLOT_SIZE=128)
+        for i in range(10):
+            cache.set("key%d" % i, i)
+        self.assertEqual(cache.get("key9"), 9)
+        self.assertLessEqual(len(cache.get_many(["key%d" % i for i in range(10)])), 2)
+
+    def test_incr_past_the_slot_size(self):
+        slot_size = sharedmem._HEADER.size + len(pickle.dumps(1, SharedMemoryCache.pickle_protocol))
+        cache = self.make_cache(SLOTS=2, SLOT_SIZE=slot_size)
+        # Two entries, two slots: whichever follows "count" is taken.
+        cache.set("count", 1)
+        cache.set("neighbour", 2)
+        with self.assertRaises(ValueError):
+            cache.incr("count", 10 ** 40)
+        # Neither the entry nor the slot after it were overwritten.
+        self.assertEqual(cache.get_many(["count", "neighbour"]), {"count": 1, "neighbour": 2})
+        self.assertEqual(cache.incr("count"), 2)
+
+    def test_slot_size_smaller_than_the_header(self):
+        with self.assertRaises(ValueError):
+            self.make_cache(SLOT_SIZE=sharedmem._HEADER.size)
+
+
+class CachePageTests(unittest.TestCase):
+    def setUp(self):
+        self.cache = caches[settings.CACHE_MIDDLEWARE_ALIAS]
+        self.cache.clear()
+        self.addCleanup(self.cache.clear)
+        self.calls = 0
+        app = FastAPI()
+
+        @app.get("/page")
+        @cache_page(60, vary_on=("Accept-Language",))
+        async def page(request: Request):
+            self.calls += 1
+            return HTMLResponse("page %d" % self.calls)
+
+        @app.get("/sync")
+        @cache_page(60)
+        def sync_page(name: str = "x"):
+            self.calls += 1
+            return HTMLResponse("%s %d" % (name, self.calls))
+
+        @app.get("/private")
+        @cache_page(60)
+        async def private():
+            self.calls += 1
+            return HTMLResponse("private %d" % self.calls, headers={"Cache-Control": "private"})
+
+        @app.get("/cookie")
+        @cache_page(60)
+        async def cookie():
+            self.calls += 1
+            response = HTMLResponse("cookie %d" % self.calls)
+            response.set_cookie("a", "b")
+            return response
+
+        @app.get("/missing")
+        @cache_page(60)
+        async def missing():
+            self.calls += 1
+            return HTMLResponse("missing %d" % self.calls, status_code=404)
+
+        self.client = TestClient(app)
+
+    def get(self, url, **headers):
+        return self.client.get(url, headers=headers).text
+
+    def test_cached(self):
+        self.assertEqual(self.get("/page"), "page 1")
+        response = self.client.get("/page")
+        self.assertEqual(response.text, "page 1")
+        self.assertIn("max-age=60", response.headers["cache-control"])
+        self.assertIn("Accept-Language", response.headers["vary"])
+
+    def test_varies_on_headers_and_query(self):
+        self.assertEqual(self.get("/page", **{"Accept-Language": "en"}), "page 1")
+        self.assertEqual(self.get("/page", **{"Accept-Language": "de"}), "page 2")
+        self.assertEqual(self.get("/page", **{"Accept-Language": "en"}), "page 1")
+        self.assertEqual(self.get("/sync?name=a"), "a 3")
+        self.assertEqual(self.get("/sync?name=b"), "b 4")
+        self.assertEqual(self.get("/sync?name=a"), "a 3")
+
+    def test_expiry(self):
+        self.assertEqual(self.get("/page"), "page 1")
+        with later(61):
+            self.assertEqual(self.get("/page"), "page 2")
+
+    def test_not_cached(self):
+        for url in ("/private", "/cookie", "/missing"):
+            with self.subTest(url=url):
+                first = self.get(url)
+                self.assertNotEqual(self.get(url), first)
+
+
+if __name__ == "__main__":
+    unittest.main()
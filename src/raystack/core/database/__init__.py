@@ -1 +1,31 @@
-from .base import create_db_and_tables, get_async_db, get_sync_db, get_async_engine
+import importlib
+
+from raystack.utils.functional import SimpleLazyObject
+
+# SQLModel helpers re-exported from .base. Importing them eagerly would load
+# SQLModel for every user of the ORM (models, fields, queries), so they're
+# resolved on first access.
+_BASE_EXPORTS = {
+    "create_db_and_tables",
+    "get_async_db",
+    "get_sync_db",
+    "get_async_engine",
+}
+
+
+def __getattr__(name):
+    if name in _BASE_EXPORTS:
+        return getattr(importlib.import_module(f"{__name__}.base"), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def _default_backend():
+    from raystack.core.database.sqlalchemy import db
+
+    return db
+
+
+# The default backend. SQLAlchemy is only imported when a query first runs.
+db = SimpleLazyObject(_default_backend)
+
+from raystack.core.database.utils import DEFAULT_DB_ALIAS, connections, router  # NOQA isort:skip
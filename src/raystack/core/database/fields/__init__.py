@@ -1,5 +1,12 @@
+from raystack.core import validators as core_validators
+from raystack.utils.functional import cached_property
+
+
 class Field:
-    def __init__(self, column_type, primary_key=False, default=None, unique=False, null=False, blank=False, verbose_name=None, help_text=None, choices=None, db_index=False, editable=True, auto_now=False, auto_now_add=False):
+    # Validators of every field of the class, before the ``validators`` given.
+    default_validators = []
+
+    def __init__(self, column_type, primary_key=False, default=None, unique=False, null=False, blank=False, verbose_name=None, help_text=None, choices=None, db_index=False, editable=True, auto_now=False, auto_now_add=False, validators=()):
         self.column_type = column_type
         self.primary_key = primary_key
         self.default = default
@@ -13,6 +20,15 @@ class Field:
         self.editable = editable
         self.auto_now = auto_now
         self.auto_now_add = auto_now_add
+        self._validators = list(validators)
+
+    @cached_property
+    def validators(self):
+        """
+        The validators of the field's values, which Model.validate_rows()
+        runs; the database enforces nothing more than its column type.
+        """
+        return [*self.default_validators, *self._validators]
     
     def contribute_to_class(self, model_class, name):
         """
@@ -88,6 +104,10 @@ class CharField(Field):
         super().__init__(f"VARCHAR({max_length})", **kwargs)
         self.max_length = max_length
 
+    @cached_property
+    def validators(self):
+        return [*super().validators, core_validators.MaxLengthValidator(self.max_length)]
+
 class TextField(Field):
     def __init__(self, **kwargs):
         super().__init__("TEXT", **kwargs)
@@ -153,20 +173,38 @@ class TimeField(Field):
         super().__init__("TIME", **kwargs)
 
 class EmailField(Field):
+    default_validators = [core_validators.validate_email]
+
     def __init__(self, max_length=254, **kwargs):
         super().__init__(f"VARCHAR({max_length})", **kwargs)
         self.max_length = max_length
 
+    @cached_property
+    def validators(self):
+        return [*super().validators, core_validators.MaxLengthValidator(self.max_length)]
+
 class URLField(Field):
+    default_validators = [core_validators.URLValidator()]
+
     def __init__(self, max_length=200, **kwargs):
         super().__init__(f"VARCHAR({max_length})", **kwargs)
         self.max_length = max_length
 
+    @cached_property
+    def validators(self):
+        return [*super().validators, core_validators.MaxLengthValidator(self.max_length)]
+
 class SlugField(Field):
+    default_validators = [core_validators.validate_slug]
+
     def __init__(self, max_length=50, **kwargs):
         super().__init__(f"VARCHAR({max_length})", **kwargs)
         self.max_length = max_length
 
+    @cached_property
+    def validators(self):
+        return [*super().validators, core_validators.MaxLengthValidator(self.max_length)]
+
 class FileField(Field):
     def __init__(self, upload_to=None, max_length=100, **kwargs):
         super().__init__(f"VARCHAR({max_length})", **kwargs)
@@ -195,6 +233,10 @@ class GenericIPAddressField(Field):
         self.protocol = protocol
         self.unpack_ipv4 = unpack_ipv4
 
+    @cached_property
+    def validators(self):
+        return [*super().validators, *core_validators.ip_address_validators(self.protocol, self.unpack_ipv4)]
+
 class UUIDField(Field):
     def __init__(self, **kwargs):
         super().__init__("VARCHAR(32)", **kwargs)
@@ -0,0 +1,199 @@
+"""
+Query instrumentation.
+
+While a QueryLog is active (see capture_queries() and
+QueryInstrumentationMiddleware) every statement the backend runs is recorded
+with its duration and row count. Nothing is recorded, timed or formatted when
+no log is active and no listener is registered: the backend only looks up a
+context variable.
+
+Statements are also grouped by shape -- the SQL with its literals replaced by
+placeholders -- so the same query issued again and again for different rows
+(the N+1 pattern) is detected, along with the code that issued it.
+"""
+import logging
+import os
+import re
+import sysconfig
+import traceback
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+logger = logging.getLogger("raystack.db")
+
+# Repeats of a single query shape within one log before it is reported.
+DEFAULT_N_PLUS_ONE_THRESHOLD = 5
+
+# Only this many statements are kept in detail; totals keep counting.
+MAX_RECORDED_QUERIES = 1000
+
+_query_log = ContextVar("raystack_query_log", default=None)
+
+# Callables receiving (sql, params, duration, rows) for every statement, in
+# every context. The metrics register one when enabled.
+query_listeners = []
+
+_STRING_LITERAL_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL_RE = re.compile(r"(?<![\w.\"])-?\d+(?:\.\d+)?\b")
+_BIND_PARAM_RE = re.compile(r"(?<![:\w]):\w+")
+_IN_LIST_RE = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+
+# Frames from these places are skipped when reporting where a query came
+# from: the interesting frame is the caller of the ORM.
+_DATABASE_DIR = os.path.dirname(os.path.abspath(__file__)) + os.sep
+_STDLIB_DIR = sysconfig.get_paths()["stdlib"] + os.sep
+_INTERNAL_PACKAGES = (
+    "sqlalchemy",
+    "starlette",
+    "fastapi",
+    "uvicorn",
+    "anyio",
+    "asgiref",
+)
+
+
+def query_shape(sql):
+    """
+    Return ``sql`` with string and numeric literals, and :name parameters,
+    replaced by ``?`` so that statements differing only in their values
+    compare equal.
+    """
+    shape = _STRING_LITERAL_RE.sub("?", sql)
+    shape = _BIND_PARAM_RE.sub("?", shape)
+    shape = _NUMBER_LITERAL_RE.sub("?", shape)
+    return _IN_LIST_RE.sub("(?)", shape)
+
+
+def _is_internal(filename):
+    if filename.startswith((_DATABASE_DIR, "<")):
+        return True
+    parts = filename.replace("\\", "/").split("/")
+    if "site-packages" in parts:
+        return any(package in parts for package in _INTERNAL_PACKAGES)
+    return filename.startswith(_STDLIB_DIR)
+
+
+def calling_stack(limit=5):
+    """Return the innermost ``limit`` frames outside the ORM and the server."""
+    frames = [
+        frame
+        for frame in traceback.extract_stack()[:-1]
+        if not _is_internal(frame.filename)
+    ]
+    return [
+        "%s:%s in %s" % (frame.filename, frame.lineno, frame.name)
+        for frame in frames[-limit:]
+    ]
+
+
+class QueryLog:
+    """The statements run while the log was active."""
+
+    def __init__(self, n_plus_one_threshold=DEFAULT_N_PLUS_ONE_THRESHOLD):
+        self.n_plus_one_threshold = n_plus_one_threshold
+        self.queries = []
+        self.count = 0
+        self.total_time = 0.0
+        self.shapes = {}
+        self.duplicates = {}
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        return iter(self.queries)
+
+    def record(self, sql, params, duration, rows=None):
+        self.count += 1
+        self.total_time += duration
+        if len(self.queries) < MAX_RECORDED_QUERIES:
+            self.queries.append(
+                {"sql": sql, "params": params, "duration": duration, "rows": rows}
+            )
+        shape = query_shape(sql)
+        seen = self.shapes.get(shape, 0) + 1
+        self.shapes[shape] = seen
+        threshold = self.n_plus_one_threshold
+        if not threshold or seen < threshold:
+            return
+        if seen == threshold:
+            # The stack is only captured once a shape crosses the threshold.
+            self.duplicates[shape] = {
+                "sql": sql,
+                "count": seen,
+                "stack": calling_stack(),
+            }
+        else:
+            self.duplicates[shape]["count"] = seen
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "total_time": self.total_time,
+            "duplicates": [
+                dict(entry, shape=shape) for shape, entry in self.duplicates.items()
+            ],
+        }
+
+    def server_timing(self):
+        """Value for a Server-Timing header entry describing this log."""
+        return 'db;dur=%.2f;desc="%d %s"' % (
+            self.total_time * 1000,
+            self.count,
+            "query" if self.count == 1 else "queries",
+        )
+
+    def log_duplicates(self, label=""):
+        for shape, entry in self.duplicates.items():
+            logger.warning(
+                "Possible N+1: query repeated %d times%s\n%s\n  %s",
+                entry["count"],
+                " in %s" % label if label else "",
+                shape,
+                "\n  ".join(entry["stack"]),
+            )
+
+
+def get_query_log():
+    """Return the active QueryLog, or None when queries aren't recorded."""
+    return _query_log.get()
+
+
+def record_query(log, sql, params, duration, rows=None):
+    """Pass a finished statement to the active log and the listeners."""
+    if log is not None:
+        log.record(sql, params, duration, rows)
+    for listener in query_listeners:
+        listener(sql, params, duration, rows)
+
+
+def start_query_log(n_plus_one_threshold=None):
+    """Activate a new QueryLog in the current context. Return (log, token)."""
+    if n_plus_one_threshold is None:
+        from raystack.conf import settings
+
+        n_plus_one_threshold = getattr(
+            settings, "QUERY_N_PLUS_ONE_THRESHOLD", DEFAULT_N_PLUS_ONE_THRESHOLD
+        )
+    log = QueryLog(n_plus_one_threshold)
+    return log, _query_log.set(log)
+
+
+def stop_query_log(token):
+    _query_log.reset(token)
+
+
+@contextmanager
+def capture_queries(n_plus_one_threshold=None):
+    """
+    Record the queries run inside the block:
+
+        with capture_queries() as queries:
+            User.objects.filter(name="bob").first()
+        assert queries.count == 1
+    """
+    log, token = start_query_log(n_plus_one_threshold)
+    try:
+        yield log
+    finally:
+        stop_query_log(token)
@@ -11,6 +11,9 @@ class Manager:
     def all(self):
         return QuerySet(self.model_class).all()
 
+    def using(self, alias):
+        return QuerySet(self.model_class, using=alias)
+
     def create(self, **kwargs):
         return universal_executor(
             QuerySet(self.model_class)._create_sync,
@@ -33,7 +36,24 @@ class Manager:
         qs = QuerySet(self.model_class).filter(**kwargs)
         return universal_executor(qs._delete_sync, qs._delete_async)
 
-            # Support for lazy loading and iteration
+    # Explicit async versions, see QuerySet.afirst().
+
+    async def aget(self, **kwargs):
+        return await QuerySet(self.model_class).filter(**kwargs).afirst()
+
+    async def acreate(self, **kwargs):
+        return await QuerySet(self.model_class).acreate(**kwargs)
+
+    async def acount(self):
+        return await QuerySet(self.model_class).acount()
+
+    async def aexists(self):
+        return await QuerySet(self.model_class).aexists()
+
+    async def adelete(self, **kwargs):
+        return await QuerySet(self.model_class).filter(**kwargs).adelete()
+
+    # Support for lazy loading and iteration
     def iter(self):
         """Returns an iterable object with query results (lazy loading)."""
         return QuerySet(self.model_class).iter()
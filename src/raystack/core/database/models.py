@@ -8,8 +8,11 @@ from raystack.core.database.fields import (
     IndexField, NullBooleanField
 )
 from raystack.core.database.manager import Manager
-from raystack.core.database.sqlalchemy import db
+from raystack.core.database import db, signals, transaction
+from raystack.core.database.utils import connections, router
 from raystack.core.database.fields.related import ForeignKeyField
+from raystack.core.validators import validate_batch
+from raystack.utils.translation import gettext_lazy as _
 
 import asyncio
 
@@ -141,6 +144,34 @@ class Model(metaclass=ModelMeta):
         
         return table
 
+    @classmethod
+    def validate_rows(cls, rows):
+        """
+        Validate ``rows`` (dicts of field values, as bulk_create() takes
+        them) a column at a time with the validators of the fields; return
+        {row index: {field name: [messages]}} of the invalid rows. Missing
+        and empty values aren't validated, but an explicit None is an error
+        for a field without null=True.
+        """
+        errors = {}
+        for name, field in cls._fields.items():
+            if not field.null and not field.primary_key:
+                for index, row in enumerate(rows):
+                    if name in row and row[name] is None:
+                        errors.setdefault(index, {}).setdefault(name, []).append(
+                            str(_("This field cannot be null."))
+                        )
+            if not field.validators:
+                continue
+            column = [row.get(name) for row in rows]
+            for validator in field.validators:
+                result = validate_batch(validator, column, skip_empty=True)
+                if result.is_valid:
+                    continue
+                for index, error in result.errors().items():
+                    errors.setdefault(index, {}).setdefault(name, []).extend(error.messages)
+        return errors
+
     @classmethod
     def create_table(cls):
         """
@@ -168,106 +199,86 @@ class Model(metaclass=ModelMeta):
         # # Create table through SQLAlchemy backend
         # db.create_table(cls.get_table_name(), columns)
 
-    def save(self):
+    def save(self, using=None):
+        """
+        Insert or update the record, on ``using`` or the database the router
+        picks for writing it.
+        """
         from raystack.core.database.query import universal_executor
-        return universal_executor(self._save_sync, self._save_async, self)
+        return universal_executor(self._save_sync, self._save_async, using=using)
+
+    async def asave(self, using=None):
+        """save() for async code, whatever the URL; never blocks the loop."""
+        from raystack.core.database.query import async_executor
+        await async_executor(self._save_sync, self._save_async, using=using)
 
-    def _save_sync(self):
-        print(f"[DEBUG] _save_sync called for {self.__class__.__name__}")
-        data = {}
+    def _db_for_write(self, using=None):
+        return using or router.db_for_write(type(self), instance=self)
+
+    def _save_query(self):
+        """
+        The (query, params) of the UPDATE or INSERT saving this instance,
+        its values bound as :name parameters.
+        """
+        params = {}
         for field, field_obj in self._fields.items():
             if isinstance(field_obj, AutoField):
                 continue  # Don't add id to data at all
-            value = getattr(self, field, None)
             if isinstance(field_obj, ForeignKeyField):
+                # The stored id (or instance), without loading the object.
+                value = self.__dict__.get(field)
                 if hasattr(value, 'id'):
                     value = value.id
-            data[field] = value
-        print(f"[DEBUG] Data to save: {data}")
-
-        def convert_value(value):
-            if isinstance(value, (int, float, str, bytes, type(None))):
-                return value
-            elif hasattr(value, '__str__'):
-                return str(value)
             else:
-                raise ValueError(f"Unsupported type for database: {type(value)}")
-
-        data = {key: convert_value(value) for key, value in data.items()}
-        print(f"[DEBUG] Converted data: {data}")
-
-        id_value = self.__dict__.get('id', None)
-        if id_value not in (None, 0, ''):
-            set_clauses = []
-            for key, value in data.items():
-                if isinstance(value, str):
-                    set_clauses.append(f'"{key}"=\'{value}\'')
-                else:
-                    set_clauses.append(f'"{key}"={value}')
-            update_query = f"UPDATE {self.get_table_name()} SET {', '.join(set_clauses)} WHERE id={id_value}"
-            print(f"[DEBUG] Executing update: {update_query}")
-            db.execute(update_query)
+                value = getattr(self, field, None)
+            if not isinstance(value, (int, float, str, bytes, type(None))):
+                value = str(value)
+            params[field] = value
+
+        table = self.get_table_name()
+        if self._is_saved():
+            set_clauses = ", ".join(f'"{key}"=:{key}' for key in params)
+            params["id"] = self.__dict__['id']
+            return f'UPDATE "{table}" SET {set_clauses} WHERE "id"=:id', params
+        fields = ", ".join(f'"{key}"' for key in params)
+        values = ", ".join(f":{key}" for key in params)
+        return f'INSERT INTO "{table}" ({fields}) VALUES ({values})', params
+
+    def _is_saved(self):
+        # An unsaved instance only has the class-level AutoField.
+        return self.__dict__.get('id', None) not in (None, 0, '')
+
+    def _save_sync(self, using=None):
+        alias = self._db_for_write(using)
+        backend = connections[alias]
+        signals.pre_save.send(type(self), instance=self, using=alias)
+        created = not self._is_saved()
+        query, params = self._save_query()
+        if not created:
+            backend.execute(query, params)
         else:
-            fields = []
-            values = []
-            for key, value in data.items():
-                fields.append(f'"{key}"')
-                if isinstance(value, str):
-                    values.append(f"'{value}'")
-                else:
-                    values.append(str(value))
-            insert_query = f"INSERT INTO {self.get_table_name()} ({', '.join(fields)}) VALUES ({', '.join(values)})"
-            print(f"[DEBUG] Executing insert: {insert_query}")
-            db.execute(insert_query)
-            self.id = db.lastrowid()
-            print(f"[DEBUG] New id set: {self.id}")
+            # One connection for both, so the id is this insert's.
+            with transaction.atomic(using=alias):
+                backend.execute(query, params)
+                self.id = backend.lastrowid()
+        self._db = alias
+        signals.post_save.send(type(self), instance=self, created=created, using=alias)
     
-    async def _save_async(self):
-        # async save implementation
-        # Get field values from object
-        data = {field: getattr(self, field, None) for field in self._fields}
-
-        # Convert values to supported types
-        def convert_value(value):
-            if isinstance(value, (int, float, str, bytes, type(None))):
-                return value
-            elif hasattr(value, '__str__'):
-                return str(value)  # Convert object to string if possible
-            else:
-                raise ValueError(f"Unsupported type for database: {type(value)}")
-
-        data = {key: convert_value(value) for key, value in data.items()}
-
-        # Check if object exists in database
-        if hasattr(self, 'id') and self.id is not None:
-            # Update existing record (UPDATE)
-            set_clauses = []
-            for key, value in data.items():
-                if key != 'id':
-                    if isinstance(value, str):
-                        set_clauses.append(f'"{key}"=\'{value}\'')
-                    else:
-                        set_clauses.append(f'"{key}"={value}')
-            
-            update_query = f"UPDATE {self.get_table_name()} SET {', '.join(set_clauses)} WHERE id={self.id}"
-            await db.execute_async(update_query)
+    async def _save_async(self, using=None):
+        alias = self._db_for_write(using)
+        backend = connections[alias]
+        await signals.pre_save.asend(type(self), instance=self, using=alias)
+        created = not self._is_saved()
+        query, params = self._save_query()
+        if not created:
+            await backend.execute_async(query, params)
         else:
-            # Create new record (INSERT)
-            fields = []
-            values = []
-            for key, value in data.items():
-                if key != 'id':
-                    fields.append(f'"{key}"')
-                    if isinstance(value, str):
-                        values.append(f"'{value}'")
-                    else:
-                        values.append(str(value))
-
-            insert_query = f"INSERT INTO {self.get_table_name()} ({', '.join(fields)}) VALUES ({', '.join(values)})"
-            await db.execute_async(insert_query)
-
-            # Get id of created record
-            self.id = await db.lastrowid_async()
+            # One connection for both, so the id is this insert's.
+            async with transaction.atomic(using=alias):
+                await backend.execute_async(query, params)
+                self.id = await backend.lastrowid_async()
+        self._db = alias
+        await signals.post_save.asend(type(self), instance=self, created=created, using=alias)
     
     @classmethod
     def create(cls, **kwargs):
@@ -286,34 +297,42 @@ class Model(metaclass=ModelMeta):
         await instance._save_async()
         return instance
     
-    @classmethod
     # The 'get', 'filter', 'all' methods on Model itself are not directly used in urls.py,
     # and they are already async. The QuerySet object handles the sync/async logic.
     # The 'create' method is already handled.
 
-    def delete(self):
+    def delete(self, using=None):
         """
         Deletes record from database.
         """
         from raystack.core.database.query import universal_executor
-        return universal_executor(self._delete_sync, self._delete_async, self)
+        return universal_executor(self._delete_sync, self._delete_async, using=using)
+
+    async def adelete(self, using=None):
+        """delete() for async code, whatever the URL; never blocks the loop."""
+        from raystack.core.database.query import async_executor
+        await async_executor(self._delete_sync, self._delete_async, using=using)
 
-    def _delete_sync(self):
+    def _delete_sync(self, using=None):
         """
         Synchronously deletes record from database.
         """
         if hasattr(self, 'id') and self.id is not None:
             table_name = self.get_table_name()
-            query = f"DELETE FROM {table_name} WHERE id = {self.id}"
-            db.execute(query)
+            query = f'DELETE FROM "{table_name}" WHERE "id" = :id'
+            alias = self._db_for_write(using)
+            connections[alias].execute(query, {"id": self.id})
+            signals.post_delete.send(type(self), instance=self, using=alias)
 
-    async def _delete_async(self):
+    async def _delete_async(self, using=None):
         """
         Asynchronously deletes record from database.
         """
         if hasattr(self, 'id') and self.id is not None:
             table_name = self.get_table_name()
-            query = f"DELETE FROM {table_name} WHERE id = {self.id}"
-            await db.execute_async(query)
+            query = f'DELETE FROM "{table_name}" WHERE "id" = :id'
+            alias = self._db_for_write(using)
+            await connections[alias].execute_async(query, {"id": self.id})
+            await signals.post_delete.asend(type(self), instance=self, using=alias)
     
 
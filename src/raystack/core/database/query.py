@@ -1,50 +1,171 @@
 import asyncio
-from raystack.core.database.sqlalchemy import db
+import contextvars
+import functools
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from raystack.core import tracing
+from raystack.core.database import db, signals, transaction
 from raystack.core.database.fields.related import ForeignKeyField
+from raystack.core.database.utils import connections, is_connection_error, router
 import inspect
 
+logger = logging.getLogger("raystack.db")
+
 class SyncResult:
-    """Helper class to make synchronous results 'awaitable'."""
-    def __init__(self, result):
-        self._result = result
+    """
+    The result of an ORM call that ran, or is running, on the sync engine.
+    It can be used directly or awaited, so code written for either mode
+    works with both.
+
+    Calls made from a running event loop are handed to the database thread
+    pool (see run_sync()); awaiting the result then doesn't block the loop,
+    while using it directly waits for the call to finish.
+    """
+    def __init__(self, result=None, future=None):
+        self._value = result
+        self._future = future
+
+    @property
+    def _result(self):
+        if self._future is not None:
+            return self._future.result()
+        return self._value
 
     def __await__(self):
+        if self._future is not None:
+            return (yield from asyncio.wrap_future(self._future).__await__())
         yield from ()
-        return self._result
+        return self._value
 
     def __iter__(self):
         """Make SyncResult iterable if the wrapped result is iterable."""
-        if hasattr(self._result, '__iter__'):
-            return iter(self._result)
-        raise TypeError(f"'{self._result.__class__.__name__}' object is not iterable")
+        result = self._result
+        if hasattr(result, '__iter__'):
+            return iter(result)
+        raise TypeError(f"'{result.__class__.__name__}' object is not iterable")
 
     def __len__(self):
         """Make SyncResult support len() if the wrapped result has length."""
-        if hasattr(self._result, '__len__'):
-            return len(self._result)
-        raise TypeError(f"'{self._result.__class__.__name__}' object has no len()")
+        result = self._result
+        if hasattr(result, '__len__'):
+            return len(result)
+        raise TypeError(f"'{result.__class__.__name__}' object has no len()")
 
     def __getitem__(self, key):
         """Make SyncResult support indexing if the wrapped result is indexable."""
-        if hasattr(self._result, '__getitem__'):
-            return self._result[key]
-        raise TypeError(f"'{self._result.__class__.__name__}' object is not subscriptable")
+        result = self._result
+        if hasattr(result, '__getitem__'):
+            return result[key]
+        raise TypeError(f"'{result.__class__.__name__}' object is not subscriptable")
 
     def __bool__(self):
         """Make SyncResult support boolean evaluation."""
         return bool(self._result)
+
+    # Compare as the wrapped result, so ``qs.count() == 0`` is what it says.
+
+    def __eq__(self, other):
+        return self._result == other
+
+    def __lt__(self, other):
+        return self._result < other
+
+    def __le__(self, other):
+        return self._result <= other
+
+    def __gt__(self, other):
+        return self._result > other
+
+    def __ge__(self, other):
+        return self._result >= other
+
+    def __hash__(self):
+        return hash(self._result)
+
+    def __int__(self):
+        return int(self._result)
     
     def __getattr__(self, name):
         """Delegate attribute access to the wrapped result."""
         return getattr(self._result, name)
 
+    def __setattr__(self, name, value):
+        """
+        Set attributes on the wrapped result too, so that
+        ``obj = qs.first(); obj.name = "x"; obj.save()`` saves "x".
+        """
+        if name in ("_value", "_future"):
+            object.__setattr__(self, name, value)
+        else:
+            setattr(self._result, name, value)
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """
+    The threads sync ORM calls made from an event loop run in.
+    DATABASE_THREAD_POOL_SIZE of them; one by default, which keeps the calls
+    in order and off SQLite's single shared connection at the same time.
+    """
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                from raystack.conf import settings
+
+                _executor = ThreadPoolExecutor(
+                    max_workers=getattr(settings, "DATABASE_THREAD_POOL_SIZE", 1),
+                    thread_name_prefix="raystack-db",
+                )
+    return _executor
+
+
+def run_sync(func, *args, **kwargs):
+    """
+    Start ``func`` in the database thread pool, in a copy of the current
+    context (so it sees the atomic() block and span it was called in), and
+    return a SyncResult for it. Inside an async atomic() block with a thread
+    of its own, ``func`` runs in that thread instead.
+    """
+    context = contextvars.copy_context()
+    executor = transaction.get_block_executor() or get_executor()
+    future = executor.submit(context.run, functools.partial(func, *args, **kwargs))
+    return SyncResult(future=future)
+
+
 def universal_executor(sync_func, async_func, *args, **kwargs):
-    if should_use_async():
-        # If async is enabled, return the coroutine directly for awaiting
-        return async_func(*args, **kwargs)
-    else:
-        # If sync, execute the sync function and wrap result for pseudo-awaiting
+    """
+    Run an ORM call the way the context calls for:
+
+    - outside an event loop, ``sync_func`` runs right away, whatever the URL;
+    - in an event loop, with an async URL, the ``async_func`` coroutine is
+      returned for awaiting;
+    - in an event loop, with a sync URL, ``sync_func`` runs in the database
+      thread pool.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
         return SyncResult(sync_func(*args, **kwargs))
+    if db.is_async:
+        return async_func(*args, **kwargs)
+    return run_sync(sync_func, *args, **kwargs)
+
+
+async def async_executor(sync_func, async_func, *args, **kwargs):
+    """
+    The explicit async flavour of universal_executor(), behind the a*()
+    methods: await ``async_func`` with an async URL, ``sync_func`` in the
+    database thread pool otherwise.
+    """
+    if db.is_async:
+        return await async_func(*args, **kwargs)
+    return await run_sync(sync_func, *args, **kwargs)
+
 
 def is_async_context():
     """Accurately determines if we are in an async context"""
@@ -56,44 +177,265 @@ def is_async_context():
 
 def should_use_async():
     """
-    Determines whether to use asynchronous mode.
-    Now determined by URL in settings, not by execution context.
+    Whether ORM calls made here go to the async engine: in an event loop,
+    with an async URL.
+    """
+    return db.is_async and is_async_context()
+
+# filter() lookups: field__<lookup>=value.
+LOOKUPS = {
+    '': '=',
+    'exact': '=',
+    'gt': '>',
+    'gte': '>=',
+    'lt': '<',
+    'lte': '<=',
+    'in': None,
+    'contains': None,
+    'startswith': None,
+}
+# LIKE patterns of the lookups matching part of a string. On most databases
+# only startswith can use an index.
+LIKE_PATTERNS = {
+    'contains': '%%%s%%',
+    'startswith': '%s%%',
+}
+
+
+def like_escape(value):
+    return value.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+def traced(operation):
+    """
+    Run the decorated QuerySet method (sync or async) in a client span named
+    "<Model>.<operation>" while tracing is on.
     """
-    return db.is_async_url()
+    def span(queryset):
+        from raystack.core.database.instrumentation import query_shape
+
+        return tracing.span(
+            "%s.%s" % (queryset.model_class.__name__, operation),
+            kind=tracing.SpanKind.CLIENT,
+            attributes={
+                "db.system": db.database_url.split(":", 1)[0].split("+", 1)[0],
+                "db.operation": operation,
+                "db.sql.table": queryset.model_class.get_table_name(),
+                "db.statement": query_shape(queryset.query),
+            },
+        )
+
+    def decorator(func):
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def wrapper(self, *args, **kwargs):
+                if not tracing.is_enabled():
+                    return await func(self, *args, **kwargs)
+                with span(self):
+                    return await func(self, *args, **kwargs)
+        else:
+            @functools.wraps(func)
+            def wrapper(self, *args, **kwargs):
+                if not tracing.is_enabled():
+                    return func(self, *args, **kwargs)
+                with span(self):
+                    return func(self, *args, **kwargs)
+        return wrapper
+    return decorator
 
 class QuerySet:
-    def __init__(self, model_class):
+    def __init__(self, model_class, using=None):
         self.model_class = model_class
-        self.query = f'SELECT * FROM "{model_class.get_table_name()}"'
+        # The parts of the SELECT, kept apart so that counts, UPDATEs and
+        # DELETEs reuse the WHERE clause alone: the filter() conditions
+        # (ANDed together), the order_by() fields and the slice taken.
+        self._where = []
         self.params = None
         self.order_by_fields = []
+        self._limit = None
+        self._offset = 0
+        self._db = using
+        # Field names selected by values(); None selects model instances.
+        self._values = None
+
+    @property
+    def query(self):
+        """The SELECT statement of this QuerySet."""
+        return self._sql()
+
+    def _where_sql(self):
+        if not self._where:
+            return ""
+        return " WHERE " + " AND ".join(self._where)
+
+    def _sql(self, columns="*", limit=None, ordered=True):
+        """
+        SELECT ``columns`` from the rows matched, in order unless
+        ``ordered`` is False. ``limit`` caps the number of rows further,
+        within the slice taken if there is one.
+        """
+        query = f'SELECT {columns} FROM "{self.model_class.get_table_name()}"{self._where_sql()}'
+        if ordered and self.order_by_fields:
+            query += " ORDER BY " + ", ".join(
+                f'"{field[1:]}" DESC' if field.startswith('-') else f'"{field}" ASC'
+                for field in self.order_by_fields
+            )
+        if self._limit is not None:
+            limit = self._limit if limit is None else min(limit, self._limit)
+        if limit is not None:
+            query += f" LIMIT {int(limit)}"
+        if self._offset:
+            query += f" OFFSET {int(self._offset)}"
+        return query
+
+    def _columns(self):
+        """The columns selected: the values() fields, or all of them."""
+        if self._values is None:
+            return "*"
+        return ", ".join(f'"{name}"' for name in self._values)
+
+    def using(self, alias):
+        """Run this QuerySet on the database ``alias``, bypassing the router."""
+        new_queryset = self._clone()
+        new_queryset._db = alias
+        return new_queryset
+
+    @property
+    def db(self):
+        """The database this QuerySet reads from."""
+        return self._db or router.db_for_read(self.model_class)
+
+    def _db_for_write(self):
+        return self._db or router.db_for_write(self.model_class)
+
+    def _failover(self, alias, exc):
+        """
+        Return the primary to retry a read that failed on replica ``alias``
+        with, or re-raise ``exc`` if that's not what happened.
+        """
+        primary = None if self._db else router.primary_for(alias)
+        if primary is None or not is_connection_error(exc):
+            raise exc
+        router.mark_unhealthy(alias)
+        logger.warning("Replica %r failed, reading from %r instead: %s", alias, primary, exc)
+        return primary
+
+    def _fetch_sync(self, query):
+        """Run a read query, returning (rows, the alias it ran on)."""
+        alias = self.db
+        try:
+            return connections[alias].execute(query, self.params or (), fetch=True), alias
+        except Exception as exc:
+            alias = self._failover(alias, exc)
+            return connections[alias].execute(query, self.params or (), fetch=True), alias
+
+    async def _fetch_async(self, query):
+        alias = self.db
+        try:
+            return await connections[alias].execute_async(query, self.params or (), fetch=True), alias
+        except Exception as exc:
+            alias = self._failover(alias, exc)
+            return await connections[alias].execute_async(query, self.params or (), fetch=True), alias
+
+    def _from_row(self, row, alias):
+        if self._values is not None:
+            return dict(zip(self._values, row))
+        instance = self.model_class(**dict(zip(self.model_class._fields.keys(), row)))
+        # Saved back to the primary of the replica it was read from.
+        instance._db = router.primary_for(alias) or alias
+        return instance
 
     def filter(self, **kwargs):
         # Always returns QuerySet, not coroutine
         return self._filter_sync(**kwargs)
 
-    def _filter_sync(self, **kwargs):
-        new_queryset = QuerySet(self.model_class)
+    def filter_any(self, **kwargs):
+        """Like filter(), but rows match if they match any one of ``kwargs``."""
+        return self._filter_sync(_connector=' OR ', **kwargs)
+
+    def _filter_sync(self, _connector=' AND ', **kwargs):
+        new_queryset = self._clone()
+        # Values are bound as :p<n> parameters, numbered across filter() calls
+        params = dict(self.params or {})
         conditions = []
-        for field_name, value in kwargs.items():
+
+        def bind(value):
+            name = f"p{len(params)}"
+            params[name] = value
+            return f":{name}"
+
+        for lookup, value in kwargs.items():
+            field_name, _, operator = lookup.partition('__')
             if field_name not in self.model_class._fields:
                 raise KeyError(f"Field '{field_name}' does not exist in model '{self.model_class.__name__}'")
+            if operator and operator not in LOOKUPS:
+                raise KeyError(f"Unsupported lookup '{operator}' on field '{field_name}'")
             field = self.model_class._fields[field_name]
-            if isinstance(field, ForeignKeyField):
-                related_model = field.get_related_model()
-                if related_model and isinstance(value, related_model):
-                    value = value.id
-                elif not isinstance(value, int):
-                    raise ValueError(f"Invalid value for foreign key '{field_name}': {value}")
-            if isinstance(value, str):
-                conditions.append(f'"{field_name}"=\'{value}\'')
+            if operator == 'in':
+                values = [bind(self._db_value(field, field_name, item)) for item in value]
+                if values:
+                    conditions.append(f'"{field_name}" IN ({", ".join(values)})')
+                else:
+                    conditions.append('1=0')
+            elif operator in LIKE_PATTERNS:
+                pattern = LIKE_PATTERNS[operator] % like_escape(str(value))
+                conditions.append(f'"{field_name}" LIKE {bind(pattern)} ESCAPE \'\\\'')
             else:
-                conditions.append(f'"{field_name}"={value}')
-        if 'WHERE' in self.query:
-            new_queryset.query = f"{self.query} AND {' AND '.join(conditions)}"
-        else:
-            new_queryset.query = f"{self.query} WHERE {' AND '.join(conditions)}"
-        new_queryset.params = None
+                value = self._db_value(field, field_name, value)
+                if value is None and LOOKUPS[operator] == '=':
+                    conditions.append(f'"{field_name}" IS NULL')
+                else:
+                    conditions.append(f'"{field_name}"{LOOKUPS[operator]}{bind(value)}')
+        if not conditions:
+            return new_queryset
+        where = _connector.join(conditions)
+        if len(conditions) > 1 and _connector == ' OR ':
+            where = f"({where})"
+        new_queryset._where = [*self._where, where]
+        new_queryset.params = params
+        return new_queryset
+
+    @staticmethod
+    def _db_value(field, field_name, value):
+        if isinstance(field, ForeignKeyField) and value is not None:
+            related_model = field.get_related_model()
+            if related_model and isinstance(value, related_model):
+                value = value.id
+            elif not isinstance(value, int):
+                raise ValueError(f"Invalid value for foreign key '{field_name}': {value}")
+        return value
+
+    def _clone(self):
+        new_queryset = QuerySet(self.model_class, using=self._db)
+        new_queryset._where = self._where
+        new_queryset.params = self.params
+        new_queryset.order_by_fields = self.order_by_fields
+        new_queryset._limit = self._limit
+        new_queryset._offset = self._offset
+        new_queryset._values = self._values
+        return new_queryset
+
+    def _sliced(self, start, stop):
+        """A clone of this QuerySet limited to its rows ``start`` to ``stop``."""
+        new_queryset = self._clone()
+        new_queryset._offset = self._offset + start
+        if stop is not None:
+            limit = max(0, stop - start)
+            new_queryset._limit = limit if self._limit is None else max(0, min(limit, self._limit - start))
+        elif self._limit is not None:
+            new_queryset._limit = max(0, self._limit - start)
+        return new_queryset
+
+    def values(self, *fields):
+        """
+        Select only ``fields`` (all of them if none are given), and return
+        rows as dicts instead of model instances.
+        """
+        for field_name in fields:
+            if field_name not in self.model_class._fields:
+                raise KeyError(f"Field '{field_name}' does not exist in model '{self.model_class.__name__}'")
+        new_queryset = self._clone()
+        new_queryset._values = tuple(fields or self.model_class._fields)
         return new_queryset
 
     def all(self):
@@ -106,18 +448,8 @@ class QuerySet:
 
     def order_by(self, *fields):
         # Always returns QuerySet
-        new_queryset = QuerySet(self.model_class)
-        new_queryset.query = self.query
-        new_queryset.params = self.params
+        new_queryset = self._clone()
         new_queryset.order_by_fields = list(fields)
-        order_conditions = []
-        for field in fields:
-            if field.startswith('-'):
-                order_conditions.append(f'"{field[1:]}" DESC')
-            else:
-                order_conditions.append(f'"{field}" ASC')
-        if order_conditions:
-            new_queryset.query += f" ORDER BY {', '.join(order_conditions)}"
         return new_queryset
 
     def execute(self):
@@ -126,8 +458,12 @@ class QuerySet:
     def first(self):
         return universal_executor(self._first_sync, self._first_async)
 
-    def count(self):
-        return universal_executor(self._count_sync, self._count_async)
+    def count(self, limit=None):
+        """
+        The number of rows; with ``limit``, counting stops at that many, so
+        the cost is bounded on large tables.
+        """
+        return universal_executor(self._count_sync, self._count_async, limit)
 
     def exists(self):
         return universal_executor(self._exists_sync, self._exists_async)
@@ -138,52 +474,87 @@ class QuerySet:
     def create(self, **kwargs):
         return universal_executor(self._create_sync, self._create_async, **kwargs)
 
+    def update(self, **kwargs):
+        """Set ``kwargs`` on every row matched; return the number of rows."""
+        return universal_executor(self._update_sync, self._update_async, **kwargs)
+
+    def bulk_create(self, rows, batch_size=None):
+        """
+        Insert ``rows`` (dicts of field values) with multi-row INSERTs of up
+        to ``batch_size`` rows, all in one transaction; return how many were
+        inserted. Unlike create() it doesn't read the rows back.
+        """
+        return universal_executor(self._bulk_create_sync, self._bulk_create_async, rows, batch_size)
+
+    # Explicit async versions: awaitable whatever the URL, and they never
+    # block the event loop.
+
+    async def aexecute(self):
+        return await async_executor(self._execute_sync, self._execute_async)
+
+    async def afirst(self):
+        return await async_executor(self._first_sync, self._first_async)
+
+    async def acount(self, limit=None):
+        return await async_executor(self._count_sync, self._count_async, limit)
+
+    async def aexists(self):
+        return await async_executor(self._exists_sync, self._exists_async)
+
+    async def adelete(self):
+        return await async_executor(self._delete_sync, self._delete_async)
+
+    async def acreate(self, **kwargs):
+        return await async_executor(self._create_sync, self._create_async, **kwargs)
+
+    async def aupdate(self, **kwargs):
+        return await async_executor(self._update_sync, self._update_async, **kwargs)
+
+    async def abulk_create(self, rows, batch_size=None):
+        return await async_executor(self._bulk_create_sync, self._bulk_create_async, rows, batch_size)
+
     # All sync methods use only _sync implementations, async — only _async implementations
 
+    @traced("select")
     def _execute_sync(self):
-        result = db.execute(self.query, self.params or (), fetch=True)
-        return [
-            self.model_class(**dict(zip(self.model_class._fields.keys(), row)))
-            for row in result
-        ]
+        result, alias = self._fetch_sync(self._sql(self._columns()))
+        return [self._from_row(row, alias) for row in result]
 
+    @traced("select")
     async def _execute_async(self):
-        result = await db.execute_async(self.query, self.params or (), fetch=True)
-        return [
-            self.model_class(**dict(zip(self.model_class._fields.keys(), row)))
-            for row in result
-        ]
+        result, alias = await self._fetch_async(self._sql(self._columns()))
+        return [self._from_row(row, alias) for row in result]
 
+    @traced("first")
     def _first_sync(self):
-        query = f"{self.query} LIMIT 1"
-        result = db.execute(query, self.params or (), fetch=True)
+        result, alias = self._fetch_sync(self._sql(self._columns(), limit=1))
         if result:
-            row = result[0]
-            return self.model_class(**{
-                key: value for key, value in zip(self.model_class._fields.keys(), row)
-                if key in self.model_class._fields
-            })
+            return self._from_row(result[0], alias)
         return None
 
+    @traced("first")
     async def _first_async(self):
-        query = f"{self.query} LIMIT 1"
-        result = await db.execute_async(query, self.params or (), fetch=True)
+        result, alias = await self._fetch_async(self._sql(self._columns(), limit=1))
         if result:
-            row = result[0]
-            return self.model_class(**{
-                key: value for key, value in zip(self.model_class._fields.keys(), row)
-                if key in self.model_class._fields
-            })
+            return self._from_row(result[0], alias)
         return None
 
-    def _count_sync(self):
-        count_query = self.query.replace('SELECT *', 'SELECT COUNT(*)')
-        result = db.execute(count_query, self.params or (), fetch=True)
+    def _count_query(self, limit=None):
+        if limit is None and self._limit is None and not self._offset:
+            return self._sql('COUNT(*)', ordered=False)
+        # A slice, or the limit, picks the rows counted: count them in a
+        # subquery, where the slice's own LIMIT and OFFSET apply.
+        sliced = self._limit is not None or bool(self._offset)
+        return f"SELECT COUNT(*) FROM ({self._sql('1', limit=limit, ordered=sliced)}) AS counted"
+
+    @traced("count")
+    def _count_sync(self, limit=None):
+        result, _ = self._fetch_sync(self._count_query(limit))
         return result[0][0] if result else 0
 
-    async def _count_async(self):
-        count_query = self.query.replace('SELECT *', 'SELECT COUNT(*)')
-        result = await db.execute_async(count_query, self.params or (), fetch=True)
+    @traced("count")
+    async def _count_async(self, limit=None):
+        result, _ = await self._fetch_async(self._count_query(limit))
         return result[0][0] if result else 0
 
     def _exists_sync(self):
@@ -193,71 +564,132 @@ class QuerySet:
         count_result = await self._count_async()
         return count_result > 0
 
+    @traced("delete")
     def _delete_sync(self):
-        delete_query = f'DELETE FROM "{self.model_class.get_table_name()}"'
-        if 'WHERE' in self.query:
-            where_clause = self.query.split('WHERE')[1]
-            delete_query += f" WHERE {where_clause}"
-        db.execute(delete_query, self.params or ())
+        delete_query = f'DELETE FROM "{self.model_class.get_table_name()}"{self._where_sql()}'
+        alias = self._db_for_write()
+        connections[alias].execute(delete_query, self.params or ())
+        signals.rows_changed.send(self.model_class, using=alias)
         return True
 
+    @traced("delete")
     async def _delete_async(self):
-        delete_query = f'DELETE FROM "{self.model_class.get_table_name()}"'
-        if 'WHERE' in self.query:
-            where_clause = self.query.split('WHERE')[1]
-            delete_query += f" WHERE {where_clause}"
-        await db.execute_async(delete_query, self.params or ())
+        delete_query = f'DELETE FROM "{self.model_class.get_table_name()}"{self._where_sql()}'
+        alias = self._db_for_write()
+        await connections[alias].execute_async(delete_query, self.params or ())
+        await signals.rows_changed.asend(self.model_class, using=alias)
         return True
 
+    def _read_back(self, alias, last_id):
+        """The row just inserted, as a values() dict if this QuerySet selects values."""
+        queryset = QuerySet(self.model_class, using=alias).filter(id=last_id)
+        queryset._values = self._values
+        return queryset
+
+    @traced("create")
     def _create_sync(self, **kwargs):
-        fields = []
-        values = []
-        for field_name, value in kwargs.items():
-            if field_name not in self.model_class._fields:
-                raise KeyError(f"Field '{field_name}' does not exist in model '{self.model_class.__name__}'")
-            field = self.model_class._fields[field_name]
-            if isinstance(field, ForeignKeyField):
-                related_model = field.get_related_model()
-                if related_model and isinstance(value, related_model):
-                    value = value.id
-                elif not isinstance(value, int):
-                    raise ValueError(f"Invalid value for foreign key '{field_name}': {value}")
-            fields.append(f'"{field_name}"')
-            if isinstance(value, str):
-                values.append(f"'{value}'")
-            else:
-                values.append(str(value))
-        insert_query = f'INSERT INTO "{self.model_class.get_table_name()}" ({", ".join(fields)}) VALUES ({", ".join(values)})'
-        db.execute(insert_query)
-        last_id = db.lastrowid()
+        [(insert_query, params)] = self._insert_batches([kwargs], None)
+        alias = self._db_for_write()
+        with transaction.atomic(using=alias):
+            connections[alias].execute(insert_query, params)
+            last_id = connections[alias].lastrowid()
         if last_id is None:
             raise RuntimeError("Failed to retrieve the ID of the newly created record.")
-        return self.model_class.objects.get(id=last_id)
+        # Read back from the database written to; a replica may lag behind.
+        instance = self._read_back(alias, last_id)._first_sync()
+        signals.post_save.send(self.model_class, instance=instance, created=True, using=alias)
+        return instance
 
+    @traced("create")
     async def _create_async(self, **kwargs):
-        fields = []
-        values = []
+        [(insert_query, params)] = self._insert_batches([kwargs], None)
+        alias = self._db_for_write()
+        async with transaction.atomic(using=alias):
+            await connections[alias].execute_async(insert_query, params)
+            last_id = await connections[alias].lastrowid_async()
+        if last_id is None:
+            raise RuntimeError("Failed to retrieve the ID of the newly created record.")
+        # Read back from the database written to; a replica may lag behind.
+        instance = await self._read_back(alias, last_id)._first_async()
+        await signals.post_save.asend(self.model_class, instance=instance, created=True, using=alias)
+        return instance
+
+    def _update_query(self, kwargs):
+        params = dict(self.params or {})
+        set_clauses = []
         for field_name, value in kwargs.items():
             if field_name not in self.model_class._fields:
                 raise KeyError(f"Field '{field_name}' does not exist in model '{self.model_class.__name__}'")
-            field = self.model_class._fields[field_name]
-            if isinstance(field, ForeignKeyField):
-                related_model = field.get_related_model()
-                if related_model and isinstance(value, related_model):
-                    value = value.id
-                elif not isinstance(value, int):
-                    raise ValueError(f"Invalid value for foreign key '{field_name}': {value}")
-            fields.append(f'"{field_name}"')
-            if isinstance(value, str):
-                values.append(f"'{value}'")
-            else:
-                values.append(str(value))
-        insert_query = f'INSERT INTO "{self.model_class.get_table_name()}" ({", ".join(fields)}) VALUES ({", ".join(values)})'
-        await db.execute_async(insert_query)
-        last_id = await db.lastrowid_async()
-        if last_id is None:
-            raise RuntimeError("Failed to retrieve the ID of the newly created record.")
-        return await self.model_class.objects.get(id=last_id)
+            value = self._db_value(self.model_class._fields[field_name], field_name, value)
+            params[f"u{len(set_clauses)}"] = value
+            set_clauses.append(f'"{field_name}"=:u{len(set_clauses)}')
+        update_query = f'UPDATE "{self.model_class.get_table_name()}" SET {", ".join(set_clauses)}{self._where_sql()}'
+        return update_query, params
+
+    @traced("update")
+    def _update_sync(self, **kwargs):
+        if not kwargs:
+            return 0
+        alias = self._db_for_write()
+        rowcount = connections[alias].execute(*self._update_query(kwargs)).rowcount
+        signals.rows_changed.send(self.model_class, using=alias)
+        return rowcount
+
+    @traced("update")
+    async def _update_async(self, **kwargs):
+        if not kwargs:
+            return 0
+        alias = self._db_for_write()
+        result = await connections[alias].execute_async(*self._update_query(kwargs))
+        await signals.rows_changed.asend(self.model_class, using=alias)
+        return result.rowcount
+
+    def _insert_batches(self, rows, batch_size):
+        """Yield the (query, params) of the INSERTs adding ``rows``."""
+        rows = list(rows)
+        if not rows:
+            return
+        fields = list(rows[0])
+        for field_name in fields:
+            if field_name not in self.model_class._fields:
+                raise KeyError(f"Field '{field_name}' does not exist in model '{self.model_class.__name__}'")
+        # SQLite allows 999 parameters per statement in older versions.
+        batch_size = batch_size or max(1, 999 // max(1, len(fields)))
+        columns = ", ".join(f'"{name}"' for name in fields)
+        table = self.model_class.get_table_name()
+        for start in range(0, len(rows), batch_size):
+            params = {}
+            groups = []
+            for row in rows[start:start + batch_size]:
+                if set(row) != set(fields):
+                    raise ValueError("Every row passed to bulk_create() must set the same fields.")
+                names = []
+                for field_name in fields:
+                    name = f"p{len(params)}"
+                    params[name] = self._db_value(self.model_class._fields[field_name], field_name, row[field_name])
+                    names.append(f":{name}")
+                groups.append(f"({', '.join(names)})")
+            yield f'INSERT INTO "{table}" ({columns}) VALUES {", ".join(groups)}', params
+
+    @traced("bulk_create")
+    def _bulk_create_sync(self, rows, batch_size=None):
+        rows = list(rows)
+        alias = self._db_for_write()
+        with transaction.atomic(using=alias):
+            for query, params in self._insert_batches(rows, batch_size):
+                connections[alias].execute(query, params)
+        signals.rows_changed.send(self.model_class, using=alias)
+        return len(rows)
+
+    @traced("bulk_create")
+    async def _bulk_create_async(self, rows, batch_size=None):
+        rows = list(rows)
+        alias = self._db_for_write()
+        async with transaction.atomic(using=alias):
+            for query, params in self._insert_batches(rows, batch_size):
+                await connections[alias].execute_async(query, params)
+        await signals.rows_changed.asend(self.model_class, using=alias)
+        return len(rows)
 
     # Support for iterations and lazy loading
     def __repr__(self):
@@ -288,49 +720,26 @@ class QuerySet:
     async def _iter_async(self):
         """Asynchronous iteration over results (lazy loading)."""
         # Execute query and return async iterator
-        result = await self._execute_async()
+        result = await self.aexecute()
         for item in result:
             yield item
 
     def get_item(self, key):
         """Gets element by index or slice."""
-        if should_use_async():
-            # For __getitem__ when async is used, we need to return an awaitable.
-            # _get_item_async returns a coroutine, so it's already compatible.
-            return self._get_item_async(key)
-        else:
-            # For __getitem__ when sync is used, we wrap the result in SyncResult
-            # to make it awaitable in calling code if needed.
-            return SyncResult(self._get_item_sync(key))
+        return universal_executor(self._get_item_sync, self._get_item_async, key)
 
     def _get_item_sync(self, key):
         """Synchronous element retrieval."""
         if isinstance(key, slice):
             # Slice - add LIMIT and OFFSET
-            start = key.start or 0
-            stop = key.stop
-            limit = stop - start if stop is not None else None
-            
-            new_queryset = QuerySet(self.model_class)
-            new_queryset.query = self.query
-            new_queryset.params = self.params
-            
-            if limit is not None:
-                new_queryset.query += f" LIMIT {limit}"
-            if start > 0:
-                new_queryset.query += f" OFFSET {start}"
-            
+            new_queryset = self._sliced(key.start or 0, key.stop)
             return new_queryset._execute_sync()
         elif isinstance(key, int):
             # Index - get specific record
             if key < 0:
                 raise IndexError("Negative indexing is not supported")
             
-            new_queryset = QuerySet(self.model_class)
-            new_queryset.query = self.query
-            new_queryset.params = self.params
-            new_queryset.query += f" LIMIT 1 OFFSET {key}"
-            
+            new_queryset = self._sliced(key, key + 1)
             result = new_queryset._execute_sync()
             if result:
                 return result[0]
@@ -343,30 +752,14 @@ class QuerySet:
         """Asynchronous element retrieval."""
         if isinstance(key, slice):
             # Slice - add LIMIT and OFFSET
-            start = key.start or 0
-            stop = key.stop
-            limit = stop - start if stop is not None else None
-            
-            new_queryset = QuerySet(self.model_class)
-            new_queryset.query = self.query
-            new_queryset.params = self.params
-            
-            if limit is not None:
-                new_queryset.query += f" LIMIT {limit}"
-            if start > 0:
-                new_queryset.query += f" OFFSET {start}"
-            
+            new_queryset = self._sliced(key.start or 0, key.stop)
             return await new_queryset._execute_async()
         elif isinstance(key, int):
             # Index - get specific record
             if key < 0:
                 raise IndexError("Negative indexing is not supported")
             
-            new_queryset = QuerySet(self.model_class)
-            new_queryset.query = self.query
-            new_queryset.params = self.params
-            new_queryset.query += f" LIMIT 1 OFFSET {key}"
-            
+            new_queryset = self._sliced(key, key + 1)
             result = await new_queryset._execute_async() # Fix: should use _execute_async
             if result:
                 return result[0]
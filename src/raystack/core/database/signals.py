@@ -0,0 +1,33 @@
+"""
+Model signals: functions called when the ORM writes rows.
+
+    from raystack.core.database import signals
+
+    def user_saved(sender, instance, created, using, **kwargs):
+        ...
+
+    signals.post_save.connect(user_saved, sender=UserModel)
+
+- pre_save(sender, instance, using): before Model.save() writes the row;
+- post_save(sender, instance, created, using): after Model.save() or
+  QuerySet.create() (whose ``instance`` is a dict under values());
+- post_delete(sender, instance, using): after Model.delete();
+- rows_changed(sender, using): after QuerySet.update(), delete() and
+  bulk_create(), which don't know the rows they changed.
+
+Receivers are sync functions. They run in the thread making the write, so
+inside its atomic() block if there's one. Writes made from async code run
+them in the database thread pool instead, so they may query the database
+without blocking the event loop. With a sync URL that's still inside the
+write's atomic() block. With an async URL it isn't: the receiver's queries
+run on a connection of their own, outside the block, and don't see its
+changes. Receivers that write should do it through
+transaction.on_commit(), which runs after the block commits, and not at
+all if it rolls back.
+"""
+from raystack.core.signals import Signal, receiver
+
+pre_save = Signal("pre_save")
+post_save = Signal("post_save")
+post_delete = Signal("post_delete")
+rows_changed = Signal("rows_changed")
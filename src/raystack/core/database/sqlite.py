@@ -0,0 +1,192 @@
+"""
+SQLite tuning.
+
+Every SQLite connection gets the PRAGMAs in its database's
+OPTIONS['pragmas']. With OPTIONS['wal'] = True the database runs in WAL
+mode, for serving requests from several threads or tasks:
+
+- the WAL_PRAGMAS defaults (which 'pragmas' can override);
+- reads outside atomic() use a pool of OPTIONS['readers'] read-only
+  connections, so they don't wait for writes;
+- everything else goes through a single writer connection, taken in turn,
+  so concurrent writers queue up instead of failing with "database is
+  locked";
+- with OPTIONS['batch_writes'] = True, the writes made outside atomic() are
+  handed to a writer thread, which commits the ones queued while it was
+  busy in one transaction.
+"""
+import queue
+import threading
+from concurrent.futures import Future
+
+from sqlalchemy import event, text
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+WAL_PRAGMAS = {
+    "journal_mode": "WAL",
+    # Durable across application crashes; a power loss may lose the last
+    # commits, but never corrupts the database.
+    "synchronous": "NORMAL",
+    "busy_timeout": 5000,
+    "cache_size": -64000,  # KiB, so 64 MB
+    "mmap_size": 256 * 1024 * 1024,
+    "temp_store": "MEMORY",
+}
+DEFAULT_READERS = 4
+WRITE_BATCH_SIZE = 100
+
+
+def emit_begin(engine, statement="BEGIN"):
+    """
+    Let SQLAlchemy, not the sqlite3 driver, begin transactions. The driver
+    only issues BEGIN before data-modifying statements, which breaks the
+    savepoints of nested atomic() blocks.
+    """
+    @event.listens_for(engine, "connect")
+    def on_connect(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine, "begin")
+    def on_begin(connection):
+        connection.exec_driver_sql(statement)
+
+
+def set_pragmas(engine, pragmas, query_only=False):
+    """Run ``PRAGMA name=value`` for each of ``pragmas`` on new connections."""
+    if not pragmas and not query_only:
+        return
+
+    @event.listens_for(engine, "connect")
+    def on_connect(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute("PRAGMA %s=%s" % (name, value))
+        if query_only:
+            cursor.execute("PRAGMA query_only=ON")
+        cursor.close()
+
+
+def get_pragmas(options):
+    pragmas = dict(WAL_PRAGMAS) if options.get("wal") else {}
+    pragmas.update(options.get("pragmas", {}))
+    return pragmas
+
+
+def is_memory(url):
+    database = url.split("://", 1)[1].lstrip("/")
+    return database in ("", ":memory:") or "mode=memory" in database
+
+
+def use_wal(url, options):
+    # Every connection to an in-memory database is a database of its own.
+    return bool(options.get("wal")) and not is_memory(url)
+
+
+def is_read(query):
+    return query.lstrip()[:6].upper() in ("SELECT", "WITH") and "RETURNING" not in query.upper()
+
+
+def create_wal_engines(create, url, options, is_async=False):
+    """
+    Return the writer and reader engines of a database in WAL mode, made by
+    ``create`` (create_engine or create_async_engine).
+    """
+    poolclass = AsyncAdaptedQueuePool if is_async else QueuePool
+    pool_timeout = options.get("pool_timeout", 30)
+    connect_args = dict(options.get("connect_args", {}), check_same_thread=False)
+    writer = create(
+        url,
+        poolclass=poolclass,
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=pool_timeout,
+        connect_args=connect_args,
+        echo=options.get("echo", False),
+    )
+    reader = create(
+        url,
+        poolclass=poolclass,
+        pool_size=options.get("readers", DEFAULT_READERS),
+        max_overflow=0,
+        pool_timeout=pool_timeout,
+        connect_args=connect_args,
+        echo=options.get("echo", False),
+    )
+    pragmas = get_pragmas(options)
+    # Take the write lock up front: a deferred transaction that reads first
+    # can't be upgraded while another connection writes.
+    emit_begin(_sync_engine(writer), "BEGIN IMMEDIATE")
+    set_pragmas(_sync_engine(writer), pragmas)
+    emit_begin(_sync_engine(reader))
+    set_pragmas(_sync_engine(reader), pragmas, query_only=True)
+    return writer, reader
+
+
+def _sync_engine(engine):
+    return getattr(engine, "sync_engine", engine)
+
+
+class WriteQueue:
+    """
+    Writes run by one thread on the writer connection. The ones queued
+    while a batch is being written are committed together in the next one,
+    each in a savepoint so that one failing doesn't undo the others.
+    """
+
+    def __init__(self, engine, batch_size=WRITE_BATCH_SIZE):
+        self.engine = engine
+        self.batch_size = batch_size
+        self._queue = queue.SimpleQueue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def submit(self, query, params=None):
+        """Queue ``query``; return a Future of its CursorResult."""
+        future = Future()
+        self._queue.put((query, params, future))
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(
+                        target=self._run, name="raystack-sqlite-writer", daemon=True
+                    )
+                    self._thread.start()
+        return future
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            self._write(batch)
+
+    def _write(self, batch):
+        outcomes = []
+        try:
+            with self.engine.connect() as connection:
+                with connection.begin():
+                    for query, params, future in batch:
+                        savepoint = connection.begin_nested() if len(batch) > 1 else None
+                        try:
+                            result = connection.execute(text(query), *((params,) if params else ()))
+                        except Exception as exc:
+                            if savepoint is None:
+                                raise
+                            savepoint.rollback()
+                            outcomes.append((future, None, exc))
+                        else:
+                            if savepoint is not None:
+                                savepoint.commit()
+                            outcomes.append((future, result, None))
+        except Exception as exc:
+            for query, params, future in batch:
+                future.set_exception(exc)
+            return
+        for future, result, exc in outcomes:
+            if exc is None:
+                future.set_result(result)
+            else:
+                future.set_exception(exc)
@@ -0,0 +1,411 @@
+"""
+Tests of the ORM, each run against a SQLite file of its own.
+"""
+import asyncio
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import unittest
+
+from raystack.conf import settings
+
+if not settings.configured:
+    settings.configure(SECRET_KEY="raystack-tests", USE_I18N=False)
+
+from raystack.core.database import db, transaction  # noqa: E402
+from raystack.core.database.fields import AutoField, CharField, IntegerField  # noqa: E402
+from raystack.core.database.models import Model  # noqa: E402
+
+
+class Account(Model):
+    table = "tests_account"
+
+    id = AutoField()
+    name = CharField(max_length=50)
+    balance = IntegerField()
+
+
+SCHEMA = """
+    CREATE TABLE tests_account (
+        id INTEGER PRIMARY KEY, name VARCHAR(50), balance INTEGER
+    );
+"""
+
+
+class DatabaseTestCase(unittest.TestCase):
+    """
+    Point the default backend at a new database with the tables above.
+    ``scheme`` picks the sync (sqlite) or async (sqlite+aiosqlite) driver.
+    """
+
+    scheme = "sqlite"
+    options = {}
+    schema = SCHEMA
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp(prefix="raystack-tests-")
+        path = os.path.join(self.directory, "db.sqlite3")
+        connection = sqlite3.connect(path)
+        with connection:
+            connection.executescript(self.schema)
+        connection.close()
+        self.addCleanup(shutil.rmtree, self.directory, ignore_errors=True)
+        self.addCleanup(self._restore, db.database_url, db._options)
+        self._reset("%s:///%s" % (self.scheme, path), dict(self.options))
+
+    def _reset(self, url, options):
+        if db.engine is not None:
+            db.engine.dispose()
+        if db.read_engine is not None:
+            db.read_engine.dispose()
+        db.database_url = url
+        db._options = options
+        db._initialized = db._async_initialized = False
+        db.engine = db.read_engine = db.write_queue = None
+        db.async_engine = db.async_read_engine = None
+        db.ReadSessionLocal = db.AsyncReadSessionLocal = None
+
+    def _restore(self, url, options):
+        self._reset(url, options)
+
+    def rows(self):
+        """The (name, balance) rows of the table, read around the ORM."""
+        connection = sqlite3.connect(os.path.join(self.directory, "db.sqlite3"))
+        try:
+            return connection.execute(
+                "SELECT name, balance FROM tests_account ORDER BY id"
+            ).fetchall()
+        finally:
+            connection.close()
+
+
+NAMES = ["O'Brien", 'say "hi"', "100%", "under_score", "back\\slash", "'; DROP TABLE tests_account; --"]
+
+
+class BindingTests(DatabaseTestCase):
+    """Values reach the database as parameters, whatever they contain."""
+
+    def test_save_and_filter(self):
+        for name in NAMES:
+            Account(name=name, balance=1).save()
+        self.assertEqual([row[0] for row in self.rows()], NAMES)
+        for name in NAMES:
+            with self.subTest(name=name):
+                self.assertEqual(Account.objects.filter(name=name).first().name, name)
+                self.assertEqual(Account.objects.filter(name__in=[name, "other"]).count(), 1)
+
+    def test_like_lookups_escape_wildcards(self):
+        Account.objects.all().bulk_create([{"name": name, "balance": 0} for name in NAMES + ["1000", "underXscore"]])
+        self.assertEqual([a.name for a in Account.objects.filter(name__contains="%").execute_all()], ["100%"])
+        self.assertEqual(
+            [a.name for a in Account.objects.filter(name__startswith="under_").execute_all()], ["under_score"]
+        )
+
+    def test_update(self):
+        account = Account.objects.create(name="a", balance=1)
+        Account.objects.filter(name="a").update(name=NAMES[-1], balance=None)
+        self.assertEqual(self.rows(), [(NAMES[-1], None)])
+        # save() writes every field, the stale balance included.
+        account.name = "O'Brien"
+        account.save()
+        self.assertEqual(self.rows(), [("O'Brien", 1)])
+
+    def test_update_and_delete_ignore_ordering_and_slices(self):
+        Account.objects.all().bulk_create([{"name": str(i), "balance": i} for i in range(5)])
+        ordered = Account.objects.filter(balance__gte=1).order_by("-balance")
+        self.assertEqual([a.balance for a in ordered[0:2]], [4, 3])
+        self.assertEqual(ordered.update(name="x"), 4)
+        ordered.delete()
+        self.assertEqual(self.rows(), [("0", 0)])
+
+    def test_bulk_create(self):
+        rows = [{"name": name, "balance": i} for i, name in enumerate(NAMES)]
+        self.assertEqual(Account.objects.all().bulk_create(rows, batch_size=4), len(rows))
+        self.assertEqual(self.rows(), [(name, i) for i, name in enumerate(NAMES)])
+
+
+class AtomicTests(DatabaseTestCase):
+    def test_commit(self):
+        with transaction.atomic():
+            Account.objects.create(name="a", balance=1)
+            self.assertTrue(transaction.in_atomic_block())
+            # Not committed yet: another connection doesn't see it.
+            self.assertEqual(self.rows(), [])
+        self.assertFalse(transaction.in_atomic_block())
+        self.assertEqual(self.rows(), [("a", 1)])
+
+    def test_rollback(self):
+        with self.assertRaises(ValueError):
+            with transaction.atomic():
+                Account.objects.create(name="a", balance=1)
+                raise ValueError
+        self.assertEqual(self.rows(), [])
+
+    def test_nested_rollback_keeps_outer_work(self):
+        with transaction.atomic():
+            Account.objects.create(name="outer", balance=1)
+            try:
+                with transaction.atomic():
+                    Account.objects.create(name="inner", balance=2)
+                    raise ValueError
+            except ValueError:
+                pass
+            with transaction.atomic():
+                Account.objects.create(name="second", balance=3)
+        self.assertEqual(self.rows(), [("outer", 1), ("second", 3)])
+
+    def test_outer_rollback_undoes_inner_commit(self):
+        with self.assertRaises(ValueError):
+            with transaction.atomic():
+                with transaction.atomic():
+                    Account.objects.create(name="inner", balance=2)
+                raise ValueError
+        self.assertEqual(self.rows(), [])
+
+    def test_without_savepoint_failure_rolls_back_everything(self):
+        with transaction.atomic():
+            Account.objects.create(name="outer", balance=1)
+            try:
+                with transaction.atomic(savepoint=False):
+                    raise ValueError
+            except ValueError:
+                pass
+        self.assertEqual(self.rows(), [])
+
+    def test_decorator(self):
+        @transaction.atomic
+        def create():
+            Account.objects.create(name="a", balance=1)
+            raise ValueError
+
+        with self.assertRaises(ValueError):
+            create()
+        self.assertEqual(self.rows(), [])
+
+
+class AsyncAtomicTests(DatabaseTestCase):
+    """atomic() in async code: queries run in the database thread pool."""
+
+    def run_async(self, coroutine_function):
+        asyncio.run(coroutine_function())
+
+    def test_commit_and_rollback(self):
+        async def main():
+            async with transaction.atomic():
+                await Account.objects.acreate(name="a", balance=1)
+                self.assertEqual(self.rows(), [])
+            with self.assertRaises(ValueError):
+                async with transaction.atomic():
+                    await Account.objects.acreate(name="b", balance=2)
+                    raise ValueError
+
+        self.run_async(main)
+        self.assertEqual(self.rows(), [("a", 1)])
+
+    def test_nesting(self):
+        async def main():
+            async with transaction.atomic():
+                await Account.objects.acreate(name="outer", balance=1)
+                try:
+                    async with transaction.atomic():
+                        await Account.objects.filter(name="outer").aupdate(balance=5)
+                        await Account.objects.acreate(name="inner", balance=2)
+                        raise ValueError
+                except ValueError:
+                    pass
+                self.assertEqual(await Account.objects.filter(name="outer").acount(), 1)
+                self.assertEqual((await Account.objects.filter(name="outer").afirst()).balance, 1)
+
+        self.run_async(main)
+        self.assertEqual(self.rows(), [("outer", 1)])
+
+    def test_decorator(self):
+        @transaction.atomic
+        async def create():
+            await Account.objects.acreate(name="a", balance=1)
+            raise ValueError
+
+        async def main():
+            with self.assertRaises(ValueError):
+                await create()
+
+        self.run_async(main)
+        self.assertEqual(self.rows(), [])
+
+
+class AsyncURLAtomicTests(AsyncAtomicTests):
+    """The same on an async URL: the async engine, in the event loop."""
+
+    scheme = "sqlite+aiosqlite"
+
+
+class OnCommitTests(DatabaseTestCase):
+    def test_called_after_commit(self):
+        called = []
+        with transaction.atomic():
+            transaction.on_commit(lambda: called.append("outer"))
+            Account.objects.create(name="a", balance=1)
+            with transaction.atomic():
+                transaction.on_commit(lambda: called.append("inner"))
+            self.assertEqual(called, [])
+        self.assertEqual(called, ["outer", "inner"])
+
+    def test_dropped_on_rollback(self):
+        called = []
+        with transaction.atomic():
+            try:
+                with transaction.atomic():
+                    transaction.on_commit(lambda: called.append("savepoint"))
+                    raise ValueError
+            except ValueError:
+                pass
+            transaction.on_commit(lambda: called.append("kept"))
+        with self.assertRaises(ValueError):
+            with transaction.atomic():
+                transaction.on_commit(lambda: called.append("rolled back"))
+                raise ValueError
+        self.assertEqual(called, ["kept"])
+
+    def test_outside_a_block(self):
+        called = []
+        transaction.on_commit(lambda: called.append(1))
+        self.assertEqual(called, [1])
+
+
+class AsyncOnCommitTests(OnCommitTests):
+    scheme = "sqlite+aiosqlite"
+
+    def test_called_after_async_commit(self):
+        called = []
+
+        async def main():
+            async with transaction.atomic():
+                await Account.objects.acreate(name="a", balance=1)
+                transaction.on_commit(lambda: called.append(transaction.in_atomic_block()))
+                self.assertEqual(called, [])
+            with self.assertRaises(ValueError):
+                async with transaction.atomic():
+                    transaction.on_commit(lambda: called.append("rolled back"))
+                    raise ValueError
+
+        asyncio.run(main())
+        # Called once the block's connection is released.
+        self.assertEqual(called, [False])
+
+
+class WALConcurrencyTests(DatabaseTestCase):
+    """
+    In WAL mode the one writer connection is held by an atomic() block
+    across awaits while other tasks write.
+    """
+
+    options = {"wal": True, "pool_timeout": 3}
+
+    def test_write_while_atomic_block_waits(self):
+        async def transfer():
+            async with transaction.atomic():
+                await Account.objects.create(name="a", balance=1)
+                await asyncio.sleep(0.2)
+                await Account.objects.filter(name="a").update(balance=2)
+
+        async def deposit():
+            await asyncio.sleep(0.05)
+            # Waits for the writer the block holds, without holding up the
+            # block's own queries.
+            await Account.objects.create(name="b", balance=3)
+
+        async def main():
+            await asyncio.wait_for(asyncio.gather(transfer(), deposit()), 2)
+
+        asyncio.run(main())
+        self.assertEqual(self.rows(), [("a", 2), ("b", 3)])
+
+    def test_concurrent_atomic_blocks(self):
+        async def block(name):
+            async with transaction.atomic():
+                await Account.objects.create(name=name, balance=0)
+                await asyncio.sleep(0.05)
+                async with transaction.atomic():
+                    await Account.objects.filter(name=name).update(balance=1)
+
+        async def main():
+            await asyncio.wait_for(asyncio.gather(*(block(str(i)) for i in range(4))), 2)
+
+        asyncio.run(main())
+        self.assertEqual(sorted(self.rows()), [(str(i), 1) for i in range(4)])
+
+
+
+class SharedConnectionConcurrencyTests(DatabaseTestCase):
+    """
+    Without WAL every thread shares SQLite's one connection; an atomic()
+    block keeps it, and other statements wait for the block to exit.
+    """
+
+    def test_write_while_atomic_block_waits(self):
+        seen = []
+
+        async def transfer():
+            async with transaction.atomic():
+                await Account.objects.create(name="a", balance=1)
+                await asyncio.sleep(0.2)
+                await Account.objects.filter(name="a").update(balance=2)
+
+        async def deposit():
+            await asyncio.sleep(0.05)
+            await Account.objects.create(name="b", balance=3)
+            # Not before the block committed, so not its uncommitted row.
+            seen.append(await Account.objects.filter(name="a").afirst())
+
+        async def main():
+            await asyncio.wait_for(asyncio.gather(transfer(), deposit()), 2)
+
+        asyncio.run(main())
+        self.assertEqual(self.rows(), [("a", 2), ("b", 3)])
+        self.assertEqual(seen[0].balance, 2)
+
+    def test_rolled_back_block_hides_its_writes(self):
+        seen = []
+
+        async def failing():
+            with self.assertRaises(ValueError):
+                async with transaction.atomic():
+                    await Account.objects.create(name="a", balance=1)
+                    await asyncio.sleep(0.2)
+                    raise ValueError
+
+        async def reader():
+            await asyncio.sleep(0.05)
+            seen.append(await Account.objects.filter(name="a").acount())
+
+        async def main():
+            await asyncio.wait_for(asyncio.gather(failing(), reader()), 2)
+
+        asyncio.run(main())
+        self.assertEqual(seen, [0])
+        self.assertEqual(self.rows(), [])
+
+    def test_sync_block_and_other_thread(self):
+        entered = threading.Event()
+        written = []
+
+        def writer():
+            entered.wait()
+            Account.objects.create(name="b", balance=3)
+            written.append(self.rows())
+
+        thread = threading.Thread(target=writer)
+        thread.start()
+        with transaction.atomic():
+            Account.objects.create(name="a", balance=1)
+            entered.set()
+            thread.join(0.2)
+            self.assertTrue(thread.is_alive())
+        thread.join(2)
+        self.assertEqual(written, [[("a", 1), ("b", 3)]])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,337 @@
+"""
+Explicit transactions.
+
+Outside a transaction every statement the ORM runs is committed on its own.
+Inside atomic() all of them run on one connection and are committed together
+when the block exits, or rolled back together if it raises:
+
+    from raystack.core.database import transaction
+
+    with transaction.atomic():
+        user = UserModel.objects.create(name="ann")
+        group.save()
+
+    async with transaction.atomic():
+        await UserModel.objects.create(name="ann")
+
+    @transaction.atomic()
+    async def transfer(...):
+        ...
+
+atomic() blocks nest: an inner block runs in a savepoint, so an exception
+it raises rolls back only its own work. A block covers one database,
+``using`` (the default one unless given); reads routed to that database
+inside it skip its replicas. The connection is bound through a context
+variable, so the statements of one task or thread don't leak into another's
+transaction; don't run queries concurrently (asyncio.gather) inside one
+block, since they would share its connection. On SQLite without WAL, where
+every thread shares one connection, an open block keeps it to itself:
+statements from elsewhere wait for the block to exit.
+
+on_commit(func) calls ``func`` once the block open on the database commits
+(right away outside one), and never if it rolls back: for work, like
+updating counters kept elsewhere, that should only follow a write that
+stuck.
+"""
+import functools
+import inspect
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import ContextVar
+
+from raystack.core.database.utils import DEFAULT_DB_ALIAS
+
+# {alias: connection} for the atomic() blocks open in this context. Never
+# mutated: entering a block sets a new dict, so contexts copied from this one
+# (tasks started inside a block) don't see blocks opened later.
+_connections = ContextVar("raystack_transaction_connections", default={})
+_async_connections = ContextVar("raystack_transaction_async_connections", default={})
+# The thread the sync ORM calls of an async atomic() block run in, when the
+# block has one of its own (see Atomic.__aenter__).
+_block_executor = ContextVar("raystack_transaction_block_executor", default=None)
+
+# Set in Connection.info when a block without a savepoint failed, so the
+# outermost block rolls back instead of committing.
+NEEDS_ROLLBACK = "raystack_needs_rollback"
+# The Connection.info list of the on_commit() functions of a block.
+ON_COMMIT = "raystack_on_commit"
+
+
+def get_connection(using=DEFAULT_DB_ALIAS):
+    """Return the connection of the sync atomic() block open on ``using``, or None."""
+    return _connections.get().get(using)
+
+
+def get_async_connection(using=DEFAULT_DB_ALIAS):
+    """Return the connection of the async atomic() block open on ``using``, or None."""
+    return _async_connections.get().get(using)
+
+
+def get_block_executor():
+    """Return the executor of the async atomic() block open in this context, or None."""
+    return _block_executor.get()
+
+
+def in_atomic_block(using=DEFAULT_DB_ALIAS):
+    return using in _connections.get() or using in _async_connections.get()
+
+
+def _bind(var, using, connection):
+    return var.set(dict(var.get(), **{using: connection}))
+
+
+def _backend(using):
+    from raystack.core.database.utils import connections
+
+    return connections[using]
+
+
+class Atomic:
+    """
+    The context manager (sync or async) and decorator returned by atomic().
+    """
+
+    def __init__(self, using=None, savepoint=True):
+        self.using = using or DEFAULT_DB_ALIAS
+        self.savepoint = savepoint
+        # (connection, transaction, token, on_commit mark) of each entry.
+        self._entries = []
+        self._async_modes = []
+        self._executor_tokens = []
+
+    def __call__(self, func):
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def inner(*args, **kwargs):
+                async with Atomic(self.using, self.savepoint):
+                    return await func(*args, **kwargs)
+        else:
+            @functools.wraps(func)
+            def inner(*args, **kwargs):
+                with Atomic(self.using, self.savepoint):
+                    return func(*args, **kwargs)
+        return inner
+
+    @staticmethod
+    def _mark(connection):
+        """How many on_commit() functions were registered before a savepoint."""
+        return len(connection.info.get(ON_COMMIT, ()))
+
+    @staticmethod
+    def _discard(connection, mark):
+        """Forget the on_commit() functions of a savepoint rolled back."""
+        del connection.info.get(ON_COMMIT, [])[mark:]
+
+    # Sync
+
+    def _begin(self, connection):
+        """
+        Open the block on ``connection``, the one of the enclosing block:
+        a transaction on a new connection if there's none, else a savepoint
+        (or nothing, without savepoint). Return (connection, transaction,
+        outermost).
+        """
+        if connection is None:
+            db = _backend(self.using)
+            db.initialize()
+            # SQLite without WAL has one connection, shared by every thread:
+            # the block keeps it to itself until it exits.
+            lock = db.connection_lock
+            if lock is not None:
+                lock.acquire()
+            try:
+                connection = db.engine.connect()
+                return connection, connection.begin(), True
+            except BaseException:
+                if lock is not None:
+                    lock.release()
+                raise
+        transaction = connection.begin_nested() if self.savepoint else None
+        return connection, transaction, False
+
+    def _end(self, connection, transaction, outermost, mark, exc_type):
+        """
+        Commit or roll back what _begin() opened. Return the on_commit()
+        functions to call: those of the outermost block, once committed.
+        """
+        if not outermost:
+            if transaction is None:
+                if exc_type is not None:
+                    connection.info[NEEDS_ROLLBACK] = True
+            elif exc_type is None:
+                transaction.commit()
+            else:
+                transaction.rollback()
+                self._discard(connection, mark)
+            return []
+        committed = False
+        try:
+            try:
+                if exc_type is None and not connection.info.pop(NEEDS_ROLLBACK, False):
+                    transaction.commit()
+                    committed = True
+                else:
+                    transaction.rollback()
+            except Exception:
+                if transaction.is_active:
+                    transaction.rollback()
+                raise
+        finally:
+            callbacks = connection.info.pop(ON_COMMIT, [])
+            connection.close()
+            lock = _backend(self.using).connection_lock
+            if lock is not None:
+                lock.release()
+        return callbacks if committed else []
+
+    def __enter__(self):
+        connection, transaction, outermost = self._begin(get_connection(self.using))
+        token = _bind(_connections, self.using, connection) if outermost else None
+        self._entries.append((connection, transaction, token, self._mark(connection)))
+
+    def __exit__(self, exc_type, exc_value, tb):
+        connection, transaction, token, mark = self._entries.pop()
+        try:
+            callbacks = self._end(connection, transaction, token is not None, mark, exc_type)
+        finally:
+            if token is not None:
+                _connections.reset(token)
+        _run_on_commit(callbacks)
+        return False
+
+    # Async
+
+    async def __aenter__(self):
+        # With a sync URL the ORM runs the block's queries on the sync
+        # engine, in the database thread pool, so the transaction is opened
+        # (and later committed) there too, off the event loop. The
+        # connection is bound here, in the task's own context.
+        is_async = _backend(self.using).is_async
+        self._async_modes.append(is_async)
+        if not is_async:
+            from raystack.core.database.query import run_sync
+
+            connection = get_connection(self.using)
+            executor_token = None
+            if connection is None:
+                # The block holds a connection (SQLite's only writer in WAL
+                # mode, its only connection without) across awaits. Other
+                # tasks waiting for it block the thread they run in; give
+                # the block a thread of its own, where it's opened and
+                # closed, so it isn't queued behind them and can finish.
+                executor_token = _block_executor.set(
+                    ThreadPoolExecutor(max_workers=1, thread_name_prefix="raystack-db-atomic")
+                )
+            try:
+                connection, transaction, outermost = await run_sync(self._begin, connection)
+            except BaseException:
+                if executor_token is not None:
+                    self._release_executor(executor_token)
+                raise
+            token = _bind(_connections, self.using, connection) if outermost else None
+            self._entries.append((connection, transaction, token, self._mark(connection)))
+            self._executor_tokens.append(executor_token)
+            return
+        connection = get_async_connection(self.using)
+        if connection is None:
+            db = _backend(self.using)
+            await db.initialize_async()
+            connection = db.async_engine.connect()
+            await connection.start()
+            transaction = connection.begin()
+            await transaction.start()
+            token = _bind(_async_connections, self.using, connection)
+        else:
+            transaction = None
+            if self.savepoint:
+                transaction = connection.begin_nested()
+                await transaction.start()
+            token = None
+        self._entries.append((connection, transaction, token, self._mark(connection)))
+
+    @staticmethod
+    def _release_executor(token):
+        _block_executor.get().shutdown(wait=False)
+        _block_executor.reset(token)
+
+    async def __aexit__(self, exc_type, exc_value, tb):
+        from raystack.core.database.query import run_sync
+
+        connection, transaction, token, mark = self._entries.pop()
+        if not self._async_modes.pop():
+            executor_token = self._executor_tokens.pop()
+            try:
+                callbacks = await run_sync(
+                    self._end, connection, transaction, token is not None, mark, exc_type
+                )
+            finally:
+                if token is not None:
+                    _connections.reset(token)
+                if executor_token is not None:
+                    self._release_executor(executor_token)
+            if callbacks:
+                await run_sync(_run_on_commit, callbacks)
+            return False
+        callbacks = []
+        try:
+            if token is None:
+                if transaction is None:
+                    if exc_type is not None:
+                        connection.info[NEEDS_ROLLBACK] = True
+                elif exc_type is None:
+                    await transaction.commit()
+                else:
+                    await transaction.rollback()
+                    self._discard(connection, mark)
+            else:
+                try:
+                    if exc_type is None and not connection.info.pop(NEEDS_ROLLBACK, False):
+                        await transaction.commit()
+                        callbacks = connection.info.get(ON_COMMIT, [])
+                    else:
+                        await transaction.rollback()
+                except Exception:
+                    if transaction.is_active:
+                        await transaction.rollback()
+                    raise
+        finally:
+            if token is not None:
+                connection.info.pop(ON_COMMIT, None)
+                _async_connections.reset(token)
+                await connection.close()
+        if callbacks:
+            await run_sync(_run_on_commit, callbacks)
+        return False
+
+
+def _run_on_commit(callbacks):
+    for func in callbacks:
+        func()
+
+
+def on_commit(func, using=None):
+    """
+    Call ``func`` once the atomic() block open on ``using`` commits, or
+    right away outside one. It's dropped if the block, or the savepoint it
+    was registered in, rolls back. The functions of an async block are
+    called in the database thread pool, after the block's connection is
+    released.
+    """
+    using = using or DEFAULT_DB_ALIAS
+    connection = get_connection(using) or get_async_connection(using)
+    if connection is None:
+        func()
+    else:
+        connection.info.setdefault(ON_COMMIT, []).append(func)
+
+
+def atomic(using=None, savepoint=True):
+    """
+    Run a block, or every call of the decorated function, in a transaction
+    on the database ``using``. ``savepoint=False`` makes a nested block join
+    the enclosing transaction instead of opening a savepoint: if it fails,
+    the whole transaction is rolled back when the outermost block exits.
+    """
+    # Bare @atomic: ``using`` is the decorated function.
+    if callable(using):
+        return Atomic(DEFAULT_DB_ALIAS, savepoint)(using)
+    return Atomic(using, savepoint)
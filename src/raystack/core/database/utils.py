@@ -0,0 +1,190 @@
+"""
+Several databases: one backend per DATABASES alias, and the router choosing
+the alias each query runs on.
+"""
+import itertools
+import threading
+import time
+from types import SimpleNamespace
+
+from raystack.conf import get_snapshot
+from raystack.core.exceptions import ImproperlyConfigured
+from raystack.core.signals import receiver, setting_changed
+from raystack.utils.connection import BaseConnectionHandler, ConnectionDoesNotExist
+from raystack.utils.functional import cached_property
+from raystack.utils.module_loading import import_string
+
+DEFAULT_DB_ALIAS = "default"
+
+__all__ = [
+    "DEFAULT_DB_ALIAS",
+    "ConnectionDoesNotExist",
+    "ConnectionHandler",
+    "ConnectionRouter",
+]
+
+
+class ConnectionHandler(BaseConnectionHandler):
+    """
+    The backends of the DATABASES aliases. Each backend owns an engine and
+    its connection pool, so unlike cache connections they're shared by every
+    thread and task rather than kept per context.
+    """
+
+    settings_name = "DATABASES"
+
+    def __init__(self, settings=None):
+        super().__init__(settings)
+        self._connections = SimpleNamespace()
+        self._lock = threading.Lock()
+
+    def configure_settings(self, databases):
+        if databases is None:
+            # The snapshot the backends read their URL and OPTIONS from, so
+            # both agree on DATABASES after reload_settings().
+            databases = getattr(get_snapshot(), self.settings_name, {})
+        databases = super().configure_settings(databases)
+        if not databases:
+            databases = {DEFAULT_DB_ALIAS: {}}
+        if DEFAULT_DB_ALIAS not in databases:
+            raise ImproperlyConfigured(
+                "You must define a '%s' database." % DEFAULT_DB_ALIAS
+            )
+        for alias, conn in databases.items():
+            for replica in conn.get("REPLICAS", []):
+                if replica not in databases:
+                    raise ImproperlyConfigured(
+                        "DATABASES['%s']['REPLICAS'] names '%s', which isn't in "
+                        "DATABASES." % (alias, replica)
+                    )
+        return databases
+
+    def __getitem__(self, alias):
+        backend = getattr(self._connections, alias, None)
+        if backend is None:
+            with self._lock:
+                backend = getattr(self._connections, alias, None)
+                if backend is None:
+                    backend = super().__getitem__(alias)
+        return backend
+
+    def create_connection(self, alias):
+        if alias == DEFAULT_DB_ALIAS:
+            # The module-level backend, so code holding on to it (and
+            # db.database_url overrides) keeps working.
+            from raystack.core.database.sqlalchemy import db
+
+            return db
+        from raystack.core.database.sqlalchemy import SQLAlchemyBackend
+
+        return SQLAlchemyBackend(self.settings[alias].get("URL"), alias=alias)
+
+
+class ConnectionRouter:
+    """
+    Pick the database for each query. The routers in DATABASE_ROUTERS are
+    asked in order (``db_for_read(model, **hints)`` and
+    ``db_for_write(model, **hints)``; None means "no opinion"), falling back
+    to the instance's own database, then the default one.
+
+    Reads sent to a database with REPLICAS go to one of the replicas instead,
+    in turn, unless an atomic() block is open on that database. A replica
+    that fails with a connection error is skipped for
+    DATABASE_REPLICA_RETRY_AFTER seconds.
+    """
+
+    def __init__(self, routers=None):
+        self._routers = routers
+        self._replica_cycles = {}
+        self._unhealthy = {}
+        self._lock = threading.Lock()
+
+    @cached_property
+    def routers(self):
+        if self._routers is None:
+            self._routers = getattr(get_snapshot(), "DATABASE_ROUTERS", [])
+        return [
+            import_string(router)() if isinstance(router, str) else router
+            for router in self._routers
+        ]
+
+    def _route(self, action, model, **hints):
+        for router in self.routers:
+            method = getattr(router, action, None)
+            if method is not None:
+                chosen = method(model, **hints)
+                if chosen:
+                    return chosen
+        instance = hints.get("instance")
+        if instance is not None:
+            alias = instance.__dict__.get("_db")
+            if alias:
+                return alias
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        return self._route("db_for_write", model, **hints)
+
+    def db_for_read(self, model, **hints):
+        return self.replica_for(self._route("db_for_read", model, **hints))
+
+    def replica_for(self, alias):
+        """Return the alias a read sent to ``alias`` should run on."""
+        replicas = connections.settings[alias].get("REPLICAS")
+        if not replicas:
+            return alias
+        from raystack.core.database.transaction import in_atomic_block
+
+        if in_atomic_block(alias):
+            return alias
+        cycle = self._replica_cycles.get(alias)
+        if cycle is None:
+            cycle = self._replica_cycles.setdefault(alias, itertools.cycle(replicas))
+        for _ in range(len(replicas)):
+            replica = next(cycle)
+            if self.is_healthy(replica):
+                return replica
+        return alias
+
+    def primary_for(self, alias):
+        """Return the database ``alias`` is a replica of, or None."""
+        for primary, conn in connections.settings.items():
+            if alias in conn.get("REPLICAS", ()):
+                return primary
+        return None
+
+    def mark_unhealthy(self, alias):
+        retry_after = getattr(get_snapshot(), "DATABASE_REPLICA_RETRY_AFTER", 30)
+        with self._lock:
+            self._unhealthy[alias] = time.monotonic() + retry_after
+
+    def is_healthy(self, alias):
+        retry_at = self._unhealthy.get(alias)
+        return retry_at is None or retry_at <= time.monotonic()
+
+
+def is_connection_error(exc):
+    """Whether ``exc`` means the database couldn't be reached."""
+    from sqlalchemy.exc import DBAPIError, InterfaceError, OperationalError
+
+    if isinstance(exc, DBAPIError) and exc.connection_invalidated:
+        return True
+    return isinstance(exc, (OperationalError, InterfaceError, ConnectionError, OSError))
+
+
+connections = ConnectionHandler()
+router = ConnectionRouter()
+
+
+@receiver(setting_changed)
+def reset_databases(*, setting, **kwargs):
+    """
+    Read DATABASES and DATABASE_ROUTERS again when they change. Backends
+    already opened keep their engines: a new URL for them takes a restart.
+    """
+    if setting == "DATABASES":
+        connections._settings = None
+        connections.__dict__.pop("settings", None)
+    elif setting == "DATABASE_ROUTERS":
+        router._routers = None
+        router.__dict__.pop("routers", None)
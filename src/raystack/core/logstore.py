@@ -0,0 +1,339 @@
+"""
+A structured log store the admin can search and tail.
+
+With LOG_STORE_ENABLED = True the loggers named in LOG_STORE_LOGGERS hand
+their records to a queue; a writer thread takes them off it and inserts
+them into a SQLite file (LOG_STORE_PATH), a batch per transaction. Logging
+a record only formats it and puts it on the queue, so requests don't wait
+for the disk. When the queue is full (LOG_STORE_QUEUE_SIZE records), new
+records are dropped and counted rather than blocking.
+
+Each record is a row with its time, level, logger, function, message and
+traceback, and the user and client IP of the request it was logged for,
+taken from the ``user``/``ip_address`` or ``request`` extras:
+
+    logger.warning("Login failed", extra={"request": request})
+
+Rows are indexed by time, level and logger, and numbered in the order they
+were written, so a page of the newest rows and the rows written after a
+known one are index lookups however big the file gets. Only the newest
+LOG_STORE_MAX_ROWS rows are kept. Several worker processes may share the
+file.
+"""
+import logging
+import queue
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from logging.handlers import QueueHandler
+
+__all__ = ["LEVELS", "LogStore", "LogStoreHandler", "get_store", "install"]
+
+LEVELS = ("DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL")
+
+COLUMNS = ("created", "levelno", "levelname", "logger", "function", "lineno", "message", "details", "user", "ip_address")
+
+SCHEMA = (
+    'CREATE TABLE IF NOT EXISTS "logs" ('
+    '"id" INTEGER PRIMARY KEY, "created" REAL NOT NULL, "levelno" INTEGER NOT NULL, '
+    '"levelname" TEXT NOT NULL, "logger" TEXT NOT NULL, "function" TEXT, "lineno" INTEGER, '
+    '"message" TEXT NOT NULL, "details" TEXT, "user" TEXT, "ip_address" TEXT)',
+    'CREATE INDEX IF NOT EXISTS "logs_created" ON "logs" ("created")',
+    'CREATE INDEX IF NOT EXISTS "logs_levelno" ON "logs" ("levelno", "id")',
+    'CREATE INDEX IF NOT EXISTS "logs_logger" ON "logs" ("logger", "id")',
+    # Rows per level, kept by the writers so the totals aren't counted.
+    'CREATE TABLE IF NOT EXISTS "logs_counts" ("levelno" INTEGER PRIMARY KEY, "count" INTEGER NOT NULL)',
+)
+
+INSERT = 'INSERT INTO "logs" (%s) VALUES (%s)' % (
+    ", ".join('"%s"' % column for column in COLUMNS),
+    ", ".join("?" * len(COLUMNS)),
+)
+COUNT = (
+    'INSERT INTO "logs_counts" ("levelno", "count") VALUES (?, ?) '
+    'ON CONFLICT ("levelno") DO UPDATE SET "count" = "count" + excluded."count"'
+)
+
+
+class LogStore:
+    def __init__(self, path, max_rows=None):
+        self.path = path
+        self.max_rows = max_rows
+        self._local = threading.local()
+        self._created = False
+        self._lock = threading.Lock()
+        # Rows this process has written since it last dropped old ones.
+        self._unpruned = 0
+
+    def _connection(self):
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            connection.row_factory = sqlite3.Row
+            # Readers don't wait for the writer, nor writers of other
+            # processes for each other longer than a batch.
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        if not self._created:
+            with self._lock:
+                if not self._created:
+                    for statement in SCHEMA:
+                        connection.execute(statement)
+                    self._created = True
+        return connection
+
+    def write(self, rows):
+        """Insert ``rows`` (tuples of COLUMNS) in one transaction."""
+        if not rows:
+            return
+        counts = {}
+        for row in rows:
+            counts[row[1]] = counts.get(row[1], 0) + 1
+        connection = self._connection()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            connection.executemany(INSERT, rows)
+            connection.executemany(COUNT, counts.items())
+            self._unpruned += len(rows)
+            if self.max_rows and self._unpruned >= max(self.max_rows // 10, 1):
+                self._prune(connection)
+                self._unpruned = 0
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        connection.execute("COMMIT")
+
+    def _prune(self, connection):
+        """Drop the rows older than the newest ``max_rows``."""
+        last_id = connection.execute('SELECT MAX("id") FROM "logs"').fetchone()[0] or 0
+        cutoff = last_id - self.max_rows
+        if cutoff <= 0:
+            return
+        dropped = connection.execute(
+            'SELECT "levelno", COUNT(*) FROM "logs" WHERE "id" <= ? GROUP BY "levelno"', (cutoff,)
+        ).fetchall()
+        connection.execute('DELETE FROM "logs" WHERE "id" <= ?', (cutoff,))
+        connection.executemany(
+            'UPDATE "logs_counts" SET "count" = "count" - ? WHERE "levelno" = ?',
+            [(count, levelno) for levelno, count in dropped],
+        )
+
+    @staticmethod
+    def _where(level=None, logger=None, since=None, until=None):
+        conditions, params = [], []
+        if level:
+            conditions.append('"levelno" = ?')
+            params.append(logging.getLevelName(level) if isinstance(level, str) else level)
+        if logger:
+            # The logger and its children: "raystack" matches "raystack.db",
+            # as a range the index serves ("/" sorts right after ".").
+            conditions.append('("logger" = ? OR ("logger" >= ? AND "logger" < ?))')
+            params.extend((logger, logger + ".", logger + "/"))
+        if since is not None:
+            conditions.append('"created" >= ?')
+            params.append(_timestamp(since))
+        if until is not None:
+            conditions.append('"created" < ?')
+            params.append(_timestamp(until))
+        return conditions, params
+
+    def search(self, level=None, logger=None, since=None, until=None, before=None, limit=100):
+        """
+        The newest ``limit`` rows matching the filters, as dicts, newest first.
+        ``before`` is the id of the last row of the previous page.
+        """
+        conditions, params = self._where(level, logger, since, until)
+        if before is not None:
+            conditions.append('"id" < ?')
+            params.append(before)
+        query = 'SELECT * FROM "logs"'
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += ' ORDER BY "id" DESC LIMIT ?'
+        rows = self._connection().execute(query, params + [limit]).fetchall()
+        return [_entry(row) for row in rows]
+
+    def tail(self, after, level=None, logger=None, limit=100):
+        """The rows matching the filters written after row ``after``, oldest first."""
+        conditions, params = self._where(level, logger)
+        conditions.append('"id" > ?')
+        params.append(after)
+        query = 'SELECT * FROM "logs" WHERE %s ORDER BY "id" LIMIT ?' % " AND ".join(conditions)
+        rows = self._connection().execute(query, params + [limit]).fetchall()
+        return [_entry(row) for row in rows]
+
+    def last_id(self):
+        return self._connection().execute('SELECT MAX("id") FROM "logs"').fetchone()[0] or 0
+
+    def counts(self):
+        """{level name: rows} of the whole store."""
+        rows = self._connection().execute('SELECT "levelno", "count" FROM "logs_counts"').fetchall()
+        counts = dict.fromkeys(LEVELS, 0)
+        for levelno, count in rows:
+            name = logging.getLevelName(levelno)
+            counts[name] = counts.get(name, 0) + count
+        return counts
+
+    def clear(self):
+        connection = self._connection()
+        connection.execute("BEGIN IMMEDIATE")
+        connection.execute('DELETE FROM "logs"')
+        connection.execute('DELETE FROM "logs_counts"')
+        connection.execute("COMMIT")
+
+    def close(self):
+        connection = getattr(self._local, "connection", None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
+
+
+def _timestamp(value):
+    return value.timestamp() if isinstance(value, datetime) else float(value)
+
+
+def _entry(row):
+    entry = dict(row)
+    entry["timestamp"] = datetime.fromtimestamp(entry["created"])
+    entry["level"] = entry["levelname"]
+    return entry
+
+
+_formatter = logging.Formatter()
+
+
+class LogStoreHandler(QueueHandler):
+    """
+    Put records on a queue, as rows, for a thread writing them to ``store``
+    ``batch_size`` at a time.
+    """
+
+    def __init__(self, store, level=logging.NOTSET, queue_size=10000, batch_size=500):
+        super().__init__(queue.Queue(queue_size))
+        self.setLevel(level)
+        self.store = store
+        self.batch_size = batch_size
+        # Records dropped because the queue was full.
+        self.dropped = 0
+        self._thread = threading.Thread(target=self._run, name="raystack-log-writer", daemon=True)
+        self._thread.start()
+
+    def prepare(self, record):
+        details = None
+        if record.exc_info:
+            details = (self.formatter or _formatter).formatException(record.exc_info)
+        elif record.exc_text:
+            details = record.exc_text
+        elif record.stack_info:
+            details = record.stack_info
+        user = getattr(record, "user", None)
+        ip_address = getattr(record, "ip_address", None)
+        request = getattr(record, "request", None)
+        scope = getattr(request, "scope", None)
+        if isinstance(scope, dict):
+            if user is None:
+                user = scope.get("user")
+            if ip_address is None and scope.get("client"):
+                ip_address = scope["client"][0]
+        if user is not None and not isinstance(user, str):
+            user = getattr(user, "name", None) or getattr(user, "username", None) or getattr(user, "email", None)
+        return (
+            record.created, record.levelno, record.levelname, record.name, record.funcName,
+            record.lineno, record.getMessage(), details, user, ip_address,
+        )
+
+    def enqueue(self, row):
+        try:
+            self.queue.put_nowait(row)
+        except queue.Full:
+            self.dropped += 1
+
+    def _run(self):
+        while True:
+            batch = [self.queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            stop = None in batch
+            rows = [row for row in batch if row is not None]
+            try:
+                self.store.write(rows)
+            except Exception:
+                # Not logged: the record would come back here.
+                self.dropped += len(rows)
+                time.sleep(1)
+            for _ in batch:
+                self.queue.task_done()
+            if stop:
+                return
+
+    def flush(self, timeout=5):
+        """Wait up to ``timeout`` seconds for the queued records to be written."""
+        deadline = time.monotonic() + timeout
+        with self.queue.all_tasks_done:
+            while self.queue.unfinished_tasks:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self.queue.all_tasks_done.wait(remaining)
+        return True
+
+    def close(self):
+        # Called by logging.shutdown() at exit: write what's queued.
+        if self._thread.is_alive():
+            try:
+                self.queue.put(None, timeout=1)
+            except queue.Full:
+                pass
+            self._thread.join(5)
+        super().close()
+
+
+_store = None
+_handler = None
+_lock = threading.RLock()
+
+
+def get_store():
+    """The LogStore at LOG_STORE_PATH."""
+    global _store
+    if _store is None:
+        from raystack.conf import settings
+
+        with _lock:
+            if _store is None:
+                _store = LogStore(
+                    getattr(settings, "LOG_STORE_PATH", "logs.sqlite3"),
+                    max_rows=getattr(settings, "LOG_STORE_MAX_ROWS", 100000),
+                )
+    return _store
+
+
+def install():
+    """Send the records of LOG_STORE_LOGGERS to the store; return the handler."""
+    global _handler
+    from raystack.conf import settings
+
+    with _lock:
+        if _handler is not None:
+            return _handler
+        level = getattr(settings, "LOG_STORE_LEVEL", "INFO")
+        if isinstance(level, str):
+            level = logging.getLevelName(level.upper())
+        _handler = LogStoreHandler(
+            get_store(),
+            level=level,
+            queue_size=getattr(settings, "LOG_STORE_QUEUE_SIZE", 10000),
+            batch_size=getattr(settings, "LOG_STORE_BATCH_SIZE", 500),
+        )
+        for name in getattr(settings, "LOG_STORE_LOGGERS", ["raystack", "uvicorn"]):
+            logger = logging.getLogger(name)
+            # A logger nobody configured passes on WARNING and up only.
+            if logger.level == logging.NOTSET and logger.getEffectiveLevel() > level:
+                logger.setLevel(level)
+            logger.addHandler(_handler)
+        return _handler
@@ -0,0 +1,110 @@
+import os
+import shutil
+
+from raystack.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = (
+        "Collect static files from the framework, STATICFILES_DIRS and "
+        "installed apps into STATIC_ROOT, with content-hashed names and "
+        "precompressed (.gz/.br) variants."
+    )
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--clear",
+            "-c",
+            action="store_true",
+            help="Clear the existing files in STATIC_ROOT before collecting.",
+        )
+        parser.add_argument(
+            "--no-post-process",
+            action="store_false",
+            dest="post_process",
+            help="Do NOT write hashed copies and the manifest.",
+        )
+        parser.add_argument(
+            "--no-compress",
+            action="store_false",
+            dest="compress",
+            help="Do NOT write .gz/.br variants of the collected files.",
+        )
+        parser.add_argument(
+            "--dry-run",
+            "-n",
+            action="store_true",
+            help="Do everything except modify the filesystem.",
+        )
+
+    def handle(self, **options):
+        from raystack.contrib.staticfiles.finders import get_finders
+        from raystack.contrib.staticfiles.storage import staticfiles_storage
+        from raystack.contrib.staticfiles.utils import compress_file
+        from raystack.core.exceptions import ImproperlyConfigured
+
+        verbosity = options.get("verbosity", 1)
+        dry_run = options["dry_run"]
+        storage = staticfiles_storage
+
+        try:
+            root = storage.path("")
+        except ImproperlyConfigured as e:
+            raise CommandError(str(e))
+
+        if options["clear"] and os.path.isdir(root):
+            if verbosity >= 1:
+                self.stdout.write(f"Clearing '{root}'")
+            if not dry_run:
+                shutil.rmtree(root)
+
+        found = {}
+        for finder in get_finders():
+            for path, source in finder.list():
+                # The first finder to provide a path wins.
+                found.setdefault(path, source)
+
+        copied = unmodified = 0
+        for path, source in found.items():
+            target = storage.path(path)
+            if self._is_unmodified(source, target):
+                unmodified += 1
+                continue
+            if verbosity >= 2:
+                self.stdout.write(f"Copying '{source}'")
+            if not dry_run:
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                shutil.copy2(source, target)
+            copied += 1
+
+        processed = []
+        if options["post_process"]:
+            for original, hashed in storage.post_process(list(found), dry_run):
+                if verbosity >= 2:
+                    self.stdout.write(f"Post-processed '{original}' as '{hashed}'")
+                processed.append(hashed)
+
+        compressed = 0
+        if options["compress"] and not dry_run:
+            for path in (*found, *processed):
+                compressed += len(compress_file(storage.path(path)))
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{copied} static files copied to '{root}', {unmodified} unmodified, "
+                f"{len(processed)} post-processed, {compressed} compressed variants "
+                "written."
+            )
+        )
+
+    def _is_unmodified(self, source, target):
+        try:
+            target_stat = os.stat(target)
+        except FileNotFoundError:
+            return False
+        source_stat = os.stat(source)
+        return (
+            source_stat.st_size == target_stat.st_size
+            and int(source_stat.st_mtime) == int(target_stat.st_mtime)
+        )
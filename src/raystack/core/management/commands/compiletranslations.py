@@ -0,0 +1,41 @@
+from raystack.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = (
+        "Merge the translation catalogs of each language from every locale "
+        "directory into LOCALE_CACHE_DIR, which the server then maps into "
+        "memory instead of reading the catalogs. Run it again after changing "
+        "translations."
+    )
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--locale",
+            "-l",
+            action="append",
+            dest="languages",
+            help="Language(s) to compile (default: all of LANGUAGES).",
+        )
+        parser.add_argument(
+            "--output",
+            "-o",
+            help="Directory to write the catalogs to (default: LOCALE_CACHE_DIR).",
+        )
+
+    def handle(self, **options):
+        from raystack.conf import settings
+        from raystack.utils.translation import trans_real
+
+        directory = options["output"] or settings.LOCALE_CACHE_DIR
+        if not directory:
+            raise CommandError("Set LOCALE_CACHE_DIR or pass --output.")
+        languages = options["languages"] or [code for code, name in settings.LANGUAGES]
+        compiled = trans_real.compile_catalogs(directory, languages)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{compiled} of {len(languages)} languages have translations, "
+                f"compiled to '{directory}'."
+            )
+        )
@@ -90,7 +90,7 @@ class Command(BaseCommand):
         # Run async operations
         import asyncio
         
-        async def create_superuser_sync():
+        async def create_superuser():
             # Check if user already exists
             existing_user = await UserModel.objects.filter(email=email).first()
             if existing_user:
@@ -135,27 +135,9 @@ class Command(BaseCommand):
             except Exception as e:
                 raise CommandError(f"Error creating superuser: {e}")
 
-        # Run the sync function
-        # Temporarily override should_use_async to use synchronous operations
-        try:
-            import raystack.core.database.query
-            original_should_use_async = raystack.core.database.query.should_use_async
-        except ImportError as e:
-            self.stdout.write(
-                self.style.ERROR(f'Failed to import database module: {e}')
-            )
-            return
-        
-        def force_sync():
-            return False
-        
-        raystack.core.database.query.should_use_async = force_sync
-        
-        try:
-            asyncio.get_event_loop().run_until_complete(create_superuser_sync())
-        finally:
-            # Restore original function
-            raystack.core.database.query.should_use_async = original_should_use_async
+        # The ORM calls run on whichever engine the URL names: the sync one
+        # in the database thread pool, or the async one.
+        asyncio.run(create_superuser())
     
     def _import_all_models(self):
         """Imports all models for registration in ModelMeta"""
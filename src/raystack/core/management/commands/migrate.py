@@ -22,6 +22,11 @@ class Command(BaseCommand):
             action='store_true',
             help='Show migration plan without applying'
         )
+        parser.add_argument(
+            '--database',
+            default='default',
+            help='Database alias to create missing tables on (default "default")'
+        )
 
     def handle(self, *args, **options):
         # Lazy imports to avoid errors when loading commands
@@ -67,6 +72,13 @@ class Command(BaseCommand):
                 self.stdout.write(
                     self.style.SUCCESS(f'Migrations applied to revision: {revision}')
                 )
+                # Tables without migrations, created here rather than on
+                # every application start
+                from raystack.core.database.utils import connections
+                connections[options['database']].create_tables()
+                self.stdout.write(
+                    self.style.SUCCESS(f"Missing tables created on '{options['database']}'")
+                )
             
         except Exception as e:
             self.stdout.write(
@@ -0,0 +1,133 @@
+import importlib
+import os
+import sys
+
+from raystack.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = (
+        "Run a request through the application in this process under the "
+        "sampling profiler and report where the time went."
+    )
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="The path to request, e.g. /admin/users.")
+        parser.add_argument(
+            "--app",
+            default="core:app",
+            help='The application, as "module:attribute" (default "core:app").',
+        )
+        parser.add_argument("--method", default="GET", help="HTTP method (default GET).")
+        parser.add_argument(
+            "-H",
+            "--header",
+            action="append",
+            default=[],
+            help='A request header, as "Name: value". Can be repeated.',
+        )
+        parser.add_argument("--data", help="The request body.")
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=1,
+            help="Number of times to run the request (default 1).",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=0.001,
+            help="Seconds between stack samples (default 0.001).",
+        )
+        parser.add_argument(
+            "--format",
+            choices=["top", "collapsed", "flamegraph"],
+            default="top",
+            help="Report the busiest functions (top), or write collapsed stacks "
+            "or an SVG flame graph.",
+        )
+        parser.add_argument("--output", help="Write the report to this file.")
+        parser.add_argument(
+            "--limit",
+            type=int,
+            default=20,
+            help="Number of functions to list with --format top (default 20).",
+        )
+
+    def handle(self, **options):
+        from starlette.testclient import TestClient
+
+        from raystack.core import profiling
+
+        module_name, _, attr = options["app"].partition(":")
+        if not module_name or not attr:
+            raise CommandError('Enter the application as "module:attribute".')
+        if os.getcwd() not in sys.path:
+            sys.path.insert(0, os.getcwd())
+        try:
+            app = getattr(importlib.import_module(module_name), attr)
+        except (ImportError, AttributeError) as e:
+            raise CommandError(f"Can't load {options['app']}: {e}")
+
+        headers = {}
+        for header in options["header"]:
+            name, sep, value = header.partition(":")
+            if not sep:
+                raise CommandError(f'Invalid header {header!r}; use "Name: value".')
+            headers[name.strip()] = value.strip()
+        if options["repeat"] < 1:
+            raise CommandError("--repeat must be at least 1.")
+
+        statuses = []
+        with TestClient(app) as client:
+            with profiling.capture(options["interval"]) as profile:
+                for _ in range(options["repeat"]):
+                    response = client.request(
+                        options["method"],
+                        options["path"],
+                        headers=headers,
+                        content=options["data"],
+                        follow_redirects=False,
+                    )
+                    statuses.append(response.status_code)
+
+        stacks = profile.labelled()
+        if options["format"] == "collapsed":
+            report = profiling.collapse(stacks)
+        elif options["format"] == "flamegraph":
+            report = profiling.flamegraph(
+                stacks, title=f"{options['method']} {options['path']}"
+            )
+        else:
+            report = self.format_top(stacks, profile.samples, options["limit"])
+
+        summary = (
+            f"{options['method']} {options['path']}: {options['repeat']} request(s), "
+            f"status {', '.join(str(status) for status in sorted(set(statuses)))}, "
+            f"{profile.duration * 1000 / options['repeat']:.1f} ms each, "
+            f"{profile.samples} samples"
+        )
+        if options["output"]:
+            with open(options["output"], "w") as f:
+                f.write(report)
+            self.stdout.write(self.style.SUCCESS(summary))
+            self.stdout.write(f"Wrote {options['format']} to {options['output']}")
+        elif options["format"] == "top":
+            self.stdout.write(self.style.SUCCESS(summary))
+            self.stdout.write(report)
+        else:
+            self.stderr.write(summary)
+            self.stdout.write(report, ending="")
+
+    def format_top(self, stacks, samples, limit):
+        from raystack.core.profiling import top
+
+        if not samples:
+            return "\nNo samples; try a smaller --interval or a larger --repeat."
+        lines = ["", f"{'self':>7}  {'total':>7}  function"]
+        for label, own, total in top(stacks, limit):
+            lines.append(
+                f"{100 * own / samples:6.1f}%  {100 * total / samples:6.1f}%  {label}"
+            )
+        return "\n".join(lines)
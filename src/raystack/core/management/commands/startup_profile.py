@@ -0,0 +1,146 @@
+import os
+import subprocess
+import sys
+from collections import defaultdict
+
+from raystack.core.management.base import BaseCommand, CommandError
+
+# Executed in a fresh interpreter started with -X importtime, so that the
+# measurement isn't skewed by modules this process has imported already.
+PROBE = """
+import importlib, sys, time
+start = time.perf_counter()
+module = importlib.import_module({module!r})
+if {attr!r}:
+    getattr(module, {attr!r})
+sys.stdout.write("ready %f\\n" % (time.perf_counter() - start))
+"""
+
+
+def parse_importtime(output):
+    """
+    Parse the stderr of `python -X importtime` into a list of
+    (module, self_us, cumulative_us, depth) tuples.
+    """
+    entries = []
+    for line in output.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        try:
+            self_us, cumulative_us, name = line[len("import time:") :].split("|")
+            self_us, cumulative_us = int(self_us), int(cumulative_us)
+        except ValueError:
+            # The header line ("self [us] | cumulative | imported package").
+            continue
+        depth = (len(name) - len(name.lstrip())) // 2
+        entries.append((name.strip(), self_us, cumulative_us, depth))
+    return entries
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure how long importing the application takes and which modules "
+        "the time goes to."
+    )
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "target",
+            nargs="?",
+            default="core:app",
+            help='What to import, as "module" or "module:attribute" '
+            '(default "core:app", the application runserver serves).',
+        )
+        parser.add_argument(
+            "--limit",
+            type=int,
+            default=20,
+            help="Number of modules to list (default 20).",
+        )
+        parser.add_argument(
+            "--sort",
+            choices=["cumulative", "self"],
+            default="cumulative",
+            help="Order modules by time including (cumulative) or excluding "
+            "(self) their own imports.",
+        )
+
+    def handle(self, **options):
+        module, _, attr = options["target"].partition(":")
+        if not module:
+            raise CommandError("Enter a module to import, e.g. core:app.")
+
+        env = os.environ.copy()
+        env["PYTHONPATH"] = os.pathsep.join(
+            filter(None, [os.getcwd(), env.get("PYTHONPATH")])
+        )
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", PROBE.format(module=module, attr=attr)],
+            capture_output=True,
+            text=True,
+            env=env,
+        )
+        if result.returncode:
+            raise CommandError(
+                f"Importing {options['target']} failed:\n{result.stderr[-2000:]}"
+            )
+
+        entries = parse_importtime(result.stderr)
+        ready = next(
+            (
+                float(line.split()[1])
+                for line in result.stdout.splitlines()
+                if line.startswith("ready ")
+            ),
+            None,
+        )
+        total_us = sum(entry[1] for entry in entries)
+
+        if ready is None:
+            # Importing the target exited the interpreter (sys.exit(0) at
+            # import time) before the probe could write the line.
+            self.stdout.write(
+                self.style.WARNING(
+                    f"{options['target']} didn't report when it was ready; "
+                    f"{len(entries)} modules, {total_us / 1000:.1f} ms importing"
+                )
+            )
+        else:
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"{options['target']} ready in {ready * 1000:.1f} ms "
+                    f"({len(entries)} modules, {total_us / 1000:.1f} ms importing)"
+                )
+            )
+        if not total_us:
+            self.stdout.write(
+                self.style.WARNING(
+                    "python -X importtime recorded no import time, so there is "
+                    "no breakdown by module to show."
+                )
+            )
+            return
+
+        by_package = defaultdict(int)
+        for name, self_us, _, _ in entries:
+            by_package[name.split(".", 1)[0]] += self_us
+
+        self.stdout.write("\nBy top-level package (self time):")
+        for package, self_us in sorted(
+            by_package.items(), key=lambda item: item[1], reverse=True
+        )[: options["limit"]]:
+            self.stdout.write(
+                f"  {self_us / 1000:9.1f} ms  {100 * self_us / total_us:5.1f}%  "
+                f"{package}"
+            )
+
+        index = 1 if options["sort"] == "self" else 2
+        self.stdout.write(f"\nSlowest modules ({options['sort']}):")
+        for entry in sorted(entries, key=lambda entry: entry[index], reverse=True)[
+            : options["limit"]
+        ]:
+            self.stdout.write(
+                f"  {entry[2] / 1000:9.1f} ms cumulative  "
+                f"{entry[1] / 1000:8.1f} ms self  {entry[0]}"
+            )
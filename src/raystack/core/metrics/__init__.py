@@ -0,0 +1,49 @@
+"""
+Metrics in the Prometheus exposition format.
+
+Define metrics at module level and update them from your code:
+
+    from raystack.core.metrics import Counter
+
+    signups = Counter("myapp_signups", "Accounts created.", ["plan"])
+    signups.labels("free").inc()
+
+With METRICS_ENABLED = True the framework records its own request, database,
+template and password hashing metrics (see raystack.core.metrics.instruments)
+and serves everything at METRICS_URL. Under several worker processes set
+METRICS_MULTIPROCESS_DIR (or RAYSTACK_METRICS_DIR) to an empty directory
+shared by the workers so the endpoint reports all of them, whichever worker
+answers the scrape.
+"""
+from raystack.core.metrics.base import (
+    DEFAULT_BUCKETS,
+    Counter,
+    Gauge,
+    Histogram,
+    Registry,
+    registry,
+)
+from raystack.core.metrics.exposition import (
+    CONTENT_TYPE_LATEST,
+    MetricsApp,
+    generate_latest,
+)
+
+__all__ = [
+    "CONTENT_TYPE_LATEST",
+    "DEFAULT_BUCKETS",
+    "Counter",
+    "Gauge",
+    "Histogram",
+    "MetricsApp",
+    "Registry",
+    "generate_latest",
+    "metrics_enabled",
+    "registry",
+]
+
+
+def metrics_enabled():
+    from raystack.conf import settings
+
+    return getattr(settings, "METRICS_ENABLED", False)
@@ -0,0 +1,282 @@
+"""
+Metric types and the registry they are collected from.
+"""
+import time
+from contextlib import contextmanager
+from threading import Lock
+
+from raystack.core.metrics.values import value_class
+
+INF = float("inf")
+
+DEFAULT_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0,
+    7.5, 10.0, INF,
+)
+
+GAUGE_MODES = ("all", "sum", "livesum", "max", "min")
+
+
+class Sample:
+    __slots__ = ("name", "labels", "value")
+
+    def __init__(self, name, labels, value):
+        self.name = name
+        self.labels = labels
+        self.value = value
+
+
+class Registry:
+    """The metrics exposed by the metrics endpoint."""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = Lock()
+
+    def register(self, metric):
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError("Duplicate metric %r." % metric.name)
+            self._metrics[metric.name] = metric
+
+    def unregister(self, metric):
+        with self._lock:
+            self._metrics.pop(metric.name, None)
+
+    def get(self, name):
+        return self._metrics.get(name)
+
+    def __iter__(self):
+        with self._lock:
+            return iter(list(self._metrics.values()))
+
+
+registry = Registry()
+
+
+class Metric:
+    type = None
+
+    def __init__(self, name, documentation, labelnames=(), registry=registry):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children = {}
+        self._lock = Lock()
+        if not self.labelnames:
+            self._children[()] = self._new_child(())
+        if registry is not None:
+            registry.register(self)
+
+    def labels(self, *labelvalues, **labelkwargs):
+        """Return the child metric for these label values."""
+        if labelkwargs:
+            labelvalues = tuple(labelkwargs[name] for name in self.labelnames)
+        labelvalues = tuple(str(value) for value in labelvalues)
+        if len(labelvalues) != len(self.labelnames):
+            raise ValueError("Incorrect label count for %r." % self.name)
+        child = self._children.get(labelvalues)
+        if child is None:
+            with self._lock:
+                child = self._children.get(labelvalues)
+                if child is None:
+                    child = self._children[labelvalues] = self._new_child(labelvalues)
+        return child
+
+    def _unlabelled(self):
+        if self.labelnames:
+            raise ValueError("%r has labels; call labels() first." % self.name)
+        return self._children[()]
+
+    def _new_child(self, labelvalues):
+        raise NotImplementedError
+
+    def collect(self):
+        """Return this process's samples."""
+        samples = []
+        for labelvalues, child in list(self._children.items()):
+            labels = dict(zip(self.labelnames, labelvalues))
+            samples.extend(child._samples(self.name, labels))
+        return samples
+
+
+class _Value:
+    def __init__(self, metric, labelvalues, suffix="", mode=""):
+        self._value = value_class()(
+            metric.type,
+            metric.name,
+            metric.name + suffix,
+            metric.labelnames,
+            labelvalues,
+            mode,
+        )
+
+
+class CounterChild(_Value):
+    def __init__(self, metric, labelvalues):
+        super().__init__(metric, labelvalues, "_total")
+
+    def inc(self, amount=1):
+        if amount < 0:
+            raise ValueError("Counters can only be incremented.")
+        self._value.inc(amount)
+
+    def get(self):
+        return self._value.get()
+
+    def _samples(self, name, labels):
+        return [Sample(name + "_total", labels, self._value.get())]
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def _new_child(self, labelvalues):
+        return CounterChild(self, labelvalues)
+
+    def inc(self, amount=1):
+        self._unlabelled().inc(amount)
+
+
+class GaugeChild(_Value):
+    def __init__(self, metric, labelvalues):
+        super().__init__(metric, labelvalues, mode=metric.multiprocess_mode)
+
+    def inc(self, amount=1):
+        self._value.inc(amount)
+
+    def dec(self, amount=1):
+        self._value.inc(-amount)
+
+    def set(self, value):
+        self._value.set(float(value))
+
+    def get(self):
+        return self._value.get()
+
+    @contextmanager
+    def track_inprogress(self):
+        self.inc()
+        try:
+            yield
+        finally:
+            self.dec()
+
+    def _samples(self, name, labels):
+        return [Sample(name, labels, self._value.get())]
+
+
+class Gauge(Metric):
+    """
+    A value that goes up and down. With several worker processes,
+    ``multiprocess_mode`` says how their values combine: ``all`` (one series
+    per pid), ``sum``, ``livesum`` (sum over running workers), ``max`` or
+    ``min``.
+    """
+
+    type = "gauge"
+
+    def __init__(self, name, documentation, labelnames=(), registry=registry,
+                 multiprocess_mode="livesum"):
+        if multiprocess_mode not in GAUGE_MODES:
+            raise ValueError("Invalid multiprocess mode %r." % multiprocess_mode)
+        self.multiprocess_mode = multiprocess_mode
+        super().__init__(name, documentation, labelnames, registry)
+
+    def _new_child(self, labelvalues):
+        return GaugeChild(self, labelvalues)
+
+    def inc(self, amount=1):
+        self._unlabelled().inc(amount)
+
+    def dec(self, amount=1):
+        self._unlabelled().dec(amount)
+
+    def set(self, value):
+        self._unlabelled().set(value)
+
+    def track_inprogress(self):
+        return self._unlabelled().track_inprogress()
+
+
+class HistogramChild:
+    def __init__(self, metric, labelvalues):
+        self._upper_bounds = metric.buckets
+        make_value = value_class()
+        labelnames = metric.labelnames + ("le",)
+        self._buckets = [
+            make_value(
+                metric.type,
+                metric.name,
+                metric.name + "_bucket",
+                labelnames,
+                labelvalues + (format_value(bound),),
+            )
+            for bound in metric.buckets
+        ]
+        self._sum = make_value(
+            metric.type, metric.name, metric.name + "_sum", metric.labelnames, labelvalues
+        )
+
+    def observe(self, amount):
+        self._sum.inc(amount)
+        for bound, bucket in zip(self._upper_bounds, self._buckets):
+            if amount <= bound:
+                bucket.inc(1)
+                break
+
+    @contextmanager
+    def time(self):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start)
+
+    def _samples(self, name, labels):
+        samples = []
+        total = 0.0
+        for bound, bucket in zip(self._upper_bounds, self._buckets):
+            total += bucket.get()
+            samples.append(
+                Sample(name + "_bucket", dict(labels, le=format_value(bound)), total)
+            )
+        samples.append(Sample(name + "_count", labels, total))
+        samples.append(Sample(name + "_sum", labels, self._sum.get()))
+        return samples
+
+
+class Histogram(Metric):
+    """
+    Observations counted into buckets. Each bucket stores only its own
+    observations; they're made cumulative when collected.
+    """
+
+    type = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), registry=registry,
+                 buckets=DEFAULT_BUCKETS):
+        buckets = tuple(sorted(float(bound) for bound in buckets))
+        if buckets[-1] != INF:
+            buckets += (INF,)
+        self.buckets = buckets
+        super().__init__(name, documentation, labelnames, registry)
+
+    def _new_child(self, labelvalues):
+        return HistogramChild(self, labelvalues)
+
+    def observe(self, amount):
+        self._unlabelled().observe(amount)
+
+    def time(self):
+        return self._unlabelled().time()
+
+
+def format_value(value):
+    if value == INF:
+        return "+Inf"
+    if value == -INF:
+        return "-Inf"
+    if value != value:
+        return "NaN"
+    return repr(float(value))
@@ -0,0 +1,79 @@
+"""
+Prometheus text exposition format and an ASGI app serving it.
+"""
+from raystack.core.metrics.base import format_value, registry as default_registry
+from raystack.core.metrics.values import multiprocess_dir
+
+CONTENT_TYPE_LATEST = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape_label(value):
+    return value.replace("\\", r"\\").replace("\n", r"\n").replace('"', r"\"")
+
+
+def _escape_help(text):
+    return text.replace("\\", r"\\").replace("\n", r"\n")
+
+
+def collect(registry=default_registry):
+    """Return [(name, type, documentation, samples)] for every metric."""
+    path = multiprocess_dir()
+    if path:
+        from raystack.core.metrics import multiprocess
+
+        return multiprocess.collect(path, registry)
+    return [
+        (metric.name, metric.type, metric.documentation, metric.collect())
+        for metric in registry
+    ]
+
+
+def generate_latest(registry=default_registry):
+    """Return the current metrics in the text exposition format."""
+    lines = []
+    for name, metric_type, documentation, samples in collect(registry):
+        lines.append("# HELP %s %s" % (name, _escape_help(documentation)))
+        lines.append("# TYPE %s %s" % (name, metric_type))
+        for sample in samples:
+            if sample.labels:
+                labels = "{%s}" % ",".join(
+                    '%s="%s"' % (key, _escape_label(value))
+                    for key, value in sample.labels.items()
+                )
+            else:
+                labels = ""
+            lines.append("%s%s %s" % (sample.name, labels, format_value(sample.value)))
+    lines.append("")
+    return "\n".join(lines).encode()
+
+
+class MetricsApp:
+    """ASGI app answering every GET with the current metrics."""
+
+    def __init__(self, registry=default_registry):
+        self.registry = registry
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return
+        if scope["method"] not in ("GET", "HEAD"):
+            await self._send(send, 405, b"Method Not Allowed", "text/plain")
+            return
+        body = generate_latest(self.registry)
+        await self._send(
+            send, 200, b"" if scope["method"] == "HEAD" else body, CONTENT_TYPE_LATEST,
+            len(body),
+        )
+
+    @staticmethod
+    async def _send(send, status, body, content_type, length=None):
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": [
+                (b"content-type", content_type.encode()),
+                (b"content-length", str(len(body) if length is None else length).encode()),
+                (b"cache-control", b"no-store"),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,136 @@
+"""
+The metrics Raystack records about itself when METRICS_ENABLED is on.
+
+This module is only imported once metrics are enabled, so the metrics below
+don't exist (and cost nothing) otherwise.
+"""
+from threading import Lock
+
+from raystack.core.metrics.base import Counter, Gauge, Histogram
+
+FAST_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5,
+)
+
+HTTP_REQUEST_DURATION = Histogram(
+    "raystack_http_request_duration_seconds",
+    "Time spent handling HTTP requests, by route template.",
+    ["method", "route"],
+)
+HTTP_REQUESTS = Counter(
+    "raystack_http_requests",
+    "HTTP requests handled, by route template and status code.",
+    ["method", "route", "status"],
+)
+HTTP_REQUESTS_IN_FLIGHT = Gauge(
+    "raystack_http_requests_in_flight",
+    "HTTP requests currently being handled.",
+)
+
+DB_QUERIES = Counter(
+    "raystack_db_queries",
+    "Statements run through the database backend, by statement type.",
+    ["statement"],
+)
+DB_QUERY_DURATION = Histogram(
+    "raystack_db_query_duration_seconds",
+    "Time spent running statements, by statement type.",
+    ["statement"],
+    buckets=FAST_BUCKETS,
+)
+DB_POOL_SIZE = Gauge(
+    "raystack_db_pool_size",
+    "Configured size of the connection pool.",
+    ["engine"],
+)
+DB_POOL_CHECKED_OUT = Gauge(
+    "raystack_db_pool_checked_out",
+    "Connections currently checked out of the pool.",
+    ["engine"],
+)
+DB_POOL_OVERFLOW = Gauge(
+    "raystack_db_pool_overflow",
+    "Connections open beyond the pool size.",
+    ["engine"],
+)
+DB_POOL_ACQUIRE = Histogram(
+    "raystack_db_pool_acquire_seconds",
+    "Time spent waiting for a connection from the pool.",
+    ["engine"],
+    buckets=FAST_BUCKETS,
+)
+
+TEMPLATE_RENDER = Histogram(
+    "raystack_template_render_seconds",
+    "Time spent rendering templates, by template name.",
+    ["template"],
+    buckets=FAST_BUCKETS,
+)
+
+PASSWORD_HASH_QUEUED = Gauge(
+    "raystack_password_hash_queue_depth",
+    "Password hash or check calls waiting for an executor thread.",
+)
+PASSWORD_HASH_IN_PROGRESS = Gauge(
+    "raystack_password_hash_in_progress",
+    "Password hash or check calls running in an executor thread.",
+)
+
+_STATEMENTS = {"SELECT", "INSERT", "UPDATE", "DELETE", "CREATE", "DROP", "ALTER", "PRAGMA"}
+
+_installed = False
+_install_lock = Lock()
+
+
+def statement_type(sql):
+    words = sql.split(None, 1)
+    keyword = words[0].upper() if words else ""
+    return keyword if keyword in _STATEMENTS else "OTHER"
+
+
+def observe_query(sql, params, duration, rows):
+    statement = statement_type(sql)
+    DB_QUERIES.labels(statement).inc()
+    DB_QUERY_DURATION.labels(statement).observe(duration)
+
+
+def install():
+    """Start recording query metrics. Safe to call more than once."""
+    global _installed
+    from raystack.core.database.instrumentation import query_listeners
+
+    with _install_lock:
+        if not _installed:
+            query_listeners.append(observe_query)
+            _installed = True
+
+
+def instrument_engine(engine, label):
+    """
+    Track the pool of a SQLAlchemy ``engine`` under ``label``. Return the
+    histogram child to time connection acquisition with.
+    """
+    from sqlalchemy import event
+
+    install()
+    pool = engine.pool
+    checked_out = DB_POOL_CHECKED_OUT.labels(label)
+    overflow = DB_POOL_OVERFLOW.labels(label)
+    if callable(getattr(pool, "size", None)):
+        DB_POOL_SIZE.labels(label).set(pool.size())
+
+    def update_overflow():
+        if callable(getattr(pool, "overflow", None)):
+            overflow.set(max(pool.overflow(), 0))
+
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        checked_out.inc()
+        update_overflow()
+
+    def on_checkin(dbapi_connection, connection_record):
+        checked_out.dec()
+        update_overflow()
+
+    event.listen(pool, "checkout", on_checkout)
+    event.listen(pool, "checkin", on_checkin)
+    return DB_POOL_ACQUIRE.labels(label)
@@ -0,0 +1,97 @@
+"""
+Combine the metric files written by every worker process.
+"""
+import glob
+import json
+import os
+
+from raystack.core.metrics.base import Sample, format_value
+from raystack.core.metrics.values import MmapedDict
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _parse_filename(path):
+    """Return (metric type, gauge mode, pid) for ``<prefix>_<pid>.db``."""
+    prefix, pid = os.path.basename(path)[:-3].rsplit("_", 1)
+    if prefix.startswith("gauge_"):
+        return "gauge", prefix[len("gauge_"):], int(pid)
+    return prefix, None, int(pid)
+
+
+def collect(path, registry):
+    """
+    Return [(name, type, documentation, samples)] aggregated across the files
+    in ``path``. Counters and histograms are summed over every process that
+    ever wrote them; gauges combine according to their multiprocess mode,
+    and ``live*`` modes skip workers that have exited.
+    """
+    metrics = {}
+    for filename in sorted(glob.glob(os.path.join(path, "*.db"))):
+        try:
+            metric_type, mode, pid = _parse_filename(filename)
+        except ValueError:
+            continue
+        if mode and mode.startswith("live") and not _pid_alive(pid):
+            continue
+        for key, value in MmapedDict.read_all(filename):
+            metric_name, name, labelnames, labelvalues = json.loads(key)
+            labels = tuple(zip(labelnames, labelvalues))
+            if mode == "all":
+                labels += (("pid", str(pid)),)
+            metric = metrics.setdefault(metric_name, {"type": metric_type, "samples": {}})
+            samples = metric["samples"]
+            sample_key = (name, labels)
+            if sample_key not in samples:
+                samples[sample_key] = value
+            elif mode == "max":
+                samples[sample_key] = max(samples[sample_key], value)
+            elif mode == "min":
+                samples[sample_key] = min(samples[sample_key], value)
+            else:
+                samples[sample_key] += value
+
+    result = []
+    for metric_name, metric in sorted(metrics.items()):
+        local = registry.get(metric_name)
+        documentation = local.documentation if local else "Multiprocess metric"
+        if metric["type"] == "histogram":
+            samples = _histogram_samples(metric_name, metric["samples"])
+        else:
+            samples = [
+                Sample(name, dict(labels), value)
+                for (name, labels), value in sorted(metric["samples"].items())
+            ]
+        result.append((metric_name, metric["type"], documentation, samples))
+    return result
+
+
+def _histogram_samples(metric_name, raw):
+    """Turn per-bucket counts into cumulative buckets, _count and _sum."""
+    series = {}
+    for (name, labels), value in raw.items():
+        if name == metric_name + "_bucket":
+            bound = dict(labels)["le"]
+            base = tuple(label for label in labels if label[0] != "le")
+            series.setdefault(base, {"buckets": {}, "sum": 0.0})["buckets"][bound] = value
+        elif name == metric_name + "_sum":
+            series.setdefault(labels, {"buckets": {}, "sum": 0.0})["sum"] = value
+    samples = []
+    for labels, data in sorted(series.items()):
+        total = 0.0
+        for bound in sorted(data["buckets"], key=float):
+            total += data["buckets"][bound]
+            samples.append(
+                Sample(metric_name + "_bucket", dict(labels, le=format_value(float(bound))), total)
+            )
+        samples.append(Sample(metric_name + "_count", dict(labels), total))
+        samples.append(Sample(metric_name + "_sum", dict(labels), data["sum"]))
+    return samples
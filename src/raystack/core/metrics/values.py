@@ -0,0 +1,218 @@
+"""
+Storage for metric values.
+
+In a single process a value is a float behind a lock. When a multiprocess
+directory is configured (METRICS_MULTIPROCESS_DIR or the RAYSTACK_METRICS_DIR
+environment variable) every process writes its values to its own
+memory-mapped file there instead, and the exposition endpoint adds the files
+of all workers together.
+"""
+import json
+import mmap
+import os
+import struct
+from threading import Lock
+
+# File layout: an 8-byte header holding the number of bytes in use, then
+# entries of [key length (int32)][key, space padded][value (double)], padded
+# so that every value is 8-byte aligned.
+_USED = struct.Struct("i")
+_KEY_LENGTH = struct.Struct("i")
+_VALUE = struct.Struct("d")
+_HEADER_SIZE = 8
+_INITIAL_SIZE = 1 << 16
+
+
+def multiprocess_dir():
+    from raystack.conf import settings
+
+    return getattr(settings, "METRICS_MULTIPROCESS_DIR", None) or os.environ.get(
+        "RAYSTACK_METRICS_DIR"
+    )
+
+
+def _padded_length(length):
+    return length + 8 - (length + _KEY_LENGTH.size) % 8
+
+
+class MmapedDict:
+    """
+    A str -> float mapping backed by a memory-mapped file.
+
+    Only the owning process writes to it. Entries are appended and the header
+    is updated last, so readers in other processes always see whole entries.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._f = open(path, "a+b")
+        capacity = os.fstat(self._f.fileno()).st_size
+        if capacity == 0:
+            capacity = _INITIAL_SIZE
+            self._f.truncate(capacity)
+        self._capacity = capacity
+        self._m = mmap.mmap(self._f.fileno(), capacity)
+        self._positions = {}
+        self._used = _USED.unpack_from(self._m, 0)[0]
+        if self._used == 0:
+            self._used = _HEADER_SIZE
+            _USED.pack_into(self._m, 0, self._used)
+        else:
+            for key, _, position in self._entries(self._m, self._used):
+                self._positions[key] = position
+
+    @staticmethod
+    def _entries(data, used):
+        position = _HEADER_SIZE
+        while position < used:
+            length = _KEY_LENGTH.unpack_from(data, position)[0]
+            position += _KEY_LENGTH.size
+            key = bytes(data[position:position + length]).decode()
+            position += _padded_length(length)
+            value = _VALUE.unpack_from(data, position)[0]
+            yield key, value, position
+            position += _VALUE.size
+
+    @classmethod
+    def read_all(cls, path):
+        """Yield (key, value) for every entry in the file at ``path``."""
+        with open(path, "rb") as fh:
+            data = fh.read()
+        if len(data) < _HEADER_SIZE:
+            return
+        used = _USED.unpack_from(data, 0)[0]
+        for key, value, _ in cls._entries(data, used):
+            yield key, value
+
+    def _grow(self, needed):
+        capacity = self._capacity
+        while capacity < needed:
+            capacity *= 2
+        self._m.close()
+        self._f.truncate(capacity)
+        self._m = mmap.mmap(self._f.fileno(), capacity)
+        self._capacity = capacity
+
+    def _add(self, key):
+        encoded = key.encode()
+        entry = (
+            _KEY_LENGTH.pack(len(encoded))
+            + encoded.ljust(_padded_length(len(encoded)))
+            + _VALUE.pack(0.0)
+        )
+        if self._used + len(entry) > self._capacity:
+            self._grow(self._used + len(entry))
+        self._m[self._used:self._used + len(entry)] = entry
+        self._used += len(entry)
+        _USED.pack_into(self._m, 0, self._used)
+        self._positions[key] = self._used - _VALUE.size
+
+    def read(self, key):
+        if key not in self._positions:
+            self._add(key)
+        return _VALUE.unpack_from(self._m, self._positions[key])[0]
+
+    def write(self, key, value):
+        if key not in self._positions:
+            self._add(key)
+        _VALUE.pack_into(self._m, self._positions[key], value)
+
+    def close(self):
+        if self._f is not None:
+            self._m.close()
+            self._f.close()
+            self._f = None
+
+
+class MutexValue:
+    """A float guarded by a lock, for single-process use."""
+
+    def __init__(self, metric_type, metric_name, name, labelnames, labelvalues, mode=""):
+        self._value = 0.0
+        self._lock = Lock()
+
+    def inc(self, amount):
+        with self._lock:
+            self._value += amount
+
+    def set(self, value):
+        with self._lock:
+            self._value = value
+
+    def get(self):
+        with self._lock:
+            return self._value
+
+
+_files = {}
+_values = []
+_pid = None
+_lock = Lock()
+
+
+def _file_prefix(metric_type, mode):
+    return "gauge_%s" % mode if metric_type == "gauge" else metric_type
+
+
+def _check_pid():
+    """
+    After a fork, start this process's own files and zero the values
+    inherited from the parent, which keeps reporting them from its files.
+    """
+    global _pid
+    pid = os.getpid()
+    if pid == _pid:
+        return
+    with _lock:
+        if pid == _pid:
+            return
+        _files.clear()
+        _pid = pid
+        for value in _values:
+            value._reset()
+
+
+def _file_for(prefix):
+    mmaped = _files.get(prefix)
+    if mmaped is None:
+        path = os.path.join(multiprocess_dir(), "%s_%d.db" % (prefix, _pid))
+        mmaped = _files[prefix] = MmapedDict(path)
+    return mmaped
+
+
+class MultiProcessValue:
+    """A float stored in this process's metrics file."""
+
+    def __init__(self, metric_type, metric_name, name, labelnames, labelvalues, mode=""):
+        self._prefix = _file_prefix(metric_type, mode)
+        self._key = json.dumps(
+            [metric_name, name, list(labelnames), list(labelvalues)]
+        )
+        _check_pid()
+        with _lock:
+            _values.append(self)
+            self._reset()
+
+    def _reset(self):
+        self._file = _file_for(self._prefix)
+        self._value = self._file.read(self._key)
+
+    def inc(self, amount):
+        _check_pid()
+        with _lock:
+            self._value += amount
+            self._file.write(self._key, self._value)
+
+    def set(self, value):
+        _check_pid()
+        with _lock:
+            self._value = value
+            self._file.write(self._key, self._value)
+
+    def get(self):
+        with _lock:
+            return self._value
+
+
+def value_class():
+    return MultiProcessValue if multiprocess_dir() else MutexValue
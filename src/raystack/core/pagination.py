@@ -0,0 +1,65 @@
+"""
+Keyset pagination.
+
+A page is the rows whose key (the primary key by default) follows the
+``after`` cursor, in key order. Unlike LIMIT/OFFSET, fetching a page costs
+the same however deep into the table it is, and rows added or deleted
+meanwhile don't shift pages:
+
+    page = await paginate(UserModel.objects.all().values("id", "name"), after, limit)
+    response = JSONResponse(page.items)
+    if page.next_cursor is not None:
+        response.headers["Link"] = next_link(request.url, page)
+
+``limit`` is capped at PAGINATION_MAX_LIMIT, and defaults to
+PAGINATION_DEFAULT_LIMIT.
+"""
+from raystack.conf import settings
+
+
+class CursorPage:
+    def __init__(self, items, next_cursor, limit):
+        self.items = items
+        # The ``after`` of the next page, or None on the last one.
+        self.next_cursor = next_cursor
+        self.limit = limit
+
+    def __repr__(self):
+        return "<CursorPage: %d items, next=%r>" % (len(self.items), self.next_cursor)
+
+
+def clamp_limit(limit):
+    """The page size to use for a requested ``limit``."""
+    if limit is None:
+        return getattr(settings, "PAGINATION_DEFAULT_LIMIT", 50)
+    return max(1, min(limit, getattr(settings, "PAGINATION_MAX_LIMIT", 500)))
+
+
+def _key_of(item, key):
+    return item[key] if isinstance(item, dict) else getattr(item, key)
+
+
+async def paginate(queryset, after=None, limit=None, key="id"):
+    """
+    Return the CursorPage of ``queryset`` after ``after``. The queryset
+    mustn't be ordered already; it's ordered by ``key``, which values()
+    querysets must select.
+    """
+    limit = clamp_limit(limit)
+    if queryset._values is not None and key not in queryset._values:
+        raise ValueError("Paginated values() querysets must select %r." % key)
+    if after is not None:
+        queryset = queryset.filter(**{key + "__gt": after})
+    # One row more than the page, to know whether there's a next one.
+    items = list(await queryset.order_by(key).get_item(slice(0, limit + 1)))
+    next_cursor = None
+    if len(items) > limit:
+        items = items[:limit]
+        next_cursor = _key_of(items[-1], key)
+    return CursorPage(items, next_cursor, limit)
+
+
+def next_link(url, page):
+    """The ``Link`` header pointing from the request ``url`` to the next page."""
+    next_url = url.include_query_params(after=page.next_cursor, limit=page.limit)
+    return '<%s>; rel="next"' % next_url
@@ -0,0 +1,351 @@
+"""
+A statistical profiler for live workers.
+
+While at least one request is being profiled, a background thread wakes up
+every PROFILING_INTERVAL seconds and reads the Python stack of every thread
+with sys._current_frames(). Nothing is traced and nothing runs in the
+profiled code itself, so the overhead is a stack walk per interval, and
+none at all while no request is profiled.
+
+Samples taken on the event loop thread are attributed to a request by
+finding the frame that registered it (ProfilingMiddleware's) in the stack.
+Samples from other threads (sync views in the threadpool) can't be tied to
+a request that way; they're attributed only while a single request is being
+profiled. Finished requests are merged into a per-route store, read by the
+admin profiling views, in the collapsed format flamegraph tools use:
+
+    root_function (file.py:10);child (other.py:42);leaf (x.py:7) 12
+"""
+import os
+import sys
+import threading
+import time
+import zlib
+from collections import Counter
+from contextlib import contextmanager
+from html import escape
+
+# Bounds on what the store keeps, so a long-running worker profiling every
+# request can't grow without limit.
+MAX_ROUTES = 200
+MAX_STACKS = 5000
+MAX_DEPTH = 128
+
+OTHER_ROUTES = "<other routes>"
+OTHER_STACKS = "[other stacks]"
+TRUNCATED = "[truncated]"
+
+# Innermost frames of a thread that's waiting rather than working.
+_IDLE_FRAMES = {
+    ("threading.py", "wait"),
+    ("threading.py", "_wait_for_tstate_lock"),
+    ("queue.py", "get"),
+    ("selectors.py", "select"),
+}
+
+_labels = {}
+
+
+def _short_filename(filename):
+    best = ""
+    for entry in sys.path:
+        if entry and filename.startswith(entry) and len(entry) > len(best):
+            best = entry
+    if best:
+        return filename[len(best):].lstrip(os.sep)
+    return filename
+
+
+def frame_label(code):
+    """Return "function (file:line)" for a code object, without semicolons."""
+    label = _labels.get(code)
+    if label is None:
+        name = getattr(code, "co_qualname", code.co_name)
+        label = "%s (%s:%d)" % (name, _short_filename(code.co_filename), code.co_firstlineno)
+        label = _labels[code] = label.replace(";", ":")
+    return label
+
+
+def _is_idle(frame):
+    code = frame.f_code
+    return (os.path.basename(code.co_filename), code.co_name) in _IDLE_FRAMES
+
+
+class Profile:
+    """
+    The stacks sampled for one request (or one capture()), as a Counter of
+    tuples of code objects, outermost first.
+    """
+
+    def __init__(self, frame=None, thread_id=None, exclude=()):
+        self.frame = frame
+        self.thread_id = thread_id
+        self.exclude = set(exclude)
+        self.stacks = Counter()
+        self.samples = 0
+        self.started = time.perf_counter()
+        self.duration = 0.0
+
+    def collapsed(self):
+        """Return the stacks in the collapsed format."""
+        return collapse(self.labelled())
+
+    def labelled(self):
+        """Return a Counter of tuples of frame labels."""
+        labelled = Counter()
+        for stack, count in self.stacks.items():
+            labelled[tuple(frame_label(code) for code in stack)] += count
+        return labelled
+
+
+class Sampler:
+    """
+    Sample the stacks of the profiles being tracked. The sampling thread
+    only runs while there's something to track.
+    """
+
+    def __init__(self, interval=0.005):
+        self.interval = interval
+        self._profiles = []
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def track(self, profile):
+        with self._lock:
+            self._profiles.append(profile)
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="raystack-profiler", daemon=True
+                )
+                self._thread.start()
+
+    def untrack(self, profile):
+        with self._lock:
+            if profile in self._profiles:
+                self._profiles.remove(profile)
+        profile.duration = time.perf_counter() - profile.started
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            with self._lock:
+                profiles = list(self._profiles)
+                if not profiles:
+                    self._thread = None
+                    return
+            self.sample(profiles)
+
+    def sample(self, profiles):
+        me = threading.get_ident()
+        owners = {}
+        loop_threads = set()
+        for profile in profiles:
+            if profile.frame is not None:
+                owners[profile.frame] = profile
+                loop_threads.add(profile.thread_id)
+        # Threads nobody registered are attributed only when it's unambiguous.
+        unowned = profiles[0] if len(profiles) == 1 else None
+
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == me or _is_idle(frame):
+                continue
+            stack = []
+            owner = None
+            while frame is not None:
+                if frame in owners:
+                    owner = owners[frame]
+                    break
+                stack.append(frame.f_code)
+                frame = frame.f_back
+            if owner is None:
+                if unowned is None or thread_id in loop_threads or thread_id in unowned.exclude:
+                    continue
+                owner = unowned
+                # Drop the thread machinery at the root of worker threads.
+                while stack and os.path.basename(stack[-1].co_filename) == "threading.py":
+                    stack.pop()
+            if not stack:
+                continue
+            stack.reverse()
+            owner.stacks[tuple(stack[:MAX_DEPTH])] += 1
+            owner.samples += 1
+
+
+class ProfileStore:
+    """Collapsed stacks of finished profiles, aggregated per route."""
+
+    def __init__(self):
+        self._routes = {}
+        self._lock = threading.Lock()
+
+    def add(self, route, profile):
+        if not profile.samples:
+            return
+        labelled = profile.labelled()
+        with self._lock:
+            if route not in self._routes and len(self._routes) >= MAX_ROUTES:
+                route = OTHER_ROUTES
+            entry = self._routes.setdefault(
+                route, {"stacks": Counter(), "samples": 0, "requests": 0, "duration": 0.0}
+            )
+            stacks = entry["stacks"]
+            for stack, count in labelled.items():
+                if len(stack) > MAX_DEPTH - 1:
+                    stack = stack[:MAX_DEPTH - 1] + (TRUNCATED,)
+                if stack not in stacks and len(stacks) >= MAX_STACKS:
+                    stack = (OTHER_STACKS,)
+                stacks[stack] += count
+            entry["samples"] += profile.samples
+            entry["requests"] += 1
+            entry["duration"] += profile.duration
+
+    def routes(self):
+        """Return [(route, requests, samples, duration)], most sampled first."""
+        with self._lock:
+            rows = [
+                (route, entry["requests"], entry["samples"], entry["duration"])
+                for route, entry in self._routes.items()
+            ]
+        return sorted(rows, key=lambda row: -row[2])
+
+    def stacks(self, route=None):
+        """
+        Return a Counter of label tuples for ``route``, or for every route
+        (each under a root frame named after it) when ``route`` is None.
+        """
+        with self._lock:
+            if route is not None:
+                entry = self._routes.get(route)
+                return Counter(entry["stacks"]) if entry else Counter()
+            combined = Counter()
+            for name, entry in self._routes.items():
+                for stack, count in entry["stacks"].items():
+                    combined[(name,) + stack] += count
+            return combined
+
+    def reset(self):
+        with self._lock:
+            self._routes.clear()
+
+
+store = ProfileStore()
+_sampler = None
+_sampler_lock = threading.Lock()
+
+
+def get_sampler():
+    global _sampler
+    if _sampler is None:
+        from raystack.conf import settings
+
+        with _sampler_lock:
+            if _sampler is None:
+                _sampler = Sampler(getattr(settings, "PROFILING_INTERVAL", 0.005))
+    return _sampler
+
+
+@contextmanager
+def capture(interval=None):
+    """
+    Sample every thread but the calling one until the block exits and yield
+    the Profile collecting them.
+    """
+    sampler = Sampler(interval) if interval else get_sampler()
+    profile = Profile(exclude=[threading.get_ident()])
+    sampler.track(profile)
+    try:
+        yield profile
+    finally:
+        sampler.untrack(profile)
+
+
+def collapse(stacks):
+    """Render a Counter of label tuples in the collapsed format."""
+    return "".join(
+        "%s %d\n" % (";".join(stack), count) for stack, count in sorted(stacks.items())
+    )
+
+
+def top(stacks, limit=20):
+    """
+    Return [(label, self, total)] for the ``limit`` functions with the most
+    samples of their own; ``total`` includes the functions they called.
+    """
+    own = Counter()
+    total = Counter()
+    for stack, count in stacks.items():
+        own[stack[-1]] += count
+        for label in set(stack):
+            total[label] += count
+    return [(label, count, total[label]) for label, count in own.most_common(limit)]
+
+
+def _build_tree(stacks):
+    root = {"name": "all", "value": 0, "children": {}}
+    for stack, count in stacks.items():
+        root["value"] += count
+        node = root
+        for label in stack:
+            node = node["children"].setdefault(
+                label, {"name": label, "value": 0, "children": {}}
+            )
+            node["value"] += count
+    return root
+
+
+def _color(name):
+    # Warm colors, stable per function so flamegraphs can be compared.
+    value = zlib.crc32(name.encode())
+    return "rgb(%d,%d,%d)" % (205 + value % 50, 80 + (value >> 8) % 130, 40 + (value >> 16) % 50)
+
+
+def flamegraph(stacks, title="Flame Graph", width=1200, frame_height=16):
+    """Render a Counter of label tuples as a self-contained SVG flame graph."""
+    root = _build_tree(stacks)
+    total = root["value"]
+    rects = []
+    depth_reached = 0
+    if total:
+        scale = (width - 20) / total
+        pending = [(root, 10.0, 0)]
+        while pending:
+            node, x, depth = pending.pop()
+            node_width = node["value"] * scale
+            if node_width < 0.5:
+                continue
+            depth_reached = max(depth_reached, depth)
+            rects.append((node, x, depth, node_width))
+            child_x = x
+            for child in sorted(node["children"].values(), key=lambda child: child["name"]):
+                pending.append((child, child_x, depth + 1))
+                child_x += child["value"] * scale
+
+    height = (depth_reached + 1) * frame_height + 50
+    parts = [
+        '<?xml version="1.0" standalone="no"?>',
+        '<svg version="1.1" width="%d" height="%d" viewBox="0 0 %d %d" '
+        'xmlns="http://www.w3.org/2000/svg">' % (width, height, width, height),
+        "<style>text { font-family: Verdana, sans-serif; font-size: 11px; fill: #000; }"
+        " rect:hover { stroke: #000; stroke-width: 0.5; }</style>",
+        '<rect x="0" y="0" width="%d" height="%d" fill="#f8f8f8"/>' % (width, height),
+        '<text x="%d" y="20" text-anchor="middle" style="font-size: 15px">%s</text>'
+        % (width // 2, escape(title)),
+    ]
+    if not total:
+        parts.append('<text x="%d" y="40" text-anchor="middle">No samples</text>' % (width // 2))
+    for node, x, depth, node_width in rects:
+        y = height - (depth + 1) * frame_height - 5
+        name = node["name"]
+        tooltip = "%s (%d samples, %.2f%%)" % (name, node["value"], 100.0 * node["value"] / total)
+        parts.append("<g><title>%s</title>" % escape(tooltip))
+        parts.append(
+            '<rect x="%.1f" y="%d" width="%.1f" height="%d" fill="%s" rx="2"/>'
+            % (x, y, node_width, frame_height - 1, "#ddd" if depth == 0 else _color(name))
+        )
+        chars = int((node_width - 6) / 7)
+        if chars >= 3:
+            text = name if len(name) <= chars else name[:chars - 2] + ".."
+            parts.append('<text x="%.1f" y="%d">%s</text>' % (x + 3, y + frame_height - 5, escape(text)))
+        parts.append("</g>")
+    parts.append("</svg>")
+    return "\n".join(parts)
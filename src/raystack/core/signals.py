@@ -0,0 +1,65 @@
+"""
+Signals: functions called when something happens, connected with
+``signal.connect(func, sender=None)`` or the @receiver decorator and called
+with ``signal.send(sender, **kwargs)``.
+
+- setting_changed(sender, setting, value, snapshot): sent by
+  raystack.conf.reload_settings() for each setting whose value changed, so
+  caches built from settings can be dropped.
+
+The model signals are in raystack.core.database.signals.
+"""
+import threading
+
+
+class Signal:
+    def __init__(self, name):
+        self.name = name
+        # [(receiver, sender)]; a None sender receives every sender's signals.
+        self.receivers = []
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return "<Signal: %s>" % self.name
+
+    def connect(self, receiver, sender=None):
+        with self._lock:
+            if (receiver, sender) not in self.receivers:
+                self.receivers = self.receivers + [(receiver, sender)]
+        return receiver
+
+    def disconnect(self, receiver, sender=None):
+        with self._lock:
+            self.receivers = [entry for entry in self.receivers if entry != (receiver, sender)]
+
+    def _live_receivers(self, sender):
+        return [receiver for receiver, wanted in self.receivers if wanted is None or wanted is sender]
+
+    def has_listeners(self, sender=None):
+        return bool(self._live_receivers(sender))
+
+    def send(self, sender, **kwargs):
+        """Call the receivers of ``sender``; return [(receiver, result)]."""
+        return [
+            (receiver, receiver(sender=sender, signal=self, **kwargs))
+            for receiver in self._live_receivers(sender)
+        ]
+
+    async def asend(self, sender, **kwargs):
+        """send() for async code: the receivers run in the database thread pool."""
+        if not self._live_receivers(sender):
+            return []
+        from raystack.core.database.query import run_sync
+
+        return await run_sync(self.send, sender, **kwargs)
+
+
+def receiver(signal, sender=None):
+    """Decorator connecting the function to ``signal``."""
+    def decorator(func):
+        signal.connect(func, sender=sender)
+        return func
+    return decorator
+
+
+setting_changed = Signal("setting_changed")
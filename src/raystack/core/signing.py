@@ -40,7 +40,7 @@ import time
 import zlib
 
 from raystack.conf import settings
-from raystack.utils.crypto import constant_time_compare, salted_hmac
+from raystack.utils.crypto import constant_time_compare, get_secret_key, salted_hmac
 from raystack.utils.encoding import force_bytes
 from raystack.utils.module_loading import import_string
 from raystack.utils.regex_helper import _lazy_re_compile
@@ -109,7 +109,7 @@ def _cookie_signer_key(key):
 def get_cookie_signer(salt="raystack.core.signing.get_cookie_signer"):
     Signer = import_string(settings.SIGNING_BACKEND)
     return Signer(
-        key=_cookie_signer_key(settings.SECRET_KEY),
+        key=_cookie_signer_key(get_secret_key()),
         fallback_keys=map(_cookie_signer_key, settings.SECRET_KEY_FALLBACKS),
         salt=salt,
     )
@@ -178,8 +178,10 @@ class Signer:
     def __init__(
         self, *, key=None, sep=":", salt=None, algorithm=None, fallback_keys=None
     ):
-        self.key = key or settings.SECRET_KEY
-        self.fallback_keys = (
+        self.key = key or get_secret_key()
+        # A list, so that an iterator (see get_cookie_signer()) is tried
+        # on every unsign() and not only the first.
+        self.fallback_keys = list(
             fallback_keys
             if fallback_keys is not None
             else settings.SECRET_KEY_FALLBACKS
@@ -197,6 +199,8 @@ class Signer:
             )
 
     def signature(self, value, key=None):
+        # salted_hmac() derives the key of (salt, key, algorithm) only once
+        # per process, so signing and unsigning cost one HMAC per key tried.
         key = key or self.key
         return base64_hmac(self.salt + "signer", value, key, algorithm=self.algorithm)
 
@@ -0,0 +1,137 @@
+"""
+Distributed tracing.
+
+With TRACING_ENABLED = True Raystack records a span for each request, each
+QuerySet execution, each render_template() call, JWT authentication and
+password hashing, and continues traces started by other services through
+the W3C ``traceparent`` header. Add spans of your own with:
+
+    from raystack.core import tracing
+
+    with tracing.span("billing.charge", attributes={"invoice.id": invoice.id}) as span:
+        ...
+        span.set_attribute("billing.amount", amount)
+
+and pass the trace on to services you call with ``tracing.inject(headers)``.
+
+TRACING_EXPORTER picks where spans go: "memory", "file" (JSON lines in
+TRACING_FILE), "console", the dotted path of an exporter class, or
+"opentelemetry" to hand spans to an installed OpenTelemetry SDK instead.
+While tracing is off every call here is a no-op.
+"""
+import threading
+
+from raystack.core.tracing.exporters import (
+    ConsoleSpanExporter,
+    FileSpanExporter,
+    InMemorySpanExporter,
+    SpanExporter,
+)
+from raystack.core.tracing.spans import (
+    NonRecordingSpan,
+    Span,
+    SpanContext,
+    SpanKind,
+    StatusCode,
+    parse_traceparent,
+)
+from raystack.core.tracing.tracers import NoopTracer, OpenTelemetryTracer, Tracer
+
+__all__ = [
+    "ConsoleSpanExporter",
+    "FileSpanExporter",
+    "InMemorySpanExporter",
+    "NonRecordingSpan",
+    "Span",
+    "SpanContext",
+    "SpanExporter",
+    "SpanKind",
+    "StatusCode",
+    "current_span",
+    "get_tracer",
+    "inject",
+    "is_enabled",
+    "parse_traceparent",
+    "reset",
+    "span",
+]
+
+_tracer = None
+_lock = threading.Lock()
+
+
+def _create_tracer():
+    from raystack.conf import settings
+    from raystack.core.exceptions import ImproperlyConfigured
+    from raystack.utils.module_loading import import_string
+
+    if not getattr(settings, "TRACING_ENABLED", False):
+        return NoopTracer()
+    exporter = getattr(settings, "TRACING_EXPORTER", "memory")
+    if exporter == "opentelemetry":
+        try:
+            return OpenTelemetryTracer()
+        except ImportError as e:
+            raise ImproperlyConfigured(
+                "TRACING_EXPORTER = 'opentelemetry' requires the opentelemetry-api "
+                "package: %s" % e
+            ) from e
+    if exporter == "memory":
+        exporter = InMemorySpanExporter()
+    elif exporter == "file":
+        exporter = FileSpanExporter(getattr(settings, "TRACING_FILE", "traces.jsonl"))
+    elif exporter == "console":
+        exporter = ConsoleSpanExporter()
+    else:
+        try:
+            exporter = import_string(exporter)()
+        except ImportError as e:
+            raise ImproperlyConfigured(
+                "Could not import TRACING_EXPORTER %r: %s" % (exporter, e)
+            ) from e
+    return Tracer(
+        exporter,
+        sample_rate=getattr(settings, "TRACING_SAMPLE_RATE", 1.0),
+        service_name=getattr(settings, "TRACING_SERVICE_NAME", "raystack"),
+    )
+
+
+def get_tracer():
+    """Return the tracer the settings ask for, creating it on first use."""
+    global _tracer
+    if _tracer is None:
+        with _lock:
+            if _tracer is None:
+                _tracer = _create_tracer()
+    return _tracer
+
+
+def reset():
+    """Shut the current tracer down; the next call reads the settings again."""
+    global _tracer
+    with _lock:
+        if _tracer is not None:
+            _tracer.shutdown()
+        _tracer = None
+
+
+def is_enabled():
+    return get_tracer().enabled
+
+
+def span(name, kind=SpanKind.INTERNAL, attributes=None, headers=None):
+    """
+    Return a context manager running a span named ``name`` as the child of
+    the current span. ``headers`` (lower-cased names) continue the trace of
+    an incoming request.
+    """
+    return get_tracer().span(name, kind, attributes, headers)
+
+
+def current_span():
+    return get_tracer().current_span()
+
+
+def inject(headers):
+    """Add the current trace context to a dict of outgoing request headers."""
+    get_tracer().inject(headers)
@@ -0,0 +1,69 @@
+"""
+Where finished spans go. An exporter is any object with ``export(spans)``
+and ``shutdown()``; TRACING_EXPORTER may name one by dotted path.
+"""
+import json
+import sys
+import threading
+from collections import deque
+
+
+class SpanExporter:
+    def export(self, spans):
+        raise NotImplementedError
+
+    def shutdown(self):
+        pass
+
+
+class InMemorySpanExporter(SpanExporter):
+    """Keep the last ``max_spans`` spans, e.g. for tests or the shell."""
+
+    def __init__(self, max_spans=10000):
+        self._spans = deque(maxlen=max_spans)
+
+    def export(self, spans):
+        self._spans.extend(spans)
+
+    def get_finished_spans(self):
+        return list(self._spans)
+
+    def clear(self):
+        self._spans.clear()
+
+
+class FileSpanExporter(SpanExporter):
+    """Append spans to ``path`` as JSON lines, one span per line."""
+
+    def __init__(self, path):
+        self.path = path
+        self._file = None
+        self._lock = threading.Lock()
+
+    def export(self, spans):
+        lines = "".join(json.dumps(span.to_dict(), default=str) + "\n" for span in spans)
+        with self._lock:
+            if self._file is None:
+                self._file = open(self.path, "a", encoding="utf-8")
+            self._file.write(lines)
+            self._file.flush()
+
+    def shutdown(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+class ConsoleSpanExporter(SpanExporter):
+    """Write a line per span to stderr."""
+
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stderr
+
+    def export(self, spans):
+        for span in spans:
+            self.stream.write("[trace %032x] %-40s %8.2f ms  %s\n" % (
+                span.context.trace_id, span.name, span.duration * 1000,
+                span.status_code if span.status_code != "UNSET" else "",
+            ))
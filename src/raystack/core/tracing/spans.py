@@ -0,0 +1,206 @@
+"""
+Spans, span contexts and W3C Trace Context (traceparent) handling.
+
+The data model follows OpenTelemetry's: 128-bit trace ids, 64-bit span ids,
+span kinds, a status and nanosecond timestamps, so exported spans can be
+loaded by OpenTelemetry tooling.
+"""
+import random
+import re
+import time
+import traceback
+from contextvars import ContextVar
+
+_random = random.Random()
+
+current_span_var = ContextVar("raystack_current_span", default=None)
+
+_TRACEPARENT_RE = re.compile(
+    r"^([0-9a-f]{2})-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})(-.*)?$"
+)
+
+
+class SpanKind:
+    INTERNAL = "INTERNAL"
+    SERVER = "SERVER"
+    CLIENT = "CLIENT"
+    PRODUCER = "PRODUCER"
+    CONSUMER = "CONSUMER"
+
+
+class StatusCode:
+    UNSET = "UNSET"
+    OK = "OK"
+    ERROR = "ERROR"
+
+
+def generate_trace_id():
+    trace_id = 0
+    while not trace_id:
+        trace_id = _random.getrandbits(128)
+    return trace_id
+
+
+def generate_span_id():
+    span_id = 0
+    while not span_id:
+        span_id = _random.getrandbits(64)
+    return span_id
+
+
+class SpanContext:
+    """The part of a span that crosses process boundaries."""
+
+    __slots__ = ("trace_id", "span_id", "sampled", "tracestate", "is_remote")
+
+    def __init__(self, trace_id, span_id, sampled=True, tracestate=None, is_remote=False):
+        self.trace_id = trace_id
+        self.span_id = span_id
+        self.sampled = sampled
+        self.tracestate = tracestate
+        self.is_remote = is_remote
+
+    @property
+    def traceparent(self):
+        return "00-%032x-%016x-%02x" % (self.trace_id, self.span_id, 1 if self.sampled else 0)
+
+
+def parse_traceparent(traceparent, tracestate=None):
+    """
+    Return the SpanContext in a ``traceparent`` header, or None if it's
+    missing or invalid.
+    """
+    if not traceparent:
+        return None
+    match = _TRACEPARENT_RE.match(traceparent.strip().lower())
+    if match is None:
+        return None
+    version, trace_id, span_id, flags, rest = match.groups()
+    # Version ff is forbidden, and version 00 has exactly four fields.
+    if version == "ff" or (version == "00" and rest):
+        return None
+    trace_id, span_id = int(trace_id, 16), int(span_id, 16)
+    if not trace_id or not span_id:
+        return None
+    return SpanContext(
+        trace_id, span_id, bool(int(flags, 16) & 1), tracestate or None, is_remote=True
+    )
+
+
+class NonRecordingSpan:
+    """
+    A span that isn't sampled. It carries its context, so the trace still
+    propagates, but records nothing.
+    """
+
+    recording = False
+
+    def __init__(self, context):
+        self.context = context
+
+    def get_span_context(self):
+        return self.context
+
+    def is_recording(self):
+        return False
+
+    def set_attribute(self, key, value):
+        pass
+
+    def set_attributes(self, attributes):
+        pass
+
+    def add_event(self, name, attributes=None):
+        pass
+
+    def record_exception(self, exception):
+        pass
+
+    def set_status(self, code, description=None):
+        pass
+
+    def update_name(self, name):
+        pass
+
+    def end(self):
+        pass
+
+
+class Span(NonRecordingSpan):
+    recording = True
+
+    def __init__(self, tracer, name, context, parent=None, kind=SpanKind.INTERNAL,
+                 attributes=None):
+        super().__init__(context)
+        self.tracer = tracer
+        self.name = name
+        self.parent = parent
+        self.kind = kind
+        self.attributes = dict(attributes) if attributes else {}
+        self.events = []
+        self.status_code = StatusCode.UNSET
+        self.status_description = None
+        self.start_time = time.time_ns()
+        self.end_time = None
+
+    def is_recording(self):
+        return self.end_time is None
+
+    def set_attribute(self, key, value):
+        self.attributes[key] = value
+
+    def set_attributes(self, attributes):
+        self.attributes.update(attributes)
+
+    def add_event(self, name, attributes=None):
+        self.events.append((name, time.time_ns(), dict(attributes or {})))
+
+    def record_exception(self, exception):
+        self.add_event("exception", {
+            "exception.type": type(exception).__qualname__,
+            "exception.message": str(exception),
+            "exception.stacktrace": "".join(traceback.format_exception(
+                type(exception), exception, exception.__traceback__
+            )),
+        })
+
+    def set_status(self, code, description=None):
+        self.status_code = code
+        self.status_description = description if code == StatusCode.ERROR else None
+
+    def update_name(self, name):
+        self.name = name
+
+    def end(self):
+        if self.end_time is None:
+            self.end_time = time.time_ns()
+            self.tracer.on_end(self)
+
+    @property
+    def duration(self):
+        """Seconds between start and end."""
+        return ((self.end_time or time.time_ns()) - self.start_time) / 1e9
+
+    def to_dict(self):
+        """Return the span as a JSON-serializable dict."""
+        return {
+            "name": self.name,
+            "trace_id": "%032x" % self.context.trace_id,
+            "span_id": "%016x" % self.context.span_id,
+            "parent_span_id": "%016x" % self.parent.span_id if self.parent else None,
+            "kind": self.kind,
+            "start_time_unix_nano": self.start_time,
+            "end_time_unix_nano": self.end_time,
+            "attributes": self.attributes,
+            "events": [
+                {"name": name, "time_unix_nano": timestamp, "attributes": attributes}
+                for name, timestamp, attributes in self.events
+            ],
+            "status": {"code": self.status_code, "description": self.status_description},
+            "resource": {"service.name": self.tracer.service_name},
+        }
+
+    def __repr__(self):
+        return "<Span %r trace_id=%032x span_id=%016x>" % (
+            self.name, self.context.trace_id, self.context.span_id,
+        )
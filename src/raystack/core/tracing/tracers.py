@@ -0,0 +1,173 @@
+"""
+The tracers behind raystack.core.tracing: a no-op one while tracing is off,
+Raystack's own, and a bridge to the OpenTelemetry SDK when it's installed.
+"""
+from raystack.core.tracing.spans import (
+    NonRecordingSpan,
+    Span,
+    SpanContext,
+    SpanKind,
+    StatusCode,
+    current_span_var,
+    generate_span_id,
+    generate_trace_id,
+    parse_traceparent,
+    _random,
+)
+
+
+class _NoopScope:
+    def __enter__(self):
+        return NOOP_SPAN
+
+    def __exit__(self, exc_type, exc_value, tb):
+        return False
+
+
+NOOP_SPAN = NonRecordingSpan(None)
+_NOOP_SCOPE = _NoopScope()
+
+
+class NoopTracer:
+    enabled = False
+    exporter = None
+
+    def span(self, name, kind=SpanKind.INTERNAL, attributes=None, headers=None):
+        return _NOOP_SCOPE
+
+    def current_span(self):
+        return NOOP_SPAN
+
+    def inject(self, headers):
+        pass
+
+    def set_error(self, span, description=None):
+        pass
+
+    def shutdown(self):
+        pass
+
+
+class _SpanScope:
+    """Make a span current for a with block, and end it on the way out."""
+
+    __slots__ = ("span", "token")
+
+    def __init__(self, span):
+        self.span = span
+
+    def __enter__(self):
+        self.token = current_span_var.set(self.span)
+        return self.span
+
+    def __exit__(self, exc_type, exc_value, tb):
+        current_span_var.reset(self.token)
+        span = self.span
+        # Cancellation and exits aren't errors of the traced operation.
+        if exc_value is not None and isinstance(exc_value, Exception) and span.recording:
+            span.record_exception(exc_value)
+            span.set_status(StatusCode.ERROR, "%s: %s" % (type(exc_value).__name__, exc_value))
+        span.end()
+        return False
+
+
+class Tracer:
+    """
+    Raystack's tracer. Root spans are sampled at ``sample_rate``; the rest
+    follow their parent, local or from an incoming traceparent header.
+    """
+
+    enabled = True
+
+    def __init__(self, exporter, sample_rate=1.0, service_name="raystack"):
+        self.exporter = exporter
+        self.sample_rate = sample_rate
+        self.service_name = service_name
+
+    def span(self, name, kind=SpanKind.INTERNAL, attributes=None, headers=None):
+        """
+        Return a context manager running a new span, the child of the current
+        one or, given the ``headers`` of an incoming request, of the span
+        named in its traceparent header.
+        """
+        parent = None
+        if headers is not None:
+            parent = parse_traceparent(headers.get("traceparent"), headers.get("tracestate"))
+        if parent is None:
+            current = current_span_var.get()
+            if current is not None:
+                parent = current.context
+
+        if parent is not None:
+            context = SpanContext(
+                parent.trace_id, generate_span_id(), parent.sampled, parent.tracestate
+            )
+        else:
+            sampled = self.sample_rate >= 1 or _random.random() < self.sample_rate
+            context = SpanContext(generate_trace_id(), generate_span_id(), sampled)
+
+        if context.sampled:
+            span = Span(self, name, context, parent, kind, attributes)
+        else:
+            span = NonRecordingSpan(context)
+        return _SpanScope(span)
+
+    def current_span(self):
+        return current_span_var.get() or NOOP_SPAN
+
+    def inject(self, headers):
+        """Add the current trace to the ``headers`` of an outgoing request."""
+        span = current_span_var.get()
+        if span is not None:
+            headers["traceparent"] = span.context.traceparent
+            if span.context.tracestate:
+                headers["tracestate"] = span.context.tracestate
+
+    def set_error(self, span, description=None):
+        span.set_status(StatusCode.ERROR, description)
+
+    def on_end(self, span):
+        self.exporter.export([span])
+
+    def shutdown(self):
+        self.exporter.shutdown()
+
+
+class OpenTelemetryTracer:
+    """
+    Hand spans to the OpenTelemetry API, so they join the traces of
+    whatever SDK, exporters and propagators the process configured.
+    """
+
+    enabled = True
+    exporter = None
+
+    def __init__(self):
+        from opentelemetry import propagate, trace
+        from opentelemetry.trace import Status, StatusCode as OTelStatusCode
+
+        self._trace = trace
+        self._propagate = propagate
+        self._error_status = lambda description: Status(OTelStatusCode.ERROR, description)
+        self._tracer = trace.get_tracer("raystack")
+
+    def span(self, name, kind=SpanKind.INTERNAL, attributes=None, headers=None):
+        context = self._propagate.extract(headers) if headers is not None else None
+        return self._tracer.start_as_current_span(
+            name,
+            context=context,
+            kind=getattr(self._trace.SpanKind, kind),
+            attributes=attributes,
+        )
+
+    def current_span(self):
+        return self._trace.get_current_span()
+
+    def inject(self, headers):
+        self._propagate.inject(headers)
+
+    def set_error(self, span, description=None):
+        span.set_status(self._error_status(description))
+
+    def shutdown(self):
+        pass
@@ -1,3 +1,5 @@
+import collections.abc
+import functools
 import ipaddress
 import math
 import re
@@ -53,6 +55,16 @@ class RegexValidator:
         if invalid_input:
             raise ValidationError(self.message, code=self.code, params={"value": value})
 
+    def invalid_indices(self, values):
+        """The positions of the invalid ``values``; see validate_batch()."""
+        search = self.regex.search
+        inverse_match = self.inverse_match
+        return [
+            index
+            for index, value in enumerate(values)
+            if (search(value if type(value) is str else str(value)) is None) is not inverse_match
+        ]
+
     def __eq__(self, other):
         return (
             isinstance(other, RegexValidator)
@@ -121,6 +133,19 @@ class DomainNameValidator(RegexValidator):
             raise ValidationError(self.message, code=self.code, params={"value": value})
         super().__call__(value)
 
+    def invalid_indices(self, values):
+        search = self.regex.search
+        max_length = self.max_length
+        ascii_only = not self.accept_idna
+        return [
+            index
+            for index, value in enumerate(values)
+            if not isinstance(value, str)
+            or len(value) > max_length
+            or (ascii_only and not value.isascii())
+            or search(value) is None
+        ]
+
 
 validate_domain_name = DomainNameValidator()
 
@@ -193,6 +218,29 @@ class URLValidator(RegexValidator):
         if splitted_url.hostname is None or len(splitted_url.hostname) > 253:
             raise ValidationError(self.message, code=self.code, params={"value": value})
 
+    def invalid_indices(self, values):
+        search = self.regex.search
+        schemes = set(self.schemes)
+        unsafe_chars = self.unsafe_chars
+        invalid = []
+        for index, value in enumerate(values):
+            # Short ASCII URLs without an IPv6 host are settled by the scheme
+            # and the regex alone: urlsplit() can't fail on them, and their
+            # host name can't be longer than 253 characters.
+            if type(value) is str and len(value) <= 253 and value.isascii() and "[" not in value:
+                if (
+                    not unsafe_chars.isdisjoint(value)
+                    or value.split("://")[0].lower() not in schemes
+                    or search(value) is None
+                ):
+                    invalid.append(index)
+                continue
+            try:
+                self(value)
+            except ValidationError:
+                invalid.append(index)
+        return invalid
+
 
 integer_validator = RegexValidator(
     _lazy_re_compile(r"^-?\d+\Z"),
@@ -256,6 +304,35 @@ class EmailValidator:
         ):
             raise ValidationError(self.message, code=self.code, params={"value": value})
 
+    def invalid_indices(self, values):
+        user_match = self.user_regex.match
+        allowlist = set(self.domain_allowlist)
+        # Whether each domain part seen is valid: imports repeat a few.
+        domains = {}
+        invalid = []
+        for index, value in enumerate(values):
+            if type(value) is not str:
+                try:
+                    self(value)
+                except ValidationError:
+                    invalid.append(index)
+                continue
+            if not value or "@" not in value or len(value) > 320:
+                invalid.append(index)
+                continue
+            user_part, _, domain_part = value.rpartition("@")
+            if user_match(user_part) is None:
+                invalid.append(index)
+                continue
+            valid = domains.get(domain_part)
+            if valid is None:
+                valid = domain_part in allowlist or self.validate_domain_part(domain_part)
+                if len(domains) < 10000:
+                    domains[domain_part] = valid
+            if not valid:
+                invalid.append(index)
+        return invalid
+
     def validate_domain_part(self, domain_part):
         if self.domain_regex.match(domain_part):
             return True
@@ -394,6 +471,13 @@ class BaseValidator:
         if self.compare(cleaned, limit_value):
             raise ValidationError(self.message, code=self.code, params=params)
 
+    def invalid_indices(self, values):
+        limit_value = (
+            self.limit_value() if callable(self.limit_value) else self.limit_value
+        )
+        compare, clean = self.compare, self.clean
+        return [index for index, value in enumerate(values) if compare(clean(value), limit_value)]
+
     def __eq__(self, other):
         if not isinstance(other, self.__class__):
             return NotImplemented
@@ -418,6 +502,12 @@ class MaxValueValidator(BaseValidator):
     def compare(self, a, b):
         return a > b
 
+    def invalid_indices(self, values):
+        limit_value = (
+            self.limit_value() if callable(self.limit_value) else self.limit_value
+        )
+        return [index for index, value in enumerate(values) if value > limit_value]
+
 
 @deconstructible
 class MinValueValidator(BaseValidator):
@@ -427,6 +517,12 @@ class MinValueValidator(BaseValidator):
     def compare(self, a, b):
         return a < b
 
+    def invalid_indices(self, values):
+        limit_value = (
+            self.limit_value() if callable(self.limit_value) else self.limit_value
+        )
+        return [index for index, value in enumerate(values) if value < limit_value]
+
 
 @deconstructible
 class StepValueValidator(BaseValidator):
@@ -483,6 +579,12 @@ class MinLengthValidator(BaseValidator):
     def clean(self, x):
         return len(x)
 
+    def invalid_indices(self, values):
+        limit_value = (
+            self.limit_value() if callable(self.limit_value) else self.limit_value
+        )
+        return [index for index, value in enumerate(values) if len(value) < limit_value]
+
 
 @deconstructible
 class MaxLengthValidator(BaseValidator):
@@ -501,6 +603,12 @@ class MaxLengthValidator(BaseValidator):
     def clean(self, x):
         return len(x)
 
+    def invalid_indices(self, values):
+        limit_value = (
+            self.limit_value() if callable(self.limit_value) else self.limit_value
+        )
+        return [index for index, value in enumerate(values) if len(value) > limit_value]
+
 
 @deconstructible
 class DecimalValidator:
@@ -534,12 +642,11 @@ class DecimalValidator:
         self.max_digits = max_digits
         self.decimal_places = decimal_places
 
-    def __call__(self, value):
+    def _failure(self, value):
+        """The code of the first check ``value`` fails, or None."""
         digit_tuple, exponent = value.as_tuple()[1:]
         if exponent in {"F", "n", "N"}:
-            raise ValidationError(
-                self.messages["invalid"], code="invalid", params={"value": value}
-            )
+            return "invalid"
         if exponent >= 0:
             digits = len(digit_tuple)
             if digit_tuple != (0,):
@@ -560,27 +667,33 @@ class DecimalValidator:
         whole_digits = digits - decimals
 
         if self.max_digits is not None and digits > self.max_digits:
-            raise ValidationError(
-                self.messages["max_digits"],
-                code="max_digits",
-                params={"max": self.max_digits, "value": value},
-            )
+            return "max_digits"
         if self.decimal_places is not None and decimals > self.decimal_places:
-            raise ValidationError(
-                self.messages["max_decimal_places"],
-                code="max_decimal_places",
-                params={"max": self.decimal_places, "value": value},
-            )
+            return "max_decimal_places"
         if (
             self.max_digits is not None
             and self.decimal_places is not None
             and whole_digits > (self.max_digits - self.decimal_places)
         ):
-            raise ValidationError(
-                self.messages["max_whole_digits"],
-                code="max_whole_digits",
-                params={"max": (self.max_digits - self.decimal_places), "value": value},
-            )
+            return "max_whole_digits"
+        return None
+
+    def __call__(self, value):
+        code = self._failure(value)
+        if code is None:
+            return
+        params = {"value": value}
+        if code == "max_digits":
+            params["max"] = self.max_digits
+        elif code == "max_decimal_places":
+            params["max"] = self.decimal_places
+        elif code == "max_whole_digits":
+            params["max"] = self.max_digits - self.decimal_places
+        raise ValidationError(self.messages[code], code=code, params=params)
+
+    def invalid_indices(self, values):
+        failure = self._failure
+        return [index for index, value in enumerate(values) if failure(value) is not None]
 
     def __eq__(self, other):
         return (
@@ -668,9 +781,158 @@ class ProhibitNullCharactersValidator:
         if "\x00" in str(value):
             raise ValidationError(self.message, code=self.code, params={"value": value})
 
+    def invalid_indices(self, values):
+        return [
+            index
+            for index, value in enumerate(values)
+            if "\x00" in (value if type(value) is str else str(value))
+        ]
+
     def __eq__(self, other):
         return (
             isinstance(other, self.__class__)
             and self.message == other.message
             and self.code == other.code
         )
+
+
+# Batch validation: a validator run over a column of values at once, for
+# imports and bulk_create(). Validators with an invalid_indices(values)
+# method (and the functions in _batch_functions) check the whole column in
+# one loop, with their regexes and limits looked up once and no exception
+# raised per invalid value; any other validator is called on each value.
+
+ipv4_re = _lazy_re_compile(
+    r"^(?:25[0-5]|2[0-4][0-9]|1[0-9][0-9]|[1-9]?[0-9])"
+    r"(?:\.(?:25[0-5]|2[0-4][0-9]|1[0-9][0-9]|[1-9]?[0-9])){3}\Z"
+)
+
+
+def _ipv4_invalid_indices(values):
+    # The dotted quads ipaddress accepts: no leading zeros, ASCII digits.
+    match = ipv4_re.match
+    invalid = []
+    for index, value in enumerate(values):
+        if type(value) is str:
+            if match(value) is None:
+                invalid.append(index)
+            continue
+        try:
+            validate_ipv4_address(value)
+        except ValidationError:
+            invalid.append(index)
+    return invalid
+
+
+def _ipv6_invalid_indices(values):
+    return [
+        index
+        for index, value in enumerate(values)
+        # An IPv6 address has at least two colons.
+        if (type(value) is str and ":" not in value) or not is_valid_ipv6_address(value)
+    ]
+
+
+def _ipv46_invalid_indices(values):
+    not_ipv4 = _ipv4_invalid_indices(values)
+    not_ipv6 = set(_ipv6_invalid_indices([values[index] for index in not_ipv4]))
+    return [index for position, index in enumerate(not_ipv4) if position in not_ipv6]
+
+
+_batch_functions = {
+    validate_integer: integer_validator.invalid_indices,
+    validate_ipv4_address: _ipv4_invalid_indices,
+    validate_ipv6_address: _ipv6_invalid_indices,
+    validate_ipv46_address: _ipv46_invalid_indices,
+}
+
+
+class BatchResult:
+    """
+    Which values of a column failed a validator: ``indices`` are their
+    positions, ``mask`` has True at each of them. The messages are only
+    built by errors(), which runs the validator again on the invalid values.
+    """
+
+    def __init__(self, validator, values, indices):
+        self.validator = validator
+        self.values = values
+        self.indices = indices
+
+    def __repr__(self):
+        return "<BatchResult: %d of %d invalid>" % (len(self.indices), len(self.values))
+
+    @property
+    def is_valid(self):
+        return not self.indices
+
+    @property
+    def mask(self):
+        mask = [False] * len(self.values)
+        for index in self.indices:
+            mask[index] = True
+        return mask
+
+    def errors(self):
+        """{index: ValidationError} of the invalid values."""
+        errors = {}
+        for index in self.indices:
+            try:
+                self.validator(self.values[index])
+            except ValidationError as e:
+                errors[index] = e
+            else:
+                errors[index] = ValidationError(
+                    getattr(self.validator, "message", _("Enter a valid value.")),
+                    code=getattr(self.validator, "code", "invalid"),
+                    params={"value": self.values[index]},
+                )
+        return errors
+
+
+def validate_batch(validator, values, skip_empty=False):
+    """
+    Run ``validator`` over ``values`` (a list or any iterable, a NumPy
+    object array included) and return a BatchResult. With ``skip_empty``,
+    EMPTY_VALUES aren't validated, as form fields don't validate them.
+    """
+    if not isinstance(values, (list, tuple)):
+        values = list(values)
+    invalid_indices = None
+    if _has_batch_method(type(validator)):
+        invalid_indices = validator.invalid_indices
+    elif isinstance(validator, collections.abc.Hashable):
+        invalid_indices = _batch_functions.get(validator)
+    if invalid_indices is None:
+        invalid_indices = functools.partial(_call_each, validator)
+    if not skip_empty:
+        return BatchResult(validator, values, invalid_indices(values))
+    positions = [index for index, value in enumerate(values) if value not in EMPTY_VALUES]
+    if len(positions) == len(values):
+        return BatchResult(validator, values, invalid_indices(values))
+    subset = [values[index] for index in positions]
+    return BatchResult(validator, values, [positions[index] for index in invalid_indices(subset)])
+
+
+def _has_batch_method(cls):
+    """
+    Whether ``cls`` has an invalid_indices() that checks what its __call__()
+    does: a subclass overriding __call__() alone may check more.
+    """
+    batch_class = call_class = None
+    for klass in cls.__mro__:
+        if batch_class is None and "invalid_indices" in klass.__dict__:
+            batch_class = klass
+        if call_class is None and "__call__" in klass.__dict__:
+            call_class = klass
+    return batch_class is not None and issubclass(batch_class, call_class)
+
+
+def _call_each(validator, values):
+    invalid = []
+    for index, value in enumerate(values):
+        try:
+            validator(value)
+        except ValidationError:
+            invalid.append(index)
+    return invalid
@@ -0,0 +1,8 @@
+"""
+Raystack validation and HTML form handling.
+"""
+
+from raystack.core.exceptions import ValidationError  # NOQA
+from raystack.forms.fields import *  # NOQA
+from raystack.forms.forms import *  # NOQA
+from raystack.forms.widgets import *  # NOQA
@@ -1,40 +1,198 @@
+"""
+Form fields: how a submitted value is converted and checked. A field holds
+no per-request state (the value and errors of a submission live on the form
+instance), so one field object safely serves every concurrent request.
+"""
+from raystack.core import validators
+from raystack.core.exceptions import ValidationError
+from raystack.utils.translation import gettext_lazy as _
+
+from .widgets import CheckboxInput, EmailInput, NumberInput, Select, TextInput
+
+__all__ = (
+    "Field",
+    "CharField",
+    "IntegerField",
+    "EmailField",
+    "BooleanField",
+    "ChoiceField",
+)
+
+
 class Field:
-    def __init__(self, label=None, required=True, initial=None, help_text=None, widget=None):
+    widget = TextInput
+    default_validators = []
+    default_error_messages = {
+        "required": _("This field is required."),
+    }
+    empty_values = list(validators.EMPTY_VALUES)
+
+    def __init__(self, label=None, required=True, initial=None, help_text=None, widget=None,
+                 validators=(), error_messages=None):
         self.label = label
         self.required = required
         self.initial = initial
         self.help_text = help_text
+        widget = widget or self.widget
+        if isinstance(widget, type):
+            widget = widget()
         self.widget = widget
-        self.value = initial
-        self.errors = []
+        extra_attrs = self.widget_attrs(widget)
+        if extra_attrs:
+            widget.attrs = {**extra_attrs, **widget.attrs}
+        self.validators = [*self.default_validators, *validators]
+        messages = {}
+        for cls in reversed(type(self).__mro__):
+            messages.update(getattr(cls, "default_error_messages", {}))
+        messages.update(error_messages or {})
+        self.error_messages = messages
+
+    def widget_attrs(self, widget):
+        """HTML attributes the field adds to its widget."""
+        return {}
+
+    def to_python(self, value):
+        return value
+
+    def validate(self, value):
+        if value in self.empty_values and self.required:
+            raise ValidationError(self.error_messages["required"], code="required")
+
+    def run_validators(self, value):
+        if value in self.empty_values:
+            return
+        errors = []
+        for validator in self.validators:
+            try:
+                validator(value)
+            except ValidationError as e:
+                if hasattr(e, "code") and e.code in self.error_messages:
+                    e.message = self.error_messages[e.code]
+                errors.extend(e.error_list)
+        if errors:
+            raise ValidationError(errors)
 
     def clean(self, value):
-        if self.required and (value is None or value == ''):
-            self.errors.append('This field is required.')
-            raise ValueError('This field is required.')
+        """Convert ``value`` and validate it; raise ValidationError if it's wrong."""
+        value = self.to_python(value)
+        self.validate(value)
+        self.run_validators(value)
         return value
 
     def get_bound_value(self, data, name):
-        return data.get(name, self.initial)
+        value = self.widget.value_from_datadict(data, {}, name)
+        return self.initial if value is None else value
+
+    def render(self, name, value=None, attrs=None, renderer=None):
+        if value is None:
+            value = self.initial
+        return self.widget.render(name, value, attrs, renderer)
 
-    def render(self, name, value=None):
-        value = value if value is not None else self.initial or ''
-        return f'<input type="text" name="{name}" value="{value}">'  # basic input
 
 class CharField(Field):
-    def clean(self, value):
-        value = super().clean(value)
-        if value is not None:
+    def __init__(self, *args, max_length=None, min_length=None, strip=True, empty_value="", **kwargs):
+        self.max_length = max_length
+        self.min_length = min_length
+        self.strip = strip
+        self.empty_value = empty_value
+        super().__init__(*args, **kwargs)
+        if min_length is not None:
+            self.validators.append(validators.MinLengthValidator(int(min_length)))
+        if max_length is not None:
+            self.validators.append(validators.MaxLengthValidator(int(max_length)))
+        self.validators.append(validators.ProhibitNullCharactersValidator())
+
+    def to_python(self, value):
+        if value not in self.empty_values:
             value = str(value)
+            if self.strip:
+                value = value.strip()
+        if value in self.empty_values:
+            return self.empty_value
         return value
 
+    def widget_attrs(self, widget):
+        attrs = {}
+        if self.max_length is not None and not getattr(widget, "choices", None):
+            attrs["maxlength"] = str(self.max_length)
+        if self.min_length is not None:
+            attrs["minlength"] = str(self.min_length)
+        return attrs
+
+
 class IntegerField(Field):
-    def clean(self, value):
-        value = super().clean(value)
-        if value is not None and value != '':
-            try:
-                value = int(value)
-            except (TypeError, ValueError):
-                self.errors.append('Please enter an integer.')
-                raise ValueError('Please enter an integer.')
-        return value 
\ No newline at end of file
+    widget = NumberInput
+    default_error_messages = {
+        "invalid": _("Enter a whole number."),
+    }
+
+    def __init__(self, *args, max_value=None, min_value=None, **kwargs):
+        self.max_value = max_value
+        self.min_value = min_value
+        super().__init__(*args, **kwargs)
+        if max_value is not None:
+            self.validators.append(validators.MaxValueValidator(max_value))
+        if min_value is not None:
+            self.validators.append(validators.MinValueValidator(min_value))
+
+    def to_python(self, value):
+        if value in self.empty_values:
+            return None
+        try:
+            return int(str(value).strip())
+        except (TypeError, ValueError):
+            raise ValidationError(self.error_messages["invalid"], code="invalid")
+
+    def widget_attrs(self, widget):
+        attrs = {}
+        if isinstance(widget, NumberInput):
+            if self.min_value is not None:
+                attrs["min"] = self.min_value
+            if self.max_value is not None:
+                attrs["max"] = self.max_value
+        return attrs
+
+
+class EmailField(CharField):
+    widget = EmailInput
+    default_validators = [validators.validate_email]
+
+
+class BooleanField(Field):
+    widget = CheckboxInput
+
+    def to_python(self, value):
+        if isinstance(value, str) and value.lower() in ("false", "0", "off"):
+            return False
+        return bool(value)
+
+    def validate(self, value):
+        if not value and self.required:
+            raise ValidationError(self.error_messages["required"], code="required")
+
+
+class ChoiceField(Field):
+    widget = Select
+    default_error_messages = {
+        "invalid_choice": _("Select a valid choice. %(value)s is not one of the available choices."),
+    }
+
+    def __init__(self, *args, choices=(), **kwargs):
+        super().__init__(*args, **kwargs)
+        self.choices = list(choices)
+        self.widget.choices = self.choices
+        self._valid = {str(value) for value, label in self.choices}
+
+    def to_python(self, value):
+        if value in self.empty_values:
+            return ""
+        return str(value)
+
+    def validate(self, value):
+        super().validate(value)
+        if value and value not in self._valid:
+            raise ValidationError(
+                self.error_messages["invalid_choice"],
+                code="invalid_choice",
+                params={"value": value},
+            )
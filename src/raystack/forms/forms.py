@@ -1,27 +1,251 @@
 """
 Base form classes for Raystack framework.
+
+A Form subclass is compiled once, when the class is created, into a plan:
+its fields in order, each with the function reading its value from the
+submitted data, its clean() and the form's clean_<name>() method if any.
+Validating a submission walks the plan once. Fields and widgets are shared
+by every instance of the form; the data, cleaned values and errors of a
+submission belong to the instance, so forms may be validated concurrently.
+
+    class GroupForm(forms.Form):
+        name = forms.CharField(max_length=100)
+        description = forms.CharField(required=False, widget=forms.Textarea)
+
+    form = GroupForm(await request.form())
+    if form.is_valid():
+        GroupModel(**form.cleaned_data).save()
 """
+from collections import namedtuple
+
+from raystack.core.exceptions import NON_FIELD_ERRORS, ValidationError
+from raystack.utils.text import capfirst
+
+from .fields import Field
+from .renderers import get_default_renderer
+from .widgets import HiddenInput
+
+__all__ = ("BaseForm", "BoundField", "Form")
+
+# One field of a form's plan.
+Step = namedtuple("Step", "name field value_from_datadict clean clean_method")
+
+
+def compile_plan(form_class):
+    return tuple(
+        Step(
+            name,
+            field,
+            field.widget.value_from_datadict,
+            field.clean,
+            getattr(form_class, "clean_%s" % name, None),
+        )
+        for name, field in form_class.base_fields.items()
+    )
+
+
+class DeclarativeFieldsMetaclass(type):
+    """Collect the Fields declared on the class and its bases, and compile the plan."""
+
+    def __new__(mcs, name, bases, attrs):
+        current_fields = [
+            (key, value) for key, value in attrs.items() if isinstance(value, Field)
+        ]
+        for key, _ in current_fields:
+            attrs.pop(key)
+        new_class = super().__new__(mcs, name, bases, attrs)
+
+        declared_fields = {}
+        for base in reversed(new_class.__mro__[1:]):
+            declared_fields.update(getattr(base, "declared_fields", {}))
+            # A field set to None on a subclass is removed.
+            for attr, value in base.__dict__.items():
+                if value is None and attr in declared_fields:
+                    declared_fields.pop(attr)
+        declared_fields.update(current_fields)
+        for attr, value in attrs.items():
+            if value is None and attr in declared_fields:
+                declared_fields.pop(attr)
+
+        new_class.declared_fields = declared_fields
+        new_class.base_fields = declared_fields
+        new_class._plan = compile_plan(new_class)
+        return new_class
+
+
+class BoundField:
+    """A field of a form instance: its value, errors and widget."""
+
+    template_name = "raystack/forms/field.html"
+
+    def __init__(self, form, field, name):
+        self.form = form
+        self.field = field
+        self.name = name
+        self.html_name = form.add_prefix(name)
+        self.label = field.label if field.label is not None else capfirst(name.replace("_", " "))
+        self.help_text = field.help_text or ""
+
+    def __str__(self):
+        return self.as_widget()
+
+    def __html__(self):
+        return self.as_widget()
+
+    @property
+    def errors(self):
+        return self.form.errors.get(self.name, [])
+
+    @property
+    def id_for_label(self):
+        return "id_%s" % self.html_name
+
+    @property
+    def is_hidden(self):
+        return isinstance(self.field.widget, HiddenInput)
+
+    def value(self):
+        """The submitted value of a bound form, the initial one otherwise."""
+        if self.form.is_bound:
+            return self.field.widget.value_from_datadict(self.form.data, self.form.files, self.html_name)
+        value = self.form.initial.get(self.name, self.field.initial)
+        return value() if callable(value) else value
+
+    def as_widget(self, attrs=None):
+        widget = self.field.widget
+        value = self.value()
+        attrs = {"id": self.id_for_label, **(attrs or {})}
+        if self.field.required and widget.use_required_attribute(value):
+            attrs.setdefault("required", True)
+        if self.errors:
+            attrs["aria-invalid"] = "true"
+        return widget.render(self.html_name, value, attrs, self.form.renderer)
+
+    def as_field_group(self):
+        """The label, widget, help text and errors of the field."""
+        return self.form.renderer.render(self.template_name, {"field": self})
+
+
+class BaseForm:
+    prefix = None
+    template_name = "raystack/forms/div.html"
+    template_name_p = "raystack/forms/p.html"
+
+    def __init__(self, data=None, files=None, initial=None, prefix=None, renderer=None):
+        self.is_bound = data is not None or files is not None
+        self.data = {} if data is None else data
+        self.files = {} if files is None else files
+        self.initial = initial or {}
+        if prefix is not None:
+            self.prefix = prefix
+        self.renderer = renderer or get_default_renderer()
+        self.fields = self.base_fields
+        self.cleaned_data = {}
+        self._errors = None
+        self._bound_fields = {}
+
+    def __iter__(self):
+        for name in self.fields:
+            yield self[name]
+
+    def __getitem__(self, name):
+        try:
+            return self._bound_fields[name]
+        except KeyError:
+            pass
+        try:
+            field = self.fields[name]
+        except KeyError:
+            raise KeyError(
+                "Key '%s' not found in '%s'. Choices are: %s."
+                % (name, type(self).__name__, ", ".join(sorted(self.fields)))
+            )
+        bound_field = self._bound_fields[name] = BoundField(self, field, name)
+        return bound_field
+
+    def __str__(self):
+        return self.render()
+
+    def __html__(self):
+        return self.render()
+
+    @property
+    def errors(self):
+        """{field name: [messages]} of the submission, validating it first if needed."""
+        if self._errors is None:
+            self.full_clean()
+        return self._errors
 
-class Form:
-    """
-    Base form class for handling form data.
-    """
-    
-    def __init__(self, data=None, files=None):
-        self.data = data or {}
-        self.files = files or {}
-        self.errors = {}
-    
     def is_valid(self):
+        """Return True if the form is bound and its data is valid."""
+        return self.is_bound and not self.errors
+
+    def add_prefix(self, field_name):
+        return "%s-%s" % (self.prefix, field_name) if self.prefix else field_name
+
+    def add_error(self, field, error):
         """
-        Check if the form is valid.
-        Override this method in subclasses.
+        Record ``error`` (a message or a ValidationError) against ``field``,
+        or against the whole form when ``field`` is None.
         """
-        return len(self.errors) == 0
-    
+        if not isinstance(error, ValidationError):
+            error = ValidationError(error)
+        if hasattr(error, "error_dict"):
+            errors = error.message_dict
+        else:
+            errors = {field or NON_FIELD_ERRORS: error.messages}
+        for name, messages in errors.items():
+            self._errors.setdefault(name, []).extend(messages)
+            self.cleaned_data.pop(name, None)
+
+    def non_field_errors(self):
+        return self.errors.get(NON_FIELD_ERRORS, [])
+
+    def full_clean(self):
+        """Validate the submission in one pass over the compiled plan."""
+        self._errors = {}
+        self.cleaned_data = {}
+        if not self.is_bound:
+            return
+        data, files, cleaned_data = self.data, self.files, self.cleaned_data
+        for step in self._plan:
+            value = step.value_from_datadict(data, files, self.add_prefix(step.name))
+            try:
+                cleaned_data[step.name] = step.clean(value)
+                if step.clean_method is not None:
+                    cleaned_data[step.name] = step.clean_method(self)
+            except ValidationError as e:
+                self.add_error(step.name, e)
+        try:
+            cleaned_data = self.clean()
+        except ValidationError as e:
+            self.add_error(None, e)
+        else:
+            if cleaned_data is not None:
+                self.cleaned_data = cleaned_data
+
     def clean(self):
         """
-        Clean and validate form data.
-        Override this method in subclasses.
+        Validate the form as a whole, once the fields are cleaned. Errors
+        raised here aren't tied to a field; use add_error() for that.
         """
-        pass
+        return self.cleaned_data
+
+    def hidden_fields(self):
+        return [field for field in self if field.is_hidden]
+
+    def visible_fields(self):
+        return [field for field in self if not field.is_hidden]
+
+    def render(self, template_name=None):
+        return self.renderer.render(template_name or self.template_name, {"form": self})
+
+    def as_p(self):
+        return self.render(self.template_name_p)
+
+    def as_div(self):
+        return self.render(self.template_name)
+
+
+class Form(BaseForm, metaclass=DeclarativeFieldsMetaclass):
+    """A collection of Fields, with their values and errors for one submission."""
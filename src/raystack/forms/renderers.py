@@ -1,7 +1,69 @@
+import functools
+import os
+
+import jinja2
+from markupsafe import Markup
+
+from raystack.conf import settings
+from raystack.core.signals import receiver, setting_changed
+from raystack.utils.module_loading import import_string
+
+# The widget and form templates shipped with Raystack.
+TEMPLATES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "jinja2")
+
+
+class RaystackTemplates:
+    """
+    Render forms and widgets with a Jinja2 environment of their own: the
+    DIRS of TEMPLATES first, so projects can override the templates under
+    raystack/forms/, then Raystack's. Each template is compiled the first
+    time it's used and kept for the life of the process.
+    """
+
+    def __init__(self):
+        dirs = [
+            directory
+            for template in getattr(settings, "TEMPLATES", [])
+            for directory in template.get("DIRS", [])
+        ]
+        self.env = jinja2.Environment(
+            loader=jinja2.FileSystemLoader([*dirs, TEMPLATES_DIR]),
+            autoescape=True,
+            auto_reload=False,
+            trim_blocks=True,
+            lstrip_blocks=True,
+        )
+        self._templates = {}
+
+    def get_template(self, template_name):
+        try:
+            return self._templates[template_name]
+        except KeyError:
+            template = self._templates[template_name] = self.env.get_template(template_name)
+            return template
+
+    def render(self, template_name, context, request=None):
+        if request is not None:
+            context = {**context, "request": request}
+        return Markup(self.get_template(template_name).render(context))
+
+
+@functools.lru_cache
+def get_default_renderer():
+    """The FORM_RENDERER, created once."""
+    return import_string(settings.FORM_RENDERER)()
+
+
+@receiver(setting_changed)
+def reset_renderer(*, setting, **kwargs):
+    if setting in ("FORM_RENDERER", "TEMPLATES"):
+        get_default_renderer.cache_clear()
+
+
 # Register filter for Jinja2
 
 def form_as_p(form):
     return form.as_p()
 
 def register_jinja2_form_filters(jinja_env):
-    jinja_env.filters['form_as_p'] = form_as_p 
\ No newline at end of file
+    jinja_env.filters['form_as_p'] = form_as_p
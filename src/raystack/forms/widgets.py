@@ -0,0 +1,149 @@
+"""
+HTML widgets: how a form field is drawn and read back from the submitted
+data. Widgets hold only their attributes, so one widget serves every form
+instance of its field.
+"""
+from .renderers import get_default_renderer
+
+__all__ = (
+    "Widget",
+    "Input",
+    "TextInput",
+    "NumberInput",
+    "EmailInput",
+    "PasswordInput",
+    "HiddenInput",
+    "Textarea",
+    "CheckboxInput",
+    "Select",
+)
+
+
+class Widget:
+    template_name = None
+
+    def __init__(self, attrs=None):
+        self.attrs = {} if attrs is None else attrs.copy()
+
+    def format_value(self, value):
+        """The value as the template shows it."""
+        if value == "" or value is None:
+            return None
+        return str(value)
+
+    def get_context(self, name, value, attrs=None):
+        return {
+            "widget": {
+                "name": name,
+                "value": self.format_value(value),
+                "attrs": {**self.attrs, **(attrs or {})},
+                "template_name": self.template_name,
+            }
+        }
+
+    def render(self, name, value, attrs=None, renderer=None):
+        if renderer is None:
+            renderer = get_default_renderer()
+        return renderer.render(self.template_name, self.get_context(name, value, attrs))
+
+    def value_from_datadict(self, data, files, name):
+        return data.get(name)
+
+    def use_required_attribute(self, initial):
+        return True
+
+
+class Input(Widget):
+    input_type = None
+    template_name = "raystack/forms/widgets/input.html"
+
+    def __init__(self, attrs=None):
+        if attrs is not None:
+            attrs = attrs.copy()
+            self.input_type = attrs.pop("type", self.input_type)
+        super().__init__(attrs)
+
+    def get_context(self, name, value, attrs=None):
+        context = super().get_context(name, value, attrs)
+        context["widget"]["type"] = self.input_type
+        return context
+
+
+class TextInput(Input):
+    input_type = "text"
+
+
+class NumberInput(Input):
+    input_type = "number"
+
+
+class EmailInput(Input):
+    input_type = "email"
+
+
+class PasswordInput(Input):
+    input_type = "password"
+
+    def __init__(self, attrs=None, render_value=False):
+        super().__init__(attrs)
+        self.render_value = render_value
+
+    def get_context(self, name, value, attrs=None):
+        if not self.render_value:
+            value = None
+        return super().get_context(name, value, attrs)
+
+
+class HiddenInput(Input):
+    input_type = "hidden"
+
+
+class Textarea(Widget):
+    template_name = "raystack/forms/widgets/textarea.html"
+
+    def __init__(self, attrs=None):
+        super().__init__({"cols": "40", "rows": "10", **(attrs or {})})
+
+
+class CheckboxInput(Input):
+    input_type = "checkbox"
+
+    def format_value(self, value):
+        # The value attribute is left out for True and its kin.
+        if value is True or value is False or value is None or value == "":
+            return None
+        return str(value)
+
+    def get_context(self, name, value, attrs=None):
+        if value not in (None, False, "", "false", "False", "0"):
+            attrs = {**(attrs or {}), "checked": True}
+        return super().get_context(name, value, attrs)
+
+    def value_from_datadict(self, data, files, name):
+        if name not in data:
+            # Unchecked boxes aren't submitted at all.
+            return False
+        value = data.get(name)
+        if isinstance(value, str):
+            return value.lower() not in ("false", "0", "off", "")
+        return bool(value)
+
+    def use_required_attribute(self, initial):
+        return False
+
+
+class Select(Widget):
+    template_name = "raystack/forms/widgets/select.html"
+
+    def __init__(self, attrs=None, choices=()):
+        super().__init__(attrs)
+        self.choices = list(choices)
+
+    def get_context(self, name, value, attrs=None):
+        context = super().get_context(name, value, attrs)
+        selected = context["widget"]["value"]
+        context["widget"]["options"] = [
+            {"value": str(option), "label": label, "selected": str(option) == selected}
+            for option, label in self.choices
+        ]
+        return context
@@ -1,9 +1,18 @@
+import html
+import random
+import re
+import sys
+import threading
+import time
+
 from fastapi import Request
 from fastapi.responses import HTMLResponse, RedirectResponse
 from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.authentication import AuthenticationBackend, SimpleUser, AuthCredentials
+from starlette.datastructures import MutableHeaders
 import jwt
-from raystack.conf import settings
+from raystack.conf import get_snapshot, settings
+from raystack.core import tracing
 
 class JWTAuthentication(AuthenticationBackend):
     """JWT authentication for checking tokens from cookies."""
@@ -11,16 +20,16 @@ class JWTAuthentication(AuthenticationBackend):
         jwt_token = request.cookies.get("jwt")
         if not jwt_token:
             return None
+        with tracing.span("JWTAuthentication.authenticate") as span:
+            result = self._authenticate(jwt_token)
+            if result is not None:
+                span.set_attribute("enduser.id", result[1].username)
+            return result
+
+    def _authenticate(self, jwt_token):
         try:
-            # Get settings safely
-            try:
-                secret_key = getattr(settings, 'SECRET_KEY', 'default-secret-key')
-                algorithm = getattr(settings, 'ALGORITHM', 'HS256')
-            except ImportError:
-                secret_key = 'default-secret-key'
-                algorithm = 'HS256'
-            
-            payload = jwt.decode(jwt_token, secret_key, algorithms=[algorithm])
+            snapshot = get_snapshot()
+            payload = jwt.decode(jwt_token, snapshot.SECRET_KEY, algorithms=[snapshot.ALGORITHM])
             user_id = payload.get("sub")
             if user_id is None:
                 return None
@@ -73,3 +82,306 @@ class PermissionMiddleware:
         # In real projects, there should be actual authentication verification here
         await self.app(scope, receive, send)
         return
+
+
+class QueryInstrumentationMiddleware:
+    """
+    Record the queries each request runs.
+
+    Adds a ``Server-Timing`` header with the total database time and query
+    count, logs repeated query shapes (likely N+1) with the code that issued
+    them and, when DEBUG and QUERY_DEBUG_PANEL are on, appends a panel listing
+    the queries to HTML pages.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        from raystack.core.database.instrumentation import (
+            start_query_log,
+            stop_query_log,
+        )
+
+        log, token = start_query_log()
+        panel = settings.DEBUG and getattr(settings, "QUERY_DEBUG_PANEL", True)
+        pending = {}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                if (
+                    panel
+                    and headers.get("content-type", "").startswith("text/html")
+                    and "content-encoding" not in headers
+                ):
+                    # Hold the response back until the body is complete.
+                    pending["start"] = message
+                    pending["body"] = []
+                    return
+                headers.append("Server-Timing", log.server_timing())
+            elif message["type"] == "http.response.body" and "start" in pending:
+                pending["body"].append(message.get("body", b""))
+                if message.get("more_body", False):
+                    return
+                start = pending.pop("start")
+                body = _with_query_panel(b"".join(pending.pop("body")), log)
+                headers = MutableHeaders(scope=start)
+                headers.append("Server-Timing", log.server_timing())
+                if "content-length" in headers:
+                    headers["content-length"] = str(len(body))
+                await send(start)
+                await send({"type": "http.response.body", "body": body})
+                return
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            stop_query_log(token)
+            log.log_duplicates("%s %s" % (scope["method"], scope["path"]))
+
+
+def _with_query_panel(body, log):
+    index = body.rfind(b"</body>")
+    if index == -1:
+        return body
+    return body[:index] + _render_query_panel(log).encode() + body[index:]
+
+
+def _render_query_panel(log):
+    rows = "".join(
+        "<tr><td>%.2f&nbsp;ms</td><td>%s</td><td><code>%s</code></td></tr>"
+        % (
+            query["duration"] * 1000,
+            "" if query["rows"] is None else query["rows"],
+            html.escape(query["sql"]),
+        )
+        for query in log.queries
+    )
+    duplicates = "".join(
+        "<li>%d&times; <code>%s</code><pre>%s</pre></li>"
+        % (entry["count"], html.escape(shape), html.escape("\n".join(entry["stack"])))
+        for shape, entry in log.duplicates.items()
+    )
+    return (
+        '<details id="raystack-queries" style="position:fixed;bottom:0;right:0;'
+        "z-index:99999;max-width:60%%;max-height:50%%;overflow:auto;"
+        'background:#fff;border:1px solid #ccc;padding:4px 8px;font:12px monospace">'
+        "<summary>%d queries in %.2f ms%s</summary>"
+        "%s<table>%s</table></details>"
+        % (
+            log.count,
+            log.total_time * 1000,
+            ", %d repeated" % len(log.duplicates) if log.duplicates else "",
+            "<p>Repeated queries (possible N+1):</p><ul>%s</ul>" % duplicates
+            if duplicates
+            else "",
+            rows,
+        )
+    )
+
+
+class MetricsMiddleware:
+    """
+    Record request latency, outcome and concurrency in the metrics registry.
+    Requests are labelled with their route template (``/users/{user_id}``),
+    never the raw path, so the number of series stays bounded.
+
+    Raystack adds this automatically when METRICS_ENABLED is on.
+    """
+
+    def __init__(self, app):
+        from raystack.core.metrics import instruments
+
+        self.app = app
+        self.instruments = instruments
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        instruments = self.instruments
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        instruments.HTTP_REQUESTS_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            duration = time.perf_counter() - start
+            instruments.HTTP_REQUESTS_IN_FLIGHT.dec()
+            route = _route_template(scope)
+            instruments.HTTP_REQUEST_DURATION.labels(scope["method"], route).observe(duration)
+            instruments.HTTP_REQUESTS.labels(scope["method"], route, status["code"]).inc()
+
+
+def _route_template(scope):
+    # The router stores the matched route in the (shared) scope; mounted apps
+    # only leave their root path behind.
+    route = scope.get("route")
+    if route is not None and getattr(route, "path", None):
+        return route.path
+    if scope.get("root_path"):
+        return scope["root_path"] + "/{path}"
+    return "<unmatched>"
+
+
+class ProfilingMiddleware:
+    """
+    Sample the call stacks of some requests with the statistical profiler in
+    raystack.core.profiling and aggregate them per route template, for the
+    admin profiling views. A request is profiled when its path matches one
+    of PROFILING_ROUTES (regular expressions), when it carries the
+    PROFILING_HEADER header, or at random for a PROFILING_SAMPLE_RATE
+    fraction of the rest.
+
+    Raystack adds this automatically when PROFILING_ENABLED is on, as the
+    innermost middleware: BaseHTTPMiddleware subclasses run the rest of the
+    stack in another task, and the view has to run in the task profiled.
+    """
+
+    def __init__(self, app):
+        from raystack.core import profiling
+
+        self.app = app
+        self.profiling = profiling
+        self.sample_rate = getattr(settings, "PROFILING_SAMPLE_RATE", 0.0)
+        header = getattr(settings, "PROFILING_HEADER", None)
+        self.header = header.lower().encode("latin-1") if header else None
+        self.routes = [re.compile(pattern) for pattern in getattr(settings, "PROFILING_ROUTES", [])]
+
+    def should_profile(self, scope):
+        if any(pattern.search(scope["path"]) for pattern in self.routes):
+            return True
+        if self.header and any(name == self.header for name, _ in scope["headers"]):
+            return True
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.should_profile(scope):
+            await self.app(scope, receive, send)
+            return
+
+        profiling = self.profiling
+        sampler = profiling.get_sampler()
+        profile = profiling.Profile(sys._getframe(), threading.get_ident())
+        sampler.track(profile)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            sampler.untrack(profile)
+            profiling.store.add(_route_template(scope), profile)
+
+
+class TracingMiddleware:
+    """
+    Run each request in a server span, continuing the trace named in its
+    traceparent header if there is one. The span is named after the route
+    template once the router has matched it.
+
+    Raystack adds this automatically when TRACING_ENABLED is on.
+    """
+
+    def __init__(self, app):
+        from raystack.core import tracing
+
+        self.app = app
+        self.tracing = tracing
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        tracer = self.tracing.get_tracer()
+        headers = {
+            name.decode("latin-1"): value.decode("latin-1")
+            for name, value in scope["headers"]
+        }
+        attributes = {
+            "http.method": scope["method"],
+            "http.target": scope.get("raw_path", scope["path"].encode()).decode("latin-1"),
+            "http.scheme": scope.get("scheme", "http"),
+        }
+        if scope.get("client"):
+            attributes["net.peer.ip"] = scope["client"][0]
+        if "user-agent" in headers:
+            attributes["http.user_agent"] = headers["user-agent"]
+
+        with tracer.span(
+            "%s %s" % (scope["method"], scope["path"]),
+            kind=self.tracing.SpanKind.SERVER,
+            attributes=attributes,
+            headers=headers,
+        ) as span:
+
+            async def send_wrapper(message):
+                if message["type"] == "http.response.start":
+                    span.set_attribute("http.status_code", message["status"])
+                    if message["status"] >= 500:
+                        tracer.set_error(span, "HTTP %d" % message["status"])
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_wrapper)
+            except Exception:
+                if "http.status_code" not in getattr(span, "attributes", {}):
+                    # ServerErrorMiddleware, outside this one, answers 500.
+                    span.set_attribute("http.status_code", 500)
+                raise
+            finally:
+                route = _route_template(scope)
+                span.set_attribute("http.route", route)
+                span.update_name("%s %s" % (scope["method"], route))
+
+
+class LocaleMiddleware:
+    """
+    Activate the language each request asks for (language cookie, then
+    Accept-Language, then LANGUAGE_CODE; see get_language_from_request) for
+    the duration of the request only, and tell caches the response depends
+    on it. The language is in ``request.state.language_code``.
+
+    Activation is per request even when requests run concurrently in one
+    event loop: each one sees only the language it activated.
+    """
+
+    def __init__(self, app):
+        from raystack.utils import translation
+
+        self.app = app
+        self.translation = translation
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.USE_I18N:
+            await self.app(scope, receive, send)
+            return
+
+        translation = self.translation
+        language = translation.get_language_from_request(Request(scope))
+        scope.setdefault("state", {})["language_code"] = language
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                headers.add_vary_header("Accept-Language")
+                if "content-language" not in headers:
+                    headers["Content-Language"] = translation.get_language()
+            await send(message)
+
+        translation.activate(language)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            translation.deactivate()
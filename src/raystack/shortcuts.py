@@ -14,7 +14,9 @@ def render_template(
     Return an HttpResponse whose content is filled with the result of calling
     raystack.template.loader.render_to_string() with the passed arguments.
     """
+    from raystack.core import tracing
     from raystack.template import loader
-    
-    content = loader.render_to_string(template_name, context, request, using=using)
+
+    with tracing.span("render_template", attributes={"template.name": str(template_name)}):
+        content = loader.render_to_string(template_name, context, request, using=using)
     return HTMLResponse(content)
@@ -3,10 +3,12 @@ from pathlib import Path
 import jinja2
 
 from raystack.conf import settings
+from raystack.core.metrics import metrics_enabled
 from raystack.template import TemplateDoesNotExist, TemplateSyntaxError
 from raystack.utils.functional import cached_property
 from raystack.utils.module_loading import import_string
 from raystack.forms.renderers import register_jinja2_form_filters
+from raystack.template.extensions import FragmentCacheExtension
 
 from .base import BaseEngine
 
@@ -24,12 +26,15 @@ class Jinja2(BaseEngine):
 
         environment = options.pop("environment", "jinja2.Environment")
         environment_cls = import_string(environment)
-        
+        fragment_cache = options.pop("fragment_cache", "default")
+
         if "loader" not in options:
             options["loader"] = jinja2.FileSystemLoader(self.template_dirs)
 
         self.env = environment_cls(**options)
         register_jinja2_form_filters(self.env)
+        self.env.add_extension(FragmentCacheExtension)
+        self.env.fragment_cache_alias = fragment_cache
 
     def get_template(self, template_name):
         try:
@@ -62,6 +67,11 @@ class Template:
             for context_processor in self.backend.template_context_processors:
                 context.update(context_processor(request))
         try:
+            if metrics_enabled():
+                from raystack.core.metrics.instruments import TEMPLATE_RENDER
+
+                with TEMPLATE_RENDER.labels(self.origin.template_name).time():
+                    return self.template.render(context)
             return self.template.render(context)
         except jinja2.TemplateSyntaxError as exc:
             new = TemplateSyntaxError(exc.args)
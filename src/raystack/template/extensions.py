@@ -0,0 +1,54 @@
+from jinja2 import nodes
+from jinja2.ext import Extension
+
+from raystack.core.cache.utils import make_template_fragment_key
+
+
+class FragmentCacheExtension(Extension):
+    """
+    Cache the rendered contents of a template fragment:
+
+        {% cache 600, "sidebar", segment %}
+            ...
+        {% endcache %}
+
+    The first argument is the timeout in seconds (None caches forever), the
+    second names the fragment and any further arguments are values the
+    fragment varies on. Without a name the fragment is identified by its
+    template and line number.
+
+    Fragments are stored in the cache alias held by the environment's
+    ``fragment_cache_alias`` attribute ("default" unless configured through
+    the Jinja2 backend's "fragment_cache" option); size limits are those of
+    that backend.
+    """
+
+    tags = {"cache"}
+
+    def __init__(self, environment):
+        super().__init__(environment)
+        environment.extend(fragment_cache_alias="default")
+
+    def parse(self, parser):
+        lineno = next(parser.stream).lineno
+        args = [parser.parse_expression()]
+        while parser.stream.skip_if("comma"):
+            args.append(parser.parse_expression())
+        if len(args) == 1:
+            args.append(nodes.Const("%s:%d" % (parser.name, lineno)))
+        body = parser.parse_statements(("name:endcache",), drop_needle=True)
+        call = self.call_method(
+            "_cache_support", [args[0], args[1], nodes.List(args[2:])]
+        )
+        return nodes.CallBlock(call, [], [], body).set_lineno(lineno)
+
+    def _cache_support(self, timeout, fragment_name, vary_on, caller):
+        from raystack.core.cache import caches
+
+        fragment_cache = caches[self.environment.fragment_cache_alias]
+        key = make_template_fragment_key(fragment_name, vary_on)
+        value = fragment_cache.get(key)
+        if value is None:
+            value = caller()
+            fragment_cache.set(key, value, timeout)
+        return value
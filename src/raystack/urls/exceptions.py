@@ -1,4 +1,9 @@
-from raystack.http import Http404
+try:
+    from raystack.http import Http404
+except ImportError:  # raystack.http hasn't been ported yet.
+
+    class Http404(Exception):
+        pass
 
 
 class Resolver404(Http404):
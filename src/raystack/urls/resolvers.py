@@ -7,6 +7,7 @@ attributes of the resolved URL match.
 """
 
 import functools
+import heapq
 import inspect
 import re
 import string
@@ -17,8 +18,11 @@ from urllib.parse import quote
 from asgiref.local import Local
 
 from raystack.conf import settings
-from raystack.core.checks import Error, Warning
-from raystack.core.checks.urls import check_resolver
+try:
+    from raystack.core.checks import Error, Warning
+    from raystack.core.checks.urls import check_resolver
+except ImportError:  # The system check framework hasn't been ported yet.
+    Error = Warning = check_resolver = None
 from raystack.core.exceptions import ImproperlyConfigured
 from raystack.utils.datastructures import MultiValueDict
 from raystack.utils.functional import cached_property
@@ -104,6 +108,16 @@ class ResolverMatch:
     def __reduce_ex__(self, protocol):
         raise PicklingError(f"Cannot pickle {self.__class__.__qualname__}.")
 
+    def _clone(self):
+        """
+        Return a copy that can be handed out while the original stays in the
+        resolver's cache. Views are free to mutate kwargs.
+        """
+        clone = self.__class__.__new__(self.__class__)
+        clone.__dict__.update(self.__dict__)
+        clone.kwargs = dict(self.kwargs)
+        return clone
+
 
 def get_resolver(urlconf=None):
     if urlconf is None:
@@ -492,8 +506,153 @@ class URLPattern:
             return callback.__module__ + "." + callback.__class__.__name__
         return callback.__module__ + "." + callback.__qualname__
 
+try:
+    from re import _parser as _sre_parse
+except ImportError:  # Python < 3.11
+    import sre_parse as _sre_parse
+
+_BACKREFERENCE_RE = _lazy_re_compile(r"\\[1-9]|\(\?P=")
+_NAMED_GROUP_RE = _lazy_re_compile(r"\(\?P<[^>]+>")
+# Key of the trie node holding the indices of the includes whose prefix ends
+# there. No path character is the empty string.
+_TRIE_END = ""
+
+
+def _literal_regex(regex):
+    """
+    If regex only matches one literal string from the start of the path,
+    return (literal, anchored_at_end), otherwise None.
+    """
+    if "(?" in regex:
+        # Groups and inline flags (e.g. case-insensitive matching).
+        return None
+    try:
+        parsed = list(_sre_parse.parse(regex))
+    except re.error:
+        return None
+    if not parsed or parsed[0] != (_sre_parse.AT, _sre_parse.AT_BEGINNING):
+        return None
+    parsed = parsed[1:]
+    anchored = bool(parsed) and parsed[-1] in (
+        (_sre_parse.AT, _sre_parse.AT_END),
+        (_sre_parse.AT, _sre_parse.AT_END_STRING),
+    )
+    if anchored:
+        parsed = parsed[:-1]
+    if any(op is not _sre_parse.LITERAL for op, _ in parsed):
+        return None
+    return "".join(chr(code) for _, code in parsed), anchored
+
+
+def _classify_pattern(url_pattern):
+    """
+    Sort a url_patterns entry into the route table: ("static", path) for
+    endpoints matching one exact path, ("prefix", prefix) for includes under a
+    literal prefix, ("regex", pattern) for anything else that can be part of
+    the combined regex, and ("linear", None) for entries that must always be
+    tried (translated or locale-prefixed patterns, backreferences, ...).
+    """
+    pattern = url_pattern.pattern
+    is_endpoint = isinstance(url_pattern, URLPattern)
+    if isinstance(pattern, RoutePattern) and isinstance(pattern._route, str):
+        if not pattern.converters:
+            return ("static" if is_endpoint else "prefix"), pattern._route
+        regex = pattern._regex
+    elif isinstance(pattern, RegexPattern) and isinstance(pattern._regex, str):
+        regex = pattern._regex
+        literal = _literal_regex(regex)
+        if literal is not None:
+            value, anchored = literal
+            return ("static" if anchored and is_endpoint else "prefix"), value
+    else:
+        return "linear", None
+    if not regex.startswith("^") or _BACKREFERENCE_RE.search(regex):
+        return "linear", None
+    # Only the alternative's own group tells which entry matched; the
+    # pattern extracts its arguments itself afterwards.
+    regex = _NAMED_GROUP_RE.sub("(?:", regex[1:])
+    try:
+        re.compile(regex)
+    except re.error:
+        # e.g. global inline flags, which are only valid at the start.
+        return "linear", None
+    return "regex", regex
+
+
+class RouteTable:
+    """
+    Index over one resolver's url_patterns, answering "which entries can
+    match this path" without trying each of them:
+
+    - static: exact path -> index of the first endpoint matching only it;
+    - prefixes: character trie of the literal prefixes of include()s;
+    - combined: one alternation of the remaining patterns, whose first
+      matching alternative is the first of them that can match;
+    - linear: entries that are tried for every path.
+
+    Candidates are returned in url_patterns order, so the first entry that
+    resolves is the one a linear walk would have found.
+    """
+
+    def __init__(self, url_patterns):
+        self.static = {}
+        self.prefixes = {}
+        self.dynamic = []
+        self.linear = []
+        alternatives = []
+        for index, url_pattern in enumerate(url_patterns):
+            kind, value = _classify_pattern(url_pattern)
+            if kind == "static":
+                self.static.setdefault(value, index)
+            elif kind == "prefix":
+                node = self.prefixes
+                for char in value:
+                    node = node.setdefault(char, {})
+                node.setdefault(_TRIE_END, []).append(index)
+            elif kind == "regex":
+                self.dynamic.append(index)
+                alternatives.append("(?P<_%d>%s)" % (index, value))
+            else:
+                self.linear.append(index)
+        self.combined = None
+        if alternatives:
+            try:
+                self.combined = re.compile("^(?:%s)" % "|".join(alternatives))
+            except (re.error, AssertionError):
+                # Too many groups or otherwise not combinable.
+                self.linear = sorted(self.linear + self.dynamic)
+                self.dynamic = []
+
+    def candidates(self, path):
+        """
+        Return (heap of candidate indices, index found by the combined regex
+        or None).
+        """
+        found = list(self.linear)
+        index = self.static.get(path)
+        if index is not None:
+            found.append(index)
+        node = self.prefixes
+        found.extend(node.get(_TRIE_END, ()))
+        for char in path:
+            node = node.get(char)
+            if node is None:
+                break
+            found.extend(node.get(_TRIE_END, ()))
+        dynamic_index = None
+        if self.combined is not None:
+            match = self.combined.match(path)
+            if match:
+                dynamic_index = int(match.lastgroup[1:])
+                found.append(dynamic_index)
+        heapq.heapify(found)
+        return found, dynamic_index
+
 
 class URLResolver:
+    # Number of resolved paths (per language) remembered by resolve().
+    resolve_cache_size = 1024
+
     def __init__(
         self, pattern, urlconf_name, default_kwargs=None, app_name=None, namespace=None
     ):
@@ -512,8 +671,12 @@ class URLResolver:
         # set of dotted paths to all functions and classes that are used in
         # urlpatterns
         self._callback_strs = set()
+        self._route_tables = {}
         self._populated = False
         self._local = Local()
+        self._resolve_cached = functools.lru_cache(maxsize=self.resolve_cache_size)(
+            self._resolve_compiled
+        )
 
     def __repr__(self):
         if isinstance(self.urlconf_name, list) and self.urlconf_name:
@@ -551,7 +714,7 @@ class URLResolver:
             for url_pattern in reversed(self.url_patterns):
                 p_pattern = url_pattern.pattern.regex.pattern
                 if p_pattern.startswith("^"):
-            p_pattern = p_pattern[1:]
+                    p_pattern = p_pattern[1:]
                 if isinstance(url_pattern, URLPattern):
                     self._callback_strs.add(url_pattern.lookup_str)
                     bits = normalize(url_pattern.pattern.regex.pattern)
@@ -616,6 +779,7 @@ class URLResolver:
             self._namespace_dict[language_code] = namespaces
             self._app_dict[language_code] = apps
             self._reverse_dict[language_code] = lookups
+            self._route_tables[language_code] = RouteTable(self.url_patterns)
             self._populated = True
         finally:
             self._local.populating = False
@@ -664,47 +828,109 @@ class URLResolver:
 
     def resolve(self, path):
         path = str(path)  # path may be a reverse_lazy object
+        if settings.DEBUG:
+            # Keep the full list of tried patterns for the debug 404 page.
+            return self._resolve_linear(path)
+        resolver_match = self._resolve_cached(get_language(), path)
+        if resolver_match is None:
+            # Misses are cached too. The patterns tried are only listed on
+            # the DEBUG 404 page, which resolves linearly.
+            raise Resolver404({"path": path})
+        return resolver_match._clone()
+
+    def _resolve_compiled(self, language_code, path):
+        """
+        Resolve path using the route table, trying only the entries that can
+        match it. Return None if nothing matches.
+        """
+        match = self.pattern.match(path)
+        if match:
+            new_path, args, kwargs = match
+            table = self._route_tables.get(language_code)
+            if table is None:
+                self._populate()
+                table = self._route_tables.get(language_code)
+            if table is None:
+                try:
+                    return self._resolve_linear(path)
+                except Resolver404:
+                    return None
+            else:
+                url_patterns = self.url_patterns
+                pending, dynamic_index = table.candidates(new_path)
+                seen = set()
+                while pending:
+                    index = heapq.heappop(pending)
+                    if index in seen:
+                        continue
+                    seen.add(index)
+                    pattern = url_patterns[index]
+                    try:
+                        if isinstance(pattern, URLResolver):
+                            sub_match = pattern._resolve_compiled(
+                                language_code, new_path
+                            )
+                        else:
+                            sub_match = pattern.resolve(new_path)
+                    except Resolver404:
+                        sub_match = None
+                    if sub_match:
+                        return self._build_match(pattern, sub_match, args, kwargs)
+                    if index == dynamic_index:
+                        # The combined regex only finds the first dynamic
+                        # pattern that matches; a converter may still reject
+                        # it, so fall back to the ones after it.
+                        for later in table.dynamic:
+                            if later > index:
+                                heapq.heappush(pending, later)
+        return None
+
+    def _build_match(self, pattern, sub_match, args, kwargs, tried=None):
+        # Merge captured arguments in match with submatch
+        sub_match_dict = {**kwargs, **self.default_kwargs}
+        # Update the sub_match_dict with the kwargs from the sub_match.
+        sub_match_dict.update(sub_match.kwargs)
+        # If there are *any* named groups, ignore all non-named groups.
+        # Otherwise, pass all non-named arguments as positional
+        # arguments.
+        sub_match_args = sub_match.args
+        if not sub_match_dict:
+            sub_match_args = args + sub_match.args
+        current_route = "" if isinstance(pattern, URLPattern) else str(pattern.pattern)
+        return ResolverMatch(
+            sub_match.func,
+            sub_match_args,
+            sub_match_dict,
+            sub_match.url_name,
+            [self.app_name] + sub_match.app_names,
+            [self.namespace] + sub_match.namespaces,
+            self._join_route(current_route, sub_match.route),
+            tried,
+            captured_kwargs=sub_match.captured_kwargs,
+            extra_kwargs={
+                **self.default_kwargs,
+                **sub_match.extra_kwargs,
+            },
+        )
+
+    def _resolve_linear(self, path):
         tried = []
         match = self.pattern.match(path)
         if match:
             new_path, args, kwargs = match
             for pattern in self.url_patterns:
                 try:
-                    sub_match = pattern.resolve(new_path)
+                    if isinstance(pattern, URLResolver):
+                        sub_match = pattern._resolve_linear(new_path)
+                    else:
+                        sub_match = pattern.resolve(new_path)
                 except Resolver404 as e:
                     self._extend_tried(tried, pattern, e.args[0].get("tried"))
                 else:
                     if sub_match:
-                        # Merge captured arguments in match with submatch
-                        sub_match_dict = {**kwargs, **self.default_kwargs}
-                        # Update the sub_match_dict with the kwargs from the sub_match.
-                        sub_match_dict.update(sub_match.kwargs)
-                        # If there are *any* named groups, ignore all non-named groups.
-                        # Otherwise, pass all non-named arguments as positional
-                        # arguments.
-                        sub_match_args = sub_match.args
-                        if not sub_match_dict:
-                            sub_match_args = args + sub_match.args
-                        current_route = (
-                            ""
-                            if isinstance(pattern, URLPattern)
-                            else str(pattern.pattern)
-                        )
                         self._extend_tried(tried, pattern, sub_match.tried)
-                        return ResolverMatch(
-                            sub_match.func,
-                            sub_match_args,
-                            sub_match_dict,
-                            sub_match.url_name,
-                            [self.app_name] + sub_match.app_names,
-                            [self.namespace] + sub_match.namespaces,
-                            self._join_route(current_route, sub_match.route),
-                            tried,
-                            captured_kwargs=sub_match.captured_kwargs,
-                            extra_kwargs={
-                                **self.default_kwargs,
-                                **sub_match.extra_kwargs,
-                            },
+                        return self._build_match(
+                            pattern, sub_match, args, kwargs, tried
                         )
                     tried.append([pattern])
             raise Resolver404({"tried": tried, "path": new_path})
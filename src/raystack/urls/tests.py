@@ -0,0 +1,174 @@
+"""
+Tests of the route table: URLResolver.resolve() must find what a linear walk
+of the patterns finds.
+"""
+import unittest
+
+from raystack.conf import settings
+
+if not settings.configured:
+    settings.configure(SECRET_KEY="raystack-tests", USE_I18N=False)
+
+from raystack.urls import converters  # noqa: E402
+from raystack.urls.exceptions import Resolver404  # noqa: E402
+from raystack.urls.resolvers import (  # noqa: E402
+    RegexPattern,
+    RoutePattern,
+    URLPattern,
+    URLResolver,
+)
+
+
+class EvenConverter:
+    """Rejects odd numbers, so the combined regex's first match can be wrong."""
+
+    regex = "[0-9]+"
+
+    def to_python(self, value):
+        if int(value) % 2:
+            raise ValueError
+        return int(value)
+
+    def to_url(self, value):
+        return str(value)
+
+
+if "even" not in converters.REGISTERED_CONVERTERS:
+    converters.register_converter(EvenConverter, "even")
+
+
+def view(request, *args, **kwargs):
+    pass
+
+
+def other_view(request, *args, **kwargs):
+    pass
+
+
+# What path(), re_path() and include() build (path() itself imports the
+# class-based views, which this tree doesn't ship).
+
+def path(route, view, name=None):
+    return URLPattern(RoutePattern(route, name=name, is_endpoint=True), view, None, name)
+
+
+def re_path(regex, view, name=None):
+    return URLPattern(RegexPattern(regex, name=name, is_endpoint=True), view, None, name)
+
+
+def include(route, patterns, Pattern=RoutePattern):
+    return URLResolver(Pattern(route, is_endpoint=False), patterns)
+
+
+article_patterns = [
+    path("", view, name="article-list"),
+    path("<int:pk>/", view, name="article-detail"),
+    path("<int:pk>/comments/<slug:slug>/", other_view, name="article-comment"),
+    re_path(r"^archive/(?P<year>[0-9]{4})/$", view, name="article-archive"),
+]
+
+urlpatterns = [
+    path("", view, name="home"),
+    path("about/", view, name="about"),
+    path("about/", other_view, name="about-shadowed"),
+    include("articles/", article_patterns),
+    include("users/<int:user_id>/", [
+        path("", view, name="user"),
+        path("posts/<uuid:post>/", other_view, name="user-post"),
+    ]),
+    include(r"^old/(?P<section>[a-z]+)/", [path("<int:pk>/", view, name="old")], RegexPattern),
+    path("numbers/<even:number>/", view, name="even"),
+    path("numbers/<int:number>/", other_view, name="odd"),
+    path("files/<path:name>", view, name="file"),
+    path("<slug:page>/", other_view, name="page"),
+    re_path(r"^legacy/(\d+)/$", view, name="legacy"),
+    re_path(r"^(?:case|CASE)/$", view, name="case"),
+    re_path(r"^twice/(?P<a>x)(?P=a)/$", view, name="backreference"),
+    re_path(r"^static\.txt$", other_view, name="static-regex"),
+    include("nested/", [
+        include("deeper/", [path("<str:leaf>/", view, name="leaf")]),
+    ]),
+]
+
+PATHS = [
+    "/", "/about/", "/about", "/articles/", "/articles/12/", "/articles/x/",
+    "/articles/12/comments/first-one/", "/articles/12/comments/", "/articles/archive/2024/",
+    "/articles/archive/24/", "/users/7/", "/users/7/posts/12345678-1234-1234-1234-123456789abc/",
+    "/users/7/posts/not-a-uuid/", "/users/x/", "/numbers/4/", "/numbers/5/", "/numbers/x/",
+    "/files/a/b/c.txt", "/files/", "/some-page/", "/some page/", "/legacy/12/", "/legacy/x/",
+    "/case/", "/CASE/", "/twice/xx/", "/twice/xy/", "/static.txt", "/staticxtxt",
+    "/nested/deeper/leaf/", "/nested/deeper/", "/nested/", "/missing/deeper/path/", "",
+    "no-leading-slash/", "/old/news/3/", "/old/NEWS/3/", "/old/news/",
+]
+
+
+class ResolverTests(unittest.TestCase):
+    def setUp(self):
+        self.resolver = URLResolver(RegexPattern(r"^/"), urlpatterns)
+
+    def resolve_linear(self, path):
+        try:
+            return self.resolver._resolve_linear(path)
+        except Resolver404:
+            return None
+
+    def resolve(self, path):
+        try:
+            return self.resolver.resolve(path)
+        except Resolver404:
+            return None
+
+    def test_same_as_linear_walk(self):
+        for path in PATHS:
+            with self.subTest(path=path):
+                expected = self.resolve_linear(path)
+                match = self.resolve(path)
+                if expected is None:
+                    self.assertIsNone(match)
+                    continue
+                self.assertIsNotNone(match)
+                self.assertEqual(
+                    (match.func, match.args, match.kwargs, match.url_name, match.route),
+                    (expected.func, expected.args, expected.kwargs, expected.url_name, expected.route),
+                )
+
+    def test_converter_rejecting_the_first_match(self):
+        self.assertEqual(self.resolve("/numbers/4/").url_name, "even")
+        self.assertEqual(self.resolve("/numbers/5/").url_name, "odd")
+        self.assertEqual(self.resolve("/numbers/5/").kwargs, {"number": 5})
+
+    def test_first_of_equal_patterns_wins(self):
+        self.assertEqual(self.resolve("/about/").url_name, "about")
+
+    def test_include_arguments(self):
+        match = self.resolve("/users/7/posts/12345678-1234-1234-1234-123456789abc/")
+        self.assertEqual(match.url_name, "user-post")
+        self.assertEqual(match.kwargs["user_id"], 7)
+        self.assertEqual(str(match.kwargs["post"]), "12345678-1234-1234-1234-123456789abc")
+
+    def test_misses_are_cached_without_a_linear_walk(self):
+        self.resolver._resolve_linear = None  # Calling it would fail.
+        for attempt in range(2):
+            with self.assertRaises(Resolver404):
+                self.resolver.resolve("/missing/deeper/path/")
+        self.assertEqual(self.resolver._resolve_cached.cache_info().hits, 1)
+
+    def test_matches_are_cached_and_copied(self):
+        first = self.resolve("/articles/12/")
+        first.kwargs["pk"] = 0
+        self.assertEqual(self.resolve("/articles/12/").kwargs, {"pk": 12})
+        self.assertEqual(self.resolver._resolve_cached.cache_info().hits, 1)
+
+    def test_debug_resolves_linearly_with_tried_patterns(self):
+        debug = settings.DEBUG
+        settings.DEBUG = True
+        self.addCleanup(setattr, settings, "DEBUG", debug)
+        with self.assertRaises(Resolver404) as caught:
+            self.resolver.resolve("/missing/deeper/path/")
+        self.assertEqual(len(caught.exception.args[0]["tried"]), len(urlpatterns))
+        self.assertEqual(self.resolver.resolve("/numbers/5/").url_name, "odd")
+        self.assertEqual(self.resolver._resolve_cached.cache_info().currsize, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
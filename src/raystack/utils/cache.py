@@ -0,0 +1,124 @@
+"""
+This module contains helper functions for controlling caching. It does so by
+managing the "Vary" header of responses. It includes functions to patch the
+header of response objects directly and decorators that change functions to do
+that header-patching themselves.
+
+For information on the Vary header, see RFC 9110 Section 12.5.5.
+
+Essentially, the "Vary" HTTP header defines which headers a cache should take
+into account when building its cache key. Requests with the same path but
+different header content for headers named in "Vary" need to get different
+cache keys to prevent delivery of wrong content.
+"""
+
+import hashlib
+
+from raystack.utils.regex_helper import _lazy_re_compile
+
+cc_delim_re = _lazy_re_compile(r"\s*,\s*")
+
+# Pseudo header accepted by vary_on: the cache entry depends on the
+# authenticated user rather than on a request header.
+VARY_ON_USER = "user"
+
+
+def _split_header(value):
+    return [item for item in cc_delim_re.split(value) if item] if value else []
+
+
+def patch_cache_control(response, **kwargs):
+    """
+    Patch the Cache-Control header by adding all keyword arguments to it.
+    Underscores in the argument names are turned into hyphens, True values
+    become bare directives and existing directives are replaced.
+    """
+    directives = {}
+    for item in _split_header(response.headers.get("Cache-Control")):
+        name, _, value = item.partition("=")
+        directives[name.lower()] = value or True
+
+    if "max_age" in kwargs and "max-age" in directives:
+        # Allow the shortest max-age to win.
+        kwargs["max_age"] = min(int(directives["max-age"]), kwargs["max_age"])
+
+    for k, v in kwargs.items():
+        directives[k.replace("_", "-")] = v
+
+    response.headers["Cache-Control"] = ", ".join(
+        name if value is True else "%s=%s" % (name, value)
+        for name, value in directives.items()
+        if value is not False
+    )
+
+
+def get_cache_control(response):
+    """Return the lowercased Cache-Control directives of a response as a set."""
+    return {
+        item.partition("=")[0].lower()
+        for item in _split_header(response.headers.get("Cache-Control"))
+    }
+
+
+def patch_vary_headers(response, newheaders):
+    """
+    Add (or update) the "Vary" header in the given response object.
+    newheaders is a list of header names that should be in "Vary". If headers
+    contains an asterisk, then "Vary" header will consist of a single asterisk
+    '*'. Otherwise, existing headers in "Vary" aren't removed.
+    """
+    vary_headers = _split_header(response.headers.get("Vary"))
+    existing_headers = {header.lower() for header in vary_headers}
+    additional_headers = [
+        newheader
+        for newheader in newheaders
+        if newheader.lower() not in existing_headers
+    ]
+    vary_headers += additional_headers
+    if "*" in vary_headers:
+        response.headers["Vary"] = "*"
+    elif vary_headers:
+        response.headers["Vary"] = ", ".join(vary_headers)
+
+
+def _vary_value(request, vary):
+    if callable(vary):
+        return str(vary(request))
+    if vary.lower() == VARY_ON_USER:
+        user = request.scope.get("user")
+        if user is None or not getattr(user, "is_authenticated", False):
+            return ""
+        return str(getattr(user, "username", "") or getattr(user, "id", ""))
+    return request.headers.get(vary, "")
+
+
+def get_cache_key(request, key_prefix="", vary_on=()):
+    """
+    Return a cache key for the request, built from the full URL (path and
+    query string) and the values of the request attributes named in vary_on.
+
+    vary_on may hold header names, the "user" pseudo header or callables
+    taking the request and returning a string.
+    """
+    ctx = hashlib.md5(usedforsecurity=False)
+    for vary in vary_on:
+        ctx.update(_vary_value(request, vary).encode())
+        ctx.update(b"\x00")
+    url = hashlib.md5(str(request.url).encode("ascii"), usedforsecurity=False)
+    return "views.decorators.cache.cache_page.%s.%s.%s" % (
+        key_prefix,
+        url.hexdigest(),
+        ctx.hexdigest(),
+    )
+
+
+def vary_header_names(vary_on):
+    """
+    Return the header names to advertise in Vary for vary_on. The user is
+    identified by its session/JWT cookie, so "user" maps to Cookie.
+    """
+    return [
+        "Cookie" if vary.lower() == VARY_ON_USER else vary
+        for vary in vary_on
+        if isinstance(vary, str)
+    ]
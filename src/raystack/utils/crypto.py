@@ -2,11 +2,14 @@
 Raystack's standard crypto functions and utilities.
 """
 
+import functools
 import hashlib
 import hmac
 import secrets
 
 from raystack.conf import settings
+from raystack.core.exceptions import ImproperlyConfigured
+from raystack.core.signals import receiver, setting_changed
 from raystack.utils.encoding import force_bytes
 
 
@@ -16,6 +19,18 @@ class InvalidAlgorithm(ValueError):
     pass
 
 
+def get_secret_key():
+    """
+    Return settings.SECRET_KEY. It's checked here, where a key is needed to
+    sign something, rather than when settings are read: projects that never
+    sign anything (management commands, migrate) run without one.
+    """
+    secret = settings.SECRET_KEY
+    if not secret:
+        raise ImproperlyConfigured("The SECRET_KEY setting must not be empty.")
+    return secret
+
+
 def salted_hmac(key_salt, value, secret=None, *, algorithm="sha1"):
     """
     Return the HMAC of 'value', using a key generated from key_salt and a
@@ -25,10 +40,20 @@ def salted_hmac(key_salt, value, secret=None, *, algorithm="sha1"):
     A different key_salt should be passed in for every application of HMAC.
     """
     if secret is None:
-        secret = settings.SECRET_KEY
+        secret = get_secret_key()
+    mac = _keyed_hmac(force_bytes(key_salt), force_bytes(secret), algorithm).copy()
+    mac.update(force_bytes(value))
+    return mac
+
 
-    key_salt = force_bytes(key_salt)
-    secret = force_bytes(secret)
+@functools.lru_cache(maxsize=256)
+def _keyed_hmac(key_salt, secret, algorithm):
+    """
+    An HMAC keyed with the key derived from key_salt and secret, holding no
+    message yet. Deriving the key and setting up the HMAC's inner and outer
+    hashes is done once per (key_salt, secret, algorithm); salted_hmac()
+    copies the result. The copies are never updated in place.
+    """
     try:
         hasher = getattr(hashlib, algorithm)
     except AttributeError as e:
@@ -42,7 +67,14 @@ def salted_hmac(key_salt, value, secret=None, *, algorithm="sha1"):
     # line is redundant and could be replaced by key = key_salt + secret, since
     # the hmac module does the same thing for keys longer than the block size.
     # However, we need to ensure that we *always* do this.
-    return hmac.new(key, msg=force_bytes(value), digestmod=hasher)
+    return hmac.new(key, digestmod=hasher)
+
+
+@receiver(setting_changed)
+def clear_keyed_hmacs(*, setting, **kwargs):
+    # Don't keep keys derived from a secret that was rotated out.
+    if setting in ("SECRET_KEY", "SECRET_KEY_FALLBACKS"):
+        _keyed_hmac.cache_clear()
 
 
 RANDOM_STRING_CHARS = "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789"
@@ -0,0 +1,166 @@
+"""
+Precompiled translation catalogs.
+
+``compiletranslations`` merges the catalogs of each language, from every
+locale directory, into LOCALE_CACHE_DIR/<locale>/<n>.mo: one GNU .mo file
+per plural form, in the order they're looked up. At run time MoCatalog maps
+those files into memory and looks messages up in their sorted tables
+instead of parsing them, so loading a language costs an open() and an
+mmap() however big its catalogs are.
+"""
+import mmap
+import os
+import struct
+from gettext import c2py
+
+MAGIC = 0x950412DE
+HEADER = struct.Struct("<7I")
+ENTRY = struct.Struct("<2I")
+# Messages found (or not) kept per catalog, beyond its number of messages.
+MEMO_SLACK = 1024
+
+
+def write_mo(path, catalog):
+    """
+    Write ``catalog`` (a GNUTranslations._catalog: {msgid: msgstr} and
+    {(msgid, n): msgstr} for plurals) to ``path`` as a UTF-8 .mo file.
+    """
+    messages = {}
+    plurals = {}
+    for key, value in catalog.items():
+        if isinstance(key, tuple):
+            plurals.setdefault(key[0], {})[key[1]] = value
+        else:
+            messages[key.encode("utf-8")] = value.encode("utf-8")
+    for msgid, forms in plurals.items():
+        # GNUTranslations forgets msgid_plural; any text after the NUL works.
+        key = msgid.encode("utf-8") + b"\x00" + msgid.encode("utf-8")
+        messages[key] = b"\x00".join(forms[n].encode("utf-8") for n in sorted(forms))
+    keys = sorted(messages)
+    count = len(keys)
+    originals_offset = HEADER.size
+    translations_offset = originals_offset + count * ENTRY.size
+    data_offset = translations_offset + count * ENTRY.size
+    originals, translations, data = [], [], []
+    offset = data_offset
+    for key in keys:
+        originals.append(ENTRY.pack(len(key), offset))
+        data.append(key + b"\x00")
+        offset += len(key) + 1
+    for key in keys:
+        value = messages[key]
+        translations.append(ENTRY.pack(len(value), offset))
+        data.append(value + b"\x00")
+        offset += len(value) + 1
+    tmp = "%s.%d.tmp" % (path, os.getpid())
+    with open(tmp, "wb") as f:
+        f.write(HEADER.pack(MAGIC, 0, count, originals_offset, translations_offset, 0, data_offset))
+        f.write(b"".join(originals))
+        f.write(b"".join(translations))
+        f.write(b"".join(data))
+    # Running processes keep the file they mapped.
+    os.replace(tmp, path)
+
+
+class MoCatalog:
+    """
+    A read-only GNUTranslations._catalog over a .mo file written by
+    write_mo(), mapped into memory rather than read.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            self._data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, _, self._count, self._originals, self._translations, _, _ = HEADER.unpack_from(self._data)
+        if magic != MAGIC:
+            raise OSError("Not a little-endian .mo file: %s" % path)
+        self._memo = {}
+        self._memo_size = self._count + MEMO_SLACK
+        info = self._header_info()
+        plural_forms = info.get("plural-forms", "")
+        plural = plural_forms.partition("plural=")[2]
+        self.plural = c2py(plural.rstrip(" ;")) if plural else (lambda n: int(n != 1))
+        self.info = info
+
+    def _header_info(self):
+        info = {}
+        header = self._lookup(b"")
+        for line in (header or b"").decode("utf-8").split("\n"):
+            name, sep, value = line.partition(":")
+            if sep:
+                info[name.strip().lower()] = value.strip()
+        return info
+
+    def _string(self, table, index):
+        length, offset = ENTRY.unpack_from(self._data, table + index * ENTRY.size)
+        return self._data[offset:offset + length]
+
+    def _search(self, key):
+        """The index of the first message not sorting before ``key``."""
+        low, high = 0, self._count
+        while low < high:
+            middle = (low + high) // 2
+            if self._string(self._originals, middle) < key:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def _lookup(self, key):
+        index = self._search(key)
+        if index < self._count and self._string(self._originals, index) == key:
+            return self._string(self._translations, index)
+        return None
+
+    def _find(self, key):
+        if isinstance(key, tuple):
+            msgid, n = key
+            prefix = msgid.encode("utf-8") + b"\x00"
+            index = self._search(prefix)
+            if index < self._count and self._string(self._originals, index).startswith(prefix):
+                forms = self._string(self._translations, index).split(b"\x00")
+                if 0 <= n < len(forms):
+                    return forms[n].decode("utf-8")
+            return None
+        value = self._lookup(key.encode("utf-8"))
+        return None if value is None else value.decode("utf-8")
+
+    def get(self, key, default=None):
+        try:
+            value = self._memo[key]
+        except KeyError:
+            value = self._find(key)
+            if len(self._memo) < self._memo_size:
+                self._memo[key] = value
+        return default if value is None else value
+
+    def __getitem__(self, key):
+        value = self.get(key)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key):
+        return self.get(key) is not None
+
+    def __len__(self):
+        return self._count
+
+    def items(self):
+        for index in range(self._count):
+            key = self._string(self._originals, index).decode("utf-8")
+            value = self._string(self._translations, index).decode("utf-8")
+            if "\x00" in key:
+                msgid = key.split("\x00")[0]
+                for n, form in enumerate(value.split("\x00")):
+                    yield (msgid, n), form
+            else:
+                yield key, value
+
+    def keys(self):
+        for key, value in self.items():
+            yield key
+
+    def copy(self):
+        return dict(self.items())
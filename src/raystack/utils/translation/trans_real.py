@@ -5,25 +5,28 @@ import gettext as gettext_module
 import os
 import re
 import sys
+import tempfile
+import threading
 import warnings
-
-from asgiref.local import Local
+from contextvars import ContextVar
 
 from raystack.apps import apps
 from raystack.conf import settings
 from raystack.conf.locale import LANG_INFO
 from raystack.core.exceptions import AppRegistryNotReady
-# from raystack.core.signals import setting_changed
-# from raystack.dispatch import receiver
+from raystack.core.signals import receiver, setting_changed
 from raystack.utils.regex_helper import _lazy_re_compile
 from raystack.utils.safestring import SafeData, mark_safe
 
 from . import to_language, to_locale
+from .catalogs import MoCatalog, write_mo
 
 # Translations are cached in a dictionary for every language.
-# The active translations are stored by threadid to make them thread local.
 _translations = {}
-_active = Local()
+_translations_lock = threading.RLock()
+# The active translation of the current thread or task: each request
+# (see raystack.middlewares.LocaleMiddleware) sees only its own.
+_active = ContextVar("raystack_translation", default=None)
 
 # The default translation is based on the settings file.
 _default = None
@@ -55,6 +58,22 @@ language_code_re = _lazy_re_compile(
     r"^[a-z]{1,8}(?:-[a-z0-9]{1,8})*(?:@[a-z0-9]{1,20})?$", re.IGNORECASE
 )
 
+
+@receiver(setting_changed)
+def reset_cache(*, setting, **kwargs):
+    """
+    Reset global state when LANGUAGES setting has been changed, as some
+    languages should no longer be accepted.
+    """
+    global _default
+    if setting in ("LANGUAGES", "LANGUAGE_CODE", "LOCALE_PATHS", "LOCALE_CACHE_DIR"):
+        check_for_language.cache_clear()
+        get_languages.cache_clear()
+        get_supported_language_variant.cache_clear()
+        with _translations_lock:
+            _translations.clear()
+            _default = None
+
 language_code_prefix_re = _lazy_re_compile(r"^/(\w+([@-]\w+){0,2})(/|$)")
 
 
@@ -91,13 +110,28 @@ class TranslationCatalog:
             yield from cat.keys()
 
     def update(self, trans):
-        # Merge if plural function is the same as the top catalog, else prepend.
-        if trans.plural.__code__ == self._plurals[0]:
-            self._catalogs[0].update(trans._catalog)
+        # Merge if plural function is the same, else prepend.
+        for cat, plural in zip(self._catalogs, self._plurals):
+            if trans.plural.__code__ == plural.__code__:
+                cat.update(trans._catalog)
+                break
         else:
             self._catalogs.insert(0, trans._catalog.copy())
             self._plurals.insert(0, trans.plural)
 
+    @classmethod
+    def from_compiled(cls, catalogs):
+        """A catalog looking messages up in ``catalogs`` (MoCatalogs), in order."""
+        catalog = cls()
+        # Writable, for code adding messages at run time.
+        catalog._catalogs = [{}] + list(catalogs)
+        catalog._plurals = [catalogs[0].plural] + [cat.plural for cat in catalogs]
+        return catalog
+
+    def groups(self):
+        """[(messages, plural)] in lookup order."""
+        return list(zip(self._catalogs, self._plurals))
+
     def get(self, key, default=None):
         missing = object()
         for cat in self._catalogs:
@@ -126,8 +160,12 @@ class RaystackTranslation(gettext_module.GNUTranslations):
 
     domain = "fastapi"
 
-    def __init__(self, language, domain=None, localedirs=None):
-        """Create a GNUTranslations() using many locale directories"""
+    def __init__(self, language, domain=None, localedirs=None, use_compiled=True):
+        """
+        Create a GNUTranslations() using many locale directories, or the
+        catalog compiletranslations merged from them unless ``use_compiled``
+        is False.
+        """
         gettext_module.GNUTranslations.__init__(self)
         if domain is not None:
             self.domain = domain
@@ -147,16 +185,21 @@ class RaystackTranslation(gettext_module.GNUTranslations):
                     "localedirs is ignored when domain is 'fastapi'.", RuntimeWarning
                 )
                 localedirs = None
-            self._init_translation_catalog()
 
-        if localedirs:
-            for localedir in localedirs:
-                translation = self._new_gnu_trans(localedir)
-                self.merge(translation)
-        else:
-            self._add_installed_apps_translations()
+        compiled = use_compiled and self.domain == "fastapi" and self._load_compiled_catalog()
+        if not compiled:
+            if self.domain == "fastapi":
+                self._init_translation_catalog()
+
+            if localedirs:
+                for localedir in localedirs:
+                    translation = self._new_gnu_trans(localedir)
+                    self.merge(translation)
+            else:
+                self._add_installed_apps_translations()
+
+            self._add_local_translations()
 
-        self._add_local_translations()
         if (
             self.__language == settings.LANGUAGE_CODE
             and self.domain == "fastapi"
@@ -190,6 +233,29 @@ class RaystackTranslation(gettext_module.GNUTranslations):
             fallback=use_null_fallback,
         )
 
+    def _load_compiled_catalog(self):
+        """
+        Take the catalog from LOCALE_CACHE_DIR if compiletranslations wrote
+        one for this language; return whether it did.
+        """
+        cache_dir = getattr(settings, "LOCALE_CACHE_DIR", None)
+        if not cache_dir:
+            return False
+        directory = os.path.join(cache_dir, self.__locale)
+        try:
+            names = sorted(
+                (name for name in os.listdir(directory) if name.endswith(".mo")),
+                key=lambda name: int(name[:-3]),
+            )
+        except (OSError, ValueError):
+            return False
+        catalogs = [MoCatalog(os.path.join(directory, name)) for name in names]
+        if catalogs:
+            self.plural = catalogs[0].plural
+            self._info = catalogs[0].info.copy()
+            self._catalog = TranslationCatalog.from_compiled(catalogs)
+        return bool(catalogs)
+
     def _init_translation_catalog(self):
         """Create a base catalog using global raystack translations."""
         settingsfile = sys.modules[settings.__module__].__file__
@@ -275,10 +341,77 @@ def translation(language):
     """
     Return a translation object in the default 'fastapi' domain.
     """
-    global _translations
-    if language not in _translations:
-        _translations[language] = RaystackTranslation(language)
-    return _translations[language]
+    try:
+        return _translations[language]
+    except KeyError:
+        pass
+    # One thread builds it while the others wait, rather than all of them.
+    with _translations_lock:
+        if language not in _translations:
+            _translations[language] = RaystackTranslation(language)
+        return _translations[language]
+
+
+def compile_catalogs(directory, languages=None):
+    """
+    Merge the catalogs of each of ``languages`` (LANGUAGES by default) into
+    ``directory``, for RaystackTranslation to map them into memory rather
+    than read every locale directory. Return the number of languages with
+    translations.
+    """
+    compiled = 0
+    for language in languages or [code for code, name in settings.LANGUAGES]:
+        locale = to_locale(language)
+        target = os.path.join(directory, locale)
+        os.makedirs(target, exist_ok=True)
+        try:
+            trans = RaystackTranslation(language, use_compiled=False)
+        except OSError:
+            # The default language without catalogs.
+            groups = []
+        else:
+            groups = [(messages, plural) for messages, plural in trans._catalog.groups() if messages]
+        written = set()
+        for index, (messages, plural) in enumerate(groups):
+            name = "%d.mo" % index
+            _write_mo_atomic(target, name, messages)
+            written.add(name)
+        # Catalogs left over from a run with more groups.
+        for name in os.listdir(target):
+            if name.endswith(".mo") and name not in written:
+                os.remove(os.path.join(target, name))
+        compiled += bool(groups)
+    return compiled
+
+
+def _write_mo_atomic(directory, name, messages):
+    """
+    Write a catalog next to its final name and rename it into place, so a
+    running server never maps a half-written file.
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    os.close(fd)
+    renamed = False
+    try:
+        write_mo(tmp_path, messages)
+        os.replace(tmp_path, os.path.join(directory, name))
+        renamed = True
+    finally:
+        if not renamed:
+            os.remove(tmp_path)
+
+
+def warm_up(languages=None):
+    """
+    Load the translations of ``languages`` (LANGUAGES by default), so the
+    first requests in each language don't wait for them.
+    """
+    for language in languages or [code for code, name in settings.LANGUAGES]:
+        check_for_language(language)
+        try:
+            translation(language)
+        except OSError:
+            pass
 
 
 def activate(language):
@@ -288,7 +421,7 @@ def activate(language):
     """
     if not language:
         return
-    _active.value = translation(language)
+    _active.set(translation(language))
 
 
 def deactivate():
@@ -296,8 +429,7 @@ def deactivate():
     Uninstall the active translation object so that further _() calls resolve
     to the default translation object.
     """
-    if hasattr(_active, "value"):
-        del _active.value
+    _active.set(None)
 
 
 def deactivate_all():
@@ -306,13 +438,14 @@ def deactivate_all():
     useful when we want delayed translations to appear as the original string
     for some reason.
     """
-    _active.value = gettext_module.NullTranslations()
-    _active.value.to_language = lambda *args: None
+    null = gettext_module.NullTranslations()
+    null.to_language = lambda *args: None
+    _active.set(null)
 
 
 def get_language():
     """Return the currently selected language."""
-    t = getattr(_active, "value", None)
+    t = _active.get()
     if t is not None:
         try:
             return t.to_language()
@@ -345,7 +478,7 @@ def catalog():
     """
     global _default
 
-    t = getattr(_active, "value", None)
+    t = _active.get()
     if t is not None:
         return t
     if _default is None:
@@ -365,7 +498,7 @@ def gettext(message):
 
     if eol_message:
         _default = _default or translation(settings.LANGUAGE_CODE)
-        translation_object = getattr(_active, "value", _default)
+        translation_object = _active.get() or _default
 
         result = translation_object.gettext(eol_message)
     else:
@@ -403,7 +536,7 @@ def gettext_noop(message):
 def do_ntranslate(singular, plural, number, translation_function):
     global _default
 
-    t = getattr(_active, "value", None)
+    t = _active.get()
     if t is not None:
         return getattr(t, translation_function)(singular, plural, number)
     if _default is None:
@@ -560,11 +693,11 @@ def get_language_from_request(request, check_path=False):
     code, otherwise this is skipped for backwards compatibility.
     """
     if check_path:
-        lang_code = get_language_from_path(request.path_info)
+        lang_code = get_language_from_path(request.url.path)
         if lang_code is not None:
             return lang_code
 
-    lang_code = request.COOKIES.get(settings.LANGUAGE_COOKIE_NAME)
+    lang_code = request.cookies.get(settings.LANGUAGE_COOKIE_NAME)
     if (
         lang_code is not None
         and lang_code in get_languages()
@@ -577,7 +710,7 @@ def get_language_from_request(request, check_path=False):
     except LookupError:
         pass
 
-    accept = request.META.get("HTTP_ACCEPT_LANGUAGE", "")
+    accept = request.headers.get("accept-language", "")
     for accept_lang, unused in parse_accept_lang_header(accept):
         if accept_lang == "*":
             break
@@ -596,7 +729,7 @@ def get_language_from_request(request, check_path=False):
         return settings.LANGUAGE_CODE
 
 
-@functools.lru_cache(maxsize=None)(maxsize=1000)
+@functools.lru_cache(maxsize=1000)
 def _parse_accept_lang_header(lang_string):
     """
     Parse the lang_string, which is the body of an HTTP Accept-Language